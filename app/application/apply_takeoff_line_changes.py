@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from enum import StrEnum
+from pathlib import Path
+from typing import Protocol
+
+from app.application.errors import InvalidInputError
+from app.application.project_totals import TakeoffTotals, load_takeoff_totals
+from app.application.repositories.item_repository import ItemRepository
+from app.application.repositories.takeoff_line_repository import (
+    TakeoffLineRepository,
+    TakeoffLineUpdate,
+)
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+
+
+class TakeoffRecordRepository(Protocol):
+    def get(self, takeoff_id: str) -> TakeoffRecord: ...
+
+
+class LineAction(StrEnum):
+    ADD = "add"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class TakeoffLineChange:
+    """One row of a changes CSV."""
+
+    row: int
+    action: LineAction
+    item_code: str
+    qty: Decimal | None = None
+    stage: Stage | None = None
+    factor: Decimal | None = None
+    sort_order: int | None = None
+    notes: str | None = None
+
+
+@dataclass(frozen=True)
+class ApplyLineChangesResult:
+    added: int
+    updated: int
+    deleted: int
+    before: TakeoffTotals
+    after: TakeoffTotals
+
+
+_REQUIRED_COLUMNS = {"action", "item_code"}
+_VALUE_COLUMNS = ("qty", "stage", "factor", "sort_order")
+
+
+def _parse_change(row_index: int, row: dict[str, str]) -> TakeoffLineChange:
+    raw_action = row.get("action", "").strip().lower()
+    try:
+        action = LineAction(raw_action)
+    except ValueError as e:
+        raise InvalidInputError(f"Invalid action: {raw_action!r} (use add/update/delete)") from e
+
+    item_code = row.get("item_code", "").strip()
+    if not item_code:
+        raise InvalidInputError("item_code is empty")
+
+    values = {c: row.get(c, "").strip() for c in (*_VALUE_COLUMNS, "notes")}
+    if action is LineAction.DELETE:
+        given = [c for c, v in values.items() if v]
+        if given:
+            raise InvalidInputError(f"delete takes no other columns (got {', '.join(given)})")
+        return TakeoffLineChange(row=row_index, action=action, item_code=item_code)
+
+    if action is LineAction.ADD and not values["qty"]:
+        raise InvalidInputError("qty is required for add")
+    if action is LineAction.UPDATE:
+        if not any(values[c] for c in _VALUE_COLUMNS):
+            raise InvalidInputError(
+                "At least one of qty, stage, factor, sort_order must be provided"
+            )
+        if values["notes"]:
+            raise InvalidInputError("notes can only be set on add")
+
+    try:
+        qty = Decimal(values["qty"]) if values["qty"] else None
+        factor = Decimal(values["factor"]) if values["factor"] else None
+    except InvalidOperation as e:
+        raise InvalidInputError(
+            f"Invalid number: qty={values['qty']!r} factor={values['factor']!r}"
+        ) from e
+    try:
+        stage = Stage(values["stage"].lower()) if values["stage"] else None
+    except ValueError as e:
+        raise InvalidInputError(
+            f"Invalid stage: {values['stage']!r} (use ground/topout/final)"
+        ) from e
+    try:
+        sort_order = int(values["sort_order"]) if values["sort_order"] else None
+    except ValueError as e:
+        raise InvalidInputError(f"Invalid sort_order: {values['sort_order']!r}") from e
+
+    if qty is not None and qty <= Decimal("0"):
+        raise InvalidInputError("qty must be > 0")
+    if factor is not None and factor <= Decimal("0"):
+        raise InvalidInputError("factor must be > 0")
+    if sort_order is not None and sort_order < 0:
+        raise InvalidInputError("sort_order must be >= 0")
+
+    return TakeoffLineChange(
+        row=row_index,
+        action=action,
+        item_code=item_code,
+        qty=qty,
+        stage=stage,
+        factor=factor,
+        sort_order=sort_order,
+        notes=values["notes"] or None,
+    )
+
+
+def read_line_changes(csv_path: Path) -> tuple[TakeoffLineChange, ...]:
+    """
+    Parse a changes CSV (action,item_code[,qty,stage,factor,sort_order,notes]).
+
+    Every row is validated; if any is invalid, one InvalidInputError lists
+    them all (`Row N: ...`) and nothing is returned.
+    """
+    if not csv_path.exists():
+        raise InvalidInputError(f"CSV not found: {csv_path}")
+
+    changes: list[TakeoffLineChange] = []
+    errors: list[str] = []
+    first_row: dict[str, int] = {}
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None:
+            raise InvalidInputError("CSV has no header row")
+
+        header = {h.strip() for h in reader.fieldnames if h}
+        missing = sorted(_REQUIRED_COLUMNS - header)
+        if missing:
+            raise InvalidInputError(f"CSV missing required columns: {missing}")
+
+        for row_index, raw in enumerate(reader, start=2):  # header is row 1
+            row = {(k or "").strip(): (v or "") for k, v in raw.items()}
+            if not any(v.strip() for v in row.values()):
+                continue  # blank line
+            try:
+                change = _parse_change(row_index, row)
+            except InvalidInputError as e:
+                errors.append(f"Row {row_index}: {e}")
+                continue
+            if change.item_code in first_row:
+                errors.append(
+                    f"Row {row_index}: item_code {change.item_code} already changed "
+                    f"on row {first_row[change.item_code]}"
+                )
+                continue
+            first_row[change.item_code] = row_index
+            changes.append(change)
+
+    if errors:
+        raise InvalidInputError(
+            f"{len(errors)} invalid row(s) in {csv_path}:\n" + "\n".join(errors)
+        )
+    if not changes:
+        raise InvalidInputError(f"No changes in {csv_path}")
+    return tuple(changes)
+
+
+@dataclass(frozen=True)
+class ApplyTakeoffLineChanges:
+    """
+    Apply many line adds/updates/deletes to one takeoff atomically.
+
+    New lines snapshot the catalog item (description, price, taxable) like
+    `takeoffs add-line`; all items are read in one get_many. The line
+    repository's `apply_changes` checks the lock, validates everything against
+    the current lines and writes in one transaction, so either every change
+    lands or none.
+    """
+
+    takeoff_repo: TakeoffRecordRepository
+    takeoff_line_repo: TakeoffLineRepository
+    item_repo: ItemRepository
+
+    def __call__(
+        self, *, takeoff_id: str, changes: Sequence[TakeoffLineChange]
+    ) -> ApplyLineChangesResult:
+        takeoff = self.takeoff_repo.get(takeoff_id=takeoff_id)
+        add_changes = [c for c in changes if c.action is LineAction.ADD]
+        items = self.item_repo.get_many({c.item_code for c in add_changes})
+        missing = sorted({c.item_code for c in add_changes} - items.keys())
+        if missing:
+            raise InvalidInputError(f"Items not found: {', '.join(missing)}")
+
+        adds = [
+            TakeoffLineSnapshot(
+                takeoff_id=takeoff_id,
+                item_code=c.item_code,
+                qty=c.qty or Decimal("0"),
+                notes=c.notes,
+                description_snapshot=items[c.item_code].description,
+                details_snapshot=items[c.item_code].details,
+                unit_price_snapshot=items[c.item_code].unit_price,
+                taxable_snapshot=items[c.item_code].taxable,
+                stage=c.stage or Stage.FINAL,
+                factor=c.factor or Decimal("1.0"),
+                sort_order=c.sort_order or 0,
+            )
+            for c in add_changes
+        ]
+        updates = [
+            TakeoffLineUpdate(
+                item_code=c.item_code,
+                qty=c.qty,
+                stage=c.stage,
+                factor=c.factor,
+                sort_order=c.sort_order,
+            )
+            for c in changes
+            if c.action is LineAction.UPDATE
+        ]
+        deletes = [c.item_code for c in changes if c.action is LineAction.DELETE]
+
+        before = load_takeoff_totals(takeoff=takeoff, takeoff_line_repo=self.takeoff_line_repo)
+        self.takeoff_line_repo.apply_changes(
+            takeoff_id=takeoff_id, adds=adds, updates=updates, deletes=deletes
+        )
+        after = load_takeoff_totals(takeoff=takeoff, takeoff_line_repo=self.takeoff_line_repo)
+
+        return ApplyLineChangesResult(
+            added=len(adds),
+            updated=len(updates),
+            deleted=len(deletes),
+            before=before,
+            after=after,
+        )
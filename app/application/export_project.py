@@ -0,0 +1,487 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+
+from app.application.export_revision_bundle import (
+    ExportRevisionBundle,
+    revision_bundle_pdf_path,
+)
+from app.application.render_jobs import RenderJob, RenderJobs, RenderOutcome
+from app.application.render_takeoff_from_snapshot import RenderTakeoffFromVersion
+from app.application.summarize_project import ProjectSummary, SummarizeProject
+from app.config import AppConfig
+from app.domain.output_format import OutputFormat
+from app.domain.project import Project
+from app.infrastructure.export_manifest import (
+    ExportManifest,
+    TakeoffExportEntry,
+    files_match,
+    record_files,
+    remove_stale,
+)
+from app.infrastructure.render_cache import RenderCache
+from app.infrastructure.renderer_registry import RendererRegistry
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+
+_DELIVERABLE_FORMATS = (OutputFormat.PDF, OutputFormat.CSV, OutputFormat.JSON)
+
+
+def _safe_filename(value: str) -> str:
+    cleaned = re.sub(r'[\\/:*?"<>|]+', "_", value.strip())
+    cleaned = re.sub(r"\s+", " ", cleaned)
+    return cleaned
+
+
+def _project_models_label(template_codes: list[str]) -> str:
+    if not template_codes:
+        return "NO_MODELS"
+    return ",".join(template_codes)
+
+
+def _summary_payload(project: Project, result: ProjectSummary) -> dict[str, object]:
+    return {
+        "project_code": result.project_code,
+        "project_name": project.name,
+        "takeoff_count": result.takeoff_count,
+        "subtotal": str(result.subtotal),
+        "tax": str(result.tax),
+        "total": str(result.total),
+        "valve_discount": str(result.valve_discount),
+        "total_after_discount": str(result.total_after_discount),
+        "takeoffs": [
+            {
+                "takeoff_id": t.takeoff_id,
+                "project_code": t.project_code,
+                "template_code": t.template_code,
+                "subtotal": str(t.subtotal),
+                "tax": str(t.tax),
+                "total": str(t.total),
+                "valve_discount": str(t.valve_discount),
+                "total_after_discount": str(t.total_after_discount),
+            }
+            for t in result.takeoffs
+        ],
+    }
+
+
+def _summary_text(project: Project, result: ProjectSummary) -> str:
+    lines = [
+        "PROJECT SUMMARY",
+        f"code={result.project_code}",
+        f"name={project.name}",
+        f"takeoffs={result.takeoff_count}",
+        "",
+        "TAKEOFFS",
+    ]
+    if not result.takeoffs:
+        lines.append("none")
+    else:
+        for t in result.takeoffs:
+            lines.append(
+                f"{t.template_code} | takeoff_id={t.takeoff_id} | "
+                f"subtotal={t.subtotal:.2f} | tax={t.tax:.2f} | "
+                f"total={t.total:.2f} | valve_discount={t.valve_discount:.2f} | "
+                f"after_discount={t.total_after_discount:.2f}"
+            )
+    lines.extend(
+        [
+            "",
+            "GRAND TOTAL",
+            f"subtotal={result.subtotal:.2f}",
+            f"tax={result.tax:.2f}",
+            f"total={result.total:.2f}",
+            f"valve_discount={result.valve_discount:.2f}",
+            f"after_discount={result.total_after_discount:.2f}",
+        ]
+    )
+    return "\n".join(lines)
+
+
+class OutputStatus(StrEnum):
+    CACHED = "cached"
+    RENDERED = "rendered"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class ExportedOutput:
+    """One rendered file (bundle PDF or deliverable) of a rebuilt takeoff."""
+
+    fmt: OutputFormat
+    path: Path
+    status: OutputStatus
+    seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class UnchangedTakeoff:
+    """A takeoff the previous export's manifest still covers; nothing was written."""
+
+    template_code: str
+    version_id: str
+    files: int
+
+
+@dataclass(frozen=True)
+class ExportedBundle:
+    template_code: str
+    version_id: str
+    # None: not exported because the bundle PDF failed to render.
+    bundle_dir: Path | None
+
+
+@dataclass(frozen=True)
+class ProjectExportResult:
+    project_dir: Path
+    summary_json: Path
+    summary_txt: Path
+    financial_summary_txt: Path
+    deliverable_dir: Path
+    manifest: Path
+    summary_rebuilt: bool
+    takeoffs_rebuilt: int
+    unchanged: tuple[UnchangedTakeoff, ...]
+    outputs: tuple[ExportedOutput, ...]  # every planned output, in a fixed order
+    bundles: tuple[ExportedBundle, ...]
+    mirror_reports: tuple[str, ...]
+    removed: tuple[Path, ...]
+    render_jobs: int
+    workers: int
+    render_seconds: float
+    wall_seconds: float
+
+    @property
+    def failed(self) -> tuple[ExportedOutput, ...]:
+        return tuple(o for o in self.outputs if o.status is OutputStatus.FAILED)
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for o in self.outputs if o.status is OutputStatus.CACHED)
+
+    @property
+    def bundles_exported(self) -> int:
+        return sum(1 for b in self.bundles if b.bundle_dir is not None)
+
+    @property
+    def rendered_deliverable_files(self) -> int:
+        return sum(
+            1
+            for o in self.outputs
+            if o.path.parent == self.deliverable_dir and o.status is not OutputStatus.FAILED
+        )
+
+
+@dataclass(frozen=True)
+class ExportProject:
+    """
+    Export a project: summary files, deliverables (PDF/CSV/JSON) and the
+    latest snapshot bundle of every takeoff, under <out_dir>/<project code>.
+
+    Every DB read and report build happens up front, once per takeoff; the
+    renderers then only see report DTOs and run in a process pool of `jobs`
+    workers. <project_dir>/export_manifest.json (see
+    app.infrastructure.export_manifest) lets a re-run skip takeoffs and
+    summary files that did not change and remove outputs that went stale;
+    full=True ignores it. With a render_cache, outputs it already has are
+    copied in, and a takeoff whose outputs are all cached is never loaded.
+    """
+
+    project_repo: SqliteProjectRepository
+    template_repo: SqliteTemplateRepository
+    takeoff_repo: SqliteTakeoffRepository
+    takeoff_line_repo: SqliteTakeoffLineRepository
+    config: AppConfig
+    render_cache: RenderCache | None = None
+    renderer_registry: RendererRegistry = field(default_factory=RendererRegistry)
+
+    def __call__(
+        self, *, project_code: str, out_dir: Path, jobs: int | None = None, full: bool = False
+    ) -> ProjectExportResult:
+        project = self.project_repo.get(code=project_code)
+        result = SummarizeProject(
+            takeoff_repo=self.takeoff_repo,
+            takeoff_line_repo=self.takeoff_line_repo,
+        )(project_code=project_code)
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        project_dir = out_dir / project.code
+        project_dir.mkdir(parents=True, exist_ok=True)
+
+        model_codes = [t.template_code for t in result.takeoffs]
+        project_base_name = _safe_filename(
+            f"{project.name} ({_project_models_label(model_codes)})"
+        )
+        summary_json_path = project_dir / f"{project_base_name}_project_summary.json"
+        summary_txt_path = project_dir / f"{project_base_name}_project_summary.txt"
+        financial_txt_path = project_dir / f"{project_base_name}_financial_summary.txt"
+        summary_payload = _summary_payload(project, result)
+
+        # The manifest of the previous export says which outputs are still
+        # current; those are verified and left alone.
+        renderers = {
+            fmt.value: self.renderer_registry.version_for(fmt) for fmt in OutputFormat
+        }
+        previous = ExportManifest.load(project_dir)
+        if previous is not None and previous.project_code != project.code:
+            previous = None
+        reusable = None
+        if previous is not None and not full and previous.renderers == renderers:
+            reusable = previous
+
+        # The payload holds every total and every name the summary files use.
+        summary_hash = hashlib.sha256(
+            json.dumps(summary_payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        summary_unchanged = (
+            reusable is not None
+            and reusable.summary_hash == summary_hash
+            and files_match(project_dir, reusable.summary_files)
+        )
+        if summary_unchanged and reusable is not None:
+            summary_files = reusable.summary_files
+        else:
+            summary_text = _summary_text(project, result)
+            summary_json_path.write_text(json.dumps(summary_payload, indent=2), encoding="utf-8")
+            summary_txt_path.write_text(summary_text, encoding="utf-8")
+            financial_txt_path.write_text(summary_text, encoding="utf-8")
+            summary_files = record_files(
+                project_dir, [summary_json_path, summary_txt_path, financial_txt_path]
+            )
+
+        deliverable_dir = project_dir / "deliverable"
+        deliverable_dir.mkdir(parents=True, exist_ok=True)
+
+        render_cache = self.render_cache
+        render_version = RenderTakeoffFromVersion(
+            project_repo=self.project_repo,
+            template_repo=self.template_repo,
+            takeoff_repo=self.takeoff_repo,
+            renderer_factory=self.renderer_registry,
+            config=self.config,
+            render_cache=render_cache,
+        )
+        unchanged: dict[str, TakeoffExportEntry] = {}
+        unchanged_report: list[UnchangedTakeoff] = []
+        latest_versions = []
+        planned: list[tuple[OutputFormat, Path]] = []
+        cached: set[Path] = set()
+        cache_keys: dict[Path, str] = {}
+        copied_later: dict[Path, str] = {}
+        render_jobs: list[RenderJob] = []
+        for t in result.takeoffs:
+            versions = self.takeoff_repo.list_versions(takeoff_id=t.takeoff_id)
+            if not versions:
+                continue
+
+            latest = versions[0]
+            fingerprint = render_version.render_fingerprint(version_id=latest.version_id)
+
+            latest_dir = project_dir / "takeoffs" / t.template_code / "latest"
+            bundle_pdf = revision_bundle_pdf_path(
+                latest_dir,
+                project_code=t.project_code,
+                template_code=t.template_code,
+                version_number=latest.version_number,
+            )
+            deliverable_base = _safe_filename(f"{project.name} ({t.template_code})")
+            outputs = [(OutputFormat.PDF, bundle_pdf)] + [
+                (fmt, deliverable_dir / f"{deliverable_base}.{fmt.value}")
+                for fmt in _DELIVERABLE_FORMATS
+            ]
+
+            entry = reusable.takeoffs.get(t.takeoff_id) if reusable else None
+            if (
+                entry is not None
+                and fingerprint is not None
+                and entry.version_id == latest.version_id
+                and entry.fingerprint == fingerprint
+                and {out.relative_to(project_dir).as_posix() for _, out in outputs}
+                <= entry.files.keys()
+                and files_match(project_dir, entry.files)
+            ):
+                unchanged[t.takeoff_id] = entry
+                unchanged_report.append(
+                    UnchangedTakeoff(
+                        template_code=t.template_code,
+                        version_id=latest.version_id,
+                        files=len(entry.files),
+                    )
+                )
+                continue
+
+            latest_versions.append(
+                (t, latest, latest_dir, bundle_pdf, fingerprint, [p for _, p in outputs])
+            )
+            keys = render_version.cache_keys(version_id=latest.version_id, fingerprint=fingerprint)
+            report = None
+            for fmt, out_path in outputs:
+                planned.append((fmt, out_path))
+                key = keys.get(fmt)
+                if render_cache is not None and key is not None and render_cache.fetch(
+                    key, out_path
+                ):
+                    cached.add(out_path)
+                    continue
+                if key is not None and key in cache_keys.values():
+                    # Same bytes as an output already queued (bundle and
+                    # deliverable PDF): render once, copy it after.
+                    copied_later[out_path] = key
+                    continue
+                if report is None:
+                    report = render_version.build_report(version_id=latest.version_id)
+                if key is not None:
+                    cache_keys[out_path] = key
+                render_jobs.append(RenderJob(report=report, fmt=fmt, out=out_path))
+
+        workers = jobs or os.cpu_count() or 1
+        render_start = time.perf_counter()
+        outcomes = RenderJobs(renderer_factory=self.renderer_registry)(render_jobs, workers=workers)
+        render_wall = time.perf_counter() - render_start
+        by_path = {o.out: o for o in outcomes}
+
+        if render_cache is not None:
+            for o in outcomes:
+                if o.ok and o.out in cache_keys:
+                    render_cache.store(cache_keys[o.out], o.out)
+        for out_path, key in copied_later.items():
+            source = by_path[next(p for p, k in cache_keys.items() if k == key)]
+            error = source.error
+            if source.ok:
+                try:
+                    if render_cache is None or not render_cache.fetch(key, out_path):
+                        shutil.copyfile(source.out, out_path)  # evicted already
+                    cached.add(out_path)
+                    continue
+                except OSError as e:
+                    error = f"{type(e).__name__}: {e}"
+            by_path[out_path] = RenderOutcome(
+                out=out_path, fmt=source.fmt, seconds=0.0, error=error
+            )
+
+        def ok(path: Path) -> bool:
+            return path in cached or by_path[path].ok
+
+        bundles: list[ExportedBundle] = []
+        rebuilt: dict[str, TakeoffExportEntry] = {}
+        # Mirror copies (e.g. to a network share) run on a thread pool while
+        # the next bundles are written; their results are reported after.
+        mirror_pool = (
+            ThreadPoolExecutor(max_workers=self.config.mirror_workers, thread_name_prefix="mirror")
+            if self.config.mirror_export_root is not None
+            else None
+        )
+        bundle_export = ExportRevisionBundle(
+            takeoff_repo=self.takeoff_repo,
+            project_repo=self.project_repo,
+            template_repo=self.template_repo,
+            config=self.config,
+            mirror_executor=mirror_pool,
+        )
+        with mirror_pool or contextlib.nullcontext():
+            for t, latest, latest_dir, bundle_pdf, fingerprint, out_paths in latest_versions:
+                if not ok(bundle_pdf):
+                    bundles.append(
+                        ExportedBundle(
+                            template_code=t.template_code,
+                            version_id=latest.version_id,
+                            bundle_dir=None,
+                        )
+                    )
+                    continue
+                bundle_dir = bundle_export(
+                    version_id=latest.version_id,
+                    out_dir=latest_dir,
+                    render_pdf=False,
+                )
+                bundles.append(
+                    ExportedBundle(
+                        template_code=t.template_code,
+                        version_id=latest.version_id,
+                        bundle_dir=bundle_dir,
+                    )
+                )
+
+                # Takeoffs with a failed output (or a legacy version without an
+                # integrity hash) stay out of the manifest and are rebuilt next run.
+                if fingerprint is None or not all(ok(p) for p in out_paths):
+                    continue
+                bundle_files = [p for p in bundle_dir.rglob("*") if p.is_file()]
+                rebuilt[t.takeoff_id] = TakeoffExportEntry(
+                    takeoff_id=t.takeoff_id,
+                    template_code=t.template_code,
+                    version_id=latest.version_id,
+                    integrity_hash=latest.integrity_hash,
+                    fingerprint=fingerprint,
+                    files=record_files(project_dir, sorted({*out_paths, *bundle_files})),
+                )
+        mirror_reports = tuple(m.result() for m in bundle_export.mirrors)
+
+        manifest = ExportManifest(
+            project_code=project.code,
+            renderers=renderers,
+            summary_hash=summary_hash,
+            summary_files=summary_files,
+            takeoffs={**unchanged, **rebuilt},
+        )
+        # Only files a previous export recorded are ever deleted; outputs
+        # that failed this run are kept until they are rebuilt.
+        stale = set()
+        if previous is not None:
+            keep = manifest.all_files() | {
+                p.relative_to(project_dir).as_posix() for _, p in planned
+            }
+            stale = previous.all_files() - keep
+        removed = remove_stale(project_dir, stale)
+        manifest_path = manifest.save(project_dir)
+
+        exported_outputs: list[ExportedOutput] = []
+        for fmt, out_path in planned:
+            if out_path in cached:
+                exported_outputs.append(
+                    ExportedOutput(fmt=fmt, path=out_path, status=OutputStatus.CACHED)
+                )
+                continue
+            o = by_path[out_path]
+            exported_outputs.append(
+                ExportedOutput(
+                    fmt=o.fmt,
+                    path=out_path,
+                    status=OutputStatus.RENDERED if o.ok else OutputStatus.FAILED,
+                    seconds=o.seconds,
+                    error=o.error,
+                )
+            )
+
+        return ProjectExportResult(
+            project_dir=project_dir,
+            summary_json=summary_json_path,
+            summary_txt=summary_txt_path,
+            financial_summary_txt=financial_txt_path,
+            deliverable_dir=deliverable_dir,
+            manifest=manifest_path,
+            summary_rebuilt=not summary_unchanged,
+            takeoffs_rebuilt=len(latest_versions),
+            unchanged=tuple(unchanged_report),
+            outputs=tuple(exported_outputs),
+            bundles=tuple(bundles),
+            mirror_reports=mirror_reports,
+            removed=tuple(removed),
+            render_jobs=len(outcomes),
+            workers=workers,
+            render_seconds=sum(o.seconds for o in outcomes),
+            wall_seconds=render_wall,
+        )
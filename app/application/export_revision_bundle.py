@@ -1,18 +1,56 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
 from app.application.generate_revision_report import GenerateRevisionReport
 from app.application.render_takeoff_from_snapshot import RenderTakeoffFromVersion
 from app.domain.output_format import OutputFormat
+from app.infrastructure.file_sync import SyncAction, sync_file
+from app.infrastructure.render_cache import RenderCache
 from app.infrastructure.renderer_registry import RendererRegistry
 
 from decimal import Decimal
 from app.domain.stage import Stage
-from app.domain.totals import TakeoffLineInput, calc_stage_totals, calc_grand_totals
+from app.domain.totals import TakeoffLineInput, TotalsAccumulator
+
+
+def revision_bundle_pdf_path(
+    out_dir: Path, *, project_code: str, template_code: str, version_number: int
+) -> Path:
+    """Where ExportRevisionBundle puts (or expects, with render_pdf=False) the PDF."""
+    return (
+        out_dir
+        / project_code
+        / template_code
+        / f"v{version_number}"
+        / f"takeoff_v{version_number}.pdf"
+    )
+
+
+def mirror_bundle(bundle_dir: Path, mirror_dir: Path) -> str:
+    """
+    Copy a bundle's files to the mirror and return the line to report.
+
+    Files whose size and mtime already match are skipped. Mirror failures
+    never break the main export.
+    """
+    try:
+        actions = [
+            sync_file(file, mirror_dir / file.name)
+            for file in sorted(bundle_dir.iterdir())
+            if file.is_file()
+        ]
+    except Exception as e:
+        return f"WARNING: mirror export failed: {e}"
+    skipped = actions.count(SyncAction.SKIPPED)
+    return (
+        f"MIRROR export completed at: {mirror_dir} "
+        f"(copied={len(actions) - skipped} skipped={skipped})"
+    )
 
 
 @dataclass
@@ -21,13 +59,25 @@ class ExportRevisionBundle:
     project_repo: any
     template_repo: any
     config: any
-
-    def __call__(self, *, version_id: str, out_dir: Path | None = None) -> Path:
+    render_cache: RenderCache | None = None
+    # With an executor, mirroring runs in the background: __call__ returns
+    # as soon as the primary bundle is written and the mirror's pending
+    # report line is appended to `mirrors`.
+    mirror_executor: Executor | None = None
+    mirrors: list[Future[str]] = field(default_factory=list)
+
+    def __call__(
+        self, *, version_id: str, out_dir: Path | None = None, render_pdf: bool = True
+    ) -> Path:
         """
         Export a revision bundle containing:
         - rendered PDF
         - revision report
         - metadata.json
+
+        render_pdf=False: the caller has already written the PDF at
+        revision_bundle_pdf_path (e.g. `projects export`, which renders every
+        PDF in a process pool first); it is left as is and still mirrored.
         """
 
         # Resolve output directory from config if not provided
@@ -42,12 +92,13 @@ class ExportRevisionBundle:
 
         version_number = version.version_number
 
-        bundle_dir = (
-            out_dir
-            / project.code
-            / template.code
-            / f"v{version_number}"
+        pdf_path = revision_bundle_pdf_path(
+            out_dir,
+            project_code=project.code,
+            template_code=template.code,
+            version_number=version_number,
         )
+        bundle_dir = pdf_path.parent
 
         bundle_dir.mkdir(parents=True, exist_ok=True)
 
@@ -55,19 +106,19 @@ class ExportRevisionBundle:
         # 1. Render Takeoff PDF
         # -----------------------------
 
-        pdf_path = bundle_dir / f"takeoff_v{version_number}.pdf"
-
-        RenderTakeoffFromVersion(
-            project_repo=self.project_repo,
-            template_repo=self.template_repo,
-            takeoff_repo=self.takeoff_repo,
-            renderer_factory=RendererRegistry(),
-            config=self.config,
-        )(
-            version_id=version_id,
-            out=pdf_path,
-            fmt=OutputFormat.PDF,
-        )
+        if render_pdf:
+            RenderTakeoffFromVersion(
+                project_repo=self.project_repo,
+                template_repo=self.template_repo,
+                takeoff_repo=self.takeoff_repo,
+                renderer_factory=RendererRegistry(),
+                config=self.config,
+                render_cache=self.render_cache,
+            )(
+                version_id=version_id,
+                out=pdf_path,
+                fmt=OutputFormat.PDF,
+            )
 
         # -----------------------------
         # 2. Revision report
@@ -137,15 +188,11 @@ class ExportRevisionBundle:
                     )
                 )
 
-            ground = calc_stage_totals(inputs, stage=Stage.GROUND, tax_rate=version.tax_rate_snapshot)
-            topout = calc_stage_totals(inputs, stage=Stage.TOPOUT, tax_rate=version.tax_rate_snapshot)
-            final = calc_stage_totals(inputs, stage=Stage.FINAL, tax_rate=version.tax_rate_snapshot)
-
-            grand = calc_grand_totals(
-                inputs,
-                valve_discount=version.valve_discount_snapshot,
-                tax_rate=version.tax_rate_snapshot,
-            )
+            acc = TotalsAccumulator.from_lines(inputs, tax_rate=version.tax_rate_snapshot)
+            ground = acc.stage_totals(Stage.GROUND)
+            topout = acc.stage_totals(Stage.TOPOUT)
+            final = acc.stage_totals(Stage.FINAL)
+            grand = acc.grand_totals(valve_discount=version.valve_discount_snapshot)
 
             summary_text = f"""
 GROUND
@@ -184,24 +231,17 @@ after_discount: {grand.total_after_discount:.2f}
         mirror_root = getattr(self.config, "mirror_export_root", None)
 
         if mirror_root:
-            try:
-                mirror_dir = (
-                    Path(mirror_root)
-                    / project.code
-                    / template.code
-                    / f"v{version_number}"
+            mirror_dir = (
+                Path(mirror_root)
+                / project.code
+                / template.code
+                / f"v{version_number}"
+            )
+            if self.mirror_executor is None:
+                print(mirror_bundle(bundle_dir, mirror_dir))
+            else:
+                self.mirrors.append(
+                    self.mirror_executor.submit(mirror_bundle, bundle_dir, mirror_dir)
                 )
 
-                mirror_dir.mkdir(parents=True, exist_ok=True)
-
-                for file in bundle_dir.iterdir():
-                    target = mirror_dir / file.name
-                    target.write_bytes(file.read_bytes())
-
-                print(f"MIRROR export completed at: {mirror_dir}")
-
-            except Exception as e:
-                # Mirror failures should never break the main export
-                print(f"WARNING: mirror export failed: {e}")
-
         return bundle_dir
\ No newline at end of file
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import csv
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
@@ -15,6 +18,10 @@ class ImportItemsReport:
     inserted_or_updated: int
     skipped: int
     errors: tuple[str, ...]
+    # Bulk mode only: how inserted_or_updated splits, plus rows that matched the catalog.
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
 
 
 def _parse_price(raw: str) -> Decimal:
@@ -51,6 +58,118 @@ def _normalize_optional_text(raw: object) -> str | None:
     return s
 
 
+_REQUIRED_COLUMNS = {"ITEM NUMBER", "PRICE$", "DESCRIPTION 1", "TAXABLE"}
+
+# One CSV row on its way to validation:
+# (row_index, item_number, PRICE$, DESCRIPTION 1, DESCRIPTION 2, TAXABLE, reader_error)
+_RawRow = tuple[int, str, object, object, object, object, str | None]
+# (row_index, item, error): exactly one of item / error is set.
+_ValidatedRow = tuple[int, Item | None, str | None]
+
+
+def _build_item(
+    item_number: str, price_raw: object, desc1_raw: object, desc2_raw: object, taxable_raw: object
+) -> Item:
+    price = _parse_price(str(price_raw or ""))
+    desc1 = str(desc1_raw or "").strip()
+    if not desc1:
+        raise InvalidInputError("DESCRIPTION 1 is empty")
+
+    desc2 = _normalize_optional_text(desc2_raw)
+    taxable = _parse_bool(taxable_raw)
+
+    return Item(
+        code=item_number,          # ✅ internal code = item number
+        item_number=item_number,   # ✅ keep original field too
+        description=desc1,
+        details=desc2,
+        unit_price=price,
+        taxable=taxable,
+        is_active=True,
+    )
+
+
+def _read_chunks(reader: csv.DictReader[str], *, chunk_size: int) -> Iterator[list[_RawRow]]:
+    """
+    Reader stage: fixed-size row chunks in file order.
+
+    ITEM NUMBER presence and duplicate checks need every earlier row, so they
+    run here, sequentially; a failing row travels on with its error set.
+    """
+    seen_item_numbers: set[str] = set()
+    chunk: list[_RawRow] = []
+    for row_index, row in enumerate(reader, start=2):  # header is row 1
+        item_number = (row.get("ITEM NUMBER") or "").strip()
+        error: str | None = None
+        if not item_number:
+            error = "ITEM NUMBER is empty"
+        elif item_number in seen_item_numbers:
+            error = f"Duplicate ITEM NUMBER in CSV: {item_number}"
+        else:
+            seen_item_numbers.add(item_number)
+
+        chunk.append(
+            (
+                row_index,
+                item_number,
+                row.get("PRICE$", ""),
+                row.get("DESCRIPTION 1"),
+                row.get("DESCRIPTION 2"),
+                row.get("TAXABLE"),
+                error,
+            )
+        )
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate_chunk(chunk: list[_RawRow]) -> list[_ValidatedRow]:
+    """Validation stage (price / description / taxable); runs in worker processes if workers > 1."""
+    out: list[_ValidatedRow] = []
+    for row_index, item_number, price, desc1, desc2, taxable, error in chunk:
+        if error is not None:
+            out.append((row_index, None, error))
+            continue
+        try:
+            out.append((row_index, _build_item(item_number, price, desc1, desc2, taxable), None))
+        except Exception as e:
+            out.append((row_index, None, str(e)))
+    return out
+
+
+def _validate_in_pool(
+    chunks: Iterator[list[_RawRow]], *, workers: int
+) -> Iterator[list[_ValidatedRow]]:
+    """Validate chunks in a process pool, yielding results in submission (file) order.
+
+    At most 2 * workers chunks are in flight, so memory stays bounded however
+    large the file is.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: deque[Future[list[_ValidatedRow]]] = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_validate_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _valid_items(
+    validated: Iterable[list[_ValidatedRow]], errors: list[str]
+) -> Iterator[tuple[int, Item]]:
+    """Valid (row_index, item) in file order; invalid rows are recorded in `errors`."""
+    for chunk in validated:
+        for row_index, item, error in chunk:
+            if item is None:
+                errors.append(f"Row {row_index}: {error}")
+            else:
+                yield row_index, item
+
+
 class ImportItemsFromCsv:
     """
     Import items from a CSV exported from Excel.
@@ -60,6 +179,18 @@ class ImportItemsFromCsv:
     - The import continues for the rest of the rows.
     - If a duplicate ITEM NUMBER appears in the same CSV, that row is skipped.
 
+    Bulk mode (bulk=True):
+    - Invalid and duplicate rows are skipped and reported as above.
+    - Valid rows stream into the repository's `upsert_many`: one transaction,
+      and only rows that are new or differ from the catalog. Nothing is
+      committed before the last row is validated, and an error reading the
+      file rolls the whole import back.
+
+    Streaming:
+    - The file is read in chunks of `chunk_size` rows. Field validation runs
+      in a process pool when workers > 1; a single writer consumes results in
+      file order, so errors and counts are the same for any `workers`.
+
     KEY RULE:
     - ITEM NUMBER is the unique identifier and is used as the internal `code`.
     """
@@ -67,18 +198,23 @@ class ImportItemsFromCsv:
     def __init__(self, *, repo: ItemRepository) -> None:
         self._repo = repo
 
-    def __call__(self, *, csv_path: Path) -> ImportItemsReport:
+    def __call__(
+        self,
+        *,
+        csv_path: Path,
+        bulk: bool = False,
+        workers: int = 1,
+        chunk_size: int = 5_000,
+    ) -> ImportItemsReport:
         if not csv_path.exists():
             raise InvalidInputError(f"CSV not found: {csv_path}")
+        if workers < 1:
+            raise InvalidInputError("workers must be >= 1")
+        if chunk_size < 1:
+            raise InvalidInputError("chunk_size must be >= 1")
 
-        required = {"ITEM NUMBER", "PRICE$", "DESCRIPTION 1", "TAXABLE"}
-
-        inserted_or_updated = 0
-        skipped = 0
         errors: list[str] = []
 
-        seen_item_numbers: set[str] = set()
-
         with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
             reader = csv.DictReader(f)
 
@@ -86,49 +222,40 @@ class ImportItemsFromCsv:
                 raise InvalidInputError("CSV has no header row")
 
             header = {h.strip() for h in reader.fieldnames if h}
-            missing = sorted(required - header)
+            missing = sorted(_REQUIRED_COLUMNS - header)
             if missing:
                 raise InvalidInputError(f"CSV missing required columns: {missing}")
 
-            for row_index, row in enumerate(reader, start=2):  # header is row 1
-                try:
-                    item_number = (row.get("ITEM NUMBER") or "").strip()
-                    if not item_number:
-                        raise InvalidInputError("ITEM NUMBER is empty")
-
-                    if item_number in seen_item_numbers:
-                        raise InvalidInputError(
-                            f"Duplicate ITEM NUMBER in CSV: {item_number}"
-                        )
-                    seen_item_numbers.add(item_number)
-
-                    price = _parse_price(str(row.get("PRICE$", "") or ""))
-                    desc1 = (row.get("DESCRIPTION 1") or "").strip()
-                    if not desc1:
-                        raise InvalidInputError("DESCRIPTION 1 is empty")
-
-                    desc2 = _normalize_optional_text(row.get("DESCRIPTION 2"))
-                    taxable = _parse_bool(row.get("TAXABLE"))
-
-                    item = Item(
-                        code=item_number,          # ✅ internal code = item number
-                        item_number=item_number,   # ✅ keep original field too
-                        description=desc1,
-                        details=desc2,
-                        unit_price=price,
-                        taxable=taxable,
-                        is_active=True,
-                    )
+            chunks = _read_chunks(reader, chunk_size=chunk_size)
+            validated: Iterable[list[_ValidatedRow]] = (
+                map(_validate_chunk, chunks)
+                if workers == 1
+                else _validate_in_pool(chunks, workers=workers)
+            )
+            valid = _valid_items(validated, errors)
 
+            # Writer stage
+            if bulk:
+                counts = self._repo.upsert_many(item for _, item in valid)
+                return ImportItemsReport(
+                    inserted_or_updated=counts.inserted + counts.updated,
+                    skipped=len(errors),
+                    errors=tuple(errors),
+                    inserted=counts.inserted,
+                    updated=counts.updated,
+                    unchanged=counts.unchanged,
+                )
+
+            inserted_or_updated = 0
+            for row_index, item in valid:
+                try:
                     self._repo.upsert(item)
                     inserted_or_updated += 1
-
                 except Exception as e:
-                    skipped += 1
                     errors.append(f"Row {row_index}: {e}")
 
         return ImportItemsReport(
             inserted_or_updated=inserted_or_updated,
-            skipped=skipped,
+            skipped=len(errors),
             errors=tuple(errors),
         )
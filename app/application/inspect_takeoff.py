@@ -4,14 +4,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Iterable, List
 
+from app.application.project_totals import load_takeoff_totals
 from app.domain.stage import Stage
-from app.domain.totals import (
-    TakeoffLineInput,
-    calc_stage_totals,
-    calc_grand_totals,
-)
 
 
 @dataclass(frozen=True)
@@ -47,36 +42,17 @@ class InspectTakeoff:
     def __call__(self, *, takeoff_id: str) -> InspectTakeoffResult:
         takeoff = self._takeoff_repo.get(takeoff_id=takeoff_id)
 
-        lines = list(self._takeoff_line_repo.list_for_takeoff(takeoff_id=takeoff_id))
-
-        inputs: List[TakeoffLineInput] = []
-
-        for ln in lines:
-            stage = getattr(ln, "stage", None) or Stage.FINAL
-            factor = getattr(ln, "factor", None) or Decimal("1.0")
-
-            inputs.append(
-                TakeoffLineInput(
-                    stage=stage,
-                    price=ln.unit_price_snapshot,
-                    qty=ln.qty,
-                    factor=factor,
-                    taxable=ln.taxable_snapshot,
-                )
-            )
-
-        stage_totals = {}
-
-        for st in (Stage.GROUND, Stage.TOPOUT, Stage.FINAL):
-            tt = calc_stage_totals(inputs, stage=st, tax_rate=takeoff.tax_rate)
-            stage_totals[st.value] = tt
-
-        grand_totals = calc_grand_totals(
-            inputs,
-            valve_discount=takeoff.valve_discount,
-            tax_rate=takeoff.tax_rate,
+        totals = load_takeoff_totals(
+            takeoff=takeoff,
+            takeoff_line_repo=self._takeoff_line_repo,
         )
 
+        stage_totals = {
+            Stage.GROUND.value: totals.ground,
+            Stage.TOPOUT.value: totals.topout,
+            Stage.FINAL.value: totals.final,
+        }
+
         versions = list(self._takeoff_repo.list_versions(takeoff_id=takeoff_id))
 
         return InspectTakeoffResult(
@@ -86,8 +62,8 @@ class InspectTakeoff:
             tax_rate=takeoff.tax_rate,
             valve_discount=takeoff.valve_discount,
             locked=takeoff.is_locked,
-            line_count=len(lines),
+            line_count=totals.line_count,
             stage_totals=stage_totals,
-            grand_totals=grand_totals,
+            grand_totals=totals.grand,
             versions=versions,
         )
\ No newline at end of file
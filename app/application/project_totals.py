@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Protocol
+
+from app.application.repositories.takeoff_line_repository import (
+    TakeoffLineRepository,
+    TakeoffStageSums,
+)
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.totals import (
+    GrandTotals,
+    StageTotals,
+    TakeoffLineInput,
+    TotalsAccumulator,
+    grand_totals_from_stages,
+    stage_totals_from_sums,
+)
+
+_STAGES = (Stage.GROUND, Stage.TOPOUT, Stage.FINAL)
+
+
+class ProjectTakeoffRepository(Protocol):
+    def list_for_project(self, project_code: str) -> Sequence[TakeoffRecord]: ...
+
+
+@dataclass(frozen=True)
+class TakeoffTotals:
+    """Stage and grand totals for one takeoff record (see list_for_project)."""
+
+    takeoff: TakeoffRecord
+    ground: StageTotals
+    topout: StageTotals
+    final: StageTotals
+    grand: GrandTotals
+    line_count: int
+
+
+def _build(
+    takeoff: TakeoffRecord, stages: dict[Stage, StageTotals], line_count: int
+) -> TakeoffTotals:
+    grand = grand_totals_from_stages(
+        (stages[s] for s in _STAGES),
+        valve_discount=takeoff.valve_discount,
+    )
+    return TakeoffTotals(
+        takeoff=takeoff,
+        ground=stages[Stage.GROUND],
+        topout=stages[Stage.TOPOUT],
+        final=stages[Stage.FINAL],
+        grand=grand,
+        line_count=line_count,
+    )
+
+
+def takeoff_totals_from_lines(
+    takeoff: TakeoffRecord, lines: Iterable[TakeoffLineSnapshot]
+) -> TakeoffTotals:
+    """Reference path: compute totals in Python from TakeoffLineSnapshot rows."""
+    inputs: list[TakeoffLineInput] = []
+    line_count = 0
+    for ln in lines:
+        line_count += 1
+        stage = getattr(ln, "stage", None) or Stage.FINAL
+        factor = getattr(ln, "factor", None) or Decimal("1.0")
+        inputs.append(
+            TakeoffLineInput(
+                stage=stage,
+                price=ln.unit_price_snapshot,
+                qty=ln.qty,
+                factor=factor,
+                taxable=ln.taxable_snapshot,
+            )
+        )
+
+    acc = TotalsAccumulator.from_lines(inputs, tax_rate=takeoff.tax_rate)
+    return _build(takeoff, acc.all_stage_totals(), line_count)
+
+
+def load_project_takeoff_totals(
+    *,
+    takeoff_repo: ProjectTakeoffRepository,
+    takeoff_line_repo: TakeoffLineRepository,
+    project_code: str,
+) -> tuple[TakeoffTotals, ...]:
+    """
+    Totals for every takeoff of a project, in list_for_project order.
+
+    The whole project's stage sums come from one stage_sums_for_project call.
+    """
+    takeoffs = takeoff_repo.list_for_project(project_code=project_code)
+    grouped = _group_stage_sums(takeoff_line_repo.stage_sums_for_project(project_code=project_code))
+    return tuple(_build_from_sums(t, grouped.get(t.takeoff_id, ())) for t in takeoffs)
+
+
+def load_takeoff_totals(
+    *, takeoff: TakeoffRecord, takeoff_line_repo: TakeoffLineRepository
+) -> TakeoffTotals:
+    """Totals for one takeoff record, from its stage_sums_for_takeoff rows."""
+    return _build_from_sums(
+        takeoff, takeoff_line_repo.stage_sums_for_takeoff(takeoff_id=takeoff.takeoff_id)
+    )
+
+
+def _group_stage_sums(rows: Iterable[TakeoffStageSums]) -> dict[str, list[TakeoffStageSums]]:
+    grouped: dict[str, list[TakeoffStageSums]] = defaultdict(list)
+    for row in rows:
+        grouped[row.takeoff_id].append(row)
+    return grouped
+
+
+def _build_from_sums(takeoff: TakeoffRecord, rows: Iterable[TakeoffStageSums]) -> TakeoffTotals:
+    empty = stage_totals_from_sums(subtotal=Decimal("0"), tax=Decimal("0"))
+    stages = {s: empty for s in _STAGES}
+    line_count = 0
+    for row in rows:
+        stages[row.stage] = stage_totals_from_sums(subtotal=row.subtotal, tax=row.tax)
+        line_count += row.line_count
+    return _build(takeoff, stages, line_count)
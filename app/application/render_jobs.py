@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.application.errors import InvalidInputError
+from app.domain.output_format import OutputFormat
+from app.reporting.models import TakeoffReport
+from app.reporting.renderer_factory import RendererFactory
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    """One output file: a prebuilt report DTO, the format and where to write it."""
+
+    report: TakeoffReport
+    fmt: OutputFormat
+    out: Path
+
+
+@dataclass(frozen=True)
+class RenderOutcome:
+    out: Path
+    fmt: OutputFormat
+    seconds: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def render_many(
+    report: TakeoffReport,
+    outputs: Mapping[OutputFormat, Path],
+    *,
+    renderer_factory: RendererFactory,
+) -> dict[OutputFormat, Path]:
+    """Render one prebuilt report to several formats, in `outputs` order."""
+    rendered: dict[OutputFormat, Path] = {}
+    for fmt, out in outputs.items():
+        rendered[fmt] = renderer_factory.for_format(fmt).render(report, out)
+    return rendered
+
+
+def _render_job(renderer_factory: RendererFactory, job: RenderJob) -> RenderOutcome:
+    """Render one job; runs in worker processes when workers > 1."""
+    start = time.perf_counter()
+    try:
+        job.out.parent.mkdir(parents=True, exist_ok=True)
+        renderer_factory.for_format(job.fmt).render(job.report, job.out)
+    except Exception as e:
+        return RenderOutcome(
+            out=job.out,
+            fmt=job.fmt,
+            seconds=time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}",
+        )
+    return RenderOutcome(out=job.out, fmt=job.fmt, seconds=time.perf_counter() - start)
+
+
+@dataclass(frozen=True)
+class RenderJobs:
+    """
+    Render many prebuilt reports, optionally across a process pool.
+
+    Workers only receive RenderJob values (report DTOs, never repositories or
+    DB connections) plus the picklable renderer factory, so the parent does
+    all DB reads. Outcomes come back in job order whatever order the workers
+    finish in, and a failing job is reported in its outcome instead of
+    aborting the others.
+    """
+
+    renderer_factory: RendererFactory
+
+    def __call__(
+        self, jobs: Sequence[RenderJob], *, workers: int = 1
+    ) -> tuple[RenderOutcome, ...]:
+        if workers < 1:
+            raise InvalidInputError("workers must be >= 1")
+
+        workers = min(workers, len(jobs))
+        if workers <= 1:
+            return tuple(_render_job(self.renderer_factory, job) for job in jobs)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return tuple(pool.map(_render_job, [self.renderer_factory] * len(jobs), jobs))
@@ -1,23 +1,35 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
 
-from app.application.generate_takeoff_report_output import GenerateTakeoffReportOutput
+from app.application.render_jobs import render_many
 from app.config import AppConfig
 from app.domain.item import Item
 from app.domain.output_format import OutputFormat
 from app.domain.stage import Stage
 from app.domain.takeoff import Takeoff, TakeoffHeader
 from app.domain.takeoff_line import TakeoffLine
+from app.infrastructure.render_cache import RenderCache, render_cache_key
 from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
 from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
 from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
 from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+from app.reporting.builder import build_takeoff_report
+from app.reporting.models import TakeoffReport
 from app.reporting.renderer_factory import RendererFactory
 
 
+def _parse_created_at(value: str | None) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
 @dataclass(frozen=True)
 class RenderTakeoffFromSnapshot:
     """Loads a seeded Takeoff snapshot (SQLite: takeoffs + takeoff_lines)
@@ -34,6 +46,25 @@ class RenderTakeoffFromSnapshot:
     config: AppConfig
 
     def __call__(self, *, takeoff_id: str, out: Path, fmt: OutputFormat) -> Path:
+        return self.render_many(takeoff_id=takeoff_id, outputs={fmt: out})[fmt]
+
+    def render_many(
+        self, *, takeoff_id: str, outputs: Mapping[OutputFormat, Path]
+    ) -> dict[OutputFormat, Path]:
+        """Load and build the report once, then write it in every requested format."""
+        return render_many(
+            self.build_report(takeoff_id=takeoff_id),
+            outputs,
+            renderer_factory=self.renderer_factory,
+        )
+
+    def build_report(self, *, takeoff_id: str) -> TakeoffReport:
+        return build_takeoff_report(
+            self.load_takeoff(takeoff_id=takeoff_id),
+            company_name=self.config.company_name,
+        )
+
+    def load_takeoff(self, *, takeoff_id: str) -> Takeoff:
         t = self.takeoff_repo.get(takeoff_id=takeoff_id)
         lines = self.takeoff_line_repo.list_for_takeoff(takeoff_id=takeoff_id)
 
@@ -76,22 +107,23 @@ class RenderTakeoffFromSnapshot:
                 )
             )
 
-        takeoff = Takeoff(
+        return Takeoff(
             header=header,
             tax_rate=t.tax_rate,
             lines=tuple(takeoff_lines),
         )
 
-        renderer = self.renderer_factory.for_format(fmt)
-        use_case = GenerateTakeoffReportOutput(renderer=renderer, config=self.config)
-        return use_case(takeoff, out)
-
 
 @dataclass(frozen=True)
 class RenderTakeoffFromVersion:
     """Renders an immutable takeoff version (SQLite: takeoff_versions + takeoff_version_lines).
 
     Reproducible output: do NOT depend on current takeoff/template/project state.
+    The report's created_at is the version's, so re-rendering gives the same file.
+
+    With a render_cache, outputs are keyed by the version's integrity hash
+    (see cache_keys) and served from the cache; the report is only built and
+    rendered for formats the cache does not have.
     """
 
     project_repo: SqliteProjectRepository
@@ -99,8 +131,91 @@ class RenderTakeoffFromVersion:
     takeoff_repo: SqliteTakeoffRepository
     renderer_factory: RendererFactory
     config: AppConfig
+    render_cache: RenderCache | None = None
 
     def __call__(self, *, version_id: str, out: Path, fmt: OutputFormat) -> Path:
+        return self.render_many(version_id=version_id, outputs={fmt: out})[fmt]
+
+    def render_many(
+        self, *, version_id: str, outputs: Mapping[OutputFormat, Path]
+    ) -> dict[OutputFormat, Path]:
+        """Load and build the report once, then write it in every requested format."""
+        cache = self.render_cache
+        keys = self.cache_keys(version_id=version_id) if cache is not None else {}
+        missing = {
+            fmt: out
+            for fmt, out in outputs.items()
+            if not (cache is not None and fmt in keys and cache.fetch(keys[fmt], out))
+        }
+        if missing:
+            rendered = render_many(
+                self.build_report(version_id=version_id),
+                missing,
+                renderer_factory=self.renderer_factory,
+            )
+            for fmt, path in rendered.items():
+                if cache is not None and fmt in keys:
+                    cache.store(keys[fmt], path)
+        return dict(outputs)
+
+    def cache_keys(
+        self, *, version_id: str, fingerprint: str | None = None
+    ) -> dict[OutputFormat, str]:
+        """
+        Render cache key per format: {} without a cache, a renderer that does
+        not report versions, or a (legacy) version with no integrity hash.
+        Pass the version's render_fingerprint if already computed.
+        """
+        version_for = getattr(self.renderer_factory, "version_for", None)
+        if self.render_cache is None or version_for is None:
+            return {}
+
+        fingerprint = fingerprint or self.render_fingerprint(version_id=version_id)
+        if fingerprint is None:
+            return {}
+        return {
+            fmt: render_cache_key(
+                {"fingerprint": fingerprint, "format": fmt.value, "renderer": version_for(fmt)}
+            )
+            for fmt in OutputFormat
+        }
+
+    def render_fingerprint(self, *, version_id: str) -> str | None:
+        """
+        Hash of everything the version's rendered files depend on apart from
+        format and renderer: the integrity hash plus the header fields read
+        from the current project/template. None for a version with no
+        integrity hash.
+        """
+        v = self.takeoff_repo.get_version(version_id=version_id)
+        if not v.integrity_hash:
+            return None
+        project = self.project_repo.get(code=v.project_code_snapshot)
+        template = self.template_repo.get(code=v.template_code_snapshot)
+
+        return render_cache_key(
+            {
+                "integrity_hash": v.integrity_hash,
+                "integrity_schema_version": v.integrity_schema_version,
+                "created_at": v.created_at,
+                "company_name": self.config.company_name,
+                "project_name": project.name,
+                "contractor_name": project.contractor or "",
+                "template_code": template.code,
+                "template_name": template.name,
+            }
+        )
+
+    def build_report(self, *, version_id: str) -> TakeoffReport:
+        """The version's report DTO, for callers that render it elsewhere (RenderJobs)."""
+        v = self.takeoff_repo.get_version(version_id=version_id)
+        return build_takeoff_report(
+            self.load_takeoff(version_id=version_id),
+            company_name=self.config.company_name,
+            created_at=_parse_created_at(v.created_at),
+        )
+
+    def load_takeoff(self, *, version_id: str) -> Takeoff:
         v = self.takeoff_repo.get_version(version_id=version_id)
 
         # Pinned at snapshot time
@@ -139,12 +254,8 @@ class RenderTakeoffFromVersion:
                 )
             )
 
-        takeoff = Takeoff(
+        return Takeoff(
             header=header,
             tax_rate=v.tax_rate_snapshot,
             lines=tuple(takeoff_lines),
-        )
-
-        renderer = self.renderer_factory.for_format(fmt)
-        use_case = GenerateTakeoffReportOutput(renderer=renderer, config=self.config)
-        return use_case(takeoff, out)
\ No newline at end of file
+        )
\ No newline at end of file
@@ -1,12 +1,34 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from dataclasses import dataclass
 from typing import Protocol
 
 from app.domain.item import Item
 
 
+@dataclass(frozen=True)
+class ItemUpsertCounts:
+    """Outcome of a batch upsert: rows written as new, rows rewritten, rows left as-is."""
+
+    inserted: int
+    updated: int
+    unchanged: int
+
+
 class ItemRepository(Protocol):
     def upsert(self, item: Item) -> None: ...
     def get(self, code: str) -> Item: ...
+    def get_many(self, codes: Iterable[str]) -> dict[str, Item]:
+        """Items found among `codes`, keyed by code; missing codes are omitted."""
+        ...
+    def upsert_many(self, items: Iterable[Item]) -> ItemUpsertCounts:
+        """
+        Upsert all `items` as one write; rows equal to the stored ones are left alone.
+
+        `items` may be a generator over a large file: nothing may become visible
+        until it is exhausted, and an exception while consuming it writes nothing.
+        """
+        ...
     def list(self, *, include_inactive: bool = False) -> tuple[Item, ...]: ...
     def delete(self, code: str) -> None: ...
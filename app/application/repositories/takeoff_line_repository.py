@@ -1,13 +1,59 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import Decimal
 
+from app.domain.stage import Stage
 from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
 
 
+@dataclass(frozen=True)
+class TakeoffStageSums:
+    """
+    Sum of line-level (already q2-rounded) subtotal/tax for one takeoff stage.
+
+    line_count is 0 for takeoffs without lines (reported once, as stage=final).
+    """
+
+    takeoff_id: str
+    stage: Stage
+    subtotal: Decimal
+    tax: Decimal
+    line_count: int
+
+
+@dataclass(frozen=True)
+class TakeoffLineUpdate:
+    """New values for one existing line (see apply_changes); None keeps the current value."""
+
+    item_code: str
+    qty: Decimal | None = None
+    stage: Stage | None = None
+    factor: Decimal | None = None
+    sort_order: int | None = None
+
+
 class TakeoffLineRepository(ABC):
     @abstractmethod
     def bulk_insert(self, lines: list[TakeoffLineSnapshot]) -> None: ...
 
     @abstractmethod
     def list_for_takeoff(self, takeoff_id: str) -> tuple[TakeoffLineSnapshot, ...]: ...
+
+    @abstractmethod
+    def apply_changes(
+        self,
+        *,
+        takeoff_id: str,
+        adds: Sequence[TakeoffLineSnapshot] = (),
+        updates: Sequence[TakeoffLineUpdate] = (),
+        deletes: Sequence[str] = (),
+    ) -> None: ...
+
+    @abstractmethod
+    def stage_sums_for_project(self, *, project_code: str) -> tuple[TakeoffStageSums, ...]: ...
+
+    @abstractmethod
+    def stage_sums_for_takeoff(self, *, takeoff_id: str) -> tuple[TakeoffStageSums, ...]: ...
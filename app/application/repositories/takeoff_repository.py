@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
 from typing import Protocol
 
@@ -13,6 +14,18 @@ class StoredTakeoff:
     path: Path
 
 
+@dataclass(frozen=True)
+class TakeoffIndexEntry:
+    """Summary of one saved takeoff, answerable without loading it."""
+
+    id: str
+    project_name: str
+    model_group: str
+    line_count: int
+    grand_total: Decimal  # total after valve discount
+    created_at: str  # ISO-8601 UTC
+
+
 class TakeoffRepository(Protocol):
     def save(self, takeoff: Takeoff) -> StoredTakeoff: ...
     def load(self, takeoff_id: str) -> Takeoff: ...
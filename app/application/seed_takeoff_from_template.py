@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import Protocol
@@ -10,9 +11,11 @@ from app.application.repositories.item_repository import ItemRepository
 from app.application.repositories.project_repository import ProjectRepository
 from app.application.repositories.template_line_repository import TemplateLineRepository
 from app.application.repositories.template_repository import TemplateRepository
+from app.domain.item import Item
 from app.domain.stage import Stage
 from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
 from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template_line import TemplateLine
 
 
 class TakeoffSnapshotRepository(Protocol):
@@ -23,6 +26,43 @@ class TakeoffLineSnapshotRepository(Protocol):
     def bulk_insert(self, lines: list[TakeoffLineSnapshot]) -> None: ...
 
 
+def build_line_snapshots(
+    *,
+    takeoff_id: str,
+    template_lines: Iterable[TemplateLine],
+    items: Mapping[str, Item],
+) -> list[TakeoffLineSnapshot]:
+    """Snapshot template lines with current item data. Every item_code must be in `items`."""
+    snapshots: list[TakeoffLineSnapshot] = []
+    for tl in template_lines:
+        item = items[tl.item_code]
+
+        base_kwargs = dict(
+            takeoff_id=takeoff_id,
+            item_code=tl.item_code,
+            qty=tl.qty,
+            notes=tl.notes,
+            description_snapshot=item.description,
+            details_snapshot=item.details,
+            unit_price_snapshot=item.unit_price,
+            taxable_snapshot=item.taxable,
+        )
+
+        # TemplateLine v2 fields (stage/factor/sort_order) may not exist in older snapshot models.
+        extra_kwargs = dict(
+            stage=tl.stage if isinstance(tl.stage, Stage) else Stage(str(tl.stage)),
+            factor=tl.factor,
+            sort_order=tl.sort_order,
+        )
+
+        try:
+            snapshots.append(TakeoffLineSnapshot(**base_kwargs, **extra_kwargs))
+        except TypeError:
+            # Backward compatibility during migration: snapshot model without stage/factor/sort_order.
+            snapshots.append(TakeoffLineSnapshot(**base_kwargs))
+    return snapshots
+
+
 @dataclass(frozen=True)
 class SeedTakeoffFromTemplate:
     project_repo: ProjectRepository
@@ -81,33 +121,16 @@ class SeedTakeoffFromTemplate:
             created_at="",
         )
 
-        snapshots: list[TakeoffLineSnapshot] = []
-        for tl in template_lines:
-            item = self.item_repo.get(tl.item_code)  # validates existence
-
-            base_kwargs = dict(
-                takeoff_id=takeoff_id,
-                item_code=tl.item_code,
-                qty=tl.qty,
-                notes=tl.notes,
-                description_snapshot=item.description,
-                details_snapshot=item.details,
-                unit_price_snapshot=item.unit_price,
-                taxable_snapshot=item.taxable,
-            )
-
-            # TemplateLine v2 fields (stage/factor/sort_order) may not exist in older snapshot models.
-            extra_kwargs = dict(
-                stage=tl.stage if isinstance(tl.stage, Stage) else Stage(str(tl.stage)),
-                factor=tl.factor,
-                sort_order=tl.sort_order,
+        items = self.item_repo.get_many(tl.item_code for tl in template_lines)
+        missing = sorted({tl.item_code for tl in template_lines} - items.keys())
+        if missing:
+            raise InvalidInputError(
+                f"Items not found for template={template_code}: {', '.join(missing)}"
             )
 
-            try:
-                snapshots.append(TakeoffLineSnapshot(**base_kwargs, **extra_kwargs))
-            except TypeError:
-                # Backward compatibility during migration: snapshot model without stage/factor/sort_order.
-                snapshots.append(TakeoffLineSnapshot(**base_kwargs))
+        snapshots = build_line_snapshots(
+            takeoff_id=takeoff_id, template_lines=template_lines, items=items
+        )
 
         # Persist atomically
         self.takeoff_repo.create(takeoff)
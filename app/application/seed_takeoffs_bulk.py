@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from enum import StrEnum
+from pathlib import Path
+from typing import Protocol
+from uuid import uuid4
+
+from app.application.errors import InvalidInputError
+from app.application.repositories.item_repository import ItemRepository
+from app.application.repositories.project_repository import ProjectRepository
+from app.application.repositories.template_line_repository import TemplateLineRepository
+from app.application.repositories.template_repository import TemplateRepository
+from app.application.seed_takeoff_from_template import (
+    TakeoffLineSnapshotRepository,
+    build_line_snapshots,
+)
+from app.domain.project import Project
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template_line import TemplateLine
+
+
+class BulkTakeoffRepository(Protocol):
+    def create(self, takeoff: TakeoffRecord) -> None: ...
+    def list_for_project(self, project_code: str) -> tuple[TakeoffRecord, ...]: ...
+
+
+class SeedStatus(StrEnum):
+    SEEDED = "seeded"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class BulkSeedResult:
+    project_code: str
+    template_code: str
+    status: SeedStatus
+    takeoff_id: str | None = None
+    message: str = ""
+
+
+def read_seed_manifest(csv_path: Path) -> list[tuple[str, str]]:
+    """(project_code, template_code) pairs from a CSV with those two columns."""
+    if not csv_path.exists():
+        raise InvalidInputError(f"CSV not found: {csv_path}")
+
+    required = {"project_code", "template_code"}
+    pairs: list[tuple[str, str]] = []
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None:
+            raise InvalidInputError("CSV has no header row")
+
+        header = {h.strip() for h in reader.fieldnames if h}
+        missing = sorted(required - header)
+        if missing:
+            raise InvalidInputError(f"CSV missing required columns: {missing}")
+
+        for row_index, row in enumerate(reader, start=2):  # header is row 1
+            row = {(k or "").strip(): v for k, v in row.items()}
+            project_code = (row.get("project_code") or "").strip()
+            template_code = (row.get("template_code") or "").strip()
+            if not project_code and not template_code:
+                continue  # blank line
+            if not project_code or not template_code:
+                raise InvalidInputError(
+                    f"Row {row_index}: project_code and template_code are required"
+                )
+            pairs.append((project_code, template_code))
+    return pairs
+
+
+@dataclass(frozen=True)
+class SeedTakeoffsBulk:
+    """
+    Seed many (project, template) pairs in one run.
+
+    Each project, template (with its lines) and catalog item is read once and
+    reused for every pair. New takeoffs are written in batches of `batch_size`
+    pairs, one transaction per batch, when the takeoff repository offers
+    `create_many`; otherwise pairs are written one by one.
+
+    Pairs whose takeoff already exists (or that repeat earlier in the input)
+    are skipped; pairs with a missing project/template/item are reported as
+    failed. Neither stops the run.
+    """
+
+    project_repo: ProjectRepository
+    template_repo: TemplateRepository
+    template_line_repo: TemplateLineRepository
+    item_repo: ItemRepository
+    takeoff_repo: BulkTakeoffRepository
+    takeoff_line_repo: TakeoffLineSnapshotRepository
+
+    def __call__(
+        self,
+        *,
+        pairs: Iterable[tuple[str, str]],
+        tax_rate_override: Decimal | None = None,
+        batch_size: int = 50,
+    ) -> tuple[BulkSeedResult, ...]:
+        if batch_size < 1:
+            raise InvalidInputError("batch_size must be >= 1")
+
+        requested = [(p.strip(), t.strip()) for p, t in pairs]
+        if not requested:
+            raise InvalidInputError("No project/template pairs to seed")
+        for project_code, template_code in requested:
+            if not project_code or not template_code:
+                raise InvalidInputError("project_code and template_code cannot be empty")
+
+        tax_rate = tax_rate_override if tax_rate_override is not None else Decimal("0.07")
+        projects, project_errors = self._load_projects({p for p, _ in requested})
+        template_lines, template_errors = self._load_templates({t for _, t in requested})
+
+        results: dict[tuple[str, str], BulkSeedResult] = {}
+        pending: list[tuple[TakeoffRecord, list[TakeoffLineSnapshot]]] = []
+        seen: set[tuple[str, str]] = set()
+        existing: dict[str, dict[str, str]] = {}
+
+        for pair in requested:
+            if pair in seen:
+                continue
+            seen.add(pair)
+            project_code, template_code = pair
+
+            error = project_errors.get(project_code) or template_errors.get(template_code)
+            if error:
+                results[pair] = BulkSeedResult(*pair, SeedStatus.FAILED, message=error)
+                continue
+
+            if project_code not in existing:
+                existing[project_code] = {
+                    t.template_code: t.takeoff_id
+                    for t in self.takeoff_repo.list_for_project(project_code)
+                }
+            existing_id = existing[project_code].get(template_code)
+            if existing_id is not None:
+                results[pair] = BulkSeedResult(
+                    *pair,
+                    SeedStatus.SKIPPED,
+                    takeoff_id=existing_id,
+                    message="takeoff already exists",
+                )
+                continue
+
+            takeoff_id = str(uuid4())
+            takeoff = TakeoffRecord(
+                takeoff_id=takeoff_id,
+                project_code=project_code,
+                template_code=template_code,
+                tax_rate=tax_rate,
+                valve_discount=projects[project_code].valve_discount,
+                created_at="",
+            )
+            lines = [replace(ln, takeoff_id=takeoff_id) for ln in template_lines[template_code]]
+            pending.append((takeoff, lines))
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start : start + batch_size]
+            try:
+                self._write(batch)
+            except Exception as e:
+                for takeoff, _ in batch:
+                    results[(takeoff.project_code, takeoff.template_code)] = BulkSeedResult(
+                        takeoff.project_code,
+                        takeoff.template_code,
+                        SeedStatus.FAILED,
+                        message=f"batch rolled back: {e}",
+                    )
+                continue
+            for takeoff, _ in batch:
+                results[(takeoff.project_code, takeoff.template_code)] = BulkSeedResult(
+                    takeoff.project_code,
+                    takeoff.template_code,
+                    SeedStatus.SEEDED,
+                    takeoff_id=takeoff.takeoff_id,
+                )
+
+        out: list[BulkSeedResult] = []
+        reported: set[tuple[str, str]] = set()
+        for pair in requested:
+            if pair in reported:
+                out.append(
+                    BulkSeedResult(*pair, SeedStatus.SKIPPED, message="duplicate pair in input")
+                )
+                continue
+            reported.add(pair)
+            out.append(results[pair])
+        return tuple(out)
+
+    def _load_projects(self, codes: set[str]) -> tuple[dict[str, Project], dict[str, str]]:
+        projects: dict[str, Project] = {}
+        errors: dict[str, str] = {}
+        for code in sorted(codes):
+            try:
+                projects[code] = self.project_repo.get(code)
+            except InvalidInputError as e:
+                errors[code] = str(e)
+        return projects, errors
+
+    def _load_templates(
+        self, codes: set[str]
+    ) -> tuple[dict[str, list[TakeoffLineSnapshot]], dict[str, str]]:
+        """Line snapshots per template (takeoff_id left blank), plus per-template errors."""
+        errors: dict[str, str] = {}
+        loaded: dict[str, tuple[TemplateLine, ...]] = {}
+        for code in sorted(codes):
+            try:
+                self.template_repo.get(code)
+            except InvalidInputError as e:
+                errors[code] = str(e)
+                continue
+            lines = self.template_line_repo.list_for_template(code)
+            if not lines:
+                errors[code] = f"Template has no lines: {code}"
+                continue
+            loaded[code] = lines
+
+        items = self.item_repo.get_many(
+            {tl.item_code for lines in loaded.values() for tl in lines}
+        )
+        snapshots: dict[str, list[TakeoffLineSnapshot]] = {}
+        for code, lines in loaded.items():
+            missing = sorted({tl.item_code for tl in lines} - items.keys())
+            if missing:
+                errors[code] = f"Items not found for template={code}: {', '.join(missing)}"
+                continue
+            snapshots[code] = build_line_snapshots(takeoff_id="", template_lines=lines, items=items)
+        return snapshots, errors
+
+    def _write(self, batch: Sequence[tuple[TakeoffRecord, list[TakeoffLineSnapshot]]]) -> None:
+        create_many = getattr(self.takeoff_repo, "create_many", None)
+        if create_many is not None:
+            create_many(batch)
+            return
+        for takeoff, lines in batch:
+            self.takeoff_repo.create(takeoff)
+            self.takeoff_line_repo.bulk_insert(lines)
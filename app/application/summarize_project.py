@@ -3,8 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from decimal import Decimal
 
-from app.domain.stage import Stage
-from app.domain.totals import TakeoffLineInput, calc_grand_totals
+from app.application.project_totals import load_project_takeoff_totals
 
 
 @dataclass(frozen=True)
@@ -43,7 +42,11 @@ class SummarizeProject:
         self._takeoff_line_repo = takeoff_line_repo
 
     def __call__(self, *, project_code: str) -> ProjectSummary:
-        takeoffs = self._takeoff_repo.list_for_project(project_code=project_code)
+        totals = load_project_takeoff_totals(
+            takeoff_repo=self._takeoff_repo,
+            takeoff_line_repo=self._takeoff_line_repo,
+            project_code=project_code,
+        )
 
         summaries: list[ProjectTakeoffSummary] = []
 
@@ -53,29 +56,9 @@ class SummarizeProject:
         valve_discount = Decimal("0")
         total_after_discount = Decimal("0")
 
-        for t in takeoffs:
-            lines = list(self._takeoff_line_repo.list_for_takeoff(takeoff_id=t.takeoff_id))
-
-            inputs: list[TakeoffLineInput] = []
-            for ln in lines:
-                stage = getattr(ln, "stage", None) or Stage.FINAL
-                factor = getattr(ln, "factor", None) or Decimal("1.0")
-
-                inputs.append(
-                    TakeoffLineInput(
-                        stage=stage,
-                        price=ln.unit_price_snapshot,
-                        qty=ln.qty,
-                        factor=factor,
-                        taxable=ln.taxable_snapshot,
-                    )
-                )
-
-            gt = calc_grand_totals(
-                inputs,
-                valve_discount=t.valve_discount,
-                tax_rate=t.tax_rate,
-            )
+        for tt in totals:
+            t = tt.takeoff
+            gt = tt.grand
 
             summaries.append(
                 ProjectTakeoffSummary(
@@ -1,52 +1,28 @@
 from __future__ import annotations
 
 import argparse
+import functools
+from dataclasses import replace
 from decimal import Decimal
 from pathlib import Path
-import json
-import re
+from typing import TYPE_CHECKING
 
-from app.application.build_sample_takeoff import BuildSampleTakeoff
 from app.application.errors import InvalidInputError
-from app.application.generate_revision_report import GenerateRevisionReport
-from app.application.export_revision_bundle import ExportRevisionBundle
-from app.application.input_sources import TakeoffInputSource
-from app.application.inputs.factory_takeoff_input import FactoryTakeoffInput
-from app.application.inputs.json_takeoff_input import JsonTakeoffInput
-from app.application.inputs.repo_takeoff_input import RepoTakeoffInput
-from app.application.render_takeoff import RenderTakeoff
-from app.application.render_takeoff_from_snapshot import (
-    RenderTakeoffFromSnapshot,
-    RenderTakeoffFromVersion,
-)
-from app.application.save_takeoff import SaveTakeoff
-from app.application.diff_takeoff_versions import DiffTakeoffVersions
-from app.application.seed_takeoff_from_template import SeedTakeoffFromTemplate
-from app.application.add_takeoff_line import AddTakeoffLine
-from app.application.delete_takeoff_line import DeleteTakeoffLine
-from app.application.list_takeoff_lines import ListTakeoffLines
-from app.application.update_takeoff_line import UpdateTakeoffLine
-from app.application.inspect_takeoff import InspectTakeoff
-from app.application.summarize_project import SummarizeProject
-from app.application.generate_project_invoice import GenerateProjectInvoice
-from app.config import AppConfig
+from app.config import DB_PROFILES, DEFAULT_DB_PROFILE, AppConfig
+from app.domain.money import DEFAULT_MONEY_ENGINE, MONEY_ENGINES
 from app.domain.output_format import OutputFormat
-from app.domain.project import Project
-from app.domain.stage import Stage
-from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
-from app.domain.template import Template
-from app.domain.template_line import TemplateLine
-from app.domain.totals import TakeoffLineInput, calc_grand_totals, calc_stage_totals
-from app.infrastructure.file_takeoff_repository import FileTakeoffRepository
-from app.infrastructure.renderer_registry import RendererRegistry
-from app.infrastructure.sqlite_db import SqliteDb
-from app.infrastructure.sqlite_item_repository import SqliteItemRepository
-from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
-from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
-from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
-from app.infrastructure.sqlite_template_line_repository import SqliteTemplateLineRepository
-from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
-from app.infrastructure.takeoff_json_loader import TakeoffJsonLoader
+
+if TYPE_CHECKING:
+    from app.application.input_sources import TakeoffInputSource
+    from app.infrastructure.file_takeoff_repository import FileTakeoffRepository
+    from app.infrastructure.render_cache import RenderCache
+    from app.infrastructure.sqlite_db import ConnectionCache, SqliteDb
+
+# Startup cost: only argparse, config and a few domain enums are imported at
+# module level. Each handler imports the use cases and repositories it needs,
+# and renderers (ReportLab in particular) are loaded by RendererRegistry only
+# when a format is actually rendered. tests/test_cli_startup.py holds the
+# import-time budget.
 
 # -----------------------------------
 # Helpers
@@ -74,16 +50,46 @@ def _validate_out_extension(fmt: OutputFormat, out: Path) -> None:
         raise SystemExit(f"--out must end with {expected} for --format {fmt.value}")
 
 
-def _safe_filename(value: str) -> str:
-    cleaned = re.sub(r'[\\/:*?"<>|]+', "_", value.strip())
-    cleaned = re.sub(r"\s+", " ", cleaned)
-    return cleaned
-
+def _parse_formats(value: str) -> tuple[OutputFormat, ...]:
+    """`pdf` or a comma-separated list (`pdf,csv,json`); repeats are dropped."""
+    formats: list[OutputFormat] = []
+    for part in value.split(","):
+        name = part.strip().lower()
+        try:
+            fmt = OutputFormat(name)
+        except ValueError as e:
+            known = ", ".join(f.value for f in OutputFormat)
+            raise SystemExit(f"Invalid --format: {name!r} (choose from {known})") from e
+        if fmt not in formats:
+            formats.append(fmt)
+    return tuple(formats)
+
+
+_FORMATS_HELP = "pdf, csv, json, or several comma-separated (pdf,csv,json) to build the report once"
+
+
+def _format_outputs(formats: tuple[OutputFormat, ...], out: Path) -> dict[OutputFormat, Path]:
+    """
+    One output path per format. A single format writes to --out as given; for
+    several, --out is the base path and each file gets its format's extension
+    (`--out outputs/t` or `--out outputs/t.pdf` -> t.pdf, t.csv, t.json).
+    """
+    if len(formats) == 1:
+        return {formats[0]: out}
+    if out.suffix and out.suffix.lower().lstrip(".") not in {f.value for f in formats}:
+        raise SystemExit(
+            "--out must have no extension or one of the requested formats' "
+            "when --format lists several formats"
+        )
+    return {fmt: out.with_suffix(f".{fmt.value}") for fmt in formats}
+
+
+def _render_cache(config: AppConfig) -> RenderCache | None:
+    if config.render_cache_root is None:
+        return None
+    from app.infrastructure.render_cache import RenderCache
 
-def _project_models_label(template_codes: list[str]) -> str:
-    if not template_codes:
-        return "NO_MODELS"
-    return ",".join(template_codes)
+    return RenderCache(root=config.render_cache_root, max_bytes=config.render_cache_max_bytes)
 
 
 # -----------------------------------
@@ -140,8 +146,252 @@ def _validate_save_args(args: argparse.Namespace) -> None:
 
 
 
-def _handle_projects(args: argparse.Namespace, *, db_path: Path) -> int:
-    conn = SqliteDb(path=db_path).connect()
+def _file_repo(args: argparse.Namespace) -> FileTakeoffRepository:
+    from app.infrastructure.file_takeoff_repository import FileTakeoffRepository
+
+    return FileTakeoffRepository(base_dir=Path(args.repo_dir))
+
+
+def _handle_save(args: argparse.Namespace) -> int:
+    from app.application.build_sample_takeoff import BuildSampleTakeoff
+    from app.application.save_takeoff import SaveTakeoff
+
+    _validate_save_args(args)
+
+    if args.input == "json":
+        from app.infrastructure.takeoff_json_loader import TakeoffJsonLoader
+
+        takeoff = TakeoffJsonLoader().load(Path(args.input_path))
+    else:
+        takeoff = BuildSampleTakeoff()()
+
+    stored = SaveTakeoff(repo=_file_repo(args))(takeoff)
+    print(f"SAVED takeoff id={stored.id} path={stored.path.resolve()}")
+    return 0
+
+
+def _handle_render(args: argparse.Namespace, *, config: AppConfig) -> int:
+    from app.application.build_sample_takeoff import BuildSampleTakeoff
+    from app.application.inputs.factory_takeoff_input import FactoryTakeoffInput
+    from app.application.inputs.json_takeoff_input import JsonTakeoffInput
+    from app.application.inputs.repo_takeoff_input import RepoTakeoffInput
+    from app.application.render_takeoff import RenderTakeoff
+    from app.infrastructure.renderer_registry import RendererRegistry
+
+    _validate_render_args(args)
+
+    fmt = OutputFormat(args.format)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    tax_override: Decimal | None = None
+    if args.tax_rate:
+        tax_override = _parse_decimal(args.tax_rate, "--tax-rate")
+
+    takeoff_input: TakeoffInputSource
+    if args.id:
+        takeoff_input = RepoTakeoffInput(repo=_file_repo(args), takeoff_id=args.id)
+    elif args.input == "json":
+        takeoff_input = JsonTakeoffInput(path=Path(args.input_path))
+    else:
+        takeoff_input = FactoryTakeoffInput(factory=BuildSampleTakeoff())
+
+    registry = RendererRegistry()
+
+    rendered_path = RenderTakeoff(
+        renderer_factory=registry,
+        config=config,
+    )(
+        out=out,
+        fmt=fmt,
+        takeoff_input=takeoff_input,
+        tax_rate_override=tax_override,
+    )
+
+    print(f"{fmt.value.upper()} generated at: {rendered_path.resolve()}")
+    return 0
+
+
+def _handle_index(args: argparse.Namespace) -> int:
+    file_repo = _file_repo(args)
+
+    if args.index_cmd == "rebuild":
+        count = file_repo.rebuild_index()
+        print(f"INDEX rebuilt entries={count} path={file_repo.index_path.resolve()}")
+        return 0
+
+    if args.index_cmd == "find":
+        if not args.project and not args.model_group:
+            raise InvalidInputError("Provide --project and/or --model-group")
+        entries = file_repo.find(project=args.project, model_group=args.model_group)
+    else:
+        entries = file_repo.list_index()
+
+    for e in entries:
+        print(
+            f"{e.id} | project={e.project_name} | model_group={e.model_group} | "
+            f"lines={e.line_count} | grand_total={e.grand_total} | created_at={e.created_at}"
+        )
+    print(f"takeoffs={len(entries)}")
+    return 0
+
+
+def _handle_batch(args: argparse.Namespace, *, db: SqliteDb) -> int:
+    import sys
+
+    from app.cli_batch import read_commands, run_batch
+    from app.infrastructure.sqlite_db import ConnectionCache
+
+    if args.file == "-":
+        commands = read_commands(sys.stdin)
+    else:
+        path = Path(args.file)
+        if not path.exists():
+            raise InvalidInputError(f"Batch file not found: {path}")
+        with path.open("r", encoding="utf-8") as f:
+            commands = read_commands(f)
+
+    global_argv = [
+        "--db-path", str(db.path),
+        "--db-profile", args.db_profile,
+        "--money-engine", args.money_engine,
+    ]
+    if args.render_cache:
+        global_argv += ["--render-cache", args.render_cache]
+    own_cache = db.connections is None
+    if own_cache:
+        db = replace(db, connections=ConnectionCache())
+    try:
+        return run_batch(
+            commands,
+            db=db,
+            global_argv=global_argv,
+            transaction=args.transaction,
+            out=sys.stdout,
+        )
+    finally:
+        if own_cache:
+            assert db.connections is not None
+            db.connections.close()
+
+
+def _handle_db(args: argparse.Namespace, *, db: SqliteDb, config: AppConfig) -> int:
+    from app.infrastructure.sqlite_db import (
+        LATEST_SCHEMA_VERSION,
+        apply_migrations,
+        pending_migrations,
+        schema_version,
+    )
+    from app.infrastructure.sqlite_totals import rebuild_totals
+
+    conn = replace(db, auto_migrate=False).connect()
+    try:
+        if args.db_cmd == "status":
+            pending = pending_migrations(conn)
+            print(f"DB {db.path}")
+            print(f"schema_version={schema_version(conn)}")
+            print(f"latest_version={LATEST_SCHEMA_VERSION}")
+            print(f"pending={len(pending)}")
+            for m in pending:
+                print(f"  {m.version:04d} {m.name}")
+            return 0
+
+        if args.db_cmd == "migrate":
+            applied = apply_migrations(conn)
+            if not applied:
+                print(f"DB up to date schema_version={schema_version(conn)}")
+                return 0
+            for m in applied:
+                print(f"MIGRATION applied {m.version:04d} {m.name}")
+            print(f"DB migrated schema_version={schema_version(conn)}")
+            return 0
+
+        if args.db_cmd == "rebuild-totals":
+            if pending_migrations(conn):
+                raise InvalidInputError("DB has pending migrations; run `db migrate` first")
+            report = rebuild_totals(conn, money_engine=config.money_engine)
+            print(
+                f"TOTALS rebuilt takeoff_rows={report.takeoff_rows} "
+                f"version_rows={report.version_rows}"
+            )
+            print(
+                f"stale_takeoff_rows={report.stale_takeoff_rows} "
+                f"stale_version_rows={report.stale_version_rows} | verified=True"
+            )
+            return 0
+
+        raise AssertionError("Unreachable: unknown db command")
+    finally:
+        conn.close()
+
+
+def _handle_cache(args: argparse.Namespace, *, config: AppConfig) -> int:
+    cache = _render_cache(config)
+    if cache is None:
+        raise InvalidInputError("Render cache is not enabled (pass --render-cache DIR)")
+
+    if args.cache_cmd == "stats":
+        stats = cache.stats()
+        print(f"RENDER CACHE {cache.root}")
+        print(
+            f"entries={stats.entries} | bytes={stats.total_bytes} | "
+            f"max_bytes={stats.max_bytes}"
+        )
+        return 0
+
+    if args.cache_cmd == "prune":
+        if args.max_bytes is not None and args.max_bytes < 0:
+            raise SystemExit("--max-bytes must be >= 0")
+        result = cache.prune(max_bytes=args.max_bytes)
+        print(f"RENDER CACHE pruned removed={result.removed} freed_bytes={result.freed_bytes}")
+        print(f"entries={result.stats.entries} | bytes={result.stats.total_bytes}")
+        return 0
+
+    raise AssertionError("Unreachable: unknown cache command")
+
+
+def _handle_items(args: argparse.Namespace, *, db: SqliteDb) -> int:
+    from app.application.import_items_from_csv import ImportItemsFromCsv
+    from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+
+    conn = db.connect()
+    try:
+        item_repo = SqliteItemRepository(conn=conn)
+
+        if args.items_cmd == "import":
+            report = ImportItemsFromCsv(repo=item_repo)(
+                csv_path=Path(args.csv),
+                bulk=args.bulk,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+            )
+            if args.bulk:
+                print(
+                    f"IMPORT items inserted={report.inserted} updated={report.updated} "
+                    f"unchanged={report.unchanged} skipped={report.skipped}"
+                )
+            else:
+                print(
+                    f"IMPORT items inserted_or_updated={report.inserted_or_updated} "
+                    f"skipped={report.skipped}"
+                )
+            for err in report.errors:
+                print(f"  {err}")
+            return 0
+
+        raise AssertionError("Unreachable: unknown items command")
+    finally:
+        conn.close()
+
+
+def _handle_projects(args: argparse.Namespace, *, db: SqliteDb, config: AppConfig) -> int:
+    from app.domain.project import Project
+    from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+    from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+    from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+    from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+
+    conn = db.connect()
     try:
         project_repo = SqliteProjectRepository(conn=conn)
 
@@ -180,9 +430,13 @@ def _handle_projects(args: argparse.Namespace, *, db_path: Path) -> int:
             return 0
 
         if args.projects_cmd == "summary":
+            from app.application.summarize_project import SummarizeProject
+
             _ = project_repo.get(code=args.code)  # validate project exists
-            takeoff_repo = SqliteTakeoffRepository(conn=conn)
-            takeoff_line_repo = SqliteTakeoffLineRepository(conn=conn)
+            takeoff_repo = SqliteTakeoffRepository(conn=conn, money_engine=config.money_engine)
+            takeoff_line_repo = SqliteTakeoffLineRepository(
+                conn=conn, money_engine=config.money_engine
+            )
 
             result = SummarizeProject(
                 takeoff_repo=takeoff_repo,
@@ -216,10 +470,14 @@ def _handle_projects(args: argparse.Namespace, *, db_path: Path) -> int:
             return 0
 
         if args.projects_cmd == "invoice":
+            from app.application.generate_project_invoice import GenerateProjectInvoice
+
             _ = project_repo.get(code=args.code)  # ensure project exists
 
-            takeoff_repo = SqliteTakeoffRepository(conn=conn)
-            takeoff_line_repo = SqliteTakeoffLineRepository(conn=conn)
+            takeoff_repo = SqliteTakeoffRepository(conn=conn, money_engine=config.money_engine)
+            takeoff_line_repo = SqliteTakeoffLineRepository(
+                conn=conn, money_engine=config.money_engine
+            )
 
             result = GenerateProjectInvoice(
                 takeoff_repo=takeoff_repo,
@@ -259,150 +517,116 @@ def _handle_projects(args: argparse.Namespace, *, db_path: Path) -> int:
 
             return 0
 
-        if args.projects_cmd == "export":
-            project = project_repo.get(code=args.code)
-            takeoff_repo = SqliteTakeoffRepository(conn=conn)
-            takeoff_line_repo = SqliteTakeoffLineRepository(conn=conn)
-            template_repo = SqliteTemplateRepository(conn=conn)
-
-            result = SummarizeProject(
-                takeoff_repo=takeoff_repo,
-                takeoff_line_repo=takeoff_line_repo,
-            )(project_code=args.code)
-
-            out_root = Path(args.out_dir)
-            out_root.mkdir(parents=True, exist_ok=True)
-            project_dir = out_root / project.code
-            project_dir.mkdir(parents=True, exist_ok=True)
-
-            model_codes = [t.template_code for t in result.takeoffs]
-            project_base_name = _safe_filename(
-                f"{project.name} ({_project_models_label(model_codes)})"
-            )
-
-            summary_json_path = project_dir / f"{project_base_name}_project_summary.json"
-            summary_txt_path = project_dir / f"{project_base_name}_project_summary.txt"
-            financial_txt_path = project_dir / f"{project_base_name}_financial_summary.txt"
-
-            summary_payload = {
-                "project_code": result.project_code,
-                "project_name": project.name,
-                "takeoff_count": result.takeoff_count,
-                "subtotal": str(result.subtotal),
-                "tax": str(result.tax),
-                "total": str(result.total),
-                "valve_discount": str(result.valve_discount),
-                "total_after_discount": str(result.total_after_discount),
-                "takeoffs": [
-                    {
-                        "takeoff_id": t.takeoff_id,
-                        "project_code": t.project_code,
-                        "template_code": t.template_code,
-                        "subtotal": str(t.subtotal),
-                        "tax": str(t.tax),
-                        "total": str(t.total),
-                        "valve_discount": str(t.valve_discount),
-                        "total_after_discount": str(t.total_after_discount),
-                    }
-                    for t in result.takeoffs
-                ],
-            }
-            summary_json_path.write_text(
-                json.dumps(summary_payload, indent=2),
-                encoding="utf-8",
-            )
+        if args.projects_cmd == "snapshot":
+            _ = project_repo.get(code=args.code)  # validate project exists
+            takeoff_repo = SqliteTakeoffRepository(conn=conn, money_engine=config.money_engine)
 
-            summary_lines = [
-                "PROJECT SUMMARY",
-                f"code={result.project_code}",
-                f"name={project.name}",
-                f"takeoffs={result.takeoff_count}",
-                "",
-                "TAKEOFFS",
-            ]
-            if not result.takeoffs:
-                summary_lines.append("none")
-            else:
-                for t in result.takeoffs:
-                    summary_lines.append(
-                        f"{t.template_code} | takeoff_id={t.takeoff_id} | "
-                        f"subtotal={t.subtotal:.2f} | tax={t.tax:.2f} | "
-                        f"total={t.total:.2f} | valve_discount={t.valve_discount:.2f} | "
-                        f"after_discount={t.total_after_discount:.2f}"
-                    )
-            summary_lines.extend(
-                [
-                    "",
-                    "GRAND TOTAL",
-                    f"subtotal={result.subtotal:.2f}",
-                    f"tax={result.tax:.2f}",
-                    f"total={result.total:.2f}",
-                    f"valve_discount={result.valve_discount:.2f}",
-                    f"after_discount={result.total_after_discount:.2f}",
-                ]
+            created = takeoff_repo.create_project_snapshot(
+                project_code=args.code,
+                notes=args.notes,
+                created_by=args.created_by,
+                reason=args.reason,
             )
-            summary_text = "\n".join(summary_lines)
-            summary_txt_path.write_text(summary_text, encoding="utf-8")
-            financial_txt_path.write_text(summary_text, encoding="utf-8")
+            if not created:
+                print(f"No takeoffs found for project={args.code}")
+                return 0
 
-            deliverable_dir = project_dir / "deliverable"
-            deliverable_dir.mkdir(parents=True, exist_ok=True)
+            for v in created:
+                print(
+                    f"SNAPSHOT {v.template_code} | takeoff_id={v.takeoff_id} | "
+                    f"v{v.version_number} | lines={v.line_count} | version_id={v.version_id}"
+                )
+            print()
+            print(f"PROJECT snapshot created code={args.code} takeoffs={len(created)} locked=True")
+            return 0
 
-            exported = 0
-            rendered_files = 0
-            for t in result.takeoffs:
-                versions = takeoff_repo.list_versions(takeoff_id=t.takeoff_id)
-                if not versions:
-                    continue
+        if args.projects_cmd == "export":
+            from app.application.export_project import ExportProject, OutputStatus
 
-                latest = versions[0]
-                template = template_repo.get(code=t.template_code)
+            if args.jobs is not None and args.jobs < 1:
+                raise SystemExit("--jobs must be >= 1")
+            if args.mirror_dir:
+                config = replace(config, mirror_export_root=Path(args.mirror_dir))
 
-                latest_dir = project_dir / "takeoffs" / t.template_code / "latest"
-                latest_dir.mkdir(parents=True, exist_ok=True)
+            export = ExportProject(
+                project_repo=project_repo,
+                template_repo=SqliteTemplateRepository(conn=conn),
+                takeoff_repo=SqliteTakeoffRepository(conn=conn, money_engine=config.money_engine),
+                takeoff_line_repo=SqliteTakeoffLineRepository(
+                    conn=conn, money_engine=config.money_engine
+                ),
+                config=config,
+                render_cache=_render_cache(config),
+            )(
+                project_code=args.code,
+                out_dir=Path(args.out_dir),
+                jobs=args.jobs,
+                full=args.full,
+            )
 
-                bundle_dir = ExportRevisionBundle(
-                    takeoff_repo=takeoff_repo,
-                    project_repo=project_repo,
-                    template_repo=template_repo,
-                    config=AppConfig(),
-                )(
-                    version_id=latest.version_id,
-                    out_dir=latest_dir,
-                )
+            for u in export.unchanged:
                 print(
-                    f"EXPORTED latest snapshot template={t.template_code} "
-                    f"version_id={latest.version_id} -> {bundle_dir.resolve()}"
+                    f"UNCHANGED takeoff template={u.template_code} "
+                    f"version_id={u.version_id} | files={u.files}"
                 )
-                exported += 1
-
-                deliverable_base = _safe_filename(f"{project.name} ({template.code})")
-                for fmt in (OutputFormat.PDF, OutputFormat.CSV, OutputFormat.JSON):
-                    out_path = deliverable_dir / f"{deliverable_base}.{fmt.value}"
-                    RenderTakeoffFromVersion(
-                        project_repo=project_repo,
-                        template_repo=template_repo,
-                        takeoff_repo=takeoff_repo,
-                        renderer_factory=RendererRegistry(),
-                        config=AppConfig(),
-                    )(
-                        version_id=latest.version_id,
-                        out=out_path,
-                        fmt=fmt,
+            for o in export.outputs:
+                if o.status is OutputStatus.CACHED:
+                    print(f"CACHED {o.fmt.value} | {o.path.resolve()}")
+                    continue
+                line = f"{o.status.name} {o.fmt.value} | {o.seconds:.3f}s | {o.path.resolve()}"
+                print(line if o.error is None else f"{line} | {o.error}")
+            for b in export.bundles:
+                if b.bundle_dir is None:
+                    print(
+                        f"SKIPPED bundle template={b.template_code} "
+                        f"version_id={b.version_id} (PDF render failed)"
                     )
-                    rendered_files += 1
+                else:
+                    print(
+                        f"EXPORTED latest snapshot template={b.template_code} "
+                        f"version_id={b.version_id} -> {b.bundle_dir.resolve()}"
+                    )
+            for report in export.mirror_reports:
+                print(report)
+            for path in export.removed:
+                print(f"REMOVED stale {path.resolve()}")
 
             print()
-            print(f"PROJECT export completed at: {project_dir.resolve()}")
-            print(f"summary_json={summary_json_path.resolve()}")
-            print(f"summary_txt={summary_txt_path.resolve()}")
-            print(f"financial_summary_txt={financial_txt_path.resolve()}")
-            print(f"deliverable_dir={deliverable_dir.resolve()}")
-            print(f"latest_snapshot_bundles={exported}")
-            print(f"rendered_deliverable_files={rendered_files}")
+            print(f"PROJECT export completed at: {export.project_dir.resolve()}")
+            print(f"summary_json={export.summary_json.resolve()}")
+            print(f"summary_txt={export.summary_txt.resolve()}")
+            print(f"financial_summary_txt={export.financial_summary_txt.resolve()}")
+            print(f"deliverable_dir={export.deliverable_dir.resolve()}")
+            print(f"latest_snapshot_bundles={export.bundles_exported}")
+            print(f"rendered_deliverable_files={export.rendered_deliverable_files}")
+            print(f"manifest={export.manifest.resolve()}")
+            print(
+                f"takeoffs_rebuilt={export.takeoffs_rebuilt} | "
+                f"takeoffs_skipped={len(export.unchanged)} | "
+                f"summary={'rebuilt' if export.summary_rebuilt else 'skipped'} | "
+                f"stale_removed={len(export.removed)}"
+            )
+            failed = export.failed
+            print(
+                f"render_jobs={export.render_jobs} | workers={export.workers} | "
+                f"failed={len(failed)} | render_seconds={export.render_seconds:.3f} | "
+                f"wall_seconds={export.wall_seconds:.3f} | cache_hits={export.cache_hits}"
+            )
+            if failed:
+                print()
+                print("FAILURES")
+                for o in failed:
+                    print(f"{o.fmt.value} | {o.path.resolve()} | {o.error}")
+                return 1
             return 0
 
         if args.projects_cmd == "package":
+            from app.infrastructure.file_sync import (
+                SyncAction,
+                sync_file,
+                write_deterministic_zip,
+            )
+
             project = project_repo.get(code=args.code)
 
             out_root = Path(args.out_dir)
@@ -414,28 +638,18 @@ def _handle_projects(args: argparse.Namespace, *, db_path: Path) -> int:
                     f"  python -m app.cli projects export --code {project.code}"
                 )
 
-            package_dir = out_root / f"{project.code}_PACKAGE"
-            package_dir.mkdir(parents=True, exist_ok=True)
-
-            summary_dir = package_dir / "01_SUMMARY"
-            models_dir = package_dir / "02_MODELS"
-            snapshots_dir = package_dir / "03_SNAPSHOTS"
-
-            summary_dir.mkdir(parents=True, exist_ok=True)
-            models_dir.mkdir(parents=True, exist_ok=True)
-            snapshots_dir.mkdir(parents=True, exist_ok=True)
+            # (path inside the package, exported file)
+            entries: list[tuple[str, Path]] = []
 
             for file in project_dir.glob("*summary*"):
                 if file.is_file():
-                    target = summary_dir / file.name
-                    target.write_bytes(file.read_bytes())
+                    entries.append((f"01_SUMMARY/{file.name}", file))
 
             deliverable_dir = project_dir / "deliverable"
             if deliverable_dir.exists():
                 for file in deliverable_dir.iterdir():
                     if file.is_file():
-                        target = models_dir / file.name
-                        target.write_bytes(file.read_bytes())
+                        entries.append((f"02_MODELS/{file.name}", file))
 
             takeoffs_dir = project_dir / "takeoffs"
             if takeoffs_dir.exists():
@@ -444,22 +658,45 @@ def _handle_projects(args: argparse.Namespace, *, db_path: Path) -> int:
                         continue
                     latest_dir = template_dir / "latest"
                     if latest_dir.exists():
-                        template_snapshot_dir = snapshots_dir / template_dir.name
-                        template_snapshot_dir.mkdir(parents=True, exist_ok=True)
                         for path in latest_dir.rglob("*"):
                             if path.is_file():
-                                relative = path.relative_to(latest_dir)
-                                target = template_snapshot_dir / relative
-                                target.parent.mkdir(parents=True, exist_ok=True)
-                                target.write_bytes(path.read_bytes())
+                                relative = path.relative_to(latest_dir).as_posix()
+                                entries.append(
+                                    (f"03_SNAPSHOTS/{template_dir.name}/{relative}", path)
+                                )
+
+            if args.zip:
+                zip_path = out_root / f"{project.code}_PACKAGE.zip"
+                count = write_deterministic_zip(entries, zip_path)
+                print()
+                print(f"PROJECT PACKAGE zip created at: {zip_path.resolve()}")
+                print(f"files={count} | bytes={zip_path.stat().st_size}")
+                return 0
+
+            package_dir = out_root / f"{project.code}_PACKAGE"
+            summary_dir = package_dir / "01_SUMMARY"
+            models_dir = package_dir / "02_MODELS"
+            snapshots_dir = package_dir / "03_SNAPSHOTS"
+
+            summary_dir.mkdir(parents=True, exist_ok=True)
+            models_dir.mkdir(parents=True, exist_ok=True)
+            snapshots_dir.mkdir(parents=True, exist_ok=True)
+
+            # Kernel-side copies (never hardlinks: a re-export rewrites some
+            # files in place); files already matching by size and mtime are skipped.
+            actions = [sync_file(src, package_dir / name) for name, src in entries]
 
             print()
             print(f"PROJECT PACKAGE created at: {package_dir.resolve()}")
             print(f"summary_dir={summary_dir.resolve()}")
             print(f"models_dir={models_dir.resolve()}")
             print(f"snapshots_dir={snapshots_dir.resolve()}")
+            print(
+                f"files={len(actions)} | copied={actions.count(SyncAction.COPIED)} | "
+                f"skipped={actions.count(SyncAction.SKIPPED)}"
+            )
             return 0
-        
+
         if args.projects_cmd == "set-valve-discount":
             amount = _parse_decimal(args.amount, "--amount")
             project_repo.set_valve_discount(code=args.code, valve_discount=amount)
@@ -477,8 +714,11 @@ def _handle_projects(args: argparse.Namespace, *, db_path: Path) -> int:
 
 
 
-def _handle_templates(args: argparse.Namespace, *, db_path: Path) -> int:
-    conn = SqliteDb(path=db_path).connect()
+def _handle_templates(args: argparse.Namespace, *, db: SqliteDb) -> int:
+    from app.domain.template import Template
+    from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+
+    conn = db.connect()
     try:
         template_repo = SqliteTemplateRepository(conn=conn)
 
@@ -519,8 +759,12 @@ def _handle_templates(args: argparse.Namespace, *, db_path: Path) -> int:
 
 
 
-def _handle_template_lines(args: argparse.Namespace, *, db_path: Path) -> int:
-    conn = SqliteDb(path=db_path).connect()
+def _handle_template_lines(args: argparse.Namespace, *, db: SqliteDb) -> int:
+    from app.domain.stage import Stage
+    from app.domain.template_line import TemplateLine
+    from app.infrastructure.sqlite_template_line_repository import SqliteTemplateLineRepository
+
+    conn = db.connect()
     try:
         line_repo = SqliteTemplateLineRepository(conn=conn)
 
@@ -558,17 +802,27 @@ def _handle_template_lines(args: argparse.Namespace, *, db_path: Path) -> int:
 
 
 
-def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConfig) -> int:
-    conn = SqliteDb(path=db_path).connect()
+def _handle_takeoffs(args: argparse.Namespace, *, db: SqliteDb, config: AppConfig) -> int:
+    from app.domain.stage import Stage
+    from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+    from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+    from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+    from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+    from app.infrastructure.sqlite_template_line_repository import SqliteTemplateLineRepository
+    from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+
+    conn = db.connect()
     try:
         item_repo = SqliteItemRepository(conn=conn)
         project_repo = SqliteProjectRepository(conn=conn)
         template_repo = SqliteTemplateRepository(conn=conn)
         template_line_repo = SqliteTemplateLineRepository(conn=conn)
-        takeoff_repo = SqliteTakeoffRepository(conn=conn)
-        takeoff_line_repo = SqliteTakeoffLineRepository(conn=conn)
+        takeoff_repo = SqliteTakeoffRepository(conn=conn, money_engine=config.money_engine)
+        takeoff_line_repo = SqliteTakeoffLineRepository(conn=conn, money_engine=config.money_engine)
 
         if args.takeoffs_cmd == "seed":
+            from app.application.seed_takeoff_from_template import SeedTakeoffFromTemplate
+
             tax_rate: Decimal | None = None
             if args.tax_rate:
                 tax_rate = _parse_decimal(args.tax_rate, "--tax-rate")
@@ -594,6 +848,58 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             )
             return 0
 
+        if args.takeoffs_cmd == "seed-bulk":
+            from app.application.seed_takeoffs_bulk import (
+                SeedStatus,
+                SeedTakeoffsBulk,
+                read_seed_manifest,
+            )
+
+            if args.manifest:
+                if args.projects or args.templates:
+                    raise InvalidInputError(
+                        "Use either --manifest or --projects/--templates, not both"
+                    )
+                pairs = read_seed_manifest(Path(args.manifest))
+            else:
+                if not args.projects or not args.templates:
+                    raise InvalidInputError("Provide --manifest or both --projects and --templates")
+                project_codes = [c.strip() for c in args.projects.split(",") if c.strip()]
+                template_codes = [c.strip() for c in args.templates.split(",") if c.strip()]
+                pairs = [(p, t) for p in project_codes for t in template_codes]
+
+            tax_rate = _parse_decimal(args.tax_rate, "--tax-rate") if args.tax_rate else None
+
+            bulk = SeedTakeoffsBulk(
+                project_repo=project_repo,
+                template_repo=template_repo,
+                template_line_repo=template_line_repo,
+                item_repo=item_repo,
+                takeoff_repo=takeoff_repo,
+                takeoff_line_repo=takeoff_line_repo,
+            )
+            results = bulk(pairs=pairs, tax_rate_override=tax_rate, batch_size=args.batch_size)
+
+            counts = {status: 0 for status in SeedStatus}
+            for r in results:
+                counts[r.status] += 1
+                line = (
+                    f"{r.status.value.upper()} project={r.project_code} "
+                    f"template={r.template_code}"
+                )
+                if r.takeoff_id:
+                    line += f" id={r.takeoff_id}"
+                if r.message:
+                    line += f" | {r.message}"
+                print(line)
+
+            print()
+            print(
+                f"SEED-BULK pairs={len(results)} seeded={counts[SeedStatus.SEEDED]} "
+                f"skipped={counts[SeedStatus.SKIPPED]} failed={counts[SeedStatus.FAILED]}"
+            )
+            return 1 if counts[SeedStatus.FAILED] else 0
+
         if args.takeoffs_cmd == "list":
             rows = takeoff_repo.list_for_project(project_code=args.project)
             for t in rows:
@@ -605,6 +911,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "show":
+            from app.domain.totals import TakeoffLineInput, TotalsAccumulator
+
             t = takeoff_repo.get(takeoff_id=args.id)
             print(
                 f"TAKEOFF {t.takeoff_id} | project={t.project_code} | template={t.template_code} | "
@@ -641,18 +949,17 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
                     )
                 )
 
+            acc = TotalsAccumulator.from_lines(
+                inputs, tax_rate=t.tax_rate, money_engine=config.money_engine
+            )
             for st in (Stage.GROUND, Stage.TOPOUT, Stage.FINAL):
-                tt = calc_stage_totals(inputs, stage=st, tax_rate=t.tax_rate)
+                tt = acc.stage_totals(st)
                 print(
                     f"{st.value.upper():<6} | subtotal={tt.subtotal:.2f} | "
                     f"tax={tt.tax:.2f} | total={tt.total:.2f}"
                 )
 
-            gt = calc_grand_totals(
-                inputs,
-                valve_discount=t.valve_discount,
-                tax_rate=t.tax_rate,
-            )
+            gt = acc.grand_totals(valve_discount=t.valve_discount)
             print(
                 f"GRAND  | subtotal={gt.subtotal:.2f} | tax={gt.tax:.2f} | "
                 f"total={gt.total:.2f} | valve_discount={gt.valve_discount:.2f} | "
@@ -661,6 +968,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
         
         if args.takeoffs_cmd == "inspect":
+            from app.application.inspect_takeoff import InspectTakeoff
+
             result = InspectTakeoff(
                 takeoff_repo=takeoff_repo,
                 takeoff_line_repo=takeoff_line_repo,
@@ -711,6 +1020,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "add-line":
+            from app.application.add_takeoff_line import AddTakeoffLine
+
             item = item_repo.get(args.item)
 
             AddTakeoffLine(repo=takeoff_line_repo)(
@@ -726,6 +1037,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "update-line":
+            from app.application.update_takeoff_line import UpdateTakeoffLine
+
             UpdateTakeoffLine(repo=takeoff_line_repo)(
                 takeoff_id=args.id,
                 item_code=args.item,
@@ -738,6 +1051,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "delete-line":
+            from app.application.delete_takeoff_line import DeleteTakeoffLine
+
             DeleteTakeoffLine(repo=takeoff_line_repo)(
                 takeoff_id=args.id,
                 item_code=args.item,
@@ -745,7 +1060,46 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             print(f"LINE deleted takeoff={args.id} item={args.item}")
             return 0
 
+        if args.takeoffs_cmd == "apply-changes":
+            from app.application.apply_takeoff_line_changes import (
+                ApplyTakeoffLineChanges,
+                read_line_changes,
+            )
+
+            changes = read_line_changes(Path(args.file))
+            applied = ApplyTakeoffLineChanges(
+                takeoff_repo=takeoff_repo,
+                takeoff_line_repo=takeoff_line_repo,
+                item_repo=item_repo,
+            )(takeoff_id=args.id, changes=changes)
+
+            print(
+                f"CHANGES applied takeoff={args.id} added={applied.added} "
+                f"updated={applied.updated} deleted={applied.deleted}"
+            )
+            before, after = applied.before.grand, applied.after.grand
+            print(
+                f"BEFORE | subtotal={before.subtotal:.2f} | tax={before.tax:.2f} | "
+                f"total={before.total:.2f} | after_discount={before.total_after_discount:.2f} | "
+                f"lines={applied.before.line_count}"
+            )
+            print(
+                f"AFTER | subtotal={after.subtotal:.2f} | tax={after.tax:.2f} | "
+                f"total={after.total:.2f} | after_discount={after.total_after_discount:.2f} | "
+                f"lines={applied.after.line_count}"
+            )
+            print(
+                f"DELTA | subtotal={after.subtotal - before.subtotal:+.2f} | "
+                f"tax={after.tax - before.tax:+.2f} | "
+                f"total={after.total - before.total:+.2f} | "
+                f"after_discount={after.total_after_discount - before.total_after_discount:+.2f} | "
+                f"lines={applied.after.line_count - applied.before.line_count:+d}"
+            )
+            return 0
+
         if args.takeoffs_cmd == "lines":
+            from app.application.list_takeoff_lines import ListTakeoffLines
+
             lines = list(
                 ListTakeoffLines(repo=takeoff_line_repo)(takeoff_id=args.id)
             )
@@ -763,23 +1117,28 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "render":
-            fmt = OutputFormat(args.format)
-            out = Path(args.out)
-            out.parent.mkdir(parents=True, exist_ok=True)
+            from app.application.render_takeoff_from_snapshot import RenderTakeoffFromSnapshot
+            from app.infrastructure.renderer_registry import RendererRegistry
+
+            outputs = _format_outputs(_parse_formats(args.format), Path(args.out))
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
 
-            rendered_path = RenderTakeoffFromSnapshot(
+            rendered = RenderTakeoffFromSnapshot(
                 project_repo=project_repo,
                 template_repo=template_repo,
                 takeoff_repo=takeoff_repo,
                 takeoff_line_repo=takeoff_line_repo,
                 renderer_factory=RendererRegistry(),
                 config=config,
-            )(takeoff_id=args.id, out=out, fmt=fmt)
+            ).render_many(takeoff_id=args.id, outputs=outputs)
 
-            print(f"{fmt.value.upper()} generated at: {rendered_path.resolve()}")
+            for fmt, rendered_path in rendered.items():
+                print(f"{fmt.value.upper()} generated at: {rendered_path.resolve()}")
             return 0
 
         if args.takeoffs_cmd == "export-revision":
+            from app.application.export_revision_bundle import ExportRevisionBundle
+
             out_dir = Path(args.out_dir)
             out_dir.mkdir(parents=True, exist_ok=True)
 
@@ -788,6 +1147,7 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
                 project_repo=project_repo,
                 template_repo=template_repo,
                 config=config,
+                render_cache=_render_cache(config),
             )(
                 version_id=args.version_id,
                 out_dir=out_dir,
@@ -844,7 +1204,10 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             takeoff_repo.lock(takeoff_id=args.id)
             print()
             print("NEXT:")
-            print(f"  python -m app.cli --db-path {args.db_path} takeoffs versions --id {v.takeoff_id}")
+            print(
+                f"  python -m app.cli --db-path {args.db_path} "
+                f"takeoffs versions --id {v.takeoff_id}"
+            )
             print(
                 "  python -m app.cli --db-path "
                 f"{args.db_path} takeoffs render-version --version-id {v.version_id} "
@@ -853,6 +1216,9 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "snapshot-and-render":
+            from app.application.render_takeoff_from_snapshot import RenderTakeoffFromVersion
+            from app.infrastructure.renderer_registry import RendererRegistry
+
             fmt = OutputFormat(args.format)
             out = Path(args.out)
             out.parent.mkdir(parents=True, exist_ok=True)
@@ -871,6 +1237,7 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
                 takeoff_repo=takeoff_repo,
                 renderer_factory=RendererRegistry(),
                 config=config,
+                render_cache=_render_cache(config),
             )(
                 version_id=version_id,
                 out=out,
@@ -918,8 +1285,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             )
             print()
 
-            rows = takeoff_repo.list_versions(takeoff_id=args.id)
-            if not rows:
+            versions = takeoff_repo.list_versions(takeoff_id=args.id)
+            if not versions:
                 print("No snapshots created yet for this takeoff.")
                 print()
                 print("NEXT:")
@@ -928,15 +1295,19 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
                 )
                 return 0
 
-            for v in rows:
+            totals = takeoff_repo.version_grand_totals(takeoff_id=args.id)
+            for v in versions:
                 created_by = v.created_by or "-"
                 reason = v.reason or ""
+                gt = totals[v.version_id]
                 print(
                     f"v{v.version_number} | {v.created_at} | "
-                    f"created_by={created_by} | reason={reason} | version_id={v.version_id}"
+                    f"created_by={created_by} | reason={reason} | "
+                    f"total={gt.total:.2f} | after_discount={gt.total_after_discount:.2f} | "
+                    f"version_id={v.version_id}"
                 )
 
-            latest = rows[0]
+            latest = versions[0]
             print()
             print("NEXT:")
             print(
@@ -948,6 +1319,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "revision-report":
+            from app.application.generate_revision_report import GenerateRevisionReport
+
             report = GenerateRevisionReport(takeoff_repo=takeoff_repo)(
                 version_a=args.v1,
                 version_b=args.v2,
@@ -964,6 +1337,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "diff":
+            from app.application.diff_takeoff_versions import DiffTakeoffVersions
+
             result = DiffTakeoffVersions(takeoff_repo=takeoff_repo)(
                 version_a=args.v1,
                 version_b=args.v2,
@@ -1051,18 +1426,21 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
             return 0
 
         if args.takeoffs_cmd == "render-version":
-            fmt = OutputFormat(args.format)
-            out = Path(args.out)
-            out.parent.mkdir(parents=True, exist_ok=True)
+            from app.application.render_takeoff_from_snapshot import RenderTakeoffFromVersion
+            from app.infrastructure.renderer_registry import RendererRegistry
+
+            outputs = _format_outputs(_parse_formats(args.format), Path(args.out))
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
 
             try:
-                rendered_path = RenderTakeoffFromVersion(
+                rendered = RenderTakeoffFromVersion(
                     project_repo=project_repo,
                     template_repo=template_repo,
                     takeoff_repo=takeoff_repo,
                     renderer_factory=RendererRegistry(),
                     config=config,
-                )(version_id=args.version_id, out=out, fmt=fmt)
+                    render_cache=_render_cache(config),
+                ).render_many(version_id=args.version_id, outputs=outputs)
             except InvalidInputError as e:
                 try:
                     _ = takeoff_repo.get(takeoff_id=args.version_id)
@@ -1078,7 +1456,8 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
                     )
                     return 2
 
-            print(f"{fmt.value.upper()} generated at: {rendered_path.resolve()}")
+            for fmt, rendered_path in rendered.items():
+                print(f"{fmt.value.upper()} generated at: {rendered_path.resolve()}")
             return 0
 
         raise AssertionError("Unreachable: unknown takeoffs command")
@@ -1091,291 +1470,448 @@ def _handle_takeoffs(args: argparse.Namespace, *, db_path: Path, config: AppConf
 # -----------------------------------
 
 
-def main(argv: list[str] | None = None) -> int:
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
+    # Built once per process: the daemon and batch runner parse many commands.
+    parser = argparse.ArgumentParser(prog="takeoff-app")
+
+    # Global (SQLite)
+    parser.add_argument("--db-path", default="data/takeoff.db")
+    parser.add_argument(
+        "--db-profile",
+        choices=sorted(DB_PROFILES),
+        default=DEFAULT_DB_PROFILE,
+        help="SQLite connection tuning profile",
+    )
+    parser.add_argument(
+        "--money-engine",
+        choices=sorted(MONEY_ENGINES),
+        default=DEFAULT_MONEY_ENGINE,
+        help="Per-line money arithmetic for cached totals (results are identical)",
+    )
+    parser.add_argument(
+        "--render-cache",
+        default=None,
+        metavar="DIR",
+        help="Serve snapshot version renders from a render cache in DIR (default: off)",
+    )
+
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    # -------------------------
+    # save (file repo)
+    # -------------------------
+    save = sub.add_parser("save")
+    save.add_argument("--input", choices=["sample", "json"], default="sample")
+    save.add_argument("--input-path", default=None)
+    save.add_argument("--repo-dir", default="data/takeoffs")
+
+    # -------------------------
+    # render (file repo)
+    # -------------------------
+    render = sub.add_parser("render")
+    render.add_argument("--input", choices=["sample", "json"], default="sample")
+    render.add_argument("--input-path", default=None)
+    render.add_argument("--id", default=None)
+    render.add_argument("--repo-dir", default="data/takeoffs")
+    render.add_argument("--format", choices=["pdf", "json", "csv"], required=True)
+    render.add_argument("--out", required=True)
+    render.add_argument("--company-name", required=False)
+    render.add_argument("--tax-rate", required=False)
+
+    # -------------------------
+    # index (file repo manifest)
+    # -------------------------
+    index = sub.add_parser("index")
+    index_sub = index.add_subparsers(dest="index_cmd", required=True)
+
+    idx_list = index_sub.add_parser("list")
+    idx_list.add_argument("--repo-dir", default="data/takeoffs")
+
+    idx_find = index_sub.add_parser("find")
+    idx_find.add_argument("--repo-dir", default="data/takeoffs")
+    idx_find.add_argument("--project", default=None)
+    idx_find.add_argument("--model-group", default=None)
+
+    idx_rebuild = index_sub.add_parser("rebuild")
+    idx_rebuild.add_argument("--repo-dir", default="data/takeoffs")
+
+    # -------------------------
+    # serve (warm daemon on a Unix socket)
+    # -------------------------
+    serve = sub.add_parser("serve")
+    serve.add_argument(
+        "--socket",
+        default="data/cli.sock",
+        help="Unix socket to listen on (clients: python -m app.cli_daemon ...)",
+    )
+
+    # -------------------------
+    # batch (many commands, one process)
+    # -------------------------
+    batch = sub.add_parser("batch")
+    batch.add_argument(
+        "--file", default="-", help="One command per line ('-' or omitted: read stdin)"
+    )
+    batch.add_argument(
+        "--transaction",
+        action="store_true",
+        help="Run all commands in one transaction; roll back on the first error",
+    )
+
+    # -------------------------
+    # db (SQLite schema)
+    # -------------------------
+    db = sub.add_parser("db")
+    db_sub = db.add_subparsers(dest="db_cmd", required=True)
+    db_sub.add_parser("status")
+    db_sub.add_parser("migrate")
+    db_sub.add_parser("rebuild-totals")
+
+    # -------------------------
+    # cache (render cache)
+    # -------------------------
+    cache = sub.add_parser("cache")
+    cache_sub = cache.add_subparsers(dest="cache_cmd", required=True)
+    cache_sub.add_parser("stats")
+    c_prune = cache_sub.add_parser("prune")
+    c_prune.add_argument(
+        "--max-bytes",
+        type=int,
+        default=None,
+        help="Evict least recently used files down to this size "
+        "(default: the cache limit; 0 empties it)",
+    )
+
+    # -------------------------
+    # items (SQLite)
+    # -------------------------
+    items = sub.add_parser("items")
+    items_sub = items.add_subparsers(dest="items_cmd", required=True)
+
+    i_import = items_sub.add_parser("import")
+    i_import.add_argument("--csv", required=True)
+    i_import.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Validate the whole file, then write only new/changed rows in one transaction",
+    )
+    i_import.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes validating rows in parallel (1 = in-process)",
+    )
+    i_import.add_argument("--chunk-size", type=int, default=5_000)
+
+    # -------------------------
+    # projects (SQLite)
+    # -------------------------
+    projects = sub.add_parser("projects")
+    projects_sub = projects.add_subparsers(dest="projects_cmd", required=True)
+
+    p_add = projects_sub.add_parser("add")
+    p_add.add_argument("--code", required=True)
+    p_add.add_argument("--name", required=True)
+    p_add.add_argument("--contractor", required=True)
+    p_add.add_argument("--foreman", required=True)
+    p_add.add_argument("--inactive", action="store_true")
+    p_add.add_argument("--valve-discount", default="0.00")
+
+    p_list = projects_sub.add_parser("list")
+    p_list.add_argument("--all", action="store_true", help="Include inactive projects")
+
+    p_show = projects_sub.add_parser("show")
+    p_show.add_argument("--code", required=True)
+
+    p_summary = projects_sub.add_parser("summary")
+    p_summary.add_argument("--code", required=True)
+
+    p_invoice = projects_sub.add_parser("invoice")
+    p_invoice.add_argument("--code", required=True)
+    
+    p_snapshot = projects_sub.add_parser("snapshot")
+    p_snapshot.add_argument("--code", required=True)
+    p_snapshot.add_argument("--notes", default=None)
+    p_snapshot.add_argument("--created-by", default=None)
+    p_snapshot.add_argument("--reason", default=None)
+
+    p_export = projects_sub.add_parser("export")
+    p_export.add_argument("--code", required=True)
+    p_export.add_argument("--out-dir", default="outputs")
+    p_export.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Render processes (default: CPU count; 1 renders in-process)",
+    )
+    p_export.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild every output even if the export manifest says it is unchanged",
+    )
+    p_export.add_argument(
+        "--mirror-dir",
+        default=None,
+        help="Also copy each exported bundle here (e.g. a network share), in the background",
+    )
+    
+    p_package = projects_sub.add_parser("package")
+    p_package.add_argument("--code", required=True)
+    p_package.add_argument("--out-dir", default="outputs")
+    p_package.add_argument(
+        "--zip",
+        action="store_true",
+        help="Write one deterministic <code>_PACKAGE.zip instead of a package folder",
+    )
+    
+    p_set = projects_sub.add_parser("set-valve-discount")
+    p_set.add_argument("--code", required=True)
+    p_set.add_argument("--amount", required=True)
+
+    p_del = projects_sub.add_parser("delete")
+    p_del.add_argument("--code", required=True)
+
+    # -------------------------
+    # templates (SQLite)
+    # -------------------------
+    templates = sub.add_parser("templates")
+    templates_sub = templates.add_subparsers(dest="templates_cmd", required=True)
+
+    t_add = templates_sub.add_parser("add")
+    t_add.add_argument("--code", required=True)
+    t_add.add_argument("--name", required=True)
+    t_add.add_argument("--category", required=True)
+    t_add.add_argument("--inactive", action="store_true")
+
+    t_list = templates_sub.add_parser("list")
+    t_list.add_argument("--all", action="store_true", help="Include inactive templates")
+
+    t_show = templates_sub.add_parser("show")
+    t_show.add_argument("--code", required=True)
+
+    t_del = templates_sub.add_parser("delete")
+    t_del.add_argument("--code", required=True)
+
+    # -------------------------
+    # template-lines (SQLite)
+    # -------------------------
+    tlines = sub.add_parser("template-lines")
+    tlines_sub = tlines.add_subparsers(dest="tlines_cmd", required=True)
+
+    tl_add = tlines_sub.add_parser("add")
+    tl_add.add_argument("--template", required=True)
+    tl_add.add_argument("--item", required=True)
+    tl_add.add_argument("--qty", required=True)
+    tl_add.add_argument("--stage", choices=["ground", "topout", "final"], default="final")
+    tl_add.add_argument("--factor", default="1.0")
+    tl_add.add_argument("--sort-order", default="0")
+    tl_add.add_argument("--notes", default=None)
+
+    tl_list = tlines_sub.add_parser("list")
+    tl_list.add_argument("--template", required=True)
+
+    # -------------------------
+    # takeoffs (SQLite)
+    # -------------------------
+    takeoffs = sub.add_parser("takeoffs")
+    takeoffs_sub = takeoffs.add_subparsers(dest="takeoffs_cmd", required=True)
+
+    seed = takeoffs_sub.add_parser("seed")
+    seed.add_argument("--project", required=True)
+    seed.add_argument("--template", required=True)
+    seed.add_argument("--tax-rate", required=False)
+
+    seed_bulk = takeoffs_sub.add_parser("seed-bulk")
+    seed_bulk.add_argument("--projects", default=None, help="Comma-separated project codes")
+    seed_bulk.add_argument("--templates", default=None, help="Comma-separated template codes")
+    seed_bulk.add_argument(
+        "--manifest", default=None, help="CSV with project_code,template_code columns"
+    )
+    seed_bulk.add_argument("--tax-rate", required=False)
+    seed_bulk.add_argument("--batch-size", type=int, default=50)
+
+    lst = takeoffs_sub.add_parser("list")
+    lst.add_argument("--project", required=True)
+
+    show = takeoffs_sub.add_parser("show")
+    show.add_argument("--id", required=True)
+    
+    inspect_cmd = takeoffs_sub.add_parser("inspect")
+    inspect_cmd.add_argument("--id", required=True)
+
+    lines_cmd = takeoffs_sub.add_parser("lines")
+    lines_cmd.add_argument("--id", required=True)
+
+    upd = takeoffs_sub.add_parser("update-line")
+    upd.add_argument("--id", required=True)
+    upd.add_argument("--item", required=True)
+    upd.add_argument("--qty", required=False)
+    upd.add_argument("--stage", choices=["ground", "topout", "final"], required=False)
+    upd.add_argument("--factor", required=False)
+    upd.add_argument("--sort-order", required=False)
+
+    add_ln = takeoffs_sub.add_parser("add-line")
+    add_ln.add_argument("--id", required=True)
+    add_ln.add_argument("--item", required=True)
+    add_ln.add_argument("--qty", required=True)
+    add_ln.add_argument("--stage", choices=["ground", "topout", "final"], default="final")
+    add_ln.add_argument("--factor", default="1.0")
+    add_ln.add_argument("--sort-order", default="0")
+    add_ln.add_argument("--notes", default=None)
+
+    del_ln = takeoffs_sub.add_parser("delete-line")
+    del_ln.add_argument("--id", required=True)
+    del_ln.add_argument("--item", required=True)
+
+    apply_ch = takeoffs_sub.add_parser("apply-changes")
+    apply_ch.add_argument("--id", required=True)
+    apply_ch.add_argument(
+        "--file", required=True, help="CSV: action,item_code[,qty,stage,factor,sort_order,notes]"
+    )
+
+    revise = takeoffs_sub.add_parser("revise")
+    revise.add_argument("--id", required=True)
+
+    rnd = takeoffs_sub.add_parser("render")
+    rnd.add_argument("--id", required=True)
+    rnd.add_argument("--format", required=True, help=_FORMATS_HELP)
+    rnd.add_argument("--out", required=True)
+    
+    snap = takeoffs_sub.add_parser("snapshot")
+    snap.add_argument("--id", required=True)
+    snap.add_argument("--notes", default=None)
+    snap.add_argument("--created-by", default=None)
+    snap.add_argument("--reason", default=None)
+
+    vers = takeoffs_sub.add_parser("versions")
+    vers.add_argument("--id", required=True)
+
+    # Alias: version (singular)
+    ver_alias = takeoffs_sub.add_parser("version")
+    ver_alias.add_argument("--id", required=True)
+
+    hist = takeoffs_sub.add_parser("history")
+    hist.add_argument("--id", required=True)
+
+    rv = takeoffs_sub.add_parser("render-version")
+    rv.add_argument("--version-id", required=True)
+    rv.add_argument("--format", required=True, help=_FORMATS_HELP)
+    rv.add_argument("--out", required=True)
+
+    snap_render = takeoffs_sub.add_parser("snapshot-and-render")
+    snap_render.add_argument("--id", required=True)
+    snap_render.add_argument("--format", choices=["pdf", "json", "csv"], required=True)
+    snap_render.add_argument("--out", required=True)
+    snap_render.add_argument("--notes", default=None)
+    snap_render.add_argument("--created-by", default=None)
+    snap_render.add_argument("--reason", default=None)
+
+    diff_cmd = takeoffs_sub.add_parser("diff")
+    diff_cmd.add_argument("--v1", required=True)
+    diff_cmd.add_argument("--v2", required=True)
+    diff_cmd.add_argument("--all", action="store_true", help="Include unchanged lines")
+    
+    rev_report = takeoffs_sub.add_parser("revision-report")
+    rev_report.add_argument("--v1", required=True)
+    rev_report.add_argument("--v2", required=True)
+    rev_report.add_argument("--out", required=False)
+
+    export_rev = takeoffs_sub.add_parser("export-revision")
+    export_rev.add_argument("--version-id", required=True)
+    export_rev.add_argument("--out-dir", default="outputs")
+
+    verify_version = takeoffs_sub.add_parser("verify-version")
+    verify_version.add_argument("--version-id", required=True)
+
+    return parser
+
+
+def main(argv: list[str] | None = None, *, connections: ConnectionCache | None = None) -> int:
+    """
+    Run one CLI command.
+
+    `connections` is passed by long-lived callers (the serve daemon) so SQLite
+    connections stay open across commands.
+    """
     try:
-        parser = argparse.ArgumentParser(prog="takeoff-app")
-
-        # Global (SQLite)
-        parser.add_argument("--db-path", default="data/takeoff.db")
-
-        sub = parser.add_subparsers(dest="cmd", required=True)
-
-        # -------------------------
-        # save (file repo)
-        # -------------------------
-        save = sub.add_parser("save")
-        save.add_argument("--input", choices=["sample", "json"], default="sample")
-        save.add_argument("--input-path", default=None)
-        save.add_argument("--repo-dir", default="data/takeoffs")
+        parser = _build_parser()
+        args = parser.parse_args(argv)
 
-        # -------------------------
-        # render (file repo)
-        # -------------------------
-        render = sub.add_parser("render")
-        render.add_argument("--input", choices=["sample", "json"], default="sample")
-        render.add_argument("--input-path", default=None)
-        render.add_argument("--id", default=None)
-        render.add_argument("--repo-dir", default="data/takeoffs")
-        render.add_argument("--format", choices=["pdf", "json", "csv"], required=True)
-        render.add_argument("--out", required=True)
-        render.add_argument("--company-name", required=False)
-        render.add_argument("--tax-rate", required=False)
+        company_name = getattr(args, "company_name", None) or AppConfig().company_name
+        config = AppConfig(
+            company_name=company_name,
+            db_profile=args.db_profile,
+            money_engine=args.money_engine,
+            render_cache_root=Path(args.render_cache) if args.render_cache else None,
+        )
 
         # -------------------------
-        # projects (SQLite)
+        # SAVE / RENDER / INDEX (file repo)
         # -------------------------
-        projects = sub.add_parser("projects")
-        projects_sub = projects.add_subparsers(dest="projects_cmd", required=True)
-
-        p_add = projects_sub.add_parser("add")
-        p_add.add_argument("--code", required=True)
-        p_add.add_argument("--name", required=True)
-        p_add.add_argument("--contractor", required=True)
-        p_add.add_argument("--foreman", required=True)
-        p_add.add_argument("--inactive", action="store_true")
-        p_add.add_argument("--valve-discount", default="0.00")
-
-        p_list = projects_sub.add_parser("list")
-        p_list.add_argument("--all", action="store_true", help="Include inactive projects")
-
-        p_show = projects_sub.add_parser("show")
-        p_show.add_argument("--code", required=True)
-
-        p_summary = projects_sub.add_parser("summary")
-        p_summary.add_argument("--code", required=True)
-
-        p_invoice = projects_sub.add_parser("invoice")
-        p_invoice.add_argument("--code", required=True)
-        
-        p_export = projects_sub.add_parser("export")
-        p_export.add_argument("--code", required=True)
-        p_export.add_argument("--out-dir", default="outputs")
-        
-        p_package = projects_sub.add_parser("package")
-        p_package.add_argument("--code", required=True)
-        p_package.add_argument("--out-dir", default="outputs")
-        
-        p_set = projects_sub.add_parser("set-valve-discount")
-        p_set.add_argument("--code", required=True)
-        p_set.add_argument("--amount", required=True)
-
-        p_del = projects_sub.add_parser("delete")
-        p_del.add_argument("--code", required=True)
+        if args.cmd == "save":
+            return _handle_save(args)
 
-        # -------------------------
-        # templates (SQLite)
-        # -------------------------
-        templates = sub.add_parser("templates")
-        templates_sub = templates.add_subparsers(dest="templates_cmd", required=True)
+        if args.cmd == "render":
+            return _handle_render(args, config=config)
 
-        t_add = templates_sub.add_parser("add")
-        t_add.add_argument("--code", required=True)
-        t_add.add_argument("--name", required=True)
-        t_add.add_argument("--category", required=True)
-        t_add.add_argument("--inactive", action="store_true")
+        if args.cmd == "index":
+            return _handle_index(args)
 
-        t_list = templates_sub.add_parser("list")
-        t_list.add_argument("--all", action="store_true", help="Include inactive templates")
+        if args.cmd == "cache":
+            return _handle_cache(args, config=config)
 
-        t_show = templates_sub.add_parser("show")
-        t_show.add_argument("--code", required=True)
+        from app.infrastructure.sqlite_db import SqliteDb
 
-        t_del = templates_sub.add_parser("delete")
-        t_del.add_argument("--code", required=True)
+        db = SqliteDb(
+            path=Path(args.db_path), tuning=config.db_tuning(), connections=connections
+        )
 
         # -------------------------
-        # template-lines (SQLite)
+        # SERVE (daemon)
         # -------------------------
-        tlines = sub.add_parser("template-lines")
-        tlines_sub = tlines.add_subparsers(dest="tlines_cmd", required=True)
-
-        tl_add = tlines_sub.add_parser("add")
-        tl_add.add_argument("--template", required=True)
-        tl_add.add_argument("--item", required=True)
-        tl_add.add_argument("--qty", required=True)
-        tl_add.add_argument("--stage", choices=["ground", "topout", "final"], default="final")
-        tl_add.add_argument("--factor", default="1.0")
-        tl_add.add_argument("--sort-order", default="0")
-        tl_add.add_argument("--notes", default=None)
+        if args.cmd == "serve":
+            if connections is not None:
+                raise InvalidInputError("serve cannot be run through a daemon")
+            from app.cli_daemon import serve as serve_daemon
 
-        tl_list = tlines_sub.add_parser("list")
-        tl_list.add_argument("--template", required=True)
+            return serve_daemon(Path(args.socket), db=db)
 
         # -------------------------
-        # takeoffs (SQLite)
+        # BATCH
         # -------------------------
-        takeoffs = sub.add_parser("takeoffs")
-        takeoffs_sub = takeoffs.add_subparsers(dest="takeoffs_cmd", required=True)
-
-        seed = takeoffs_sub.add_parser("seed")
-        seed.add_argument("--project", required=True)
-        seed.add_argument("--template", required=True)
-        seed.add_argument("--tax-rate", required=False)
-
-        lst = takeoffs_sub.add_parser("list")
-        lst.add_argument("--project", required=True)
-
-        show = takeoffs_sub.add_parser("show")
-        show.add_argument("--id", required=True)
-        
-        inspect_cmd = takeoffs_sub.add_parser("inspect")
-        inspect_cmd.add_argument("--id", required=True)
-
-        lines_cmd = takeoffs_sub.add_parser("lines")
-        lines_cmd.add_argument("--id", required=True)
-
-        upd = takeoffs_sub.add_parser("update-line")
-        upd.add_argument("--id", required=True)
-        upd.add_argument("--item", required=True)
-        upd.add_argument("--qty", required=False)
-        upd.add_argument("--stage", choices=["ground", "topout", "final"], required=False)
-        upd.add_argument("--factor", required=False)
-        upd.add_argument("--sort-order", required=False)
-
-        add_ln = takeoffs_sub.add_parser("add-line")
-        add_ln.add_argument("--id", required=True)
-        add_ln.add_argument("--item", required=True)
-        add_ln.add_argument("--qty", required=True)
-        add_ln.add_argument("--stage", choices=["ground", "topout", "final"], default="final")
-        add_ln.add_argument("--factor", default="1.0")
-        add_ln.add_argument("--sort-order", default="0")
-        add_ln.add_argument("--notes", default=None)
-
-        del_ln = takeoffs_sub.add_parser("delete-line")
-        del_ln.add_argument("--id", required=True)
-        del_ln.add_argument("--item", required=True)
-
-        revise = takeoffs_sub.add_parser("revise")
-        revise.add_argument("--id", required=True)
-
-        rnd = takeoffs_sub.add_parser("render")
-        rnd.add_argument("--id", required=True)
-        rnd.add_argument("--format", choices=["pdf", "json", "csv"], required=True)
-        rnd.add_argument("--out", required=True)
-        
-        snap = takeoffs_sub.add_parser("snapshot")
-        snap.add_argument("--id", required=True)
-        snap.add_argument("--notes", default=None)
-        snap.add_argument("--created-by", default=None)
-        snap.add_argument("--reason", default=None)
-
-        vers = takeoffs_sub.add_parser("versions")
-        vers.add_argument("--id", required=True)
-
-        # Alias: version (singular)
-        ver_alias = takeoffs_sub.add_parser("version")
-        ver_alias.add_argument("--id", required=True)
-
-        hist = takeoffs_sub.add_parser("history")
-        hist.add_argument("--id", required=True)
-
-        rv = takeoffs_sub.add_parser("render-version")
-        rv.add_argument("--version-id", required=True)
-        rv.add_argument("--format", choices=["pdf", "json", "csv"], required=True)
-        rv.add_argument("--out", required=True)
-
-        snap_render = takeoffs_sub.add_parser("snapshot-and-render")
-        snap_render.add_argument("--id", required=True)
-        snap_render.add_argument("--format", choices=["pdf", "json", "csv"], required=True)
-        snap_render.add_argument("--out", required=True)
-        snap_render.add_argument("--notes", default=None)
-        snap_render.add_argument("--created-by", default=None)
-        snap_render.add_argument("--reason", default=None)
-
-        diff_cmd = takeoffs_sub.add_parser("diff")
-        diff_cmd.add_argument("--v1", required=True)
-        diff_cmd.add_argument("--v2", required=True)
-        diff_cmd.add_argument("--all", action="store_true", help="Include unchanged lines")
-        
-        rev_report = takeoffs_sub.add_parser("revision-report")
-        rev_report.add_argument("--v1", required=True)
-        rev_report.add_argument("--v2", required=True)
-        rev_report.add_argument("--out", required=False)
-
-        export_rev = takeoffs_sub.add_parser("export-revision")
-        export_rev.add_argument("--version-id", required=True)
-        export_rev.add_argument("--out-dir", default="outputs")
-
-        verify_version = takeoffs_sub.add_parser("verify-version")
-        verify_version.add_argument("--version-id", required=True)
-
-        args = parser.parse_args(argv)
-
-        # File repo (existing)
-        file_repo = FileTakeoffRepository(base_dir=Path(getattr(args, "repo_dir", "data/takeoffs")))
-        company_name = getattr(args, "company_name", None) or AppConfig().company_name
-        config = AppConfig(company_name=company_name)
-        sample_builder = BuildSampleTakeoff()
+        if args.cmd == "batch":
+            return _handle_batch(args, db=db)
 
         # -------------------------
-        # SAVE
+        # DB (SQLite)
         # -------------------------
-        if args.cmd == "save":
-            _validate_save_args(args)
-
-            if args.input == "json":
-                takeoff = TakeoffJsonLoader().load(Path(args.input_path))
-            else:
-                takeoff = sample_builder()
-
-            stored = SaveTakeoff(repo=file_repo)(takeoff)
-            print(f"SAVED takeoff id={stored.id} path={stored.path.resolve()}")
-            return 0
+        if args.cmd == "db":
+            return _handle_db(args, db=db, config=config)
 
         # -------------------------
-        # RENDER
+        # ITEMS (SQLite)
         # -------------------------
-        if args.cmd == "render":
-            _validate_render_args(args)
-
-            fmt = OutputFormat(args.format)
-            out = Path(args.out)
-            out.parent.mkdir(parents=True, exist_ok=True)
-
-            tax_override: Decimal | None = None
-            if args.tax_rate:
-                tax_override = _parse_decimal(args.tax_rate, "--tax-rate")
-
-            takeoff_input: TakeoffInputSource
-            if args.id:
-                takeoff_input = RepoTakeoffInput(repo=file_repo, takeoff_id=args.id)
-            elif args.input == "json":
-                takeoff_input = JsonTakeoffInput(path=Path(args.input_path))
-            else:
-                takeoff_input = FactoryTakeoffInput(factory=sample_builder)
-
-            registry = RendererRegistry()
-
-            rendered_path = RenderTakeoff(
-                renderer_factory=registry,
-                config=config,
-            )(
-                out=out,
-                fmt=fmt,
-                takeoff_input=takeoff_input,
-                tax_rate_override=tax_override,
-            )
-
-            print(f"{fmt.value.upper()} generated at: {rendered_path.resolve()}")
-            return 0
+        if args.cmd == "items":
+            return _handle_items(args, db=db)
 
         # -------------------------
         # PROJECTS (SQLite)
         # -------------------------
         if args.cmd == "projects":
-            return _handle_projects(args, db_path=Path(args.db_path))
+            return _handle_projects(args, db=db, config=config)
 
         # -------------------------
         # TEMPLATES (SQLite)
         # -------------------------
         if args.cmd == "templates":
-            return _handle_templates(args, db_path=Path(args.db_path))
+            return _handle_templates(args, db=db)
 
         # -------------------------
         # TEMPLATE LINES (SQLite)
         # -------------------------
         if args.cmd == "template-lines":
-            return _handle_template_lines(args, db_path=Path(args.db_path))
+            return _handle_template_lines(args, db=db)
 
         # -------------------------
         # TAKEOFFS (SQLite)
@@ -1383,7 +1919,7 @@ def main(argv: list[str] | None = None) -> int:
         if args.cmd == "takeoffs":
             return _handle_takeoffs(
                 args,
-                db_path=Path(args.db_path),
+                db=db,
                 config=config,
             )
 
@@ -0,0 +1,155 @@
+"""Run many CLI commands from a file (or stdin) in one process: `app.cli batch`.
+
+One command per line, written as on the command line without `python -m
+app.cli`; blank lines and `# comments` are ignored:
+
+    takeoffs seed --project P1 --template TH_DEFAULT
+    takeoffs update-line --id T1 --item ITEM-001 --qty 3
+    takeoffs snapshot --id T1 --reason "repricing"
+
+The batch's own global flags (--db-path, --db-profile, --money-engine and,
+when given, --render-cache) apply to every command, and all commands share
+one connection per database.
+
+Output is JSON lines: one object per command (line, command, status, exit_code,
+ms, stdout, stderr) and a final summary object.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import shlex
+import time
+from collections.abc import Iterable
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, TextIO
+
+from app.application.errors import InvalidInputError
+
+if TYPE_CHECKING:
+    from app.infrastructure.sqlite_db import ConnectionCache, SqliteDb
+
+# Flags that would point a command at another connection than the held one.
+_CONNECTION_FLAGS = ("--db-path", "--db-profile")
+
+
+@dataclass(frozen=True)
+class BatchCommand:
+    line: int
+    argv: tuple[str, ...]
+
+    @property
+    def text(self) -> str:
+        return shlex.join(self.argv)
+
+
+def read_commands(lines: Iterable[str]) -> list[BatchCommand]:
+    commands: list[BatchCommand] = []
+    for lineno, raw in enumerate(lines, start=1):
+        try:
+            argv = shlex.split(raw, comments=True)
+        except ValueError as e:
+            raise InvalidInputError(f"Line {lineno}: {e}") from e
+        if not argv:
+            continue
+        if argv[0] in {"batch", "serve"}:
+            raise InvalidInputError(f"Line {lineno}: {argv[0]} cannot run inside a batch")
+        commands.append(BatchCommand(line=lineno, argv=tuple(argv)))
+    return commands
+
+
+def _emit(out: TextIO, record: dict[str, object]) -> None:
+    out.write(json.dumps(record) + "\n")
+    out.flush()
+
+
+def run_batch(
+    commands: list[BatchCommand],
+    *,
+    db: SqliteDb,
+    global_argv: list[str],
+    transaction: bool,
+    out: TextIO,
+) -> int:
+    """
+    Run `commands` in order; returns 0 when all succeeded, else 1.
+
+    transaction=False: every command commits on its own and a failure does
+    not stop the batch. transaction=True: the batch's DB work is one
+    transaction, committed after the last command; the first failure rolls
+    everything back and the remaining commands are reported as skipped.
+    """
+    from app.cli_daemon import run_argv
+    from app.infrastructure.sqlite_db import SharedConnection
+
+    if transaction:
+        for cmd in commands:
+            if any(a.split("=")[0] in _CONNECTION_FLAGS for a in cmd.argv):
+                raise InvalidInputError(
+                    f"Line {cmd.line}: --db-path/--db-profile cannot be set per command "
+                    "with --transaction"
+                )
+
+    assert db.connections is not None
+    connections: ConnectionCache = db.connections
+    conn = db.connect()
+    assert isinstance(conn, SharedConnection)
+    if transaction:
+        conn.hold_transaction()
+
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    failed = False
+    finished = False
+    batch_start = time.perf_counter()
+    try:
+        for cmd in commands:
+            if failed and transaction:
+                counts["skipped"] += 1
+                _emit(out, {"line": cmd.line, "command": cmd.text, "status": "skipped"})
+                continue
+
+            stdout, stderr = io.StringIO(), io.StringIO()
+            start = time.perf_counter()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                code = run_argv([*global_argv, *cmd.argv], connections)
+            ms = (time.perf_counter() - start) * 1000
+
+            if code == 0 and transaction and conn.held_transaction_lost:
+                print("command rolled back the batch transaction", file=stderr)
+                code = 1
+            status = "ok" if code == 0 else "error"
+            counts[status] += 1
+            failed = failed or code != 0
+            _emit(
+                out,
+                {
+                    "line": cmd.line,
+                    "command": cmd.text,
+                    "status": status,
+                    "exit_code": code,
+                    "ms": round(ms, 3),
+                    "stdout": stdout.getvalue(),
+                    "stderr": stderr.getvalue(),
+                },
+            )
+        finished = True
+    finally:
+        outcome = None
+        if transaction:
+            committed = finished and not failed
+            conn.end_held_transaction(commit=committed)
+            outcome = "committed" if committed else "rolled_back"
+
+    _emit(
+        out,
+        {
+            "summary": True,
+            "commands": len(commands),
+            **counts,
+            "transaction": outcome,
+            "ms": round((time.perf_counter() - batch_start) * 1000, 3),
+        },
+    )
+    return 1 if failed else 0
@@ -0,0 +1,265 @@
+"""Warm CLI daemon over a Unix domain socket, and its thin client.
+
+Server:
+    python -m app.cli [--db-path ...] serve [--socket data/cli.sock]
+
+Client (stdlib imports only; same arguments as app.cli):
+    python -m app.cli_daemon [--socket data/cli.sock] projects list
+    python -m app.cli_daemon --stop
+
+Wire format, newline-delimited JSON over one connection per command:
+    client -> server  {"argv": [...], "cwd": "/abs/dir"}     or  {"control": "stop"}
+    server -> client  {"stream": "stdout" | "stderr", "data": "..."}   (any number)
+                      {"exit": <int>}                                  (last)
+
+The server runs requests one at a time, in the client's working directory,
+through the same app.cli.main the in-process CLI uses. A malformed request
+line gets an stderr message and exit code 2. The socket is owner-only (0600).
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import sys
+import traceback
+from collections.abc import Sequence
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.infrastructure.sqlite_db import ConnectionCache, SqliteDb
+
+DEFAULT_SOCKET = "data/cli.sock"
+
+# Imported (and font metrics loaded) before the first request, so even that
+# one pays no import cost.
+_WARM_MODULES = (
+    "app.application.export_project",
+    "app.application.export_revision_bundle",
+    "app.application.generate_project_invoice",
+    "app.application.render_takeoff",
+    "app.application.render_takeoff_from_snapshot",
+    "app.application.seed_takeoff_from_template",
+    "app.application.summarize_project",
+    "app.infrastructure.csv_takeoff_renderer",
+    "app.infrastructure.debug_takeoff_json_renderer",
+    "app.infrastructure.pdf_takeoff_reportlab",
+    "app.infrastructure.sqlite_item_repository",
+    "app.infrastructure.sqlite_project_repository",
+    "app.infrastructure.sqlite_takeoff_line_repository",
+    "app.infrastructure.sqlite_takeoff_repository",
+    "app.infrastructure.sqlite_template_line_repository",
+    "app.infrastructure.sqlite_template_repository",
+)
+
+
+def _send(conn: socket.socket, message: dict[str, Any]) -> None:
+    conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+class _SocketStream(io.TextIOBase):
+    """Text stream forwarded to the client line by line as {"stream": name, "data": ...}."""
+
+    def __init__(self, conn: socket.socket, name: str) -> None:
+        self._conn = conn
+        self._name = name
+        self._buffer = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self._buffer += s
+        if "\n" in self._buffer:
+            head, _, self._buffer = self._buffer.rpartition("\n")
+            _send(self._conn, {"stream": self._name, "data": head + "\n"})
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buffer:
+            _send(self._conn, {"stream": self._name, "data": self._buffer})
+            self._buffer = ""
+
+
+# -----------------------------------
+# Server
+# -----------------------------------
+
+
+def _warm_up(db: SqliteDb) -> None:
+    from importlib import import_module
+
+    for name in _WARM_MODULES:
+        import_module(name)
+
+    from app.infrastructure.pdf_takeoff_reportlab import warm_font_metrics
+
+    warm_font_metrics()
+
+    db.connect()  # opens (and migrates) the DB named by serve's own global flags
+
+
+def run_argv(argv: list[str], connections: ConnectionCache) -> int:
+    """app.cli.main as a function call: SystemExit and crashes become exit codes."""
+    from app.cli import main
+
+    try:
+        return main(argv, connections=connections)
+    except SystemExit as e:  # argparse errors and handler SystemExit("message")
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def _parse_request(line: bytes) -> dict[str, Any]:
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise TypeError("request must be a JSON object")
+    if not isinstance(request.get("argv", []), list):
+        raise TypeError('"argv" must be a list')
+    return request
+
+
+def _handle_request(
+    conn: socket.socket, request: dict[str, Any], connections: ConnectionCache
+) -> bool:
+    """Run one request; False once the server should stop."""
+    if request.get("control") == "stop":
+        _send(conn, {"exit": 0})
+        return False
+
+    argv = [str(a) for a in request.get("argv", [])]
+    out, err = _SocketStream(conn, "stdout"), _SocketStream(conn, "stderr")
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(request.get("cwd") or previous_cwd)
+    except OSError as e:
+        _send(conn, {"stream": "stderr", "data": f"Cannot use client directory: {e}\n"})
+        _send(conn, {"exit": 2})
+        return True
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            code = run_argv(argv, connections)
+    finally:
+        os.chdir(previous_cwd)
+        out.flush()
+        err.flush()
+    _send(conn, {"exit": code})
+    return True
+
+
+def serve(socket_path: Path, *, db: SqliteDb) -> int:
+    """Answer CLI requests on `socket_path` until stopped; returns the exit code."""
+    from dataclasses import replace
+
+    from app.infrastructure.sqlite_db import ConnectionCache
+
+    socket_path = socket_path.resolve()
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            print(f"A daemon is already listening on {socket_path}", file=sys.stderr)
+            return 2
+        socket_path.unlink()  # left behind by a daemon that did not shut down cleanly
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    connections = ConnectionCache()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(str(socket_path))
+        os.chmod(socket_path, 0o600)  # commands run with the daemon's rights: owner only
+        server.listen()
+        _warm_up(replace(db, connections=connections))
+        print(f"SERVE listening on {socket_path} pid={os.getpid()}", flush=True)
+
+        running = True
+        while running:
+            conn, _ = server.accept()
+            with conn:
+                line = conn.makefile("rb").readline()
+                if not line:
+                    continue
+                try:
+                    try:
+                        request = _parse_request(line)
+                    except (ValueError, TypeError) as e:
+                        _send(conn, {"stream": "stderr", "data": f"Invalid request: {e}\n"})
+                        _send(conn, {"exit": 2})
+                        continue
+                    running = _handle_request(conn, request, connections)
+                except (BrokenPipeError, ConnectionResetError):
+                    continue  # client went away mid-command; keep serving
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        connections.close()
+        socket_path.unlink(missing_ok=True)
+    print("SERVE stopped", flush=True)
+    return 0
+
+
+def _is_listening(socket_path: Path) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+# -----------------------------------
+# Client
+# -----------------------------------
+
+
+def request(socket_path: Path, message: dict[str, Any]) -> int:
+    """Send one request, copying streamed output to stdout/stderr; returns the exit code."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(str(socket_path))
+        _send(conn, message)
+        for line in conn.makefile("rb"):
+            reply = json.loads(line)
+            if "exit" in reply:
+                return int(reply["exit"])
+            stream = sys.stdout if reply["stream"] == "stdout" else sys.stderr
+            stream.write(reply["data"])
+            stream.flush()
+    print("daemon closed the connection without an exit code", file=sys.stderr)
+    return 1
+
+
+def client_main(argv: Sequence[str] | None = None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    socket_path = Path(DEFAULT_SOCKET)
+    if args[:1] == ["--socket"] and len(args) >= 2:
+        socket_path, args = Path(args[1]), args[2:]
+
+    if args == ["--stop"]:
+        message: dict[str, Any] = {"control": "stop"}
+    else:
+        message = {"argv": args, "cwd": os.getcwd()}
+
+    try:
+        return request(socket_path, message)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if "control" in message:
+            print(f"No daemon listening on {socket_path}", file=sys.stderr)
+            return 2
+        # No daemon: run in this process instead, so scripts work either way.
+        from app.cli import main
+
+        return main(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(client_main())
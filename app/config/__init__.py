@@ -1,10 +1,90 @@
-
 from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
 from pathlib import Path
 
+from app.domain.money import DEFAULT_MONEY_ENGINE, MONEY_ENGINES
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+
+
+@dataclass(frozen=True)
+class SqliteTuning:
+    """
+    Per-connection SQLite PRAGMAs applied by SqliteDb.connect.
+
+    cache_size:
+        Same semantics as PRAGMA cache_size: negative values are KiB,
+        positive values are pages.
+
+    mmap_size:
+        Bytes of the DB file mapped into memory (0 disables mmap).
+
+    query_only:
+        PRAGMA query_only = ON once pending migrations are applied: any
+        write through the connection fails.
+    """
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -16_000
+    mmap_size: int = 0
+    temp_store: str = "DEFAULT"
+    busy_timeout_ms: int = 5_000
+    query_only: bool = False
+
+    def __post_init__(self) -> None:
+        if self.journal_mode.upper() not in _JOURNAL_MODES:
+            raise ValueError(f"Invalid journal_mode: {self.journal_mode!r}")
+        if self.synchronous.upper() not in _SYNCHRONOUS:
+            raise ValueError(f"Invalid synchronous: {self.synchronous!r}")
+        if self.temp_store.upper() not in _TEMP_STORE:
+            raise ValueError(f"Invalid temp_store: {self.temp_store!r}")
+        if self.mmap_size < 0:
+            raise ValueError("mmap_size must be >= 0")
+        if self.busy_timeout_ms < 0:
+            raise ValueError("busy_timeout_ms must be >= 0")
+
+
+# Named profiles selectable with `--db-profile`.
+DB_PROFILES: dict[str, SqliteTuning] = {
+    # CLI + Streamlit UI sharing one DB: WAL so readers never block the writer.
+    "interactive": SqliteTuning(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-16_000,
+        mmap_size=64 * 1024 * 1024,
+        temp_store="MEMORY",
+        busy_timeout_ms=5_000,
+    ),
+    # Large one-off writes (imports, bulk seeding). WAL + NORMAL syncs only at
+    # checkpoints: a power loss may drop the last transactions but cannot
+    # corrupt the file (synchronous=OFF could).
+    "bulk_import": SqliteTuning(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-256_000,
+        mmap_size=256 * 1024 * 1024,
+        temp_store="MEMORY",
+        busy_timeout_ms=30_000,
+    ),
+    # Exports / summaries that scan takeoff_version_lines. Enforced read-only.
+    "read_only_report": SqliteTuning(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-64_000,
+        mmap_size=512 * 1024 * 1024,
+        temp_store="MEMORY",
+        busy_timeout_ms=10_000,
+        query_only=True,
+    ),
+}
+
+DEFAULT_DB_PROFILE = "interactive"
+
 
 @dataclass(frozen=True)
 class AppConfig:
@@ -18,6 +98,28 @@ class AppConfig:
         Optional secondary folder (e.g. network share) where a copy of
         exported revision bundles is also written. If None, mirroring
         is disabled.
+
+    mirror_workers:
+        Threads copying bundles to mirror_export_root in the background
+        during `projects export`.
+
+    db_profile:
+        Name of the SQLite tuning profile (see DB_PROFILES) applied to
+        every connection opened by the CLI.
+
+    money_engine:
+        Per-line money arithmetic used for cached totals and report totals:
+        "decimal" (reference) or "fixed" (integer cents). Both give identical
+        results; "fixed" is faster on large rebuilds.
+
+    render_cache_root:
+        Folder of the content-addressed render cache (see
+        app.infrastructure.render_cache). None (the default, and the CLI's
+        unless --render-cache is given) re-renders snapshot versions every time.
+
+    render_cache_max_bytes:
+        Size bound of the render cache; least recently used files are
+        evicted beyond it.
     """
 
     company_name: str = "LEZA'S PLUMBING"
@@ -28,3 +130,34 @@ class AppConfig:
 
     # Optional mirror location (ex: network drive)
     mirror_export_root: Path | None = None
+    mirror_workers: int = 4
+
+    # SQLite connection tuning
+    db_profile: str = DEFAULT_DB_PROFILE
+
+    # Money arithmetic engine (see app.domain.money.MONEY_ENGINES)
+    money_engine: str = DEFAULT_MONEY_ENGINE
+
+    # Render cache for snapshot versions
+    render_cache_root: Path | None = None
+    render_cache_max_bytes: int = 512 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        if self.money_engine not in MONEY_ENGINES:
+            known = ", ".join(sorted(MONEY_ENGINES))
+            raise ValueError(
+                f"Unknown money_engine: {self.money_engine!r} (expected one of: {known})"
+            )
+        if self.mirror_workers < 1:
+            raise ValueError("mirror_workers must be >= 1")
+        if self.render_cache_max_bytes < 0:
+            raise ValueError("render_cache_max_bytes must be >= 0")
+
+    def db_tuning(self) -> SqliteTuning:
+        try:
+            return DB_PROFILES[self.db_profile]
+        except KeyError as e:
+            known = ", ".join(sorted(DB_PROFILES))
+            raise ValueError(
+                f"Unknown db_profile: {self.db_profile!r} (expected one of: {known})"
+            ) from e
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+__all__ = ["calc_line_cents", "round_half_up_div", "to_scaled"]
+
+# Integer fixed-point money engine.
+#
+# A decimal value is carried as (mantissa, scale) meaning mantissa / 10**scale,
+# so "12.345" -> (12345, 3). Products add scales, and the only rounding step is
+# an integer division with ROUND_HALF_UP (ties away from zero), which is exactly
+# what Decimal.quantize(..., ROUND_HALF_UP) does.
+#
+# Results equal app.domain.money.calc_line_totals as long as price * qty * factor
+# fits in the Decimal context precision (28 significant digits); beyond that
+# Decimal itself rounds the intermediate product.
+
+
+def to_scaled(value: object) -> tuple[int, int]:
+    """Exact (mantissa, scale) for a Decimal, int or decimal string such as DB TEXT."""
+    if isinstance(value, int):
+        return value, 0
+    text = value.strip() if isinstance(value, str) else str(value)
+    if "E" not in text and "e" not in text:
+        # Plain "[-]123.45" (also str() of most Decimals): pure int parsing.
+        negative = text.startswith("-")
+        whole, _, frac = text.lstrip("+-").partition(".")
+        mantissa = int((whole or "0") + frac)
+        return (-mantissa if negative else mantissa), len(frac)
+
+    sign, digits, exponent = Decimal(text).as_tuple()
+    if not isinstance(exponent, int):
+        raise ValueError(f"Not a finite decimal: {value!r}")
+    mantissa = int("".join(map(str, digits)) or "0")
+    if sign:
+        mantissa = -mantissa
+    if exponent > 0:
+        return mantissa * 10**exponent, 0
+    return mantissa, -exponent
+
+
+_POW10: tuple[int, ...] = tuple(10**n for n in range(40))
+
+
+def round_half_up_div(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded to an integer, ties away from zero."""
+    q, r = divmod(abs(numerator), denominator)
+    if 2 * r >= denominator:
+        q += 1
+    return -q if numerator < 0 else q
+
+
+def _to_cents(mantissa: int, scale: int) -> int:
+    if scale <= 2:
+        return mantissa * _POW10[2 - scale]
+    d: int = _POW10[scale - 2] if scale < 42 else 10 ** (scale - 2)
+    # Inline round_half_up_div: this is the hot path.
+    q, r = divmod(-mantissa if mantissa < 0 else mantissa, d)
+    if r + r >= d:
+        q += 1
+    return -q if mantissa < 0 else q
+
+
+def calc_line_cents(
+    *,
+    price: object,
+    qty: object,
+    factor: object,
+    taxable: bool,
+    tax_rate: object = "0.07",
+) -> tuple[int, int]:
+    """
+    (subtotal, tax) of one line in integer cents.
+
+    Same business rule as calc_line_totals:
+      subtotal = q2(price * qty * factor)
+      tax = q2(subtotal * tax_rate) if taxable else 0
+    """
+    p, ps = to_scaled(price)
+    q, qs = to_scaled(qty)
+    f, fs = to_scaled(factor)
+    subtotal = _to_cents(p * q * f, ps + qs + fs)
+    if not taxable:
+        return subtotal, 0
+    t, ts = to_scaled(tax_rate)
+    # subtotal is at scale 2, so subtotal * rate is at scale 2 + ts.
+    return subtotal, _to_cents(subtotal * t, 2 + ts)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
 from decimal import ROUND_HALF_UP, Decimal
 
+from app.domain import fixed_point
+
 TWOPLACES = Decimal("0.01")
 
 
@@ -37,4 +40,51 @@ def calc_line_totals(
     subtotal = q2(price * qty * factor)
     tax = q2(subtotal * tax_rate) if taxable else Decimal("0.00")
     total = q2(subtotal + tax)
-    return LineTotals(subtotal=subtotal, tax=tax, total=total)
\ No newline at end of file
+    return LineTotals(subtotal=subtotal, tax=tax, total=total)
+
+def _as_decimal(value: object) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def calc_line_cents(
+    *,
+    price: object,
+    qty: object,
+    factor: object,
+    taxable: bool,
+    tax_rate: object = Decimal("0.07"),
+) -> tuple[int, int]:
+    """(subtotal, tax) of one line in integer cents, via the Decimal reference path."""
+    t = calc_line_totals(
+        price=_as_decimal(price),
+        qty=_as_decimal(qty),
+        factor=_as_decimal(factor),
+        taxable=taxable,
+        tax_rate=_as_decimal(tax_rate),
+    )
+    return int(t.subtotal.scaleb(2)), int(t.tax.scaleb(2))
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    """Integer cents -> 2-place Decimal (exact)."""
+    return Decimal(cents).scaleb(-2)
+
+
+LineCentsFn = Callable[..., tuple[int, int]]
+
+# Interchangeable per-line engines (same keyword arguments, same results).
+# "decimal" is the reference; "fixed" is the integer fixed-point fast path.
+MONEY_ENGINES: dict[str, LineCentsFn] = {
+    "decimal": calc_line_cents,
+    "fixed": fixed_point.calc_line_cents,
+}
+
+DEFAULT_MONEY_ENGINE = "decimal"
+
+
+def line_cents_engine(name: str) -> LineCentsFn:
+    try:
+        return MONEY_ENGINES[name]
+    except KeyError as e:
+        known = ", ".join(sorted(MONEY_ENGINES))
+        raise ValueError(f"Unknown money engine: {name!r} (expected one of: {known})") from e
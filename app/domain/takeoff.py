@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
+from functools import cached_property
 
 from app.domain.stage import Stage
 from app.domain.takeoff_line import TakeoffLine
-from app.domain.totals import GrandTotals, TakeoffLineInput, calc_grand_totals, calc_stage_totals
+from app.domain.totals import GrandTotals, TotalsAccumulator
 
 
 @dataclass(frozen=True)
@@ -36,30 +37,19 @@ class Takeoff:
         )
         return tuple(stage_lines)
 
-    def _as_inputs(self) -> list[TakeoffLineInput]:
-        """Convert lines to calculation inputs (stage/price/qty/factor/taxable)."""
-        inputs: list[TakeoffLineInput] = []
-        for ln in self.lines:
-            inputs.append(
-                TakeoffLineInput(
-                    stage=ln.stage,
-                    price=ln.item.unit_price,
-                    qty=ln.qty,
-                    factor=ln.factor,
-                    taxable=ln.item.taxable,
-                )
-            )
-        return inputs
+    @cached_property
+    def _totals(self) -> TotalsAccumulator:
+        """All stage totals from one pass over the lines (lines are immutable)."""
+        return TotalsAccumulator.from_lines(
+            (ln.as_input() for ln in self.lines),
+            tax_rate=self.tax_rate,
+        )
 
     def stage_totals(self, stage: Stage) -> tuple[Decimal, Decimal, Decimal]:
         """Return (subtotal, tax, total) for a specific stage."""
-        t = calc_stage_totals(self._as_inputs(), stage=stage, tax_rate=self.tax_rate)
+        t = self._totals.stage_totals(stage)
         return (t.subtotal, t.tax, t.total)
 
     def grand_totals(self) -> GrandTotals:
         """Return grand totals across all stages, including valve discount."""
-        return calc_grand_totals(
-            self._as_inputs(),
-            valve_discount=self.valve_discount,
-            tax_rate=self.tax_rate,
-        )
+        return self._totals.grand_totals(valve_discount=self.valve_discount)
@@ -6,6 +6,7 @@ from decimal import Decimal
 from app.domain.item import Item
 from app.domain.money import LineTotals, calc_line_totals
 from app.domain.stage import Stage
+from app.domain.totals import TakeoffLineInput
 
 __all__ = ["TakeoffLine"]
 
@@ -20,6 +21,16 @@ class TakeoffLine:
     factor: Decimal
     sort_order: int
 
+    def as_input(self) -> TakeoffLineInput:
+        """Calculation input (stage/price/qty/factor/taxable) for this line."""
+        return TakeoffLineInput(
+            stage=self.stage,
+            price=self.item.unit_price,
+            qty=self.qty,
+            factor=self.factor,
+            taxable=self.item.taxable,
+        )
+
     def totals(
         self,
         *,
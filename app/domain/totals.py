@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
 from decimal import Decimal
 
-from app.domain.money import LineTotals, calc_line_totals, q2
+from app.domain.money import (
+    DEFAULT_MONEY_ENGINE,
+    LineTotals,
+    calc_line_totals,
+    cents_to_decimal,
+    line_cents_engine,
+    q2,
+)
 from app.domain.stage import Stage
 
 
@@ -32,46 +40,27 @@ class GrandTotals:
     total_after_discount: Decimal
 
 
-def calc_stage_totals(
-    lines: list[TakeoffLineInput],
-    *,
-    stage: Stage,
-    tax_rate: Decimal = Decimal("0.07"),
-) -> StageTotals:
-    stage_lines = [ln for ln in lines if ln.stage == stage]
-
-    subtotal = Decimal("0.00")
-    tax = Decimal("0.00")
-
-    for ln in stage_lines:
-        t: LineTotals = calc_line_totals(
-            price=ln.price,
-            qty=ln.qty,
-            factor=ln.factor,
-            taxable=ln.taxable,
-            tax_rate=tax_rate,
-        )
-        subtotal += t.subtotal
-        tax += t.tax
-
+def stage_totals_from_sums(*, subtotal: Decimal, tax: Decimal) -> StageTotals:
+    """Stage totals from already-rounded line subtotal/tax sums."""
     subtotal = q2(subtotal)
     tax = q2(tax)
     total = q2(subtotal + tax)
     return StageTotals(subtotal=subtotal, tax=tax, total=total)
 
 
-def calc_grand_totals(
-    lines: list[TakeoffLineInput],
+def grand_totals_from_stages(
+    stages: Iterable[StageTotals],
     *,
     valve_discount: Decimal = Decimal("0.00"),
-    tax_rate: Decimal = Decimal("0.07"),
 ) -> GrandTotals:
-    ground = calc_stage_totals(lines, stage=Stage.GROUND, tax_rate=tax_rate)
-    topout = calc_stage_totals(lines, stage=Stage.TOPOUT, tax_rate=tax_rate)
-    final = calc_stage_totals(lines, stage=Stage.FINAL, tax_rate=tax_rate)
+    subtotal = Decimal("0.00")
+    tax = Decimal("0.00")
+    for st in stages:
+        subtotal += st.subtotal
+        tax += st.tax
 
-    subtotal = q2(ground.subtotal + topout.subtotal + final.subtotal)
-    tax = q2(ground.tax + topout.tax + final.tax)
+    subtotal = q2(subtotal)
+    tax = q2(tax)
     total = q2(subtotal + tax)
     # `valve_discount` is a signed adjustment (negative reduces the total).
     total_after_discount = q2(total + valve_discount)
@@ -83,3 +72,120 @@ def calc_grand_totals(
         valve_discount=valve_discount,
         total_after_discount=total_after_discount,
     )
+
+
+class TotalsAccumulator:
+    """
+    Single-pass totals engine.
+
+    Feed each line once with add(); it returns the line's LineTotals and adds
+    the (already q2-rounded) line subtotal/tax to its stage. Stage and grand
+    totals are then read without rescanning the lines.
+
+    Rounding is identical to calc_stage_totals / calc_grand_totals: line values
+    are q2'd per line, stage sums are q2'd, grand totals are q2 of stage sums.
+
+    money_engine selects the per-line arithmetic (see MONEY_ENGINES): the
+    default "decimal" is the reference path; "fixed" sums integer cents.
+    """
+
+    __slots__ = ("_tax_rate", "_line_cents", "_subtotals", "_taxes")
+
+    def __init__(
+        self,
+        *,
+        tax_rate: Decimal = Decimal("0.07"),
+        money_engine: str = DEFAULT_MONEY_ENGINE,
+    ) -> None:
+        self._tax_rate = tax_rate
+        self._line_cents = (
+            None if money_engine == DEFAULT_MONEY_ENGINE else line_cents_engine(money_engine)
+        )
+        # Decimal sums on the reference path, integer cents on the fixed-point path.
+        zero: Decimal | int = Decimal("0.00") if self._line_cents is None else 0
+        self._subtotals: dict[Stage, Decimal | int] = dict.fromkeys(Stage, zero)
+        self._taxes: dict[Stage, Decimal | int] = dict.fromkeys(Stage, zero)
+
+    @classmethod
+    def from_lines(
+        cls,
+        lines: Iterable[TakeoffLineInput],
+        *,
+        tax_rate: Decimal = Decimal("0.07"),
+        money_engine: str = DEFAULT_MONEY_ENGINE,
+    ) -> TotalsAccumulator:
+        acc = cls(tax_rate=tax_rate, money_engine=money_engine)
+        for ln in lines:
+            acc.add(ln)
+        return acc
+
+    def add(self, line: TakeoffLineInput) -> LineTotals:
+        if self._line_cents is not None:
+            subtotal_cents, tax_cents = self._line_cents(
+                price=line.price,
+                qty=line.qty,
+                factor=line.factor,
+                taxable=line.taxable,
+                tax_rate=self._tax_rate,
+            )
+            self._subtotals[line.stage] += subtotal_cents
+            self._taxes[line.stage] += tax_cents
+            return LineTotals(
+                subtotal=cents_to_decimal(subtotal_cents),
+                tax=cents_to_decimal(tax_cents),
+                total=cents_to_decimal(subtotal_cents + tax_cents),
+            )
+
+        t = calc_line_totals(
+            price=line.price,
+            qty=line.qty,
+            factor=line.factor,
+            taxable=line.taxable,
+            tax_rate=self._tax_rate,
+        )
+        self._subtotals[line.stage] += t.subtotal
+        self._taxes[line.stage] += t.tax
+        return t
+
+    def stage_totals(self, stage: Stage) -> StageTotals:
+        subtotal = self._subtotals[stage]
+        tax = self._taxes[stage]
+        if isinstance(subtotal, int) and isinstance(tax, int):
+            # Fixed-point engine: the sums are integer cents.
+            return stage_totals_from_sums(
+                subtotal=cents_to_decimal(subtotal), tax=cents_to_decimal(tax)
+            )
+        assert isinstance(subtotal, Decimal) and isinstance(tax, Decimal)
+        return stage_totals_from_sums(subtotal=subtotal, tax=tax)
+
+    def all_stage_totals(self) -> dict[Stage, StageTotals]:
+        return {st: self.stage_totals(st) for st in Stage}
+
+    def grand_totals(self, *, valve_discount: Decimal = Decimal("0.00")) -> GrandTotals:
+        return grand_totals_from_stages(
+            self.all_stage_totals().values(),
+            valve_discount=valve_discount,
+        )
+
+
+def calc_stage_totals(
+    lines: list[TakeoffLineInput],
+    *,
+    stage: Stage,
+    tax_rate: Decimal = Decimal("0.07"),
+) -> StageTotals:
+    acc = TotalsAccumulator.from_lines(
+        (ln for ln in lines if ln.stage == stage),
+        tax_rate=tax_rate,
+    )
+    return acc.stage_totals(stage)
+
+
+def calc_grand_totals(
+    lines: list[TakeoffLineInput],
+    *,
+    valve_discount: Decimal = Decimal("0.00"),
+    tax_rate: Decimal = Decimal("0.07"),
+) -> GrandTotals:
+    acc = TotalsAccumulator.from_lines(lines, tax_rate=tax_rate)
+    return acc.grand_totals(valve_discount=valve_discount)
@@ -1,11 +1,32 @@
 from __future__ import annotations
 
-from app.infrastructure.csv_takeoff_renderer import CsvTakeoffReportRenderer
-from app.infrastructure.debug_takeoff_json_renderer import DebugJsonTakeoffReportRenderer
-from app.infrastructure.pdf_takeoff_reportlab import ReportLabTakeoffPdfRenderer
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.infrastructure.csv_takeoff_renderer import CsvTakeoffReportRenderer
+    from app.infrastructure.debug_takeoff_json_renderer import DebugJsonTakeoffReportRenderer
+    from app.infrastructure.pdf_takeoff_reportlab import ReportLabTakeoffPdfRenderer
 
 __all__ = [
     "CsvTakeoffReportRenderer",
     "DebugJsonTakeoffReportRenderer",
     "ReportLabTakeoffPdfRenderer",
-]
\ No newline at end of file
+]
+
+# Renderers are re-exported lazily: every SQLite/file repository lives in this
+# package, and importing one of them must not pull in ReportLab.
+_LAZY_EXPORTS = {
+    "CsvTakeoffReportRenderer": "app.infrastructure.csv_takeoff_renderer",
+    "DebugJsonTakeoffReportRenderer": "app.infrastructure.debug_takeoff_json_renderer",
+    "ReportLabTakeoffPdfRenderer": "app.infrastructure.pdf_takeoff_reportlab",
+}
+
+
+def __getattr__(name: str) -> object:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from app.infrastructure.atomic_write import atomic_write_text
+from app.infrastructure.file_sync import file_sha256
+
+# `projects export` keeps <project_dir>/export_manifest.json so a re-run only
+# regenerates what changed. File paths in the manifest are POSIX paths
+# relative to the project directory; every file the export wrote is recorded
+# with its sha256, size and mtime, which is how unchanged outputs are verified
+# and how stale ones (from an older version, a removed takeoff or a renamed
+# project) are found and removed.
+
+MANIFEST_NAME = "export_manifest.json"
+MANIFEST_VERSION = 2
+
+
+@dataclass(frozen=True)
+class ExportedFile:
+    sha256: str
+    size: int
+    mtime_ns: int
+
+
+def record_files(root: Path, paths: Iterable[Path]) -> dict[str, ExportedFile]:
+    """{relative POSIX path: ExportedFile} for files under root."""
+    files: dict[str, ExportedFile] = {}
+    for p in paths:
+        st = p.stat()
+        files[p.relative_to(root).as_posix()] = ExportedFile(
+            sha256=file_sha256(p), size=st.st_size, mtime_ns=st.st_mtime_ns
+        )
+    return files
+
+
+def files_match(root: Path, files: Mapping[str, ExportedFile]) -> bool:
+    """
+    True if every recorded file still exists under root with its recorded
+    bytes. A file whose size and mtime match is taken as unchanged; only one
+    with the same size but a different mtime is hashed.
+    """
+    for rel, recorded in files.items():
+        try:
+            st = (root / rel).stat()
+        except FileNotFoundError:
+            return False
+        if st.st_size != recorded.size:
+            return False
+        if st.st_mtime_ns != recorded.mtime_ns and file_sha256(root / rel) != recorded.sha256:
+            return False
+    return True
+
+
+def remove_stale(root: Path, stale: Iterable[str]) -> list[Path]:
+    """Delete recorded files that are no longer outputs, then their emptied folders."""
+    removed: list[Path] = []
+    for rel in sorted(stale):
+        path = root / rel
+        if path.is_file():
+            path.unlink()
+            removed.append(path)
+        parent = path.parent
+        while parent != root and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return removed
+
+
+@dataclass(frozen=True)
+class TakeoffExportEntry:
+    takeoff_id: str
+    template_code: str
+    version_id: str
+    integrity_hash: str
+    # RenderTakeoffFromVersion.render_fingerprint: also covers the header
+    # fields (project name, contractor, template name) and company name.
+    fingerprint: str
+    files: dict[str, ExportedFile] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ExportManifest:
+    project_code: str
+    renderers: dict[str, str]
+    summary_hash: str
+    summary_files: dict[str, ExportedFile]
+    takeoffs: dict[str, TakeoffExportEntry]
+
+    def all_files(self) -> set[str]:
+        files = set(self.summary_files)
+        for entry in self.takeoffs.values():
+            files.update(entry.files)
+        return files
+
+    @classmethod
+    def load(cls, project_dir: Path) -> ExportManifest | None:
+        """The manifest of a previous export; None if absent, unreadable or outdated."""
+        path = project_dir / MANIFEST_NAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("manifest_version") != MANIFEST_VERSION:
+                return None
+            return cls(
+                project_code=data["project_code"],
+                renderers=dict(data["renderers"]),
+                summary_hash=data["summary"]["hash"],
+                summary_files=_files_from_json(data["summary"]["files"]),
+                takeoffs={
+                    takeoff_id: TakeoffExportEntry(
+                        takeoff_id=takeoff_id,
+                        template_code=entry["template_code"],
+                        version_id=entry["version_id"],
+                        integrity_hash=entry["integrity_hash"],
+                        fingerprint=entry["fingerprint"],
+                        files=_files_from_json(entry["files"]),
+                    )
+                    for takeoff_id, entry in data["takeoffs"].items()
+                },
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, project_dir: Path) -> Path:
+        payload = {
+            "manifest_version": MANIFEST_VERSION,
+            "project_code": self.project_code,
+            "renderers": self.renderers,
+            "summary": {"hash": self.summary_hash, "files": _files_to_json(self.summary_files)},
+            "takeoffs": {
+                takeoff_id: {
+                    "template_code": e.template_code,
+                    "version_id": e.version_id,
+                    "integrity_hash": e.integrity_hash,
+                    "fingerprint": e.fingerprint,
+                    "files": _files_to_json(e.files),
+                }
+                for takeoff_id, e in sorted(self.takeoffs.items())
+            },
+        }
+        path = project_dir / MANIFEST_NAME
+        atomic_write_text(path, json.dumps(payload, indent=2, sort_keys=True))
+        return path
+
+
+def _files_to_json(files: Mapping[str, ExportedFile]) -> dict[str, dict[str, object]]:
+    return {rel: asdict(f) for rel, f in files.items()}
+
+
+def _files_from_json(raw: Mapping[str, Mapping[str, object]]) -> dict[str, ExportedFile]:
+    return {
+        rel: ExportedFile(
+            sha256=str(f["sha256"]), size=int(str(f["size"])), mtime_ns=int(str(f["mtime_ns"]))
+        )
+        for rel, f in raw.items()
+    }
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from decimal import Decimal
 from pathlib import Path
 
 from app.application.errors import InvalidInputError
-from app.application.repositories.item_repository import ItemRepository
+from app.application.repositories.item_repository import ItemRepository, ItemUpsertCounts
 from app.domain.item import Item
+from app.infrastructure.json_record_store import JsonRecordStore
 
 
 def _as_str(value: object, *, field: str) -> str:
@@ -63,45 +64,65 @@ def _item_from_dict(d: dict[str, object]) -> Item:
 
 @dataclass(frozen=True)
 class FileItemRepository(ItemRepository):
+    """
+    JSON-file item catalog.
+
+    storage_format "document" (default) keeps the catalog as one JSON list;
+    "journal" appends each change to a JSON-lines journal next to it and
+    compacts every `compact_after` entries (see JsonRecordStore). Either
+    way the parsed catalog is cached in memory and invalidated by the
+    files' stamps.
+    """
+
     path: Path
+    storage_format: str = "document"
+    compact_after: int = 1_000
+    _store: JsonRecordStore[Item] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self._write_all({})
+        store = JsonRecordStore(
+            path=self.path,
+            label="Items catalog",
+            to_dict=_item_to_dict,
+            from_dict=_item_from_dict,
+            key=lambda it: it.code,
+            storage_format=self.storage_format,
+            compact_after=self.compact_after,
+        )
+        object.__setattr__(self, "_store", store)
 
     def _read_all(self) -> dict[str, Item]:
-        raw = json.loads(self.path.read_text(encoding="utf-8"))
-
-        if not isinstance(raw, list):
-            raise ValueError("Items catalog JSON must be a list")
-
-        items: dict[str, Item] = {}
-        for row in raw:
-            if not isinstance(row, dict):
-                raise ValueError("Items catalog entries must be objects")
-
-            # json gives dict[str, object] effectively
-            row_typed: dict[str, object] = dict(row)
-            it = _item_from_dict(row_typed)
-            items[it.code] = it
-
-        return items
-
-    def _write_all(self, items: dict[str, Item]) -> None:
-        payload: list[dict[str, object]] = [_item_to_dict(it) for it in items.values()]
-        payload.sort(key=lambda x: str(x["code"]))  # key must be orderable (str)
-
-        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
-        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-        tmp.replace(self.path)
+        """The cached catalog. Callers must not mutate it."""
+        return self._store.load()
 
     def upsert(self, item: Item) -> None:
         if not item.code.strip():
             raise InvalidInputError("Item.code cannot be empty")
-        items = self._read_all()
-        items[item.code] = item
-        self._write_all(items)
+        self._store.put_many([item])
+
+    def upsert_many(self, items: Iterable[Item]) -> ItemUpsertCounts:
+        """Apply all items with one write (one rewrite or one journal append); none if unchanged."""
+        latest: dict[str, Item] = {}
+        for item in items:
+            if not item.code.strip():
+                raise InvalidInputError("Item.code cannot be empty")
+            latest[item.code] = item
+
+        current = self._read_all()
+        inserted = updated = unchanged = 0
+        changed: list[Item] = []
+        for item in latest.values():
+            previous = current.get(item.code)
+            if previous is None:
+                inserted += 1
+            elif previous != item:
+                updated += 1
+            else:
+                unchanged += 1
+                continue
+            changed.append(item)
+        self._store.put_many(changed)
+        return ItemUpsertCounts(inserted=inserted, updated=updated, unchanged=unchanged)
 
     def get(self, code: str) -> Item:
         items = self._read_all()
@@ -110,17 +131,21 @@ class FileItemRepository(ItemRepository):
         except KeyError as e:
             raise InvalidInputError(f"Item not found: {code}") from e
 
-    def list(self, *, include_inactive: bool = False) -> tuple[Item, ...]:
+    def get_many(self, codes: Iterable[str]) -> dict[str, Item]:
         items = self._read_all()
-        vals = list(items.values())
+        return {code: items[code] for code in codes if code in items}
+
+    def list(self, *, include_inactive: bool = False) -> tuple[Item, ...]:
+        vals = self._store.sorted_records()
         if not include_inactive:
-            vals = [it for it in vals if it.is_active]
-        vals.sort(key=lambda it: it.code)
-        return tuple(vals)
+            vals = tuple(it for it in vals if it.is_active)
+        return vals
 
     def delete(self, code: str) -> None:
-        items = self._read_all()
-        if code not in items:
+        if code not in self._read_all():
             raise InvalidInputError(f"Item not found: {code}")
-        del items[code]
-        self._write_all(items)
\ No newline at end of file
+        self._store.remove(code)
+
+    def compact(self) -> None:
+        """Fold the journal into the catalog file (no-op for the document format)."""
+        self._store.compact()
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from app.application.errors import InvalidInputError
 from app.application.repositories.project_repository import ProjectRepository
 from app.domain.project import Project
+from app.infrastructure.json_record_store import JsonRecordStore
 
 
 def _as_str(value: object, *, field: str) -> str:
@@ -51,34 +51,32 @@ def _project_from_dict(d: dict[str, object]) -> Project:
 
 @dataclass(frozen=True)
 class FileProjectRepository(ProjectRepository):
+    """
+    JSON-file project list.
+
+    storage_format "document" (default) or "journal"; see JsonRecordStore.
+    """
+
     path: Path
+    storage_format: str = "document"
+    compact_after: int = 1_000
+    _store: JsonRecordStore[Project] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self._write_all({})
+        store = JsonRecordStore(
+            path=self.path,
+            label="Projects",
+            to_dict=_project_to_dict,
+            from_dict=_project_from_dict,
+            key=lambda p: p.code,
+            storage_format=self.storage_format,
+            compact_after=self.compact_after,
+        )
+        object.__setattr__(self, "_store", store)
 
     def _read_all(self) -> dict[str, Project]:
-        raw = json.loads(self.path.read_text(encoding="utf-8"))
-        if not isinstance(raw, list):
-            raise ValueError("Projects JSON must be a list")
-
-        projects: dict[str, Project] = {}
-        for row in raw:
-            if not isinstance(row, dict):
-                raise ValueError("Projects entries must be objects")
-            row_typed: dict[str, object] = dict(row)
-            p = _project_from_dict(row_typed)
-            projects[p.code] = p
-        return projects
-
-    def _write_all(self, projects: dict[str, Project]) -> None:
-        payload: list[dict[str, object]] = [_project_to_dict(p) for p in projects.values()]
-        payload.sort(key=lambda x: str(x["code"]))
-
-        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
-        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-        tmp.replace(self.path)
+        """The cached projects. Callers must not mutate them."""
+        return self._store.load()
 
     def upsert(self, project: Project) -> None:
         if not project.code.strip():
@@ -86,9 +84,7 @@ class FileProjectRepository(ProjectRepository):
         if not project.name.strip():
             raise InvalidInputError("Project.name cannot be empty")
 
-        projects = self._read_all()
-        projects[project.code] = project
-        self._write_all(projects)
+        self._store.put_many([project])
 
     def get(self, code: str) -> Project:
         projects = self._read_all()
@@ -98,16 +94,16 @@ class FileProjectRepository(ProjectRepository):
             raise InvalidInputError(f"Project not found: {code}") from e
 
     def list(self, *, include_inactive: bool = False) -> tuple[Project, ...]:
-        projects = self._read_all()
-        vals = list(projects.values())
+        vals = self._store.sorted_records()
         if not include_inactive:
-            vals = [p for p in vals if p.is_active]
-        vals.sort(key=lambda p: p.code)
-        return tuple(vals)
+            vals = tuple(p for p in vals if p.is_active)
+        return vals
 
     def delete(self, code: str) -> None:
-        projects = self._read_all()
-        if code not in projects:
+        if code not in self._read_all():
             raise InvalidInputError(f"Project not found: {code}")
-        del projects[code]
-        self._write_all(projects)
+        self._store.remove(code)
+
+    def compact(self) -> None:
+        """Fold the journal into the projects file (no-op for the document format)."""
+        self._store.compact()
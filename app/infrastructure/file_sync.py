@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import zipfile
+from collections.abc import Iterable
+from enum import StrEnum
+from pathlib import Path
+
+# File copying for packages and mirrors without reading whole files into
+# Python: shutil.copyfile uses sendfile/copy_file_range on Linux, so the
+# bytes stay in the kernel. Always copies, never hardlinks: exports rewrite
+# some files in place, which would otherwise change an already-built package
+# or mirror. Copies keep the source mtime, which is what lets a later run
+# skip files whose size and mtime already match.
+
+# Fixed ZIP entry timestamp (the earliest the format can store), so the same
+# files always give byte-identical archives.
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_ZIP_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """sha256 of a file's bytes, read in chunks."""
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_ZIP_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class SyncAction(StrEnum):
+    COPIED = "copied"
+    SKIPPED = "skipped"
+
+
+def sync_file(src: Path, dst: Path) -> SyncAction:
+    """
+    Make dst a copy of src.
+
+    dst is skipped if it has the same size and mtime. Otherwise it is
+    replaced through a tmp file, so a reader never sees a partial copy.
+    """
+    st = src.stat()
+    try:
+        dst_st = dst.stat()
+    except FileNotFoundError:
+        dst_st = None
+
+    if dst_st is not None:
+        if dst_st.st_size == st.st_size and dst_st.st_mtime_ns == st.st_mtime_ns:
+            return SyncAction.SKIPPED
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.tmp")
+    try:
+        shutil.copyfile(src, tmp)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        tmp.replace(dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return SyncAction.COPIED
+
+
+def write_deterministic_zip(entries: Iterable[tuple[str, Path]], out: Path) -> int:
+    """
+    Stream files into one ZIP at `out` and return the number of entries.
+
+    entries: (archive name, source file). Entries are written sorted by name
+    with a fixed timestamp and mode, so identical inputs give identical
+    archives. Each file is streamed in chunks; nothing is staged on disk.
+    """
+    ordered = sorted(entries)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f"{out.name}.tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for arcname, src in ordered:
+                info = zipfile.ZipInfo(arcname, date_time=_ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.create_system = 3  # Unix, whatever platform wrote it
+                info.external_attr = 0o644 << 16
+                large = src.stat().st_size >= zipfile.ZIP64_LIMIT
+                with src.open("rb") as f, zf.open(info, "w", force_zip64=large) as dest:
+                    shutil.copyfileobj(f, dest, _ZIP_CHUNK)
+        tmp.replace(out)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return len(ordered)
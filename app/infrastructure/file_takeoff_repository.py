@@ -1,29 +1,106 @@
 from __future__ import annotations
 
+import fcntl
 import json
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
 from pathlib import Path
 from uuid import uuid4
 
-from app.application.repositories.takeoff_repository import StoredTakeoff, TakeoffRepository
+from app.application.repositories.takeoff_repository import (
+    StoredTakeoff,
+    TakeoffIndexEntry,
+    TakeoffRepository,
+)
 from app.domain.takeoff import Takeoff
+from app.infrastructure.atomic_write import atomic_write_text
 from app.infrastructure.takeoff_json_codec import TakeoffJsonCodec
 
+INDEX_FILENAME = "index.json"
+_INDEX_LOCK_FILENAME = ".index.lock"
+_INDEX_VERSION = 1
+
+
+def _utc_iso(ts: float | None = None) -> str:
+    moment = datetime.now(UTC) if ts is None else datetime.fromtimestamp(ts, UTC)
+    return moment.isoformat(timespec="seconds")
+
+
+def _entry_to_dict(e: TakeoffIndexEntry) -> dict[str, object]:
+    return {
+        "id": e.id,
+        "project_name": e.project_name,
+        "model_group": e.model_group,
+        "line_count": e.line_count,
+        "grand_total": str(e.grand_total),
+        "created_at": e.created_at,
+    }
+
+
+def _entry_from_dict(d: dict[str, object]) -> TakeoffIndexEntry:
+    return TakeoffIndexEntry(
+        id=str(d["id"]),
+        project_name=str(d["project_name"]),
+        model_group=str(d["model_group"]),
+        line_count=int(str(d["line_count"])),
+        grand_total=Decimal(str(d["grand_total"])),
+        created_at=str(d["created_at"]),
+    )
+
+
+def _index_entry(takeoff_id: str, takeoff: Takeoff, *, created_at: str) -> TakeoffIndexEntry:
+    return TakeoffIndexEntry(
+        id=takeoff_id,
+        project_name=takeoff.header.project_name,
+        model_group=takeoff.header.model_group_display,
+        line_count=len(takeoff.lines),
+        grand_total=takeoff.grand_totals().total_after_discount,
+        created_at=created_at,
+    )
+
 
 @dataclass(frozen=True)
 class FileTakeoffRepository(TakeoffRepository):
+    """
+    One `<id>.json` file per takeoff, plus a manifest (`index.json`) that
+    summarizes every saved takeoff so list/find never open the takeoff files.
+
+    The manifest is rewritten atomically on each save and rebuilt from the
+    directory when it is missing, when save finds it corrupt, or on demand
+    with rebuild_index. Its read-modify-write holds an exclusive flock on
+    `.index.lock`, so concurrent saves from several processes all land.
+    """
+
     base_dir: Path
     codec: TakeoffJsonCodec = TakeoffJsonCodec()
 
     def __post_init__(self) -> None:
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def index_path(self) -> Path:
+        return self.base_dir / INDEX_FILENAME
+
     def save(self, takeoff: Takeoff) -> StoredTakeoff:
         takeoff_id = uuid4().hex[:12]
         path = self.base_dir / f"{takeoff_id}.json"
 
         payload = self.codec.to_dict(takeoff)
-        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        atomic_write_text(path, json.dumps(payload, indent=2))
+
+        with self._index_lock():
+            try:
+                entries = {e.id: e for e in self._parse_index()}
+            except (FileNotFoundError, ValueError, KeyError, TypeError):
+                # Missing or corrupt manifest: the takeoff file is already
+                # written, so a rebuild from the directory picks it up too.
+                self._rebuild_index()
+            else:
+                entries[takeoff_id] = _index_entry(takeoff_id, takeoff, created_at=_utc_iso())
+                self._write_index(entries.values())
 
         return StoredTakeoff(id=takeoff_id, path=path)
 
@@ -37,3 +114,81 @@ class FileTakeoffRepository(TakeoffRepository):
             raise ValueError("Invalid takeoff JSON: top-level must be an object")
 
         return self.codec.from_dict(data)
+
+    # -------------------------
+    # Manifest index
+    # -------------------------
+
+    def list_index(self) -> tuple[TakeoffIndexEntry, ...]:
+        """All saved takeoffs, newest first."""
+        return self._read_index()
+
+    def find(
+        self,
+        *,
+        project: str | None = None,
+        model_group: str | None = None,
+    ) -> tuple[TakeoffIndexEntry, ...]:
+        """Index entries whose project name / model group contain the given text.
+
+        Matching is case-insensitive.
+        """
+        project_q = project.strip().casefold() if project else None
+        model_q = model_group.strip().casefold() if model_group else None
+        return tuple(
+            e
+            for e in self._read_index()
+            if (project_q is None or project_q in e.project_name.casefold())
+            and (model_q is None or model_q in e.model_group.casefold())
+        )
+
+    def rebuild_index(self) -> int:
+        """Regenerate the manifest by loading every takeoff file. Returns the entry count."""
+        with self._index_lock():
+            return self._rebuild_index()
+
+    @contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        """Exclusive lock over the manifest's read-modify-write, until the block exits."""
+        with (self.base_dir / _INDEX_LOCK_FILENAME).open("a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _rebuild_index(self) -> int:
+        previous: dict[str, TakeoffIndexEntry] = {}
+        if self.index_path.exists():
+            try:
+                previous = {e.id: e for e in self._parse_index()}
+            except (ValueError, KeyError, TypeError):
+                previous = {}  # corrupt manifest: rebuild from scratch
+
+        entries: list[TakeoffIndexEntry] = []
+        for path in sorted(self.base_dir.glob("*.json")):
+            if path.name == INDEX_FILENAME:
+                continue
+            takeoff_id = path.stem
+            old = previous.get(takeoff_id)
+            # Keep the recorded creation time; fall back to the file's mtime.
+            created_at = old.created_at if old else _utc_iso(path.stat().st_mtime)
+            entries.append(_index_entry(takeoff_id, self.load(takeoff_id), created_at=created_at))
+        self._write_index(entries)
+        return len(entries)
+
+    def _read_index(self) -> tuple[TakeoffIndexEntry, ...]:
+        if not self.index_path.exists():
+            self.rebuild_index()
+        return self._parse_index()
+
+    def _parse_index(self) -> tuple[TakeoffIndexEntry, ...]:
+        raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+        if not isinstance(raw, dict) or not isinstance(raw.get("entries"), list):
+            raise ValueError(f"Invalid takeoff index: {self.index_path} (run: index rebuild)")
+        return tuple(_entry_from_dict(dict(e)) for e in raw["entries"])
+
+    def _write_index(self, entries: Iterable[TakeoffIndexEntry]) -> None:
+        ordered = sorted(entries, key=lambda e: (e.created_at, e.id), reverse=True)
+        payload = {
+            "version": _INDEX_VERSION,
+            "entries": [_entry_to_dict(e) for e in ordered],
+        }
+        atomic_write_text(self.index_path, json.dumps(payload, indent=2))
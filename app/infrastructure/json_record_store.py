@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Generic, TypeVar
+
+from app.infrastructure.atomic_write import atomic_write_text
+
+T = TypeVar("T")
+
+# Keyed record storage shared by the file-backed repositories.
+#
+# Two on-disk formats:
+#
+# document  <path> is a JSON list of records, rewritten (tmp file + fsync +
+#           atomic replace) on every change. O(records) per write.
+#
+# journal   <path> holds the same JSON list as a snapshot; every change is
+#           appended to <path>.journal as one JSON line:
+#               {"op": "upsert", "record": {...}}
+#               {"op": "delete", "code": "..."}
+#           Load = snapshot + journal replay. After `compact_after` journal
+#           entries the live records are written as a new snapshot and the
+#           journal is emptied. O(1) per write.
+#
+# Crash safety of the journal format comes from ordering: an append is
+# fsynced before the write returns; a torn last line (crash mid-append)
+# is ignored on load; compaction first replaces the snapshot atomically and
+# only then empties the journal, and replaying a journal over a snapshot
+# that already contains its entries yields the same records.
+#
+# Appends and compaction hold an exclusive flock on the journal, and the
+# journal is truncated in place rather than replaced, so an append from
+# another process cannot land between the snapshot write and the truncate.
+
+STORAGE_FORMATS = ("document", "journal")
+
+_Stamp = tuple[tuple[int, int, int], tuple[int, int, int] | None]
+
+
+def _file_stamp(path: Path) -> tuple[int, int, int]:
+    st = path.stat()
+    # The inode changes on every tmp-file replace, which catches rewrites that
+    # land within the filesystem's mtime granularity with an unchanged size.
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+@dataclass
+class JsonRecordStore(Generic[T]):
+    """
+    Records of one kind, keyed by code, in a JSON file.
+
+    The parsed records are kept in memory and reused while the on-disk stamp
+    (mtime, size, inode of the snapshot and journal) is unchanged, so writes
+    from another process or store instance invalidate the cache. Writes
+    through this store update the cache without re-reading, unless the files
+    changed since it was loaded.
+
+    The storage format is a library option of the file-backed repositories;
+    the CLI and AppConfig only use the SQLite repositories.
+    """
+
+    path: Path
+    label: str  # used in error messages, e.g. "Items catalog"
+    to_dict: Callable[[T], dict[str, object]]
+    from_dict: Callable[[dict[str, object]], T]
+    key: Callable[[T], str]
+    storage_format: str = "document"
+    compact_after: int = 1_000
+
+    _stamp: _Stamp | None = field(default=None, init=False, repr=False)
+    _records: dict[str, T] = field(default_factory=dict, init=False, repr=False)
+    _sorted: tuple[T, ...] | None = field(default=None, init=False, repr=False)
+    _journal_entries: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.storage_format not in STORAGE_FORMATS:
+            known = ", ".join(STORAGE_FORMATS)
+            raise ValueError(f"Unknown storage format {self.storage_format!r} (known: {known})")
+        if self.compact_after < 1:
+            raise ValueError("compact_after must be >= 1")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self._write_snapshot({})
+        if self.storage_format == "journal" and not self.journal_path.exists():
+            self.journal_path.touch()
+
+    @property
+    def journal_path(self) -> Path:
+        return self.path.with_suffix(self.path.suffix + ".journal")
+
+    # -------------------------
+    # Reads
+    # -------------------------
+
+    def load(self) -> dict[str, T]:
+        """All records by code. Callers must not mutate the returned dict."""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return self._records
+
+        records = self._parse_snapshot()
+        entries = 0
+        if stamp[1] is not None:
+            entries = self._replay_journal(records)
+        self._remember(stamp, records)
+        self._journal_entries = entries
+        return records
+
+    def sorted_records(self) -> tuple[T, ...]:
+        records = self.load()
+        if self._sorted is None:
+            self._sorted = tuple(sorted(records.values(), key=self.key))
+        return self._sorted
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def put_many(self, records: Iterable[T]) -> None:
+        records = list(records)
+        if not records:
+            return
+        current = self.load()
+        if self.storage_format == "document":
+            updated = dict(current)
+            for r in records:
+                updated[self.key(r)] = r
+            self._write_snapshot(updated)
+            return
+
+        fresh = self._append([{"op": "upsert", "record": self.to_dict(r)} for r in records])
+        for r in records:
+            current[self.key(r)] = r
+        self._after_append(len(records), fresh=fresh)
+
+    def remove(self, code: str) -> None:
+        """Delete one record; the caller checks that it exists."""
+        current = self.load()
+        if self.storage_format == "document":
+            updated = dict(current)
+            updated.pop(code, None)
+            self._write_snapshot(updated)
+            return
+
+        fresh = self._append([{"op": "delete", "code": code}])
+        current.pop(code, None)
+        self._after_append(1, fresh=fresh)
+
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot (no-op for the document format)."""
+        if self.storage_format == "document":
+            self.load()
+            return
+        with self._locked_journal() as f:
+            records = self.load()  # under the lock: includes every append so far
+            self._write_snapshot(records)
+            f.truncate(0)
+            os.fsync(f.fileno())
+            self._remember(self._current_stamp(), records)
+        self._journal_entries = 0
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _current_stamp(self) -> _Stamp:
+        journal = self.journal_path
+        return _file_stamp(self.path), (_file_stamp(journal) if journal.exists() else None)
+
+    def _remember(self, stamp: _Stamp, records: dict[str, T]) -> None:
+        self._stamp = stamp
+        self._records = records
+        self._sorted = None
+
+    def _parse_snapshot(self) -> dict[str, T]:
+        raw = json.loads(self.path.read_text(encoding="utf-8"))
+        if not isinstance(raw, list):
+            raise ValueError(f"{self.label} JSON must be a list")
+
+        records: dict[str, T] = {}
+        for row in raw:
+            if not isinstance(row, dict):
+                raise ValueError(f"{self.label} entries must be objects")
+            # json gives dict[str, object] effectively
+            r = self.from_dict(dict(row))
+            records[self.key(r)] = r
+        return records
+
+    def _replay_journal(self, records: dict[str, T]) -> int:
+        data = self.journal_path.read_bytes()
+        lines = data.split(b"\n")
+        if not data.endswith(b"\n"):
+            lines.pop()  # torn final append: never acknowledged, ignore it
+        entries = 0
+        for lineno, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                op = entry["op"]
+                if op == "upsert":
+                    r = self.from_dict(dict(entry["record"]))
+                    records[self.key(r)] = r
+                elif op == "delete":
+                    records.pop(str(entry["code"]), None)
+                else:
+                    raise ValueError(f"unknown op {op!r}")
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{self.label} journal line {lineno} is invalid: {e}") from e
+            entries += 1
+        return entries
+
+    def _write_snapshot(self, records: dict[str, T]) -> None:
+        payload = [self.to_dict(r) for r in records.values()]
+        payload.sort(key=lambda x: str(x["code"]))  # key must be orderable (str)
+        atomic_write_text(self.path, json.dumps(payload, indent=2))
+        if self.storage_format == "document" or not self.journal_path.exists():
+            self._remember(self._current_stamp(), records)
+
+    @contextmanager
+    def _locked_journal(self) -> Iterator[BinaryIO]:
+        """The journal opened for appending, under an exclusive flock until closed."""
+        with self.journal_path.open("ab") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            f.seek(0, os.SEEK_END)  # another writer may have appended while we waited
+            yield f
+
+    def _append(self, entries: list[dict[str, object]]) -> bool:
+        """Append entries; True if the files were still as last loaded just before."""
+        text = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries)
+        with self._locked_journal() as f:
+            fresh = self._current_stamp() == self._stamp
+            if f.tell() > 0:
+                self._drop_torn_tail(f)
+            f.write(text.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        return fresh
+
+    def _drop_torn_tail(self, f: BinaryIO) -> None:
+        """Cut a torn final line so the next entry starts on a line of its own."""
+        data = self.journal_path.read_bytes()
+        if data.endswith(b"\n"):
+            return
+        f.truncate(data.rfind(b"\n") + 1)
+        f.seek(0, os.SEEK_END)
+
+    def _after_append(self, n: int, *, fresh: bool) -> None:
+        if fresh:
+            self._journal_entries += n
+            self._stamp = self._current_stamp()
+            self._sorted = None
+        else:
+            # Another writer changed the files since our load(): the cache
+            # lacks its entries, so re-read rather than stamp it as current.
+            self._stamp = None
+            self.load()
+        if self._journal_entries >= self.compact_after:
+            self.compact()
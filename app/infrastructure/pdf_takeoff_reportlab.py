@@ -12,7 +12,7 @@ from reportlab.pdfgen.canvas import Canvas
 from app.reporting.models import ReportSection, TakeoffReport
 from app.reporting.renderers import TakeoffReportRenderer
 
-__all__ = ["PdfStyle", "ReportLabTakeoffPdfRenderer", "render_takeoff_pdf"]
+__all__ = ["PdfStyle", "ReportLabTakeoffPdfRenderer", "render_takeoff_pdf", "warm_font_metrics"]
 
 
 @dataclass(frozen=True)
@@ -38,6 +38,13 @@ class ReportLabTakeoffPdfRenderer(TakeoffReportRenderer):
         return render_takeoff_pdf(report, output_path, style=self.style)
 
 
+def warm_font_metrics(style: PdfStyle | None = None) -> None:
+    """Load the metrics of the fonts the renderer uses (done lazily on first use)."""
+    style = style or PdfStyle()
+    for font in (style.font, style.font_bold):
+        stringWidth("0", font, style.font_size)
+
+
 def _money(x: Decimal) -> str:
     return f"${x:.2f}"
 
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+# Content-addressed store of rendered takeoff files.
+#
+# An entry is the bytes one renderer produced for one immutable input. The
+# key is a sha256 over everything the output depends on (version integrity
+# hash, format, renderer version, company name, header fields), so entries
+# never need invalidating: a changed input is simply a different key.
+#
+# Layout: <root>/<key[:2]>/<key>. Entries and served outputs are written to
+# a tmp file and atomically replaced, so concurrent exports never see a
+# partial file. Recency for LRU eviction is the entry's mtime, bumped on
+# every hit.
+#
+# Entries and outputs never share an inode: store copies the rendered file
+# in and fetch copies the entry out (shutil.copyfile, so the bytes stay in
+# the kernel on Linux). Editing an output in place, by this app or anything
+# else, cannot reach the cache, so a hit needs no re-hashing.
+
+
+def render_cache_key(parts: Mapping[str, object]) -> str:
+    payload = json.dumps({k: str(v) for k, v in parts.items()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class RenderCacheStats:
+    entries: int
+    total_bytes: int
+    max_bytes: int
+
+
+@dataclass(frozen=True)
+class RenderCachePruneResult:
+    removed: int
+    freed_bytes: int
+    stats: RenderCacheStats
+
+
+@dataclass(frozen=True)
+class RenderCache:
+    root: Path
+    max_bytes: int
+
+    def __post_init__(self) -> None:
+        if self.max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def fetch(self, key: str, out: Path) -> bool:
+        """Place the cached bytes for `key` at `out`; False on a miss."""
+        entry = self._entry(key)
+        try:
+            os.utime(entry)  # LRU recency
+        except FileNotFoundError:
+            return False
+
+        tmp = out.with_name(f"{out.name}.{uuid4().hex}.tmp")
+        try:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry, tmp)
+            tmp.replace(out)
+        except OSError:
+            # Evicted by a concurrent prune, or e.g. a directory in the way
+            # (the render path reports that).
+            return False
+        finally:
+            tmp.unlink(missing_ok=True)
+        return True
+
+    def store(self, key: str, src: Path) -> None:
+        """Copy a freshly rendered file into the cache, then evict down to max_bytes."""
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{key}.{uuid4().hex}.tmp")
+        try:
+            shutil.copyfile(src, tmp)
+            tmp.replace(entry)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.prune()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        if not self.root.is_dir():
+            return []
+        found: list[tuple[float, int, Path]] = []
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for e in os.scandir(shard.path):
+                if e.name.endswith(".tmp"):
+                    continue
+                try:
+                    st = e.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((st.st_mtime, st.st_size, Path(e.path)))
+        return found
+
+    def stats(self) -> RenderCacheStats:
+        entries = self._entries()
+        return RenderCacheStats(
+            entries=len(entries),
+            total_bytes=sum(size for _, size, _ in entries),
+            max_bytes=self.max_bytes,
+        )
+
+    def prune(self, *, max_bytes: int | None = None) -> RenderCachePruneResult:
+        """Evict least recently used entries until the cache fits in max_bytes."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        if limit < 0:
+            raise ValueError("max_bytes must be >= 0")
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+            freed += size
+
+        return RenderCachePruneResult(
+            removed=removed,
+            freed_bytes=freed,
+            stats=RenderCacheStats(
+                entries=len(entries) - removed, total_bytes=total, max_bytes=self.max_bytes
+            ),
+        )
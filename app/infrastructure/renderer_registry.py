@@ -3,21 +3,40 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from app.domain.output_format import OutputFormat
-from app.infrastructure.csv_takeoff_renderer import CsvTakeoffReportRenderer
-from app.infrastructure.debug_takeoff_json_renderer import DebugJsonTakeoffReportRenderer
-from app.infrastructure.pdf_takeoff_reportlab import ReportLabTakeoffPdfRenderer
 from app.reporting.renderers import TakeoffReportRenderer
 
+# Part of every render cache key. Bump a format's version whenever its
+# renderer's output changes, so files cached from the old renderer stop
+# being served.
+RENDERER_VERSIONS: dict[OutputFormat, str] = {
+    OutputFormat.PDF: "reportlab-1",
+    OutputFormat.CSV: "csv-1",
+    OutputFormat.JSON: "json-1",
+}
+
 
 @dataclass(frozen=True)
 class RendererRegistry:
+    # Renderer modules are imported on first use of their format, so callers
+    # that only render CSV/JSON (or nothing at all) never load ReportLab.
     def for_format(self, fmt: OutputFormat) -> TakeoffReportRenderer:
         match fmt:
             case OutputFormat.PDF:
+                from app.infrastructure.pdf_takeoff_reportlab import ReportLabTakeoffPdfRenderer
+
                 return ReportLabTakeoffPdfRenderer()
             case OutputFormat.JSON:
+                from app.infrastructure.debug_takeoff_json_renderer import (
+                    DebugJsonTakeoffReportRenderer,
+                )
+
                 return DebugJsonTakeoffReportRenderer()
             case OutputFormat.CSV:
+                from app.infrastructure.csv_takeoff_renderer import CsvTakeoffReportRenderer
+
                 return CsvTakeoffReportRenderer()
             case _:
-                raise AssertionError(f"Unhandled format: {fmt}")
\ No newline at end of file
+                raise AssertionError(f"Unhandled format: {fmt}")
+
+    def version_for(self, fmt: OutputFormat) -> str:
+        return RENDERER_VERSIONS[fmt]
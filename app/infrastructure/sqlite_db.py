@@ -1,35 +1,171 @@
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
 from pathlib import Path
+from typing import Any, TypeVar, overload
+
+from app.application.errors import InvalidInputError
+from app.config import SqliteTuning
+
+_ConnT = TypeVar("_ConnT", bound=sqlite3.Connection)
 
 
 @dataclass(frozen=True)
 class SqliteDb:
     path: Path
+    auto_migrate: bool = True
+    # None keeps SQLite's built-in defaults (rollback journal, no mmap).
+    tuning: SqliteTuning | None = None
+    # Set by long-lived CLI processes (serve / batch): connect() then hands out
+    # one kept-open connection per (path, tuning) instead of a new one.
+    connections: ConnectionCache | None = field(default=None, compare=False, repr=False)
 
     def connect(self) -> sqlite3.Connection:
+        if self.connections is not None:
+            return self.connections.get(self)
+        return self.open()
+
+    @overload
+    def open(self) -> sqlite3.Connection: ...
+
+    @overload
+    def open(self, factory: type[_ConnT]) -> _ConnT: ...
+
+    def open(self, factory: type[sqlite3.Connection] = sqlite3.Connection) -> sqlite3.Connection:
+        """A new connection of the `factory` class, tuned and (with auto_migrate) migrated."""
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(self.path)
+        conn = sqlite3.connect(self.path, factory=factory)
         conn.row_factory = sqlite3.Row
 
         # IMPORTANT: SQLite does NOT enforce foreign keys unless enabled per connection.
         conn.execute("PRAGMA foreign_keys = ON")
 
-        _migrate(conn)
+        if self.tuning is not None:
+            _apply_tuning(conn, self.tuning)
+
+        if self.auto_migrate:
+            _migrate_if_needed(conn)
+        # After migrating: a read-only connection may still upgrade the schema.
+        if self.tuning is not None and self.tuning.query_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+
+_BEGIN_SQL = frozenset({"BEGIN", "BEGIN IMMEDIATE"})
+
+
+class SharedConnection(sqlite3.Connection):
+    """
+    A connection reused by many CLI commands in one process.
+
+    Handlers close their connection when a command ends. Here close() only
+    rolls back whatever the command left uncommitted, so the next command
+    starts clean, and release() really closes it.
+
+    hold_transaction() wraps several commands in one transaction (`batch
+    --transaction`): until end_held_transaction(), the repositories' commit()
+    and BEGIN / BEGIN IMMEDIATE calls are no-ops. A rollback() still rolls
+    back for real, and it sets `held_transaction_lost` so the caller knows
+    earlier commands' work is gone too.
+    """
+
+    _held = False
+    held_transaction_lost = False
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        if self._held and self.in_transaction and sql.strip().upper() in _BEGIN_SQL:
+            return self.cursor()
+        return super().execute(sql, parameters)
+
+    def commit(self) -> None:
+        if not self._held:
+            super().commit()
+
+    def rollback(self) -> None:
+        if self._held:
+            self.held_transaction_lost = True
+        super().rollback()
+
+    def close(self) -> None:
+        if self.in_transaction and not self._held:
+            self.rollback()
+
+    def release(self) -> None:
+        super().close()
+
+    def hold_transaction(self) -> None:
+        if self.in_transaction:
+            raise InvalidInputError("Cannot hold a transaction: one is already open")
+        super().execute("BEGIN")
+        self._held = True
+        self.held_transaction_lost = False
+
+    def end_held_transaction(self, *, commit: bool) -> None:
+        self._held = False
+        if commit and not self.held_transaction_lost:
+            super().commit()
+        else:
+            super().rollback()
+
+
+@dataclass
+class ConnectionCache:
+    """Open SharedConnections keyed by (resolved DB path, tuning)."""
+
+    _conns: dict[tuple[Path, SqliteTuning | None], SharedConnection] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def get(self, db: SqliteDb) -> SharedConnection:
+        key = (db.path.resolve(), db.tuning)
+        conn = self._conns.get(key)
+        if conn is None:
+            conn = db.open(factory=SharedConnection)
+            self._conns[key] = conn
+        elif db.auto_migrate:
+            # The connection may have been opened by `db status` (no migration),
+            # or another process may have changed the schema since.
+            _migrate_if_needed(conn)
         return conn
 
+    def close(self) -> None:
+        for conn in self._conns.values():
+            conn.release()
+        self._conns.clear()
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One numbered schema step. `version` is recorded in PRAGMA user_version."""
+
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _apply_tuning(conn: sqlite3.Connection, tuning: SqliteTuning) -> None:
+    # busy_timeout first so switching journal_mode waits on a concurrent writer.
+    conn.execute(f"PRAGMA busy_timeout = {int(tuning.busy_timeout_ms)}")
+    conn.execute(f"PRAGMA journal_mode = {tuning.journal_mode.upper()}").fetchone()
+    conn.execute(f"PRAGMA synchronous = {tuning.synchronous.upper()}")
+    conn.execute(f"PRAGMA cache_size = {int(tuning.cache_size)}")
+    conn.execute(f"PRAGMA mmap_size = {int(tuning.mmap_size)}")
+    conn.execute(f"PRAGMA temp_store = {tuning.temp_store.upper()}")
+
 
 def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
     rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
     return any(str(r["name"]) == column for r in rows)
 
 
-def _migrate(conn: sqlite3.Connection) -> None:
+def _m001_baseline(conn: sqlite3.Connection) -> None:
     """Idempotent schema creation + additive migrations.
 
-    Safe to run on every startup.
+    Baseline for DBs created before versioned migrations existed
+    (user_version = 0): every statement tolerates a partially migrated schema.
     """
 
     # -------------------------
@@ -309,4 +445,169 @@ def _migrate(conn: sqlite3.Connection) -> None:
     if not _has_column(conn, "takeoff_version_lines", "sort_order"):
         conn.execute("ALTER TABLE takeoff_version_lines ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0")
 
-    conn.commit()
\ No newline at end of file
+
+def _m002_totals_tables(conn: sqlite3.Connection) -> None:
+    """Materialized stage totals (see app.infrastructure.sqlite_totals), backfilled."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS takeoff_totals (
+            takeoff_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            subtotal_cents INTEGER NOT NULL,
+            tax_cents INTEGER NOT NULL,
+            line_count INTEGER NOT NULL,
+            PRIMARY KEY (takeoff_id, stage),
+            FOREIGN KEY (takeoff_id) REFERENCES takeoffs(takeoff_id) ON DELETE CASCADE
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS takeoff_version_totals (
+            version_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            subtotal_cents INTEGER NOT NULL,
+            tax_cents INTEGER NOT NULL,
+            line_count INTEGER NOT NULL,
+            PRIMARY KEY (version_id, stage),
+            FOREIGN KEY (version_id) REFERENCES takeoff_versions(version_id) ON DELETE CASCADE
+        )
+        """
+    )
+    _m002_register_line_cents(conn)
+    conn.execute(
+        """
+        INSERT INTO takeoff_totals (takeoff_id, stage, subtotal_cents, tax_cents, line_count)
+        SELECT
+            l.takeoff_id,
+            COALESCE(NULLIF(l.stage, ''), 'final'),
+            SUM(m002_line_cents(l.unit_price_snapshot, l.qty, l.factor,
+                                l.taxable_snapshot, t.tax_rate, 0)),
+            SUM(m002_line_cents(l.unit_price_snapshot, l.qty, l.factor,
+                                l.taxable_snapshot, t.tax_rate, 1)),
+            COUNT(*)
+        FROM takeoff_lines l
+        JOIN takeoffs t ON t.takeoff_id = l.takeoff_id
+        GROUP BY l.takeoff_id, COALESCE(NULLIF(l.stage, ''), 'final')
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO takeoff_version_totals (
+            version_id, stage, subtotal_cents, tax_cents, line_count
+        )
+        SELECT
+            vl.version_id,
+            COALESCE(NULLIF(vl.stage, ''), 'final'),
+            SUM(m002_line_cents(vl.unit_price_snapshot, vl.qty, vl.factor,
+                                vl.taxable_snapshot, v.tax_rate_snapshot, 0)),
+            SUM(m002_line_cents(vl.unit_price_snapshot, vl.qty, vl.factor,
+                                vl.taxable_snapshot, v.tax_rate_snapshot, 1)),
+            COUNT(*)
+        FROM takeoff_version_lines vl
+        JOIN takeoff_versions v ON v.version_id = vl.version_id
+        GROUP BY vl.version_id, COALESCE(NULLIF(vl.stage, ''), 'final')
+        """
+    )
+
+
+def _m002_register_line_cents(conn: sqlite3.Connection) -> None:
+    """
+    The backfill's per-line rounding, frozen as of migration 2 so later changes
+    to app.infrastructure.sqlite_totals or the money engines cannot change
+    what this migration writes: subtotal = q2(price * qty * factor), tax =
+    q2(subtotal * tax_rate) if taxable, ROUND_HALF_UP; NULL/empty/zero factor
+    counts as 1.
+    """
+    cent = Decimal("0.01")
+
+    def line_cents(
+        price: object, qty: object, factor: object, taxable: object, tax_rate: object, part: int
+    ) -> int:
+        f = Decimal(str(factor)) if factor not in (None, "") else Decimal("1")
+        if f == 0:
+            f = Decimal("1")
+        subtotal = (Decimal(str(price)) * Decimal(str(qty)) * f).quantize(
+            cent, rounding=ROUND_HALF_UP
+        )
+        if part == 0:
+            return int(subtotal.scaleb(2))
+        if isinstance(taxable, (str, bytes, bytearray)):
+            taxable = int(taxable)
+        if not taxable:
+            return 0
+        tax = (subtotal * Decimal(str(tax_rate))).quantize(cent, rounding=ROUND_HALF_UP)
+        return int(tax.scaleb(2))
+
+    conn.create_function("m002_line_cents", 6, line_cents, deterministic=True)
+
+
+def _m003_lookup_indexes(conn: sqlite3.Connection) -> None:
+    """Indexes for the FK columns no primary/unique key leads with.
+
+    Deleting an item checks takeoff_lines / template_lines by item_code, and
+    deleting a template checks takeoffs by template_code; without these each
+    check is a full table scan. (takeoffs.project_code is the leading column of
+    idx_takeoffs_project_template; takeoff_versions(takeoff_id, version_number)
+    is covered by its UNIQUE constraint, which SQLite also walks in DESC order.)
+    See tests/test_sqlite_query_plans.py.
+    """
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_takeoff_lines_item_code ON takeoff_lines(item_code)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_template_lines_item_code ON template_lines(item_code)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_takeoffs_template_code ON takeoffs(template_code)"
+    )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(version=1, name="baseline_schema", apply=_m001_baseline),
+    Migration(version=2, name="totals_tables", apply=_m002_totals_tables),
+    Migration(version=3, name="lookup_indexes", apply=_m003_lookup_indexes),
+)
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("PRAGMA user_version").fetchone()
+    return int(row[0])
+
+
+def _migrate_if_needed(conn: sqlite3.Connection) -> None:
+    # Fast path: a current DB costs a single PRAGMA read.
+    if schema_version(conn) != LATEST_SCHEMA_VERSION:
+        apply_migrations(conn)
+
+
+def pending_migrations(conn: sqlite3.Connection) -> tuple[Migration, ...]:
+    current = schema_version(conn)
+    if current > LATEST_SCHEMA_VERSION:
+        raise InvalidInputError(
+            f"Database schema version {current} is newer than this app supports "
+            f"({LATEST_SCHEMA_VERSION}). Upgrade the app before using this DB."
+        )
+    return tuple(m for m in MIGRATIONS if m.version > current)
+
+
+def apply_migrations(conn: sqlite3.Connection) -> tuple[Migration, ...]:
+    """Apply pending migrations in order, each in its own transaction.
+
+    The version bump is written inside the same transaction as the step, so an
+    interrupted migration is retried from that step on the next connect.
+    """
+    applied: list[Migration] = []
+    for migration in pending_migrations(conn):
+        conn.execute("BEGIN")
+        try:
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(migration)
+    return tuple(applied)
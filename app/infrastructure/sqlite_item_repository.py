@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import sqlite3
+from collections.abc import Iterable
 from dataclasses import dataclass
 from decimal import Decimal
+from itertools import islice
 
 from app.application.errors import InvalidInputError
-from app.application.repositories.item_repository import ItemRepository
+from app.application.repositories.item_repository import ItemRepository, ItemUpsertCounts
 from app.domain.item import Item
 
 
@@ -24,6 +26,64 @@ def _bool(value: object) -> bool:
     raise TypeError(f"Expected boolean-ish SQLite value, got {type(value).__name__}")
 
 
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER (999 on older builds).
+_IN_CHUNK = 500
+
+
+def _row_to_item(row: sqlite3.Row) -> Item:
+    return Item(
+        code=str(row["internal_item_code"]),
+        item_number=row["lennar_item_number"],
+        description=str(row["description1"]),
+        details=row["description2"],
+        unit_price=Decimal(str(row["unit_price"])),
+        taxable=_bool(row["default_taxable"]),
+        is_active=_bool(row["is_active"]),
+    )
+
+
+_INSERT_ITEM_SQL = """
+    INSERT INTO items (
+        internal_item_code,
+        lennar_item_number,
+        description1,
+        description2,
+        unit_price,
+        default_taxable,
+        is_active,
+        updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
+"""
+
+_UPSERT_ITEM_SQL = (
+    _INSERT_ITEM_SQL
+    + """
+    ON CONFLICT(internal_item_code) DO UPDATE SET
+        lennar_item_number=excluded.lennar_item_number,
+        description1=excluded.description1,
+        description2=excluded.description2,
+        unit_price=excluded.unit_price,
+        default_taxable=excluded.default_taxable,
+        is_active=excluded.is_active,
+        updated_at=datetime('now')
+"""
+)
+
+
+def _item_row(item: Item) -> tuple[object, ...]:
+    """Parameters for _INSERT_ITEM_SQL and _UPSERT_ITEM_SQL."""
+    return (
+        item.code,
+        item.item_number,
+        item.description,
+        item.details,
+        str(item.unit_price),
+        _b(item.taxable),
+        _b(item.is_active),
+    )
+
+
 @dataclass(frozen=True)
 class SqliteItemRepository(ItemRepository):
     conn: sqlite3.Connection
@@ -32,40 +92,64 @@ class SqliteItemRepository(ItemRepository):
         if not item.code.strip():
             raise InvalidInputError("Item.code cannot be empty")
 
-        self.conn.execute(
-            """
-            INSERT INTO items (
-                internal_item_code,
-                lennar_item_number,
-                description1,
-                description2,
-                unit_price,
-                default_taxable,
-                is_active,
-                updated_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            ON CONFLICT(internal_item_code) DO UPDATE SET
-                lennar_item_number=excluded.lennar_item_number,
-                description1=excluded.description1,
-                description2=excluded.description2,
-                unit_price=excluded.unit_price,
-                default_taxable=excluded.default_taxable,
-                is_active=excluded.is_active,
-                updated_at=datetime('now')
-            """,
-            (
-                item.code,
-                item.item_number,
-                item.description,
-                item.details,
-                str(item.unit_price),
-                _b(item.taxable),
-                _b(item.is_active),
-            ),
-        )
+        self.conn.execute(_UPSERT_ITEM_SQL, _item_row(item))
         self.conn.commit()
 
+    def upsert_many(
+        self, items: Iterable[Item], *, chunk_size: int = _IN_CHUNK
+    ) -> ItemUpsertCounts:
+        """
+        Insert new items and rewrite changed ones in one transaction.
+
+        `items` is consumed in chunks of `chunk_size` (it may be a generator
+        over a very large file). Each chunk is compared with the stored rows
+        first; rows that already hold the same values are not written at all
+        (no updated_at bump). A repeated code is applied in order, last wins.
+        """
+        inserted = updated = unchanged = 0
+        it = iter(items)
+
+        self.conn.execute("BEGIN")
+        try:
+            while chunk := list(islice(it, chunk_size)):
+                latest: dict[str, Item] = {}
+                for item in chunk:
+                    if not item.code.strip():
+                        raise InvalidInputError("Item.code cannot be empty")
+                    latest[item.code] = item
+
+                current = self.get_many(latest)
+                inserts = [_item_row(i) for code, i in latest.items() if code not in current]
+                updates = [
+                    _item_row(i)[1:] + (code,)
+                    for code, i in latest.items()
+                    if code in current and current[code] != i
+                ]
+                self.conn.executemany(_INSERT_ITEM_SQL, inserts)
+                self.conn.executemany(
+                    """
+                    UPDATE items
+                    SET lennar_item_number = ?,
+                        description1 = ?,
+                        description2 = ?,
+                        unit_price = ?,
+                        default_taxable = ?,
+                        is_active = ?,
+                        updated_at = datetime('now')
+                    WHERE internal_item_code = ?
+                    """,
+                    updates,
+                )
+                inserted += len(inserts)
+                updated += len(updates)
+                unchanged += len(latest) - len(inserts) - len(updates)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        return ItemUpsertCounts(inserted=inserted, updated=updated, unchanged=unchanged)
+
     def get(self, code: str) -> Item:
         row = self.conn.execute(
             """
@@ -80,15 +164,27 @@ class SqliteItemRepository(ItemRepository):
         if row is None:
             raise InvalidInputError(f"Item not found: {code}")
 
-        return Item(
-            code=str(row["internal_item_code"]),
-            item_number=row["lennar_item_number"],
-            description=str(row["description1"]),
-            details=row["description2"],
-            unit_price=Decimal(str(row["unit_price"])),
-            taxable=_bool(row["default_taxable"]),
-            is_active=_bool(row["is_active"]),
-        )
+        return _row_to_item(row)
+
+    def get_many(self, codes: Iterable[str]) -> dict[str, Item]:
+        unique = list(dict.fromkeys(codes))
+        out: dict[str, Item] = {}
+        for start in range(0, len(unique), _IN_CHUNK):
+            chunk = unique[start : start + _IN_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.conn.execute(
+                f"""
+                SELECT internal_item_code, lennar_item_number, description1, description2,
+                       unit_price, default_taxable, is_active
+                FROM items
+                WHERE internal_item_code IN ({placeholders})
+                """,
+                chunk,
+            ).fetchall()
+            for row in rows:
+                item = _row_to_item(row)
+                out[item.code] = item
+        return out
 
     def list(self, *, include_inactive: bool = False) -> tuple[Item, ...]:
         if include_inactive:
@@ -111,20 +207,7 @@ class SqliteItemRepository(ItemRepository):
                 """
             ).fetchall()
 
-        out: list[Item] = []
-        for row in rows:
-            out.append(
-                Item(
-                    code=str(row["internal_item_code"]),
-                    item_number=row["lennar_item_number"],
-                    description=str(row["description1"]),
-                    details=row["description2"],
-                    unit_price=Decimal(str(row["unit_price"])),
-                    taxable=_bool(row["default_taxable"]),
-                    is_active=_bool(row["is_active"]),
-                )
-            )
-        return tuple(out)
+        return tuple(_row_to_item(row) for row in rows)
 
     def delete(self, code: str) -> None:
         cur = self.conn.execute(
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
 from decimal import Decimal
+from typing import Any
 
-from app.application.repositories.takeoff_line_repository import TakeoffLineRepository
 from app.application.errors import InvalidInputError
+from app.application.repositories.takeoff_line_repository import (
+    TakeoffLineRepository,
+    TakeoffLineUpdate,
+    TakeoffStageSums,
+)
+from app.domain.money import DEFAULT_MONEY_ENGINE, cents_to_decimal
 from app.domain.stage import Stage
 from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.infrastructure.sqlite_totals import line_cents
 
 
 def _b(value: bool) -> int:
@@ -24,53 +32,59 @@ def _bool(value: object) -> bool:
     raise TypeError(f"Expected boolean-ish SQLite value, got {type(value).__name__}")
 
 
+INSERT_TAKEOFF_LINE_SQL = """
+    INSERT INTO takeoff_lines (
+        takeoff_id,
+        item_code,
+        qty,
+        notes,
+        description_snapshot,
+        details_snapshot,
+        unit_price_snapshot,
+        taxable_snapshot,
+        stage,
+        factor,
+        sort_order,
+        updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+"""
+
+
+def takeoff_line_row(ln: TakeoffLineSnapshot) -> tuple[object, ...]:
+    """Parameters for INSERT_TAKEOFF_LINE_SQL."""
+    stage = getattr(ln, "stage", None)
+    return (
+        ln.takeoff_id,
+        ln.item_code,
+        str(ln.qty),
+        ln.notes,
+        ln.description_snapshot,
+        ln.details_snapshot,
+        str(ln.unit_price_snapshot),
+        _b(ln.taxable_snapshot),
+        stage.value if isinstance(stage, Stage) else stage,
+        str(getattr(ln, "factor", Decimal("1.0"))),
+        int(getattr(ln, "sort_order", 0)),
+    )
+
+
 @dataclass(frozen=True)
 class SqliteTakeoffLineRepository(TakeoffLineRepository):
     conn: sqlite3.Connection
+    # Per-line arithmetic used to maintain takeoff_totals (see MONEY_ENGINES).
+    money_engine: str = DEFAULT_MONEY_ENGINE
 
     def bulk_insert(self, lines: list[TakeoffLineSnapshot]) -> None:
         if not lines:
             return
 
+        rows = [takeoff_line_row(ln) for ln in lines]
+
         self.conn.execute("BEGIN")
         try:
-            self.conn.executemany(
-                """
-                INSERT INTO takeoff_lines (
-                    takeoff_id,
-                    item_code,
-                    qty,
-                    notes,
-                    description_snapshot,
-                    details_snapshot,
-                    unit_price_snapshot,
-                    taxable_snapshot,
-                    stage,
-                    factor,
-                    sort_order,
-                    updated_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                """,
-                [
-                    (
-                        ln.takeoff_id,
-                        ln.item_code,
-                        str(ln.qty),
-                        ln.notes,
-                        ln.description_snapshot,
-                        ln.details_snapshot,
-                        str(ln.unit_price_snapshot),
-                        _b(ln.taxable_snapshot),
-                        getattr(ln, "stage", None).value
-                        if isinstance(getattr(ln, "stage", None), Stage)
-                        else getattr(ln, "stage", None),
-                        str(getattr(ln, "factor", Decimal("1.0"))),
-                        int(getattr(ln, "sort_order", 0)),
-                    )
-                    for ln in lines
-                ],
-            )
+            self.conn.executemany(INSERT_TAKEOFF_LINE_SQL, rows)
+            self._bump_totals(self._totals_deltas(rows))
             self.conn.commit()
         except Exception:
             self.conn.rollback()
@@ -88,61 +102,48 @@ class SqliteTakeoffLineRepository(TakeoffLineRepository):
         if line.sort_order < 0:
             raise InvalidInputError("sort_order must be >= 0")
 
-        takeoff_row = self.conn.execute(
-            "SELECT is_locked FROM takeoffs WHERE takeoff_id = ?",
-            (line.takeoff_id,),
-        ).fetchone()
-        if takeoff_row is None:
-            raise InvalidInputError(f"Takeoff not found: {line.takeoff_id}")
-        if bool(int(takeoff_row["is_locked"])):
-            raise InvalidInputError(f"Takeoff is locked: {line.takeoff_id}")
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            takeoff_row = self.conn.execute(
+                "SELECT is_locked, tax_rate FROM takeoffs WHERE takeoff_id = ?",
+                (line.takeoff_id,),
+            ).fetchone()
+            if takeoff_row is None:
+                raise InvalidInputError(f"Takeoff not found: {line.takeoff_id}")
+            if bool(int(takeoff_row["is_locked"])):
+                raise InvalidInputError(f"Takeoff is locked: {line.takeoff_id}")
 
-        existing = self.conn.execute(
-            """
-            SELECT 1
-            FROM takeoff_lines
-            WHERE takeoff_id = ? AND item_code = ?
-            """,
-            (line.takeoff_id, line.item_code),
-        ).fetchone()
-        if existing is not None:
-            raise InvalidInputError(
-                f"Takeoff line already exists: takeoff_id={line.takeoff_id} item_code={line.item_code}"
-            )
+            existing = self.conn.execute(
+                """
+                SELECT 1
+                FROM takeoff_lines
+                WHERE takeoff_id = ? AND item_code = ?
+                """,
+                (line.takeoff_id, line.item_code),
+            ).fetchone()
+            if existing is not None:
+                raise InvalidInputError(
+                    "Takeoff line already exists: "
+                    f"takeoff_id={line.takeoff_id} item_code={line.item_code}"
+                )
 
-        self.conn.execute(
-            """
-            INSERT INTO takeoff_lines (
-                takeoff_id,
-                item_code,
-                qty,
-                notes,
-                description_snapshot,
-                details_snapshot,
-                unit_price_snapshot,
-                taxable_snapshot,
-                stage,
-                factor,
-                sort_order,
-                updated_at
+            if not line.stage:
+                line = replace(line, stage=Stage.FINAL)  # add_line stores the default explicitly
+            stage_value = str(line.stage)
+            self.conn.execute(INSERT_TAKEOFF_LINE_SQL, takeoff_line_row(line))
+            subtotal_cents, tax_cents = line_cents(
+                line.unit_price_snapshot,
+                line.qty,
+                line.factor,
+                line.taxable_snapshot,
+                takeoff_row["tax_rate"],
+                money_engine=self.money_engine,
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            """,
-            (
-                line.takeoff_id,
-                line.item_code,
-                str(line.qty),
-                line.notes,
-                line.description_snapshot,
-                line.details_snapshot,
-                str(line.unit_price_snapshot),
-                _b(line.taxable_snapshot),
-                line.stage.value if isinstance(line.stage, Stage) else str(line.stage or "final"),
-                str(line.factor),
-                int(line.sort_order),
-            ),
-        )
-        self.conn.commit()
+            self._bump_totals({(line.takeoff_id, stage_value): [subtotal_cents, tax_cents, 1]})
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
     
     def update_line(
         self,
@@ -159,61 +160,87 @@ class SqliteTakeoffLineRepository(TakeoffLineRepository):
         if not str(item_code).strip():
             raise InvalidInputError("item_code cannot be empty")
 
-        takeoff_row = self.conn.execute(
-            "SELECT is_locked FROM takeoffs WHERE takeoff_id = ?",
-            (takeoff_id,),
-        ).fetchone()
-        if takeoff_row is None:
-            raise InvalidInputError(f"Takeoff not found: {takeoff_id}")
-        if bool(int(takeoff_row["is_locked"])):
-            raise InvalidInputError(f"Takeoff is locked: {takeoff_id}")
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            takeoff_row = self.conn.execute(
+                "SELECT is_locked, tax_rate FROM takeoffs WHERE takeoff_id = ?",
+                (takeoff_id,),
+            ).fetchone()
+            if takeoff_row is None:
+                raise InvalidInputError(f"Takeoff not found: {takeoff_id}")
+            if bool(int(takeoff_row["is_locked"])):
+                raise InvalidInputError(f"Takeoff is locked: {takeoff_id}")
 
-        row = self.conn.execute(
-            """
-            SELECT qty, stage, factor, sort_order
-            FROM takeoff_lines
-            WHERE takeoff_id = ? AND item_code = ?
-            """,
-            (takeoff_id, item_code),
-        ).fetchone()
+            row = self.conn.execute(
+                """
+                SELECT qty, stage, factor, sort_order, unit_price_snapshot, taxable_snapshot
+                FROM takeoff_lines
+                WHERE takeoff_id = ? AND item_code = ?
+                """,
+                (takeoff_id, item_code),
+            ).fetchone()
 
-        if row is None:
-            raise InvalidInputError(
-                f"Takeoff line not found: takeoff_id={takeoff_id} item_code={item_code}"
-            )
+            if row is None:
+                raise InvalidInputError(
+                    f"Takeoff line not found: takeoff_id={takeoff_id} item_code={item_code}"
+                )
 
-        new_qty = qty if qty is not None else Decimal(str(row["qty"]))
-        new_stage = stage if stage is not None else Stage(str(row["stage"] or "final"))
-        new_factor = factor if factor is not None else Decimal(str(row["factor"] or "1.0"))
-        new_sort_order = sort_order if sort_order is not None else int(row["sort_order"] or 0)
+            new_qty = qty if qty is not None else Decimal(str(row["qty"]))
+            new_stage = stage if stage is not None else Stage(str(row["stage"] or "final"))
+            new_factor = factor if factor is not None else Decimal(str(row["factor"] or "1.0"))
+            new_sort_order = sort_order if sort_order is not None else int(row["sort_order"] or 0)
 
-        if new_qty <= Decimal("0"):
-            raise InvalidInputError("qty must be > 0")
-        if new_factor <= Decimal("0"):
-            raise InvalidInputError("factor must be > 0")
-        if new_sort_order < 0:
-            raise InvalidInputError("sort_order must be >= 0")
+            if new_qty <= Decimal("0"):
+                raise InvalidInputError("qty must be > 0")
+            if new_factor <= Decimal("0"):
+                raise InvalidInputError("factor must be > 0")
+            if new_sort_order < 0:
+                raise InvalidInputError("sort_order must be >= 0")
 
-        self.conn.execute(
-            """
-            UPDATE takeoff_lines
-            SET qty = ?,
-                stage = ?,
-                factor = ?,
-                sort_order = ?,
-                updated_at = datetime('now')
-            WHERE takeoff_id = ? AND item_code = ?
-            """,
-            (
-                str(new_qty),
-                new_stage.value,
-                str(new_factor),
-                int(new_sort_order),
-                takeoff_id,
-                item_code,
-            ),
-        )
-        self.conn.commit()    
+            self.conn.execute(
+                """
+                UPDATE takeoff_lines
+                SET qty = ?,
+                    stage = ?,
+                    factor = ?,
+                    sort_order = ?,
+                    updated_at = datetime('now')
+                WHERE takeoff_id = ? AND item_code = ?
+                """,
+                (
+                    str(new_qty),
+                    new_stage.value,
+                    str(new_factor),
+                    int(new_sort_order),
+                    takeoff_id,
+                    item_code,
+                ),
+            )
+            old_subtotal, old_tax = line_cents(
+                row["unit_price_snapshot"],
+                row["qty"],
+                row["factor"],
+                row["taxable_snapshot"],
+                takeoff_row["tax_rate"],
+                money_engine=self.money_engine,
+            )
+            new_subtotal, new_tax = line_cents(
+                row["unit_price_snapshot"],
+                new_qty,
+                new_factor,
+                row["taxable_snapshot"],
+                takeoff_row["tax_rate"],
+                money_engine=self.money_engine,
+            )
+            deltas: dict[tuple[str, str], list[int]] = {}
+            old_key = (takeoff_id, str(row["stage"] or "final"))
+            self._add_delta(deltas, old_key, -old_subtotal, -old_tax, -1)
+            self._add_delta(deltas, (takeoff_id, new_stage.value), new_subtotal, new_tax, 1)
+            self._bump_totals(deltas)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
 
     def list_for_takeoff(self, takeoff_id: str) -> tuple[TakeoffLineSnapshot, ...]:
         rows = self.conn.execute(
@@ -275,25 +302,314 @@ class SqliteTakeoffLineRepository(TakeoffLineRepository):
         if not str(item_code).strip():
             raise InvalidInputError("item_code cannot be empty")
 
-        takeoff_row = self.conn.execute(
-            "SELECT is_locked FROM takeoffs WHERE takeoff_id = ?",
-            (takeoff_id,),
-        ).fetchone()
-        if takeoff_row is None:
-            raise InvalidInputError(f"Takeoff not found: {takeoff_id}")
-        if bool(int(takeoff_row["is_locked"])):
-            raise InvalidInputError(f"Takeoff is locked: {takeoff_id}")
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            takeoff_row = self.conn.execute(
+                "SELECT is_locked, tax_rate FROM takeoffs WHERE takeoff_id = ?",
+                (takeoff_id,),
+            ).fetchone()
+            if takeoff_row is None:
+                raise InvalidInputError(f"Takeoff not found: {takeoff_id}")
+            if bool(int(takeoff_row["is_locked"])):
+                raise InvalidInputError(f"Takeoff is locked: {takeoff_id}")
+
+            row = self.conn.execute(
+                """
+                SELECT stage, qty, factor, unit_price_snapshot, taxable_snapshot
+                FROM takeoff_lines
+                WHERE takeoff_id = ? AND item_code = ?
+                """,
+                (takeoff_id, item_code),
+            ).fetchone()
+            if row is None:
+                raise InvalidInputError(
+                    f"Takeoff line not found: takeoff_id={takeoff_id} item_code={item_code}"
+                )
 
-        cur = self.conn.execute(
+            self.conn.execute(
+                """
+                DELETE FROM takeoff_lines
+                WHERE takeoff_id = ? AND item_code = ?
+                """,
+                (takeoff_id, item_code),
+            )
+            subtotal_cents, tax_cents = line_cents(
+                row["unit_price_snapshot"],
+                row["qty"],
+                row["factor"],
+                row["taxable_snapshot"],
+                takeoff_row["tax_rate"],
+                money_engine=self.money_engine,
+            )
+            self._bump_totals(
+                {(takeoff_id, str(row["stage"] or "final")): [-subtotal_cents, -tax_cents, -1]}
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def apply_changes(
+        self,
+        *,
+        takeoff_id: str,
+        adds: Sequence[TakeoffLineSnapshot] = (),
+        updates: Sequence[TakeoffLineUpdate] = (),
+        deletes: Sequence[str] = (),
+    ) -> None:
+        """
+        Add, update and delete many lines of one takeoff atomically.
+
+        The write lock is taken first, so the lock check, the current lines and
+        the totals deltas cannot go stale before the writes land. Every change
+        is validated before anything is written; then each kind of change is one
+        executemany, and takeoff_totals gets one combined delta. Each item_code
+        may appear in one change only.
+        """
+        if not str(takeoff_id).strip():
+            raise InvalidInputError("takeoff_id cannot be empty")
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            takeoff_row = self.conn.execute(
+                "SELECT is_locked, tax_rate FROM takeoffs WHERE takeoff_id = ?",
+                (takeoff_id,),
+            ).fetchone()
+            if takeoff_row is None:
+                raise InvalidInputError(f"Takeoff not found: {takeoff_id}")
+            if bool(int(takeoff_row["is_locked"])):
+                raise InvalidInputError(f"Takeoff is locked: {takeoff_id}")
+            tax_rate = takeoff_row["tax_rate"]
+
+            current = {
+                str(r["item_code"]): r
+                for r in self.conn.execute(
+                    """
+                    SELECT item_code, qty, stage, factor, sort_order,
+                           unit_price_snapshot, taxable_snapshot
+                    FROM takeoff_lines
+                    WHERE takeoff_id = ?
+                    """,
+                    (takeoff_id,),
+                )
+            }
+
+            errors: list[str] = []
+            seen: set[str] = set()
+            codes = [ln.item_code for ln in adds] + [u.item_code for u in updates] + list(deletes)
+            for code in codes:
+                if code in seen:
+                    errors.append(f"{code}: more than one change for the same item")
+                seen.add(code)
+
+            for ln in adds:
+                if ln.takeoff_id != takeoff_id:
+                    errors.append(f"{ln.item_code}: line belongs to takeoff {ln.takeoff_id}")
+                if ln.item_code in current:
+                    errors.append(f"{ln.item_code}: line already exists")
+                if ln.qty <= Decimal("0"):
+                    errors.append(f"{ln.item_code}: qty must be > 0")
+                if ln.factor <= Decimal("0"):
+                    errors.append(f"{ln.item_code}: factor must be > 0")
+                if ln.sort_order < 0:
+                    errors.append(f"{ln.item_code}: sort_order must be >= 0")
+
+            deltas: dict[tuple[str, str], list[int]] = {}
+            update_rows: list[tuple[object, ...]] = []
+            for u in updates:
+                row = current.get(u.item_code)
+                if row is None:
+                    errors.append(f"{u.item_code}: line not found")
+                    continue
+                new_qty = u.qty if u.qty is not None else Decimal(str(row["qty"]))
+                new_stage = u.stage if u.stage is not None else Stage(str(row["stage"] or "final"))
+                new_factor = (
+                    u.factor if u.factor is not None else Decimal(str(row["factor"] or "1.0"))
+                )
+                new_sort_order = (
+                    u.sort_order if u.sort_order is not None else int(row["sort_order"] or 0)
+                )
+                if new_qty <= Decimal("0"):
+                    errors.append(f"{u.item_code}: qty must be > 0")
+                if new_factor <= Decimal("0"):
+                    errors.append(f"{u.item_code}: factor must be > 0")
+                if new_sort_order < 0:
+                    errors.append(f"{u.item_code}: sort_order must be >= 0")
+
+                update_rows.append(
+                    (
+                        str(new_qty),
+                        new_stage.value,
+                        str(new_factor),
+                        int(new_sort_order),
+                        takeoff_id,
+                        u.item_code,
+                    )
+                )
+                old_subtotal, old_tax = line_cents(
+                    row["unit_price_snapshot"],
+                    row["qty"],
+                    row["factor"],
+                    row["taxable_snapshot"],
+                    tax_rate,
+                    money_engine=self.money_engine,
+                )
+                new_subtotal, new_tax = line_cents(
+                    row["unit_price_snapshot"],
+                    new_qty,
+                    new_factor,
+                    row["taxable_snapshot"],
+                    tax_rate,
+                    money_engine=self.money_engine,
+                )
+                old_key = (takeoff_id, str(row["stage"] or "final"))
+                self._add_delta(deltas, old_key, -old_subtotal, -old_tax, -1)
+                self._add_delta(deltas, (takeoff_id, new_stage.value), new_subtotal, new_tax, 1)
+
+            for code in deletes:
+                row = current.get(code)
+                if row is None:
+                    errors.append(f"{code}: line not found")
+                    continue
+                subtotal_cents, tax_cents = line_cents(
+                    row["unit_price_snapshot"],
+                    row["qty"],
+                    row["factor"],
+                    row["taxable_snapshot"],
+                    tax_rate,
+                    money_engine=self.money_engine,
+                )
+                key = (takeoff_id, str(row["stage"] or "final"))
+                self._add_delta(deltas, key, -subtotal_cents, -tax_cents, -1)
+
+            if errors:
+                raise InvalidInputError(
+                    f"Invalid changes for takeoff={takeoff_id}: " + "; ".join(errors)
+                )
+
+            insert_rows = [takeoff_line_row(ln) for ln in adds]
+            for key, values in self._totals_deltas(insert_rows).items():
+                self._add_delta(deltas, key, *values)
+
+            self.conn.executemany(
+                "DELETE FROM takeoff_lines WHERE takeoff_id = ? AND item_code = ?",
+                [(takeoff_id, code) for code in deletes],
+            )
+            self.conn.executemany(
+                """
+                UPDATE takeoff_lines
+                SET qty = ?,
+                    stage = ?,
+                    factor = ?,
+                    sort_order = ?,
+                    updated_at = datetime('now')
+                WHERE takeoff_id = ? AND item_code = ?
+                """,
+                update_rows,
+            )
+            self.conn.executemany(INSERT_TAKEOFF_LINE_SQL, insert_rows)
+            self._bump_totals(deltas)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    @staticmethod
+    def _add_delta(
+        deltas: dict[tuple[str, str], list[int]],
+        key: tuple[str, str],
+        subtotal_cents: int,
+        tax_cents: int,
+        line_count: int,
+    ) -> None:
+        acc = deltas.setdefault(key, [0, 0, 0])
+        acc[0] += subtotal_cents
+        acc[1] += tax_cents
+        acc[2] += line_count
+
+    def _totals_deltas(self, rows: list[tuple[Any, ...]]) -> dict[tuple[str, str], list[int]]:
+        """Totals deltas for freshly inserted bulk_insert rows."""
+        if not rows:
+            return {}
+        takeoff_ids = sorted({r[0] for r in rows})
+        placeholders = ", ".join("?" for _ in takeoff_ids)
+        tax_rates = {
+            str(r["takeoff_id"]): r["tax_rate"]
+            for r in self.conn.execute(
+                f"SELECT takeoff_id, tax_rate FROM takeoffs WHERE takeoff_id IN ({placeholders})",
+                takeoff_ids,
+            )
+        }
+        deltas: dict[tuple[str, str], list[int]] = {}
+        for takeoff_id, _, qty, _, _, _, price, taxable, stage, factor, _ in rows:
+            subtotal_cents, tax_cents = line_cents(
+                price, qty, factor, taxable, tax_rates[takeoff_id], money_engine=self.money_engine
+            )
+            self._add_delta(deltas, (takeoff_id, stage or "final"), subtotal_cents, tax_cents, 1)
+        return deltas
+
+    def _bump_totals(self, deltas: dict[tuple[str, str], list[int]]) -> None:
+        """Apply (subtotal_cents, tax_cents, line_count) deltas to takeoff_totals."""
+        if not deltas:
+            return
+        self.conn.executemany(
             """
-            DELETE FROM takeoff_lines
-            WHERE takeoff_id = ? AND item_code = ?
+            INSERT INTO takeoff_totals (takeoff_id, stage, subtotal_cents, tax_cents, line_count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (takeoff_id, stage) DO UPDATE SET
+                subtotal_cents = subtotal_cents + excluded.subtotal_cents,
+                tax_cents = tax_cents + excluded.tax_cents,
+                line_count = line_count + excluded.line_count
             """,
-            (takeoff_id, item_code),
+            [(k[0], k[1], *v) for k, v in deltas.items()],
         )
-        self.conn.commit()
+        self.conn.executemany(
+            "DELETE FROM takeoff_totals WHERE takeoff_id = ? AND stage = ? AND line_count = 0",
+            list(deltas),
+        )
+
+    def stage_sums_for_project(self, *, project_code: str) -> tuple[TakeoffStageSums, ...]:
+        """
+        Per-takeoff, per-stage totals for every takeoff of a project.
+
+        Reads the takeoff_totals cache, so cost is O(takeoffs), not O(lines).
+        """
+        rows = self.conn.execute(
+            """
+            SELECT
+                t.takeoff_id AS takeoff_id,
+                COALESCE(tt.stage, 'final') AS stage,
+                tt.subtotal_cents AS subtotal_cents,
+                tt.tax_cents AS tax_cents,
+                COALESCE(tt.line_count, 0) AS line_count
+            FROM takeoffs t
+            LEFT JOIN takeoff_totals tt ON tt.takeoff_id = t.takeoff_id
+            WHERE t.project_code = ?
+            """,
+            (project_code,),
+        ).fetchall()
+        return self._stage_sums(rows)
+
+    def stage_sums_for_takeoff(self, *, takeoff_id: str) -> tuple[TakeoffStageSums, ...]:
+        rows = self.conn.execute(
+            """
+            SELECT takeoff_id, stage, subtotal_cents, tax_cents, line_count
+            FROM takeoff_totals
+            WHERE takeoff_id = ?
+            """,
+            (takeoff_id,),
+        ).fetchall()
+        return self._stage_sums(rows)
 
-        if cur.rowcount == 0:
-            raise InvalidInputError(
-                f"Takeoff line not found: takeoff_id={takeoff_id} item_code={item_code}"
-            )
\ No newline at end of file
+    @staticmethod
+    def _stage_sums(rows: list[sqlite3.Row]) -> tuple[TakeoffStageSums, ...]:
+        return tuple(
+            TakeoffStageSums(
+                takeoff_id=str(r["takeoff_id"]),
+                stage=Stage(str(r["stage"])),
+                subtotal=cents_to_decimal(int(r["subtotal_cents"] or 0)),
+                tax=cents_to_decimal(int(r["tax_cents"] or 0)),
+                line_count=int(r["line_count"]),
+            )
+            for r in rows
+        )
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import hashlib
 import sqlite3
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from decimal import Decimal
 from uuid import uuid4
-import hashlib
 
 from app.application.errors import InvalidInputError
+from app.domain.money import DEFAULT_MONEY_ENGINE, cents_to_decimal
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
 from app.domain.takeoff_record import TakeoffRecord
+from app.domain.totals import (
+    GrandTotals,
+    StageTotals,
+    grand_totals_from_stages,
+    stage_totals_from_sums,
+)
+from app.infrastructure.sqlite_takeoff_line_repository import (
+    INSERT_TAKEOFF_LINE_SQL,
+    takeoff_line_row,
+)
+from app.infrastructure.sqlite_totals import insert_version_totals, refresh_takeoff_totals
 
 
 @dataclass(frozen=True)
@@ -43,9 +57,43 @@ class TakeoffVersionLineSnapshot:
     created_at: str | None
 
 
+@dataclass(frozen=True)
+class ProjectSnapshotVersion:
+    takeoff_id: str
+    template_code: str
+    version_id: str
+    version_number: int
+    line_count: int
+    integrity_hash: str
+
+
+def _normalize_version_metadata(
+    *,
+    notes: str | None,
+    created_by: str | None,
+    reason: str | None,
+) -> tuple[str | None, str | None]:
+    normalized_created_by = str(created_by).strip() if created_by is not None else None
+    if normalized_created_by == "":
+        normalized_created_by = None
+
+    normalized_reason = str(reason).strip() if reason is not None else None
+    if normalized_reason == "":
+        normalized_reason = None
+
+    # Backward compatibility: if caller only sends notes, use it as reason too.
+    if normalized_reason is None and notes is not None:
+        stripped_notes = str(notes).strip()
+        normalized_reason = stripped_notes or None
+
+    return normalized_created_by, normalized_reason
+
+
 @dataclass(frozen=True)
 class SqliteTakeoffRepository:
     conn: sqlite3.Connection
+    # Per-line arithmetic used for takeoff_version_totals (see MONEY_ENGINES).
+    money_engine: str = DEFAULT_MONEY_ENGINE
 
     # -------------------------
     # Takeoffs
@@ -57,7 +105,8 @@ class SqliteTakeoffRepository:
             self.conn.execute(
                 """
                 INSERT INTO takeoffs (
-                    takeoff_id, project_code, template_code, tax_rate, valve_discount, is_locked, updated_at
+                    takeoff_id, project_code, template_code, tax_rate, valve_discount, is_locked,
+                    updated_at
                 )
                 VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
                 """,
@@ -75,6 +124,53 @@ class SqliteTakeoffRepository:
             self.conn.rollback()
             raise
 
+    def create_many(
+        self, seeded: Sequence[tuple[TakeoffRecord, Sequence[TakeoffLineSnapshot]]]
+    ) -> None:
+        """Insert takeoffs with their lines in one transaction.
+
+        Takeoffs and lines are each written with a single executemany; cached
+        totals for the new takeoffs are computed in SQL afterwards.
+        """
+        if not seeded:
+            return
+
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(
+                """
+                INSERT INTO takeoffs (
+                    takeoff_id, project_code, template_code, tax_rate, valve_discount, is_locked,
+                    updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
+                """,
+                [
+                    (
+                        t.takeoff_id,
+                        t.project_code,
+                        t.template_code,
+                        str(t.tax_rate),
+                        str(t.valve_discount),
+                        1 if t.is_locked else 0,
+                    )
+                    for t, _ in seeded
+                ],
+            )
+            self.conn.executemany(
+                INSERT_TAKEOFF_LINE_SQL,
+                [takeoff_line_row(ln) for _, lines in seeded for ln in lines],
+            )
+            refresh_takeoff_totals(
+                self.conn,
+                takeoff_ids=[t.takeoff_id for t, _ in seeded],
+                money_engine=self.money_engine,
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
     def get(self, takeoff_id: str) -> TakeoffRecord:
         row = self.conn.execute(
             """
@@ -182,7 +278,7 @@ class SqliteTakeoffRepository:
             str(Decimal(str(valve_discount_snapshot))),
         )
 
-    def _build_integrity_hash(
+    def _integrity_hasher(
         self,
         *,
         takeoff_id: str,
@@ -190,8 +286,7 @@ class SqliteTakeoffRepository:
         template_code_snapshot: str,
         tax_rate_snapshot: Decimal,
         valve_discount_snapshot: Decimal,
-        rows: list[dict[str, str]],
-    ) -> str:
+    ) -> hashlib._Hash:
         hash_builder = hashlib.sha256()
 
         header = self._canonical_version_header(
@@ -203,22 +298,46 @@ class SqliteTakeoffRepository:
         )
         for part in header:
             hash_builder.update(part.encode())
+        return hash_builder
+
+    @staticmethod
+    def _update_integrity_hash(
+        hash_builder: hashlib._Hash, r: Mapping[str, str | None]
+    ) -> None:
+        hash_builder.update(str(r["item_code"]).encode())
+        hash_builder.update(str(r["qty"]).encode())
+        hash_builder.update(str(r["unit_price_snapshot"]).encode())
+        hash_builder.update(str(r["taxable_snapshot"]).encode())
+        hash_builder.update(str(r["stage"]).encode())
+        hash_builder.update(str(r["factor"]).encode())
+        hash_builder.update(str(r["sort_order"]).encode())
+        # schema v2: include full snapshot fields
+        if "description_snapshot" in r:
+            hash_builder.update((r["description_snapshot"] or "").encode())
+        if "details_snapshot" in r:
+            hash_builder.update((r["details_snapshot"] or "").encode())
+        if "notes" in r:
+            hash_builder.update((r["notes"] or "").encode())
 
-        for r in sorted(rows, key=lambda x: x["item_code"]):
-            hash_builder.update(r["item_code"].encode())
-            hash_builder.update(r["qty"].encode())
-            hash_builder.update(r["unit_price_snapshot"].encode())
-            hash_builder.update(r["taxable_snapshot"].encode())
-            hash_builder.update(r["stage"].encode())
-            hash_builder.update(r["factor"].encode())
-            hash_builder.update(r["sort_order"].encode())
-            # schema v2: include full snapshot fields
-            if "description_snapshot" in r:
-                hash_builder.update((r["description_snapshot"] or "").encode())
-            if "details_snapshot" in r:
-                hash_builder.update((r["details_snapshot"] or "").encode())
-            if "notes" in r:
-                hash_builder.update((r["notes"] or "").encode())
+    def _build_integrity_hash(
+        self,
+        *,
+        takeoff_id: str,
+        project_code_snapshot: str,
+        template_code_snapshot: str,
+        tax_rate_snapshot: Decimal,
+        valve_discount_snapshot: Decimal,
+        rows: Sequence[Mapping[str, str | None]],
+    ) -> str:
+        hash_builder = self._integrity_hasher(
+            takeoff_id=takeoff_id,
+            project_code_snapshot=project_code_snapshot,
+            template_code_snapshot=template_code_snapshot,
+            tax_rate_snapshot=tax_rate_snapshot,
+            valve_discount_snapshot=valve_discount_snapshot,
+        )
+        for r in sorted(rows, key=lambda x: str(x["item_code"])):
+            self._update_integrity_hash(hash_builder, r)
 
         return hash_builder.hexdigest()
 
@@ -245,196 +364,317 @@ class SqliteTakeoffRepository:
 
         # Validate exists + get pinned context
         t = self.get(takeoff_id=takeoff_id)
+        normalized_created_by, normalized_reason = _normalize_version_metadata(
+            notes=notes, created_by=created_by, reason=reason
+        )
 
-        project_code_snapshot = t.project_code
-        template_code_snapshot = t.template_code
-        tax_rate_snapshot = t.tax_rate
-        valve_discount_snapshot = t.valve_discount
-
-        row = self.conn.execute(
-            "SELECT COALESCE(MAX(version_number), 0) FROM takeoff_versions WHERE takeoff_id = ?",
-            (takeoff_id,),
-        ).fetchone()
-        next_version = int(row[0]) + 1
-
-        version_id = str(uuid4())
-        normalized_created_by = str(created_by).strip() if created_by is not None else None
-        if normalized_created_by == "":
-            normalized_created_by = None
+        self.conn.execute("BEGIN")
+        try:
+            created = self._snapshot_takeoffs(
+                (t,),
+                notes=notes,
+                created_by=normalized_created_by,
+                reason=normalized_reason,
+            )
+            self.conn.commit()
+            return created[0].version_id
+        except Exception:
+            self.conn.rollback()
+            raise
 
-        normalized_reason = str(reason).strip() if reason is not None else None
-        if normalized_reason == "":
-            normalized_reason = None
+    def create_project_snapshot(
+        self,
+        *,
+        project_code: str,
+        notes: str | None = None,
+        created_by: str | None = None,
+        reason: str | None = None,
+    ) -> tuple[ProjectSnapshotVersion, ...]:
+        """Snapshot and lock every takeoff of a project in one transaction.
 
-        # Backward compatibility: if caller only sends notes, use it as reason too.
-        if normalized_reason is None and notes is not None:
-            stripped_notes = str(notes).strip()
-            normalized_reason = stripped_notes or None
+        All-or-nothing: either every takeoff gets a new version and is locked,
+        or nothing is written. One commit (one fsync) for the whole project.
+        """
+        normalized_created_by, normalized_reason = _normalize_version_metadata(
+            notes=notes, created_by=created_by, reason=reason
+        )
 
         self.conn.execute("BEGIN")
         try:
-            raw_rows = self.conn.execute(
+            takeoffs = self.list_for_project(project_code=project_code)
+            created = self._snapshot_takeoffs(
+                takeoffs,
+                notes=notes,
+                created_by=normalized_created_by,
+                reason=normalized_reason,
+            )
+            self.conn.execute(
                 """
-                SELECT
-                    item_code,
-                    qty,
-                    notes,
-                    description_snapshot,
-                    details_snapshot,
-                    unit_price_snapshot,
-                    taxable_snapshot,
-                    COALESCE(stage, 'final') AS stage,
-                    COALESCE(factor, '1.0') AS factor,
-                    COALESCE(sort_order, 0) AS sort_order
-                FROM takeoff_lines
-                WHERE takeoff_id = ?
+                UPDATE takeoffs
+                SET is_locked = 1, updated_at = datetime('now')
+                WHERE project_code = ?
                 """,
-                (takeoff_id,),
-            ).fetchall()
+                (project_code,),
+            )
+            self.conn.commit()
+            return created
+        except Exception:
+            self.conn.rollback()
+            raise
 
-            rows: list[dict[str, str | None]] = []
-            for r in raw_rows:
-                rows.append(
-                    {
-                        "item_code": str(r["item_code"]),
-                        "qty": str(Decimal(str(r["qty"]))),
-                        "notes": str(r["notes"]) if r["notes"] is not None else None,
-                        "description_snapshot": str(r["description_snapshot"]),
-                        "details_snapshot": str(r["details_snapshot"]) if r["details_snapshot"] is not None else None,
-                        "unit_price_snapshot": str(Decimal(str(r["unit_price_snapshot"]))),
-                        "taxable_snapshot": str(int(r["taxable_snapshot"])),
-                        "stage": str(r["stage"] or "final"),
-                        "factor": str(Decimal(str(r["factor"] or "1.0"))),
-                        "sort_order": str(int(r["sort_order"] or 0)),
-                    }
-                )
+    def _snapshot_takeoffs(
+        self,
+        takeoffs: tuple[TakeoffRecord, ...],
+        *,
+        notes: str | None,
+        created_by: str | None,
+        reason: str | None,
+    ) -> tuple[ProjectSnapshotVersion, ...]:
+        """Write one new version per takeoff. Caller owns the transaction."""
+        if not takeoffs:
+            return ()
+
+        takeoff_ids = [t.takeoff_id for t in takeoffs]
+        placeholders = ", ".join("?" for _ in takeoff_ids)
+        latest = {
+            str(r[0]): int(r[1])
+            for r in self.conn.execute(
+                f"""
+                SELECT takeoff_id, MAX(version_number)
+                FROM takeoff_versions
+                WHERE takeoff_id IN ({placeholders})
+                GROUP BY takeoff_id
+                """,
+                takeoff_ids,
+            )
+        }
+
+        pending: dict[str, tuple[TakeoffRecord, str, int, int]] = {}
+        hashers: dict[str, hashlib._Hash] = {}
+        for t in takeoffs:
+            version_id = str(uuid4())
+            version_number = latest.get(t.takeoff_id, 0) + 1
+            self._insert_version_header(
+                version_id=version_id,
+                takeoff_id=t.takeoff_id,
+                project_code_snapshot=t.project_code,
+                template_code_snapshot=t.template_code,
+                next_version=version_number,
+                notes=notes,
+                created_by=created_by,
+                reason=reason,
+                tax_rate_snapshot=t.tax_rate,
+                valve_discount_snapshot=t.valve_discount,
+            )
+            line_count = self._insert_version_lines(version_id=version_id, takeoff_id=t.takeoff_id)
+            pending[t.takeoff_id] = (t, version_id, version_number, line_count)
+            hashers[t.takeoff_id] = self._integrity_hasher(
+                takeoff_id=t.takeoff_id,
+                project_code_snapshot=t.project_code,
+                template_code_snapshot=t.template_code,
+                tax_rate_snapshot=t.tax_rate,
+                valve_discount_snapshot=t.valve_discount,
+            )
 
-            integrity_hash = ""
+        version_ids = {takeoff_id: p[1] for takeoff_id, p in pending.items()}
+        hashes = self._stream_integrity_hashes(hashers=hashers, version_ids=version_ids)
+        insert_version_totals(
+            self.conn, version_ids=version_ids.values(), money_engine=self.money_engine
+        )
 
-            self.conn.execute(
-                """
-                INSERT INTO takeoff_versions (
-                    version_id,
-                    takeoff_id,
-                    project_code_snapshot,
-                    template_code_snapshot,
-                    version_number,
-                    notes,
-                    created_by,
-                    reason,
-                    tax_rate_snapshot,
-                    valve_discount_snapshot,
-                    integrity_hash,
-                    integrity_schema_version,
-                    created_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                """,
-                (
-                    version_id,
-                    takeoff_id,
-                    project_code_snapshot,
-                    template_code_snapshot,
-                    next_version,
-                    notes,
-                    normalized_created_by,
-                    normalized_reason,
-                    str(tax_rate_snapshot),
-                    str(valve_discount_snapshot),
-                    integrity_hash,
-                    2,
-                ),
+        self.conn.executemany(
+            "UPDATE takeoff_versions SET integrity_hash = ? WHERE version_id = ?",
+            [(hashes[takeoff_id], version_ids[takeoff_id]) for takeoff_id in takeoff_ids],
+        )
+
+        return tuple(
+            ProjectSnapshotVersion(
+                takeoff_id=t.takeoff_id,
+                template_code=t.template_code,
+                version_id=version_id,
+                version_number=version_number,
+                line_count=line_count,
+                integrity_hash=hashes[t.takeoff_id],
             )
+            for t, version_id, version_number, line_count in pending.values()
+        )
 
-            for r in rows:
-                self.conn.execute(
-                    """
-                    INSERT INTO takeoff_version_lines (
-                        version_id,
-                        item_code,
-                        qty,
-                        notes,
-                        description_snapshot,
-                        details_snapshot,
-                        unit_price_snapshot,
-                        taxable_snapshot,
-                        stage,
-                        factor,
-                        sort_order,
-                        created_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                    """,
+    def _insert_version_header(
+        self,
+        *,
+        version_id: str,
+        takeoff_id: str,
+        project_code_snapshot: str,
+        template_code_snapshot: str,
+        next_version: int,
+        notes: str | None,
+        created_by: str | None,
+        reason: str | None,
+        tax_rate_snapshot: Decimal,
+        valve_discount_snapshot: Decimal,
+    ) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO takeoff_versions (
+                version_id,
+                takeoff_id,
+                project_code_snapshot,
+                template_code_snapshot,
+                version_number,
+                notes,
+                created_by,
+                reason,
+                tax_rate_snapshot,
+                valve_discount_snapshot,
+                integrity_hash,
+                integrity_schema_version,
+                created_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+            """,
+            (
+                version_id,
+                takeoff_id,
+                project_code_snapshot,
+                template_code_snapshot,
+                next_version,
+                notes,
+                created_by,
+                reason,
+                str(tax_rate_snapshot),
+                str(valve_discount_snapshot),
+                "",
+                2,
+            ),
+        )
+
+    def _insert_version_lines(self, *, version_id: str, takeoff_id: str) -> int:
+        """Copy takeoff_lines into takeoff_version_lines with one INSERT ... SELECT."""
+        cur = self.conn.execute(
+            """
+            INSERT INTO takeoff_version_lines (
+                version_id,
+                item_code,
+                qty,
+                notes,
+                description_snapshot,
+                details_snapshot,
+                unit_price_snapshot,
+                taxable_snapshot,
+                stage,
+                factor,
+                sort_order,
+                created_at
+            )
+            SELECT
+                ?,
+                item_code,
+                qty,
+                notes,
+                description_snapshot,
+                details_snapshot,
+                unit_price_snapshot,
+                taxable_snapshot,
+                COALESCE(NULLIF(stage, ''), 'final'),
+                COALESCE(NULLIF(factor, ''), '1.0'),
+                COALESCE(sort_order, 0),
+                datetime('now')
+            FROM takeoff_lines
+            WHERE takeoff_id = ?
+            """,
+            (version_id, takeoff_id),
+        )
+        return int(cur.rowcount)
+
+    def _stream_integrity_hashes(
+        self,
+        *,
+        hashers: dict[str, hashlib._Hash],
+        version_ids: dict[str, str],
+    ) -> dict[str, str]:
+        """Feed the v2 integrity hash of every pending version from one cursor pass.
+
+        ORDER BY item_code (BINARY collation) matches Python's str ordering used
+        by _build_integrity_hash, so the digest is byte-identical to hashing the
+        persisted version lines.
+
+        Values are persisted in canonical form (str(Decimal), int flags). Lines
+        written by this app are already canonical; any legacy row that is not
+        gets rewritten to exactly what the previous row-by-row copy stored.
+        """
+        takeoff_ids = list(hashers)
+        placeholders = ", ".join("?" for _ in takeoff_ids)
+        cursor = self.conn.execute(
+            f"""
+            SELECT
+                takeoff_id,
+                item_code,
+                qty,
+                notes,
+                description_snapshot,
+                details_snapshot,
+                unit_price_snapshot,
+                taxable_snapshot,
+                COALESCE(NULLIF(stage, ''), 'final') AS stage,
+                COALESCE(NULLIF(factor, ''), '1.0') AS factor,
+                COALESCE(sort_order, 0) AS sort_order
+            FROM takeoff_lines
+            WHERE takeoff_id IN ({placeholders})
+            ORDER BY takeoff_id, item_code
+            """,
+            takeoff_ids,
+        )
+
+        fixups: list[tuple[str, str, int, str, int, str, str]] = []
+        for r in cursor:
+            canonical: dict[str, str | None] = {
+                "item_code": str(r["item_code"]),
+                "qty": str(Decimal(str(r["qty"]))),
+                "notes": str(r["notes"]) if r["notes"] is not None else None,
+                "description_snapshot": str(r["description_snapshot"]),
+                "details_snapshot": (
+                    str(r["details_snapshot"]) if r["details_snapshot"] is not None else None
+                ),
+                "unit_price_snapshot": str(Decimal(str(r["unit_price_snapshot"]))),
+                "taxable_snapshot": str(int(r["taxable_snapshot"])),
+                "stage": str(r["stage"]),
+                "factor": str(Decimal(str(r["factor"]))),
+                "sort_order": str(int(r["sort_order"])),
+            }
+            takeoff_id = str(r["takeoff_id"])
+            self._update_integrity_hash(hashers[takeoff_id], canonical)
+
+            if (
+                canonical["qty"] != r["qty"]
+                or canonical["unit_price_snapshot"] != r["unit_price_snapshot"]
+                or canonical["factor"] != r["factor"]
+                or not isinstance(r["taxable_snapshot"], int)
+                or not isinstance(r["sort_order"], int)
+            ):
+                fixups.append(
                     (
-                        version_id,
-                        str(r["item_code"]),
-                        str(r["qty"]),
-                        r["notes"],
-                        str(r["description_snapshot"]),
-                        r["details_snapshot"],
-                        str(r["unit_price_snapshot"]),
-                        int(str(r["taxable_snapshot"])),
-                        str(r["stage"]),
-                        str(r["factor"]),
-                        int(str(r["sort_order"])),
-                    ),
+                        str(canonical["qty"]),
+                        str(canonical["unit_price_snapshot"]),
+                        int(str(canonical["taxable_snapshot"])),
+                        str(canonical["factor"]),
+                        int(str(canonical["sort_order"])),
+                        version_ids[takeoff_id],
+                        str(canonical["item_code"]),
+                    )
                 )
 
-            # Now fetch the persisted rows and compute the canonical integrity hash
-            persisted_rows_raw = self.conn.execute(
+        if fixups:
+            self.conn.executemany(
                 """
-                SELECT
-                    item_code,
-                    qty,
-                    notes,
-                    description_snapshot,
-                    details_snapshot,
-                    unit_price_snapshot,
-                    taxable_snapshot,
-                    COALESCE(stage, 'final') AS stage,
-                    COALESCE(factor, '1.0') AS factor,
-                    COALESCE(sort_order, 0) AS sort_order
-                FROM takeoff_version_lines
-                WHERE version_id = ?
+                UPDATE takeoff_version_lines
+                SET qty = ?, unit_price_snapshot = ?, taxable_snapshot = ?, factor = ?,
+                    sort_order = ?
+                WHERE version_id = ? AND item_code = ?
                 """,
-                (version_id,),
-            ).fetchall()
-
-            persisted_rows = [
-                {
-                    "item_code": str(r["item_code"]),
-                    "qty": str(r["qty"]),
-                    "notes": str(r["notes"]) if r["notes"] is not None else None,
-                    "description_snapshot": str(r["description_snapshot"]),
-                    "details_snapshot": str(r["details_snapshot"]) if r["details_snapshot"] is not None else None,
-                    "unit_price_snapshot": str(r["unit_price_snapshot"]),
-                    "taxable_snapshot": str(int(r["taxable_snapshot"])),
-                    "stage": str(r["stage"] or "final"),
-                    "factor": str(r["factor"] or "1.0"),
-                    "sort_order": str(int(r["sort_order"] or 0)),
-                }
-                for r in persisted_rows_raw
-            ]
-
-            integrity_hash = self._build_integrity_hash(
-                takeoff_id=takeoff_id,
-                project_code_snapshot=project_code_snapshot,
-                template_code_snapshot=template_code_snapshot,
-                tax_rate_snapshot=tax_rate_snapshot,
-                valve_discount_snapshot=valve_discount_snapshot,
-                rows=persisted_rows,
+                fixups,
             )
 
-            self.conn.execute(
-                "UPDATE takeoff_versions SET integrity_hash = ? WHERE version_id = ?",
-                (integrity_hash, version_id),
-            )
-
-            self.conn.commit()
-            return version_id
-        except Exception:
-            self.conn.rollback()
-            raise
+        return {takeoff_id: h.hexdigest() for takeoff_id, h in hashers.items()}
 
     def list_versions(self, *, takeoff_id: str) -> tuple[TakeoffVersionRecord, ...]:
         rows = self.conn.execute(
@@ -481,6 +721,43 @@ class SqliteTakeoffRepository:
             )
         return tuple(out)
 
+    def version_grand_totals(self, *, takeoff_id: str) -> dict[str, GrandTotals]:
+        """Grand totals of every version of a takeoff, read from takeoff_version_totals."""
+        rows = self.conn.execute(
+            """
+            SELECT
+                v.version_id AS version_id,
+                v.valve_discount_snapshot AS valve_discount_snapshot,
+                vt.subtotal_cents AS subtotal_cents,
+                vt.tax_cents AS tax_cents
+            FROM takeoff_versions v
+            LEFT JOIN takeoff_version_totals vt ON vt.version_id = v.version_id
+            WHERE v.takeoff_id = ?
+            """,
+            (takeoff_id,),
+        ).fetchall()
+
+        stages: dict[str, list[StageTotals]] = {}
+        valve_discounts: dict[str, Decimal] = {}
+        for r in rows:
+            version_id = str(r["version_id"])
+            valve_discounts[version_id] = Decimal(str(r["valve_discount_snapshot"]))
+            per_version = stages.setdefault(version_id, [])
+            if r["subtotal_cents"] is not None:
+                per_version.append(
+                    stage_totals_from_sums(
+                        subtotal=cents_to_decimal(int(r["subtotal_cents"] or 0)),
+                        tax=cents_to_decimal(int(r["tax_cents"] or 0)),
+                    )
+                )
+
+        return {
+            version_id: grand_totals_from_stages(
+                per_version, valve_discount=valve_discounts[version_id]
+            )
+            for version_id, per_version in stages.items()
+        }
+
     def get_version(self, *, version_id: str) -> TakeoffVersionRecord:
         r = self.conn.execute(
             """
@@ -613,7 +890,9 @@ class SqliteTakeoffRepository:
                     "qty": str(r["qty"]),
                     "notes": str(r["notes"]) if r["notes"] is not None else None,
                     "description_snapshot": str(r["description_snapshot"]),
-                    "details_snapshot": str(r["details_snapshot"]) if r["details_snapshot"] is not None else None,
+                    "details_snapshot": (
+                        str(r["details_snapshot"]) if r["details_snapshot"] is not None else None
+                    ),
                     "unit_price_snapshot": str(r["unit_price_snapshot"]),
                     "taxable_snapshot": str(int(r["taxable_snapshot"])),
                     "stage": str(r["stage"] or "final"),
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.domain.fixed_point import to_scaled
+from app.domain.money import DEFAULT_MONEY_ENGINE, line_cents_engine
+
+# Materialized stage totals.
+#
+# takeoff_totals         one row per (takeoff, stage) with lines; kept current by
+#                        SqliteTakeoffLineRepository on every line write.
+# takeoff_version_totals one row per (version, stage); written once with the
+#                        version (versions are immutable).
+#
+# Amounts are stored as integer cents of the sum of line-level q2 values, which
+# is exactly what calc_stage_totals adds up before its final q2.
+
+
+@dataclass(frozen=True)
+class TotalsRebuildReport:
+    takeoff_rows: int
+    version_rows: int
+    stale_takeoff_rows: int
+    stale_version_rows: int
+
+
+def _bool(value: object) -> bool:
+    if isinstance(value, (str, bytes, bytearray)):
+        return int(value) != 0
+    return bool(value)
+
+
+def line_cents(
+    price: object,
+    qty: object,
+    factor: object,
+    taxable: object,
+    tax_rate: object,
+    *,
+    money_engine: str = DEFAULT_MONEY_ENGINE,
+) -> tuple[int, int]:
+    """(subtotal, tax) of one stored line in integer cents."""
+    # Same defaults the Python path applies on top of list_for_takeoff:
+    # NULL stage -> final (done in SQL), NULL / zero factor -> 1.0.
+    if factor in (None, "") or to_scaled(factor)[0] == 0:
+        factor = "1.0"
+    return line_cents_engine(money_engine)(
+        price=price,
+        qty=qty,
+        factor=factor,
+        taxable=_bool(taxable),
+        tax_rate=tax_rate,
+    )
+
+
+def register_totals_functions(
+    conn: sqlite3.Connection, *, money_engine: str = DEFAULT_MONEY_ENGINE
+) -> None:
+    """
+    SQLite has no decimal type (SUM over TEXT goes through REAL), so each line
+    is rounded by the selected money engine inside a deterministic SQL function
+    that returns integer cents; SQL then sums exact integers.
+    """
+    line_cents_engine(money_engine)  # validate the name up front
+
+    def _subtotal(
+        price: object, qty: object, factor: object, taxable: object, tax_rate: object
+    ) -> int | None:
+        if price is None:
+            return None  # LEFT JOIN row of a takeoff without lines
+        return line_cents(price, qty, factor, taxable, tax_rate, money_engine=money_engine)[0]
+
+    def _tax(
+        price: object, qty: object, factor: object, taxable: object, tax_rate: object
+    ) -> int | None:
+        if price is None:
+            return None
+        return line_cents(price, qty, factor, taxable, tax_rate, money_engine=money_engine)[1]
+
+    conn.create_function("line_subtotal_cents", 5, _subtotal, deterministic=True)
+    conn.create_function("line_tax_cents", 5, _tax, deterministic=True)
+
+
+def _in_clause(column: str, values: list[str] | None) -> tuple[str, list[str]]:
+    if values is None:
+        return "", []
+    return f"AND {column} IN ({', '.join('?' for _ in values)})", values
+
+
+def _computed_takeoff_totals(
+    conn: sqlite3.Connection, takeoff_ids: list[str] | None, money_engine: str
+) -> dict[tuple[str, str], tuple[int, int, int]]:
+    register_totals_functions(conn, money_engine=money_engine)
+    where, params = _in_clause("l.takeoff_id", takeoff_ids)
+    rows = conn.execute(
+        f"""
+        SELECT
+            l.takeoff_id,
+            COALESCE(NULLIF(l.stage, ''), 'final') AS stage,
+            SUM(line_subtotal_cents(
+                l.unit_price_snapshot, l.qty, l.factor, l.taxable_snapshot, t.tax_rate
+            )),
+            SUM(line_tax_cents(
+                l.unit_price_snapshot, l.qty, l.factor, l.taxable_snapshot, t.tax_rate
+            )),
+            COUNT(*)
+        FROM takeoff_lines l
+        JOIN takeoffs t ON t.takeoff_id = l.takeoff_id
+        WHERE 1 = 1 {where}
+        GROUP BY l.takeoff_id, COALESCE(NULLIF(l.stage, ''), 'final')
+        """,
+        params,
+    ).fetchall()
+    return {(str(r[0]), str(r[1])): (int(r[2]), int(r[3]), int(r[4])) for r in rows}
+
+
+def _computed_version_totals(
+    conn: sqlite3.Connection, version_ids: list[str] | None, money_engine: str
+) -> dict[tuple[str, str], tuple[int, int, int]]:
+    register_totals_functions(conn, money_engine=money_engine)
+    where, params = _in_clause("vl.version_id", version_ids)
+    rows = conn.execute(
+        f"""
+        SELECT
+            vl.version_id,
+            COALESCE(NULLIF(vl.stage, ''), 'final') AS stage,
+            SUM(line_subtotal_cents(
+                vl.unit_price_snapshot, vl.qty, vl.factor, vl.taxable_snapshot, v.tax_rate_snapshot
+            )),
+            SUM(line_tax_cents(
+                vl.unit_price_snapshot, vl.qty, vl.factor, vl.taxable_snapshot, v.tax_rate_snapshot
+            )),
+            COUNT(*)
+        FROM takeoff_version_lines vl
+        JOIN takeoff_versions v ON v.version_id = vl.version_id
+        WHERE 1 = 1 {where}
+        GROUP BY vl.version_id, COALESCE(NULLIF(vl.stage, ''), 'final')
+        """,
+        params,
+    ).fetchall()
+    return {(str(r[0]), str(r[1])): (int(r[2]), int(r[3]), int(r[4])) for r in rows}
+
+
+def _stored(
+    conn: sqlite3.Connection, table: str, key: str
+) -> dict[tuple[str, str], tuple[int, int, int]]:
+    rows = conn.execute(
+        f"""
+        SELECT {key}, stage, subtotal_cents, tax_cents, line_count
+        FROM {table}
+        WHERE line_count > 0
+        """
+    ).fetchall()
+    return {(str(r[0]), str(r[1])): (int(r[2]), int(r[3]), int(r[4])) for r in rows}
+
+
+def _stale_count(
+    stored: dict[tuple[str, str], tuple[int, int, int]],
+    computed: dict[tuple[str, str], tuple[int, int, int]],
+) -> int:
+    return sum(1 for k in stored.keys() | computed.keys() if stored.get(k) != computed.get(k))
+
+
+def refresh_takeoff_totals(
+    conn: sqlite3.Connection,
+    *,
+    takeoff_ids: Iterable[str] | None = None,
+    money_engine: str = DEFAULT_MONEY_ENGINE,
+) -> None:
+    """Recompute takeoff_totals from takeoff_lines. Caller owns the transaction."""
+    ids = list(takeoff_ids) if takeoff_ids is not None else None
+    computed = _computed_takeoff_totals(conn, ids, money_engine)
+    where, params = _in_clause("takeoff_id", ids)
+    conn.execute(f"DELETE FROM takeoff_totals WHERE 1 = 1 {where}", params)
+    conn.executemany(
+        """
+        INSERT INTO takeoff_totals (takeoff_id, stage, subtotal_cents, tax_cents, line_count)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(k[0], k[1], *v) for k, v in computed.items()],
+    )
+
+
+def insert_version_totals(
+    conn: sqlite3.Connection,
+    *,
+    version_ids: Iterable[str] | None = None,
+    money_engine: str = DEFAULT_MONEY_ENGINE,
+) -> None:
+    """Write takeoff_version_totals from takeoff_version_lines. Caller owns the transaction."""
+    ids = list(version_ids) if version_ids is not None else None
+    computed = _computed_version_totals(conn, ids, money_engine)
+    where, params = _in_clause("version_id", ids)
+    conn.execute(f"DELETE FROM takeoff_version_totals WHERE 1 = 1 {where}", params)
+    conn.executemany(
+        """
+        INSERT INTO takeoff_version_totals (
+            version_id, stage, subtotal_cents, tax_cents, line_count
+        )
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(k[0], k[1], *v) for k, v in computed.items()],
+    )
+
+
+def rebuild_totals(
+    conn: sqlite3.Connection, *, money_engine: str = DEFAULT_MONEY_ENGINE
+) -> TotalsRebuildReport:
+    """
+    Regenerate both totals tables from the line tables in one transaction and
+    verify the stored rows match a fresh computation afterwards.
+
+    stale_* counts (takeoff|version, stage) groups that differed before the rebuild.
+    """
+    conn.execute("BEGIN")
+    try:
+        stale_takeoffs = _stale_count(
+            _stored(conn, "takeoff_totals", "takeoff_id"),
+            _computed_takeoff_totals(conn, None, money_engine),
+        )
+        stale_versions = _stale_count(
+            _stored(conn, "takeoff_version_totals", "version_id"),
+            _computed_version_totals(conn, None, money_engine),
+        )
+
+        refresh_takeoff_totals(conn, money_engine=money_engine)
+        insert_version_totals(conn, money_engine=money_engine)
+
+        takeoff_rows = _stored(conn, "takeoff_totals", "takeoff_id")
+        version_rows = _stored(conn, "takeoff_version_totals", "version_id")
+        if (
+            _stale_count(takeoff_rows, _computed_takeoff_totals(conn, None, money_engine))
+            or _stale_count(version_rows, _computed_version_totals(conn, None, money_engine))
+        ):
+            raise RuntimeError("Totals verification failed after rebuild")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return TotalsRebuildReport(
+        takeoff_rows=len(takeoff_rows),
+        version_rows=len(version_rows),
+        stale_takeoff_rows=stale_takeoffs,
+        stale_version_rows=stale_versions,
+    )
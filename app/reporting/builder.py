@@ -4,6 +4,7 @@ from datetime import datetime
 
 from app.domain.stage import Stage
 from app.domain.takeoff import Takeoff
+from app.domain.totals import TotalsAccumulator
 from app.reporting.models import ReportLine, ReportSection, TakeoffReport
 
 __all__ = ["build_takeoff_report"]
@@ -31,17 +32,18 @@ def build_takeoff_report(
 
     - Sections map 1:1 to Stage (Ground/Topout/Final)
     - Lines are sorted by (sort_order, item_number, item_code) via Takeoff.lines_for_stage()
-    - Totals are computed via domain calculation logic (TakeoffLine.totals / Takeoff.stage_totals / Takeoff.grand_totals)
+    - Line, stage and grand totals come from one TotalsAccumulator pass over the lines
     """
     created = created_at or datetime.now()
 
     stages: tuple[Stage, ...] = (Stage.GROUND, Stage.TOPOUT, Stage.FINAL)
     sections: list[ReportSection] = []
+    acc = TotalsAccumulator(tax_rate=takeoff.tax_rate)
 
     for st in stages:
         report_lines: list[ReportLine] = []
         for ln in takeoff.lines_for_stage(st):
-            t = ln.totals(tax_rate=takeoff.tax_rate)
+            t = acc.add(ln.as_input())
             item_number = ln.item.item_number or ln.item.code
             report_lines.append(
                 ReportLine(
@@ -56,15 +58,15 @@ def build_takeoff_report(
                 )
             )
 
-        subtotal, tax, total = takeoff.stage_totals(st)
+        stage_totals = acc.stage_totals(st)
 
         sections.append(
             ReportSection(
                 title=_stage_title(st),
                 lines=tuple(report_lines),
-                subtotal=subtotal,
-                tax=tax,
-                total=total,
+                subtotal=stage_totals.subtotal,
+                tax=stage_totals.tax,
+                total=stage_totals.total,
             )
         )
 
@@ -78,5 +80,5 @@ def build_takeoff_report(
         created_at=created,
         tax_rate=takeoff.tax_rate,
         sections=tuple(sections),
-        grand_totals=takeoff.grand_totals(),
+        grand_totals=acc.grand_totals(valve_discount=takeoff.valve_discount),
     )
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""Benchmark ImportItemsFromCsv over a synthetic item CSV.
+
+Generates a supplier-style CSV (default 1,000,000 rows, with a sprinkling of
+duplicate ITEM NUMBERs and invalid prices/flags) and imports it into a fresh
+SQLite DB in bulk mode once per --workers value. Reports from all runs are
+checked for equality (same counts, same row-numbered errors).
+
+Usage:
+    python -m scripts.bench_import_items [--rows 1000000] [--workers 1,2,4]
+        [--chunk-size 5000] [--normal]
+
+--normal also times the row-by-row normal mode (one commit per row; slow).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import random
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.application.import_items_from_csv import ImportItemsFromCsv, ImportItemsReport
+from app.config import DB_PROFILES
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+
+
+def _write_csv(path: Path, *, rows: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["ITEM NUMBER", "PRICE$", "DESCRIPTION 1", "DESCRIPTION 2", "TAXABLE"])
+        for i in range(rows):
+            roll = rnd.random()
+            number = f"SUP-{rnd.randrange(rows):07d}" if roll < 0.01 else f"SUP-{i:07d}"
+            price = "N/A" if roll > 0.998 else f"${rnd.randint(1, 250_000) / 100:,.2f}"
+            taxable = "maybe" if 0.5 < roll < 0.501 else rnd.choice(["TRUE", "FALSE", "1", "0"])
+            w.writerow([number, price, f"Part {i}", rnd.choice(["", "Chrome", "PVC"]), taxable])
+
+
+def _import(
+    csv_path: Path, db_path: Path, *, bulk: bool, workers: int, chunk_size: int
+) -> tuple[float, ImportItemsReport]:
+    conn = SqliteDb(path=db_path, tuning=DB_PROFILES["bulk_import"]).connect()
+    try:
+        use_case = ImportItemsFromCsv(repo=SqliteItemRepository(conn=conn))
+        start = time.perf_counter()
+        report = use_case(csv_path=csv_path, bulk=bulk, workers=workers, chunk_size=chunk_size)
+        return time.perf_counter() - start, report
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}")
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--normal", action="store_true")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "items.csv"
+        start = time.perf_counter()
+        _write_csv(csv_path, rows=args.rows)
+        size_mb = csv_path.stat().st_size / 1e6
+        elapsed = time.perf_counter() - start
+        print(f"generated {args.rows:,} rows ({size_mb:.1f} MB) in {elapsed:.1f}s")
+        print()
+
+        runs = [("bulk", int(w)) for w in args.workers.split(",")]
+        if args.normal:
+            runs.insert(0, ("normal", 1))
+
+        print(f"{'mode':>6} | {'workers':>7} | {'seconds':>8} | {'rows/s':>9}")
+        baseline: ImportItemsReport | None = None
+        for n, (mode, workers) in enumerate(runs):
+            seconds, report = _import(
+                csv_path,
+                Path(tmp) / f"bench{n}.db",
+                bulk=mode == "bulk",
+                workers=workers,
+                chunk_size=args.chunk_size,
+            )
+            if baseline is None:
+                baseline = report
+            elif (report.errors, report.inserted_or_updated) != (
+                baseline.errors,
+                baseline.inserted_or_updated,
+            ):
+                raise SystemExit(f"Report mismatch for mode={mode} workers={workers}")
+            print(f"{mode:>6} | {workers:>7} | {seconds:>8.2f} | {args.rows / seconds:>9,.0f}")
+
+        assert baseline is not None
+        print()
+        print(
+            f"imported={baseline.inserted_or_updated:,} skipped={baseline.skipped:,} "
+            "(reports identical across runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
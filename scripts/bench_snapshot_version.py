@@ -0,0 +1,208 @@
+"""Benchmark SqliteTakeoffRepository.create_snapshot_version.
+
+Compares the set-based copy (INSERT ... SELECT + streamed hash) against the
+previous row-by-row implementation, reproduced below, at several takeoff sizes.
+Hashes from both paths are checked for equality.
+
+Usage:
+    python -m scripts.bench_snapshot_version [--sizes 50,500,5000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from uuid import uuid4
+
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+
+_LINE_COLUMNS = """
+    item_code, qty, notes, description_snapshot, details_snapshot,
+    unit_price_snapshot, taxable_snapshot,
+    COALESCE(stage, 'final') AS stage,
+    COALESCE(factor, '1.0') AS factor,
+    COALESCE(sort_order, 0) AS sort_order
+"""
+
+
+def _seed(conn: sqlite3.Connection, *, takeoff_id: str, lines: int) -> None:
+    conn.execute(
+        "INSERT OR IGNORE INTO projects (project_code, project_name) VALUES ('P', 'Bench')"
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO templates (template_code, template_name, category) "
+        "VALUES ('T', 'Bench', 'TH')"
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO items "
+        "(internal_item_code, description1, unit_price, default_taxable) "
+        "VALUES (?, ?, ?, 1)",
+        [(f"I{i:05d}", f"Item {i}", str(Decimal("10.25") + i)) for i in range(lines)],
+    )
+    conn.execute(
+        "INSERT INTO takeoffs (takeoff_id, project_code, template_code, tax_rate) "
+        "VALUES (?, 'P', 'T', '0.07')",
+        (takeoff_id,),
+    )
+    conn.executemany(
+        """
+        INSERT INTO takeoff_lines (
+            takeoff_id, item_code, qty, description_snapshot, unit_price_snapshot,
+            taxable_snapshot, stage, factor, sort_order
+        ) VALUES (?, ?, ?, ?, ?, 1, 'final', '1.0', ?)
+        """,
+        [
+            (takeoff_id, f"I{i:05d}", str(i % 7 + 1), f"Item {i}", str(Decimal("10.25") + i), i)
+            for i in range(lines)
+        ],
+    )
+    conn.commit()
+
+
+def _legacy_snapshot(repo: SqliteTakeoffRepository, takeoff_id: str) -> str:
+    """Row-by-row copy + read-back hashing, as create_snapshot_version used to do."""
+    conn = repo.conn
+    t = repo.get(takeoff_id)
+    version_id = str(uuid4())
+    conn.execute("BEGIN")
+    raw = conn.execute(
+        f"SELECT {_LINE_COLUMNS} FROM takeoff_lines WHERE takeoff_id = ?", (takeoff_id,)
+    ).fetchall()
+    rows = [
+        {
+            "item_code": str(r["item_code"]),
+            "qty": str(Decimal(str(r["qty"]))),
+            "notes": r["notes"],
+            "description_snapshot": str(r["description_snapshot"]),
+            "details_snapshot": r["details_snapshot"],
+            "unit_price_snapshot": str(Decimal(str(r["unit_price_snapshot"]))),
+            "taxable_snapshot": str(int(r["taxable_snapshot"])),
+            "stage": str(r["stage"] or "final"),
+            "factor": str(Decimal(str(r["factor"] or "1.0"))),
+            "sort_order": str(int(r["sort_order"] or 0)),
+        }
+        for r in raw
+    ]
+    conn.execute(
+        """
+        INSERT INTO takeoff_versions (
+            version_id, takeoff_id, project_code_snapshot, template_code_snapshot,
+            version_number, tax_rate_snapshot, valve_discount_snapshot,
+            integrity_hash, integrity_schema_version
+        ) VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(version_number), 0) + 1
+                                FROM takeoff_versions WHERE takeoff_id = ?), ?, ?, '', 2)
+        """,
+        (
+            version_id,
+            takeoff_id,
+            t.project_code,
+            t.template_code,
+            takeoff_id,
+            str(t.tax_rate),
+            str(t.valve_discount),
+        ),
+    )
+    for r in rows:
+        conn.execute(
+            """
+            INSERT INTO takeoff_version_lines (
+                version_id, item_code, qty, notes, description_snapshot, details_snapshot,
+                unit_price_snapshot, taxable_snapshot, stage, factor, sort_order, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+            """,
+            (
+                version_id,
+                r["item_code"],
+                r["qty"],
+                r["notes"],
+                r["description_snapshot"],
+                r["details_snapshot"],
+                r["unit_price_snapshot"],
+                int(r["taxable_snapshot"]),
+                r["stage"],
+                r["factor"],
+                int(r["sort_order"]),
+            ),
+        )
+    persisted = conn.execute(
+        f"SELECT {_LINE_COLUMNS} FROM takeoff_version_lines WHERE version_id = ?", (version_id,)
+    ).fetchall()
+    integrity_hash = repo._build_integrity_hash(
+        takeoff_id=takeoff_id,
+        project_code_snapshot=t.project_code,
+        template_code_snapshot=t.template_code,
+        tax_rate_snapshot=t.tax_rate,
+        valve_discount_snapshot=t.valve_discount,
+        rows=[
+            {
+                "item_code": str(r["item_code"]),
+                "qty": str(r["qty"]),
+                "notes": r["notes"],
+                "description_snapshot": str(r["description_snapshot"]),
+                "details_snapshot": r["details_snapshot"],
+                "unit_price_snapshot": str(r["unit_price_snapshot"]),
+                "taxable_snapshot": str(int(r["taxable_snapshot"])),
+                "stage": str(r["stage"] or "final"),
+                "factor": str(r["factor"] or "1.0"),
+                "sort_order": str(int(r["sort_order"] or 0)),
+            }
+            for r in persisted
+        ],
+    )
+    conn.execute(
+        "UPDATE takeoff_versions SET integrity_hash = ? WHERE version_id = ?",
+        (integrity_hash, version_id),
+    )
+    conn.commit()
+    return integrity_hash
+
+
+def _best_of(repeat: int, fn) -> tuple[float, str]:  # type: ignore[no-untyped-def]
+    best = float("inf")
+    result = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="50,500,5000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'lines':>6} | {'legacy ms':>10} | {'set-based ms':>12} | {'speedup':>7}")
+    for size in (int(x) for x in args.sizes.split(",")):
+        with TemporaryDirectory() as tmp:
+            conn = SqliteDb(path=Path(tmp) / "bench.db").connect()
+            try:
+                _seed(conn, takeoff_id="T", lines=size)
+                repo = SqliteTakeoffRepository(conn=conn)
+
+                legacy_s, legacy_hash = _best_of(
+                    args.repeat, lambda repo=repo: _legacy_snapshot(repo, "T")
+                )
+                new_s, version_id = _best_of(
+                    args.repeat, lambda repo=repo: repo.create_snapshot_version(takeoff_id="T")
+                )
+                new_hash = repo.get_version(version_id=version_id).integrity_hash
+                if new_hash != legacy_hash:
+                    raise SystemExit(f"Hash mismatch at {size} lines")
+            finally:
+                conn.close()
+
+        print(
+            f"{size:>6} | {legacy_s * 1000:>10.2f} | {new_s * 1000:>12.2f} | "
+            f"{legacy_s / new_s:>6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
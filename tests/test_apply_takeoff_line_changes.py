@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.application.apply_takeoff_line_changes import (
+    ApplyTakeoffLineChanges,
+    read_line_changes,
+)
+from app.application.errors import InvalidInputError
+from app.application.project_totals import takeoff_totals_from_lines
+from app.domain.item import Item
+from app.domain.project import Project
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template import Template
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+from app.infrastructure.sqlite_totals import rebuild_totals
+
+CODES = [f"ITEM-{i:03d}" for i in range(8)]
+
+
+@pytest.fixture()
+def db_path(tmp_path: Path) -> Path:
+    path = tmp_path / "t.db"
+    conn = SqliteDb(path=path).connect()
+    try:
+        SqliteProjectRepository(conn=conn).upsert(
+            Project(code="P1", name="Palm Glades", contractor=None, foreman=None)
+        )
+        SqliteTemplateRepository(conn=conn).upsert(Template(code="TPL", name="TPL", category="TH"))
+        items = SqliteItemRepository(conn=conn)
+        for n, code in enumerate(CODES):
+            items.upsert(
+                Item(
+                    code=code,
+                    item_number=code,
+                    description=f"Item {n}",
+                    details=None,
+                    unit_price=Decimal("10.125") + n,
+                    taxable=n % 2 == 0,
+                )
+            )
+        SqliteTakeoffRepository(conn=conn).create(
+            TakeoffRecord(
+                takeoff_id="T1",
+                project_code="P1",
+                template_code="TPL",
+                tax_rate=Decimal("0.07"),
+                valve_discount=Decimal("-12.50"),
+            )
+        )
+        SqliteTakeoffLineRepository(conn=conn).bulk_insert(
+            [
+                TakeoffLineSnapshot(
+                    takeoff_id="T1",
+                    item_code=code,
+                    qty=Decimal("2"),
+                    notes=None,
+                    description_snapshot=code,
+                    details_snapshot=None,
+                    unit_price_snapshot=Decimal("10.125") + n,
+                    taxable_snapshot=n % 2 == 0,
+                    stage=Stage.GROUND,
+                )
+                for n, code in enumerate(CODES[:4])
+            ]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+def _write(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "changes.csv"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _lines(path: Path) -> dict[str, tuple[str, str, str]]:
+    conn = SqliteDb(path=path).connect()
+    try:
+        rows = conn.execute("SELECT item_code, qty, stage, factor FROM takeoff_lines ORDER BY 1")
+        return {r[0]: (r[1], r[2], r[3]) for r in rows}
+    finally:
+        conn.close()
+
+
+CHANGES = """action,item_code,qty,stage,factor,sort_order,notes
+update,ITEM-000,5,topout,,,
+update,ITEM-001,,,0.5,,
+delete,ITEM-002,,,,,
+add,ITEM-005,3,,,,new fixture
+add,ITEM-006,1.5,final,2,4,
+"""
+
+
+def test_cli_applies_all_changes_and_prints_delta(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = _write(tmp_path, CHANGES)
+    argv = ["--db-path", str(db_path), "takeoffs", "apply-changes", "--id", "T1"]
+    assert cli.main([*argv, "--file", str(path)]) == 0
+
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "CHANGES applied takeoff=T1 added=2 updated=2 deleted=1"
+    assert [ln.split(" | ")[0] for ln in out[1:]] == ["BEFORE", "AFTER", "DELTA"]
+    assert out[1].endswith("lines=4") and out[2].endswith("lines=5")
+    assert out[3].endswith("lines=+1")
+
+    lines = _lines(db_path)
+    assert sorted(lines) == ["ITEM-000", "ITEM-001", "ITEM-003", "ITEM-005", "ITEM-006"]
+    assert lines["ITEM-000"][:2] == ("5", "topout")
+    assert lines["ITEM-001"] == ("2", "ground", "0.5")
+    assert lines["ITEM-006"] == ("1.5", "final", "2")
+
+    # Cached totals were moved by the same deltas a full rebuild computes.
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        assert rebuild_totals(conn).stale_takeoff_rows == 0
+    finally:
+        conn.close()
+
+
+def test_changes_are_written_in_one_transaction(db_path: Path, tmp_path: Path) -> None:
+    changes = read_line_changes(_write(tmp_path, CHANGES))
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        takeoff_repo = SqliteTakeoffRepository(conn=conn)
+        line_repo = SqliteTakeoffLineRepository(conn=conn)
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        result = ApplyTakeoffLineChanges(
+            takeoff_repo=takeoff_repo,
+            takeoff_line_repo=line_repo,
+            item_repo=SqliteItemRepository(conn=conn),
+        )(takeoff_id="T1", changes=changes)
+        conn.set_trace_callback(None)
+
+        assert len([s for s in statements if s.startswith("BEGIN")]) == 1
+        begin = statements.index("BEGIN IMMEDIATE")
+        lock_checks = [i for i, s in enumerate(statements) if s.startswith("SELECT is_locked")]
+        assert len(lock_checks) == 1 and lock_checks[0] > begin
+        assert len([s for s in statements if s.startswith("DELETE FROM takeoff_lines")]) == 1
+        reference = takeoff_totals_from_lines(
+            takeoff_repo.get(takeoff_id="T1"), line_repo.list_for_takeoff(takeoff_id="T1")
+        )
+        assert result.after.grand == reference.grand
+        assert result.after.line_count == reference.line_count == 5
+    finally:
+        conn.close()
+
+
+def test_invalid_rows_are_all_reported_and_nothing_is_written(
+    db_path: Path, tmp_path: Path
+) -> None:
+    before = _lines(db_path)
+    bad_csv = _write(
+        tmp_path,
+        "action,item_code,qty,stage\n"
+        "update,ITEM-000,-1,\n"
+        "remove,ITEM-001,,\n"
+        "add,ITEM-005,,\n"
+        "delete,ITEM-002,,\n"
+        "delete,ITEM-002,,\n",
+    )
+    with pytest.raises(InvalidInputError) as exc:
+        read_line_changes(bad_csv)
+    message = str(exc.value)
+    for row in (2, 3, 4, 6):
+        assert f"Row {row}:" in message
+    assert "Row 5:" not in message
+
+    # Rows that parse but conflict with the stored lines fail as a whole, too.
+    conflicting = _write(
+        tmp_path,
+        "action,item_code,qty\nupdate,ITEM-000,3\nadd,ITEM-001,1\ndelete,ITEM-007,\n",
+    )
+    argv = ["--db-path", str(db_path), "takeoffs", "apply-changes", "--id", "T1"]
+    assert cli.main([*argv, "--file", str(conflicting)]) == 2
+    assert _lines(db_path) == before
+
+
+def test_locked_takeoff_is_rejected(db_path: Path, tmp_path: Path) -> None:
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        SqliteTakeoffRepository(conn=conn).lock(takeoff_id="T1")
+        line_repo = SqliteTakeoffLineRepository(conn=conn)
+        with pytest.raises(InvalidInputError, match="locked"):
+            line_repo.apply_changes(takeoff_id="T1", deletes=["ITEM-000"])
+        assert len(line_repo.list_for_takeoff(takeoff_id="T1")) == 4
+        assert not conn.in_transaction
+    finally:
+        conn.close()
+
+
+def test_empty_file_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(InvalidInputError, match="No changes"):
+        read_line_changes(_write(tmp_path, "action,item_code\n"))
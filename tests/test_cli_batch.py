@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.infrastructure.sqlite_db import ConnectionCache, SqliteDb
+
+
+def _add(code: str) -> str:
+    return f"projects add --code {code} --name 'Project {code}' --contractor C --foreman F"
+
+
+def _batch(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], lines: list[str], *flags: str
+) -> tuple[int, list[dict[str, object]]]:
+    path = tmp_path / "commands.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    db = ["--db-path", str(tmp_path / "app.db")]
+    code = cli.main([*db, "batch", "--file", str(path), *flags])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return code, records
+
+
+def _project_codes(tmp_path: Path) -> list[str]:
+    conn = SqliteDb(path=tmp_path / "app.db").connect()
+    try:
+        return [r[0] for r in conn.execute("SELECT project_code FROM projects ORDER BY 1")]
+    finally:
+        conn.close()
+
+
+def test_batch_reports_each_command_and_continues_after_errors(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    code, records = _batch(
+        tmp_path,
+        capsys,
+        ["# comment", _add("P1"), "", "projects show --code NOPE", _add("P2"), "projects list"],
+    )
+
+    assert code == 1
+    *commands, summary = records
+    assert [(r["line"], r["status"], r["exit_code"]) for r in commands] == [
+        (2, "ok", 0),
+        (4, "error", 2),
+        (5, "ok", 0),
+        (6, "ok", 0),
+    ]
+    assert commands[1]["stdout"] == "Project not found: NOPE\n"
+    assert "Project P2" in str(commands[3]["stdout"])
+    assert all(isinstance(r["ms"], float) for r in commands)
+    assert summary["summary"] is True
+    assert (summary["ok"], summary["error"], summary["skipped"]) == (3, 1, 0)
+    assert summary["transaction"] is None
+    assert _project_codes(tmp_path) == ["P1", "P2"]
+
+
+def test_transaction_rolls_back_whole_batch_on_first_error(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    code, records = _batch(
+        tmp_path,
+        capsys,
+        [_add("P1"), "projects show --code NOPE", _add("P2")],
+        "--transaction",
+    )
+
+    assert code == 1
+    assert [r.get("status") for r in records[:-1]] == ["ok", "error", "skipped"]
+    assert records[-1]["transaction"] == "rolled_back"
+    assert _project_codes(tmp_path) == []
+
+    code, records = _batch(tmp_path, capsys, [_add("P1"), _add("P2")], "--transaction")
+    assert code == 0
+    assert records[-1]["transaction"] == "committed"
+    assert _project_codes(tmp_path) == ["P1", "P2"]
+
+
+def test_transaction_rejects_per_command_database(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "commands.txt"
+    path.write_text(f"--db-path {tmp_path / 'other.db'} {_add('P1')}\n", encoding="utf-8")
+
+    argv = ["--db-path", str(tmp_path / "app.db"), "batch", "--file", str(path), "--transaction"]
+    assert cli.main(argv) == 2
+    assert "cannot be set per command" in capsys.readouterr().out
+
+
+def test_batch_forwards_the_render_cache_flag(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "commands.txt"
+    path.write_text("cache stats\n", encoding="utf-8")
+    db = ["--db-path", str(tmp_path / "app.db")]
+    cache = ["--render-cache", str(tmp_path / "render_cache")]
+
+    assert cli.main([*db, *cache, "batch", "--file", str(path)]) == 0
+    record = json.loads(capsys.readouterr().out.splitlines()[0])
+    assert record["status"] == "ok" and "entries=0" in str(record["stdout"])
+
+    assert cli.main([*db, "batch", "--file", str(path)]) == 1
+    assert "--render-cache" in capsys.readouterr().out
+
+
+def test_batch_reads_stdin(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO(_add("P1") + "\n"))
+    assert cli.main(["--db-path", str(tmp_path / "app.db"), "batch"]) == 0
+    assert json.loads(capsys.readouterr().out.splitlines()[-1])["ok"] == 1
+
+
+def test_rollback_inside_held_transaction_is_reported(tmp_path: Path) -> None:
+    cache = ConnectionCache()
+    conn = SqliteDb(path=tmp_path / "app.db", connections=cache).connect()
+    try:
+        conn.hold_transaction()
+        conn.execute("BEGIN")  # a repository's own transaction: absorbed
+        conn.execute(
+            "INSERT INTO templates (template_code, template_name, category) VALUES ('T', 'T', 'c')"
+        )
+        conn.commit()  # deferred
+        assert conn.in_transaction
+        conn.rollback()
+        assert conn.held_transaction_lost
+        conn.end_held_transaction(commit=True)
+        assert conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0] == 0
+    finally:
+        cache.close()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import socket
+import sqlite3
+import stat
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from app.cli_daemon import request
+from app.infrastructure.sqlite_db import ConnectionCache, SqliteDb
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_connection_cache_reuses_one_connection_per_db(tmp_path: Path) -> None:
+    cache = ConnectionCache()
+    db = SqliteDb(path=tmp_path / "app.db", connections=cache)
+
+    conn = db.connect()
+    assert db.connect() is conn
+
+    conn.execute(
+        "INSERT INTO templates (template_code, template_name, category) VALUES ('T', 'T', 'c')"
+    )
+    conn.close()  # what a handler does when its command ends: drop uncommitted work
+    assert db.connect() is conn
+    assert conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0] == 0
+
+    cache.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+@pytest.fixture
+def daemon(tmp_path: Path) -> Iterator[Path]:
+    sock = tmp_path / "cli.sock"
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "app.cli", "--db-path", str(tmp_path / "app.db"),
+            "serve", "--socket", str(sock),
+        ],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    deadline = time.monotonic() + 30
+    while not sock.exists():
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            pytest.fail(f"daemon did not start: {proc.communicate()[0]}")
+        time.sleep(0.05)
+    try:
+        yield sock
+    finally:
+        if proc.poll() is None:
+            request(sock, {"control": "stop"})
+        assert proc.wait(timeout=30) == 0
+        assert not sock.exists()
+
+
+def _run(sock: Path, cwd: Path, *argv: str) -> int:
+    return request(sock, {"argv": list(argv), "cwd": str(cwd)})
+
+
+def test_daemon_runs_commands_and_streams_output(
+    daemon: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    db = ["--db-path", "app.db"]  # relative: resolved against the client's cwd
+    add = ["--code", "P1", "--name", "One", "--contractor", "C", "--foreman", "F"]
+    assert _run(daemon, tmp_path, *db, "projects", "add", *add) == 0
+    assert _run(daemon, tmp_path, *db, "projects", "list") == 0
+    out = capsys.readouterr().out
+    assert "PROJECT saved code=P1" in out
+    assert "P1 | One | contractor=C" in out
+
+    assert _run(daemon, tmp_path, "render", "--format", "csv", "--out", "out/sample.csv") == 0
+    assert (tmp_path / "out" / "sample.csv").exists()
+
+    # Failures come back as exit codes and stderr; the daemon keeps serving.
+    assert _run(daemon, tmp_path, *db, "projects", "show", "--code", "NOPE") == 2
+    assert "Project not found: NOPE" in capsys.readouterr().out
+    assert _run(daemon, tmp_path, "projects", "bogus") == 2
+    assert "invalid choice: 'bogus'" in capsys.readouterr().err
+    assert _run(daemon, tmp_path, "serve") == 2
+    assert _run(daemon, tmp_path, *db, "projects", "list") == 0
+
+
+def test_daemon_survives_malformed_requests(
+    daemon: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    for line in (b"not json\n", b"[1, 2]\n", b'{"argv": "projects"}\n'):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(str(daemon))
+            conn.sendall(line)
+            replies = conn.makefile("rb").read().decode("utf-8")
+        assert "Invalid request" in replies
+        assert '{"exit": 2}' in replies
+
+    assert _run(daemon, tmp_path, "--db-path", "app.db", "projects", "list") == 0
+    assert stat.S_IMODE(daemon.stat().st_mode) == 0o600
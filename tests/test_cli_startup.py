@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative `python -X importtime` cost of `import app.cli`, in microseconds.
+# Lazy handler imports put it around 60 ms on a developer laptop (it was ~240 ms
+# when every use case, repository and ReportLab loaded up front); the budget
+# leaves headroom for slow CI machines while still catching an eager import of
+# ReportLab or the whole application layer.
+IMPORT_BUDGET_US = 150_000
+
+# Never needed just to parse arguments or to run non-rendering commands.
+HEAVY_MODULES = ("reportlab", "PIL", "app.infrastructure.pdf_takeoff_reportlab")
+
+
+def _importtime(*args: str) -> dict[str, int]:
+    """Cumulative import time (us) of every module imported by `python -X importtime ...`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        modules[name] = int(cumulative)
+    return modules
+
+
+def _heavy(modules: dict[str, int]) -> list[str]:
+    return sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES or m in HEAVY_MODULES)
+
+
+def test_cli_import_stays_within_budget() -> None:
+    modules = _importtime("-c", "import app.cli")
+
+    assert _heavy(modules) == []
+    assert not [m for m in modules if m.startswith("app.infrastructure.sqlite_")]
+    assert modules["app.cli"] < IMPORT_BUDGET_US, f"import app.cli took {modules['app.cli']} us"
+
+
+def test_non_rendering_command_does_not_load_renderers(tmp_path: Path) -> None:
+    modules = _importtime(
+        "-m", "app.cli", "--db-path", str(tmp_path / "app.db"), "projects", "list"
+    )
+
+    assert "app.infrastructure.sqlite_project_repository" in modules
+    assert _heavy(modules) == []
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+import app.infrastructure.export_manifest as export_manifest
+from app.infrastructure.export_manifest import (
+    ExportManifest,
+    TakeoffExportEntry,
+    files_match,
+    record_files,
+)
+
+
+def test_files_match_hashes_only_files_whose_mtime_moved(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_bytes(b"alpha")
+    b.write_bytes(b"bravo")
+    files = record_files(tmp_path, [a, b])
+
+    hashed: list[Path] = []
+    real_sha256 = export_manifest.file_sha256
+
+    def counting_sha256(path: Path) -> str:
+        hashed.append(path)
+        return real_sha256(path)
+
+    monkeypatch.setattr(export_manifest, "file_sha256", counting_sha256)
+    assert files_match(tmp_path, files)
+    assert hashed == []
+
+    b.write_bytes(b"bravo")  # same bytes, new mtime
+    os.utime(b, ns=(0, files["b.csv"].mtime_ns + 1_000_000))
+    assert files_match(tmp_path, files)
+    assert hashed == [b]
+
+    b.write_bytes(b"BRAVO")  # same size, other bytes
+    os.utime(b, ns=(0, files["b.csv"].mtime_ns + 2_000_000))
+    assert not files_match(tmp_path, files)
+
+    a.write_bytes(b"alpha!")
+    assert not files_match(tmp_path, {"a.csv": files["a.csv"]})
+    a.unlink()
+    assert not files_match(tmp_path, {"a.csv": files["a.csv"]})
+
+
+def test_manifest_round_trips(tmp_path: Path) -> None:
+    out = tmp_path / "deliverable" / "x.pdf"
+    out.parent.mkdir()
+    out.write_bytes(b"%PDF")
+    manifest = ExportManifest(
+        project_code="P1",
+        renderers={"pdf": "1"},
+        summary_hash="s",
+        summary_files={},
+        takeoffs={
+            "T": TakeoffExportEntry(
+                takeoff_id="T",
+                template_code="A",
+                version_id="V",
+                integrity_hash="i",
+                fingerprint="f",
+                files=record_files(tmp_path, [out]),
+            )
+        },
+    )
+    manifest.save(tmp_path)
+    assert ExportManifest.load(tmp_path) == manifest
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import threading
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+import app.infrastructure.json_record_store as record_store
+from app.application.errors import InvalidInputError
+from app.domain.item import Item
+from app.domain.project import Project
+from app.infrastructure.file_item_repository import FileItemRepository
+from app.infrastructure.file_project_repository import FileProjectRepository
+
+
+def _item(code: str, price: str = "1.00", *, is_active: bool = True) -> Item:
+    return Item(
+        code=code,
+        item_number=code,
+        description=f"Item {code}",
+        details=None,
+        unit_price=Decimal(price),
+        taxable=True,
+        is_active=is_active,
+    )
+
+
+@pytest.fixture()
+def parses(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Counts full catalog parses."""
+    calls: list[int] = []
+    real_loads = json.loads
+
+    def counting_loads(text: str) -> object:
+        calls.append(1)
+        return real_loads(text)
+
+    monkeypatch.setattr(record_store.json, "loads", counting_loads)
+    return calls
+
+
+def test_reads_are_served_from_cache(tmp_path: Path, parses: list[int]) -> None:
+    repo = FileItemRepository(path=tmp_path / "items.json")
+    repo.upsert_many([_item("B"), _item("A"), _item("C", is_active=False)])
+
+    for _ in range(50):
+        repo.get("A")
+        repo.get_many(["A", "B"])
+    assert [it.code for it in repo.list()] == ["A", "B"]
+    assert [it.code for it in repo.list(include_inactive=True)] == ["A", "B", "C"]
+    assert parses == []  # writes refresh the cache; nothing was re-read
+
+
+def test_external_write_invalidates_cache(tmp_path: Path, parses: list[int]) -> None:
+    path = tmp_path / "items.json"
+    repo = FileItemRepository(path=path)
+    repo.upsert(_item("A", "1.00"))
+    assert repo.get("A").unit_price == Decimal("1.00")
+
+    FileItemRepository(path=path).upsert(_item("A", "2.00"))
+    assert repo.get("A").unit_price == Decimal("2.00")
+
+    # Same size, different content, written behind the repository's back.
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw[0]["unit_price"] = "3.00"
+    path.write_text(json.dumps(raw, indent=2), encoding="utf-8")
+    assert repo.get("A").unit_price == Decimal("3.00")
+
+    repo.delete("A")
+    with pytest.raises(InvalidInputError):
+        FileItemRepository(path=path).get("A")
+
+
+def test_upsert_many_rewrites_file_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    repo = FileItemRepository(path=tmp_path / "items.json")
+    fsyncs: list[int] = []
+    monkeypatch.setattr(record_store.os, "fsync", fsyncs.append)
+
+    counts = repo.upsert_many(_item(f"I{i:04d}") for i in range(1_000))
+    assert (counts.inserted, counts.updated, counts.unchanged) == (1_000, 0, 0)
+    assert len(fsyncs) == 1
+    assert not (tmp_path / "items.json.tmp").exists()
+    assert len(FileItemRepository(path=tmp_path / "items.json").list()) == 1_000
+
+
+def test_journal_format_appends_and_replays(tmp_path: Path) -> None:
+    path = tmp_path / "items.json"
+    repo = FileItemRepository(path=path, storage_format="journal", compact_after=100)
+    repo.upsert_many([_item("A"), _item("B"), _item("C")])
+    snapshot = path.read_bytes()
+
+    repo.upsert(_item("A", "9.99"))
+    repo.delete("B")
+    assert path.read_bytes() == snapshot  # edits only touch the journal
+    assert len((tmp_path / "items.json.journal").read_text(encoding="utf-8").splitlines()) == 5
+
+    fresh = FileItemRepository(path=path, storage_format="journal")
+    assert [(it.code, it.unit_price) for it in fresh.list()] == [
+        ("A", Decimal("9.99")),
+        ("C", Decimal("1.00")),
+    ]
+
+
+def test_journal_compaction_folds_into_snapshot(tmp_path: Path) -> None:
+    path = tmp_path / "items.json"
+    repo = FileItemRepository(path=path, storage_format="journal", compact_after=5)
+    for i in range(12):
+        repo.upsert(_item(f"I{i:02d}"))
+
+    # Compacted at 5 and 10 entries; two entries remain in the journal.
+    journal = (tmp_path / "items.json.journal").read_text(encoding="utf-8")
+    assert len(journal.splitlines()) == 2
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 10
+
+    repo.compact()
+    assert (tmp_path / "items.json.journal").read_text(encoding="utf-8") == ""
+    # The snapshot is the plain document format.
+    assert len(FileItemRepository(path=path).list()) == 12
+
+
+def test_journal_survives_torn_append(tmp_path: Path) -> None:
+    path = tmp_path / "items.json"
+    repo = FileItemRepository(path=path, storage_format="journal")
+    repo.upsert(_item("A"))
+    with (tmp_path / "items.json.journal").open("a", encoding="utf-8") as f:
+        f.write('{"op":"upsert","record":{"code":"B"')  # crash mid-append
+
+    reopened = FileItemRepository(path=path, storage_format="journal")
+    assert [it.code for it in reopened.list()] == ["A"]
+
+    reopened.upsert(_item("C"))
+    assert [it.code for it in FileItemRepository(path=path, storage_format="journal").list()] == [
+        "A",
+        "C",
+    ]
+
+
+def test_journal_replay_is_idempotent_after_interrupted_compaction(tmp_path: Path) -> None:
+    path = tmp_path / "items.json"
+    repo = FileItemRepository(path=path, storage_format="journal")
+    repo.upsert_many([_item("A"), _item("B")])
+    repo.delete("A")
+    journal = (tmp_path / "items.json.journal").read_bytes()
+
+    repo.compact()
+    # Crash after the snapshot was replaced but before the journal was emptied.
+    (tmp_path / "items.json.journal").write_bytes(journal)
+    assert [it.code for it in FileItemRepository(path=path, storage_format="journal").list()] == [
+        "B"
+    ]
+
+
+def test_journal_append_after_another_writer_refreshes_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "items.json"
+    repo = FileItemRepository(path=path, storage_format="journal")
+    other = FileItemRepository(path=path, storage_format="journal")
+    repo.upsert(_item("A"))
+
+    store = repo._store
+    real_append = store._append
+
+    def racing_append(entries: list[dict[str, object]]) -> bool:
+        other.upsert(_item("B"))  # lands between repo's load() and its append
+        return real_append(entries)
+
+    monkeypatch.setattr(store, "_append", racing_append)
+    repo.upsert(_item("C"))
+
+    assert [it.code for it in repo.list()] == ["A", "B", "C"]
+
+
+def test_append_during_compaction_is_not_lost(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "items.json"
+    repo = FileItemRepository(path=path, storage_format="journal")
+    other = FileItemRepository(path=path, storage_format="journal")
+    repo.upsert(_item("A"))
+
+    store = repo._store
+    real_write_snapshot = store._write_snapshot
+    writer = threading.Thread(target=lambda: other.upsert(_item("B")))
+
+    def racing_write_snapshot(records: dict[str, Item]) -> None:
+        writer.start()  # another process appends while the snapshot is written
+        writer.join(timeout=0.2)
+        assert writer.is_alive()  # blocked on the journal lock
+        real_write_snapshot(records)
+
+    monkeypatch.setattr(store, "_write_snapshot", racing_write_snapshot)
+    repo.compact()
+    writer.join()
+
+    reopened = FileItemRepository(path=path, storage_format="journal")
+    assert [it.code for it in reopened.list()] == ["A", "B"]
+
+
+def test_project_repository_journal_format(tmp_path: Path) -> None:
+    path = tmp_path / "projects.json"
+    repo = FileProjectRepository(path=path, storage_format="journal")
+    repo.upsert(Project(code="P1", name="One", contractor=None, foreman=None))
+    repo.upsert(Project(code="P2", name="Two", contractor=None, foreman=None, is_active=False))
+    repo.delete("P1")
+
+    fresh = FileProjectRepository(path=path, storage_format="journal")
+    assert [p.code for p in fresh.list(include_inactive=True)] == ["P2"]
+    with pytest.raises(InvalidInputError):
+        fresh.get("P1")
+
+    with pytest.raises(ValueError):
+        FileProjectRepository(path=path, storage_format="yaml")
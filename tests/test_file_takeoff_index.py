@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.application.build_sample_takeoff import BuildSampleTakeoff
+from app.application.repositories.takeoff_repository import TakeoffIndexEntry
+from app.domain.takeoff import Takeoff
+from app.infrastructure.file_takeoff_repository import FileTakeoffRepository
+
+
+def _takeoff(project: str, model_group: str) -> Takeoff:
+    sample = BuildSampleTakeoff()()
+    return replace(
+        sample,
+        header=replace(sample.header, project_name=project, model_group_display=model_group),
+    )
+
+
+def test_index_tracks_saves_without_opening_takeoffs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    repo = FileTakeoffRepository(base_dir=tmp_path)
+    a = _takeoff("Palm Glades", "TH 1-2")
+    b = _takeoff("Coral Bay", "SF 40")
+    stored_a = repo.save(a)
+    stored_b = repo.save(replace(b, lines=b.lines * 3))
+
+    def _no_load(self: FileTakeoffRepository, takeoff_id: str) -> Takeoff:
+        raise AssertionError("index queries must not load takeoff files")
+
+    monkeypatch.setattr(FileTakeoffRepository, "load", _no_load)
+
+    entries = {e.id: e for e in repo.list_index()}
+    assert set(entries) == {stored_a.id, stored_b.id}
+    assert entries[stored_a.id].line_count == len(a.lines)
+    assert entries[stored_a.id].grand_total == a.grand_totals().total_after_discount
+    assert entries[stored_b.id].line_count == 3
+
+    assert [e.id for e in repo.find(project="palm")] == [stored_a.id]
+    assert [e.id for e in repo.find(model_group="sf")] == [stored_b.id]
+    assert repo.find(project="palm", model_group="sf") == ()
+
+
+def test_lost_index_is_rebuilt_from_directory(tmp_path: Path) -> None:
+    repo = FileTakeoffRepository(base_dir=tmp_path)
+    ids = {repo.save(_takeoff(f"Project {n}", "TH")).id for n in range(3)}
+    before = {e.id: e for e in repo.list_index()}
+
+    (tmp_path / "index.json").unlink()
+    assert {e.id for e in repo.list_index()} == ids  # rebuilt on demand
+
+    (tmp_path / "index.json").write_text(json.dumps({"version": 1, "entries": []}))
+    assert repo.list_index() == ()
+    assert repo.rebuild_index() == 3
+    after = {e.id: e for e in repo.list_index()}
+    assert {i: (e.project_name, e.line_count, e.grand_total) for i, e in after.items()} == {
+        i: (e.project_name, e.line_count, e.grand_total) for i, e in before.items()
+    }
+
+
+def test_save_rebuilds_a_corrupt_index(tmp_path: Path) -> None:
+    repo = FileTakeoffRepository(base_dir=tmp_path)
+    first = repo.save(_takeoff("Palm Glades", "TH"))
+    (tmp_path / "index.json").write_text("{not json")
+
+    second = repo.save(_takeoff("Coral Bay", "SF"))
+
+    assert {e.id for e in repo.list_index()} == {first.id, second.id}
+
+
+def test_concurrent_saves_all_reach_the_index(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    FileTakeoffRepository(base_dir=tmp_path).rebuild_index()
+    real_write_index = FileTakeoffRepository._write_index
+
+    def slow_write_index(self: FileTakeoffRepository, entries: Iterable[TakeoffIndexEntry]) -> None:
+        time.sleep(0.05)  # widen the read-modify-write window
+        real_write_index(self, entries)
+
+    monkeypatch.setattr(FileTakeoffRepository, "_write_index", slow_write_index)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        stored = list(
+            pool.map(
+                lambda n: FileTakeoffRepository(base_dir=tmp_path).save(_takeoff(f"P{n}", "TH")),
+                range(4),
+            )
+        )
+
+    index = FileTakeoffRepository(base_dir=tmp_path).list_index()
+    assert {e.id for e in index} == {s.id for s in stored}
+
+
+def test_cli_index_commands(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    repo_dir = str(tmp_path / "repo")
+    assert cli.main(["save", "--repo-dir", repo_dir]) == 0
+    assert cli.main(["save", "--repo-dir", repo_dir]) == 0
+    capsys.readouterr()
+
+    assert cli.main(["index", "list", "--repo-dir", repo_dir]) == 0
+    assert "takeoffs=2" in capsys.readouterr().out
+
+    project = BuildSampleTakeoff()().header.project_name
+    assert cli.main(["index", "find", "--repo-dir", repo_dir, "--project", project[:4]]) == 0
+    out = capsys.readouterr().out
+    assert f"project={project}" in out
+    assert "takeoffs=2" in out
+
+    assert cli.main(["index", "rebuild", "--repo-dir", repo_dir]) == 0
+    assert "INDEX rebuilt entries=2" in capsys.readouterr().out
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import random
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from app.domain.fixed_point import round_half_up_div, to_scaled
+from app.domain.money import MONEY_ENGINES, calc_line_cents, line_cents_engine
+from app.domain.stage import Stage
+from app.domain.totals import TakeoffLineInput, TotalsAccumulator
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_totals import rebuild_totals
+
+fixed_line_cents = MONEY_ENGINES["fixed"]
+
+# Property-style checks: many seeded random cases per property, so failures
+# are reproducible from the seed.
+_CASES = 2_000
+
+
+def _rand_decimal(rnd: random.Random, *, max_digits: int, max_scale: int, signed: bool) -> Decimal:
+    scale = rnd.randint(0, max_scale)
+    mantissa = rnd.randint(0, 10 ** rnd.randint(1, max_digits) - 1)
+    if signed and rnd.random() < 0.2:
+        mantissa = -mantissa
+    return Decimal(mantissa).scaleb(-scale)
+
+
+def _rand_line(rnd: random.Random) -> dict[str, object]:
+    price = _rand_decimal(rnd, max_digits=7, max_scale=4, signed=True)
+    if rnd.random() < 0.25:
+        # Force an exact half-cent tie: x.xx5
+        price = Decimal(rnd.randint(-99_999, 99_999) * 10 + 5).scaleb(-3)
+    return {
+        "price": price,
+        "qty": _rand_decimal(rnd, max_digits=4, max_scale=3, signed=False) or Decimal("1"),
+        "factor": Decimal(rnd.choice(["1", "1.0", "0.3", "0.3333", "1.5", "2"])),
+        "taxable": rnd.random() < 0.7,
+        "tax_rate": rnd.choice(
+            [Decimal("0.07"), Decimal("0.065"), Decimal("0.0725"), Decimal("0")]
+        ),
+    }
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fixed_engine_matches_decimal_engine(seed: int) -> None:
+    rnd = random.Random(seed)
+    for _ in range(_CASES):
+        line = _rand_line(rnd)
+        assert fixed_line_cents(**line) == calc_line_cents(**line), line
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_fixed_engine_parses_db_text_like_decimal(seed: int) -> None:
+    rnd = random.Random(seed)
+    for _ in range(_CASES):
+        line = _rand_line(rnd)
+        as_text = {k: (str(v) if isinstance(v, Decimal) else v) for k, v in line.items()}
+        assert fixed_line_cents(**as_text) == calc_line_cents(**line), as_text
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("12.345", (12345, 3)),
+        ("-0.5", (-5, 1)),
+        ("+7", (7, 0)),
+        (".25", (25, 2)),
+        ("1E+1", (10, 0)),
+        ("1.50E-3", (150, 5)),
+        (Decimal("-0.00"), (0, 2)),
+    ],
+)
+def test_to_scaled(text: object, expected: tuple[int, int]) -> None:
+    assert to_scaled(text) == expected
+
+
+def test_round_half_up_div_ties_away_from_zero() -> None:
+    assert round_half_up_div(5, 10) == 1
+    assert round_half_up_div(-5, 10) == -1
+    assert round_half_up_div(4, 10) == 0
+    assert round_half_up_div(-15, 10) == -2
+    assert round_half_up_div(14999, 1000) == 15
+
+
+def test_unknown_engine_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        line_cents_engine("float")
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_accumulator_engines_agree(seed: int) -> None:
+    rnd = random.Random(seed)
+    for _ in range(100):
+        tax_rate = rnd.choice([Decimal("0.07"), Decimal("0.0725")])
+        lines = []
+        for _ in range(rnd.randint(0, 40)):
+            line = _rand_line(rnd)
+            lines.append(
+                TakeoffLineInput(
+                    stage=rnd.choice(list(Stage)),
+                    price=line["price"],
+                    qty=line["qty"],
+                    factor=line["factor"],
+                    taxable=bool(line["taxable"]),
+                )
+            )
+        valve_discount = Decimal(-rnd.randint(0, 5_000)).scaleb(-2)
+
+        ref = TotalsAccumulator(tax_rate=tax_rate)
+        fast = TotalsAccumulator(tax_rate=tax_rate, money_engine="fixed")
+        for ln in lines:
+            assert fast.add(ln) == ref.add(ln)
+        assert fast.all_stage_totals() == ref.all_stage_totals()
+        assert fast.grand_totals(valve_discount=valve_discount) == ref.grand_totals(
+            valve_discount=valve_discount
+        )
+
+
+def test_totals_cache_is_engine_independent(tmp_path: Path) -> None:
+    conn = SqliteDb(path=tmp_path / "t.db").connect()
+    try:
+        rnd = random.Random(9)
+        conn.execute("INSERT INTO projects (project_code, project_name) VALUES ('P', 'P')")
+        conn.execute(
+            "INSERT INTO templates (template_code, template_name, category) VALUES ('T', 'T', 'TH')"
+        )
+        conn.execute(
+            "INSERT INTO takeoffs (takeoff_id, project_code, template_code, tax_rate) "
+            "VALUES ('TK', 'P', 'T', '0.0725')"
+        )
+        rows = []
+        for i in range(300):
+            line = _rand_line(rnd)
+            code = f"I{i:03d}"
+            conn.execute(
+                "INSERT INTO items (internal_item_code, description1, unit_price, default_taxable) "
+                "VALUES (?, ?, '1', 1)",
+                (code, code),
+            )
+            rows.append(
+                (
+                    code,
+                    str(line["qty"]),
+                    str(line["price"]),
+                    int(bool(line["taxable"])),
+                    rnd.choice(list(Stage)).value,
+                    str(line["factor"]),
+                )
+            )
+        conn.executemany(
+            """
+            INSERT INTO takeoff_lines (
+                takeoff_id, item_code, qty, description_snapshot, unit_price_snapshot,
+                taxable_snapshot, stage, factor
+            ) VALUES ('TK', ?, ?, 'x', ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+
+        rebuild_totals(conn, money_engine="decimal")
+        report = rebuild_totals(conn, money_engine="fixed")
+        assert report.takeoff_rows == 3
+        assert report.stale_takeoff_rows == 0
+    finally:
+        conn.close()
@@ -3,8 +3,14 @@ from __future__ import annotations
 from decimal import Decimal
 from pathlib import Path
 
+import pytest
+
+import app.cli as cli
 from app.application.import_items_from_csv import ImportItemsFromCsv
 from app.domain.item import Item
+from app.infrastructure.file_item_repository import FileItemRepository
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
 
 
 class _InMemoryItemRepo:
@@ -51,3 +57,122 @@ def test_import_items_from_csv_skips_bad_rows(tmp_path: Path) -> None:
     c = repo.get("CCC-1")
     assert c.taxable is False
     assert c.details == "Details"
+
+
+def _write_catalog(path: Path, rows: list[str]) -> None:
+    path.write_text(
+        "ITEM NUMBER,PRICE$,DESCRIPTION 1,DESCRIPTION 2,TAXABLE\n" + "\n".join(rows) + "\n",
+        encoding="utf-8",
+    )
+
+
+def test_bulk_import_counts_and_writes_only_changes(tmp_path: Path) -> None:
+    csv_path = tmp_path / "items.csv"
+    conn = SqliteDb(path=tmp_path / "t.db").connect()
+    try:
+        repo = SqliteItemRepository(conn=conn)
+        use_case = ImportItemsFromCsv(repo=repo)
+
+        _write_catalog(csv_path, ["A,$10.00,Desc A,,TRUE", "B,5,Desc B,,FALSE", "C,1,Desc C,,1"])
+        first = use_case(csv_path=csv_path, bulk=True)
+        assert (first.inserted, first.updated, first.unchanged, first.skipped) == (3, 0, 0, 0)
+
+        _write_catalog(
+            csv_path,
+            [
+                "A,$10.00,Desc A,,TRUE",        # unchanged
+                "B,6,Desc B,,FALSE",            # price changed
+                "C,1,Desc C,,0",                # taxable changed
+                "D,2,Desc D,,TRUE",             # new
+                "D,3,Desc D dup,,TRUE",         # duplicate -> skipped
+                "E,oops,Desc E,,TRUE",          # bad price -> skipped
+            ],
+        )
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        report = use_case(csv_path=csv_path, bulk=True)
+        conn.set_trace_callback(None)
+
+        assert (report.inserted, report.updated, report.unchanged, report.skipped) == (1, 2, 1, 2)
+        assert report.inserted_or_updated == 3
+        assert [e.split(":")[0] for e in report.errors] == ["Row 6", "Row 7"]
+        assert len([s for s in statements if s.startswith("BEGIN")]) == 1
+        assert len([s for s in statements if s.lstrip().startswith("UPDATE items")]) == 2
+        assert repo.get("B").unit_price == Decimal("6")
+        assert repo.get("C").taxable is False
+    finally:
+        conn.close()
+
+
+def test_bulk_import_writes_nothing_when_the_file_fails_late(tmp_path: Path) -> None:
+    csv_path = tmp_path / "items.csv"
+    _write_catalog(csv_path, [f"I{i:05d},1,Desc,,TRUE" for i in range(5_000)])
+    with csv_path.open("ab") as f:
+        f.write(b"BAD,1,\xff\xfe,,TRUE\n")  # not UTF-8: fails after earlier chunks were sent
+    conn = SqliteDb(path=tmp_path / "t.db").connect()
+    try:
+        repo = SqliteItemRepository(conn=conn)
+        with pytest.raises(UnicodeDecodeError):
+            ImportItemsFromCsv(repo=repo)(csv_path=csv_path, bulk=True, chunk_size=100)
+        assert repo.list() == ()
+    finally:
+        conn.close()
+
+
+def test_bulk_import_file_repository(tmp_path: Path) -> None:
+    csv_path = tmp_path / "items.csv"
+    repo = FileItemRepository(path=tmp_path / "items.json")
+    _write_catalog(csv_path, ["A,1,Desc A,,TRUE", "B,2,Desc B,,TRUE"])
+    ImportItemsFromCsv(repo=repo)(csv_path=csv_path, bulk=True)
+    mtime = (tmp_path / "items.json").stat().st_mtime_ns
+
+    report = ImportItemsFromCsv(repo=repo)(csv_path=csv_path, bulk=True)
+    assert (report.inserted, report.updated, report.unchanged) == (0, 0, 2)
+    assert (tmp_path / "items.json").stat().st_mtime_ns == mtime  # nothing rewritten
+
+
+def test_cli_items_import_bulk(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    csv_path = tmp_path / "items.csv"
+    _write_catalog(csv_path, ["A,1,Desc A,,TRUE", ",2,No number,,TRUE"])
+    argv = ["--db-path", str(tmp_path / "t.db"), "items", "import", "--csv", str(csv_path)]
+
+    assert cli.main([*argv, "--bulk"]) == 0
+    out = capsys.readouterr().out
+    assert "IMPORT items inserted=1 updated=0 unchanged=0 skipped=1" in out
+    assert "Row 3: ITEM NUMBER is empty" in out
+
+
+def test_parallel_validation_matches_sequential(tmp_path: Path) -> None:
+    rows = []
+    for i in range(400):
+        code = f"IT-{i % 350:04d}"                 # codes 0..49 repeat -> duplicates
+        price = "bad" if i % 37 == 0 else f"${i},{i % 1000:03d}.5"
+        desc = "" if i % 53 == 0 else f"Desc {i}"
+        taxable = "maybe" if i % 61 == 0 else ("yes" if i % 2 else "0")
+        number = "" if i % 97 == 0 else code
+        rows.append(f"{number},\"{price}\",{desc},,{taxable}")
+    csv_path = tmp_path / "items.csv"
+    _write_catalog(csv_path, rows)
+
+    reports = []
+    stored = []
+    for n, workers in enumerate((1, 3)):
+        conn = SqliteDb(path=tmp_path / f"t{n}.db").connect()
+        try:
+            repo = SqliteItemRepository(conn=conn)
+            reports.append(
+                ImportItemsFromCsv(repo=repo)(
+                    csv_path=csv_path, bulk=True, workers=workers, chunk_size=32
+                )
+            )
+            stored.append(repo.list(include_inactive=True))
+        finally:
+            conn.close()
+
+    assert reports[0] == reports[1]
+    assert stored[0] == stored[1]
+    assert reports[0].skipped > 0 and reports[0].inserted > 0
+
+    normal = ImportItemsFromCsv(repo=_InMemoryItemRepo())(csv_path=csv_path, chunk_size=7)
+    assert normal.errors == reports[0].errors
+    assert normal.inserted_or_updated == reports[0].inserted
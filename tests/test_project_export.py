@@ -0,0 +1,518 @@
+from __future__ import annotations
+
+import csv
+import zipfile
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.application.export_project import ExportProject, OutputStatus, ProjectExportResult
+from app.application.export_revision_bundle import mirror_bundle
+from app.application.render_jobs import RenderJob, RenderJobs
+from app.application.render_takeoff_from_snapshot import RenderTakeoffFromVersion
+from app.application.repositories.takeoff_line_repository import TakeoffLineUpdate
+from app.config import AppConfig
+from app.domain.item import Item
+from app.domain.output_format import OutputFormat
+from app.domain.project import Project
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template import Template
+from app.infrastructure.render_cache import RenderCache
+from app.infrastructure.renderer_registry import RendererRegistry
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+from app.reporting.builder import build_takeoff_report
+
+TEMPLATES = ("A", "B", "C")
+
+
+@pytest.fixture()
+def db_path(tmp_path: Path) -> Path:
+    path = tmp_path / "t.db"
+    conn = SqliteDb(path=path).connect()
+    try:
+        SqliteProjectRepository(conn=conn).upsert(
+            Project(code="P1", name="Palm Glades", contractor="Lennar", foreman="JOE")
+        )
+        items = SqliteItemRepository(conn=conn)
+        for n in range(5):
+            items.upsert(
+                Item(
+                    code=f"ITEM-{n}",
+                    item_number=f"ITEM-{n}",
+                    description=f"Item {n}",
+                    details=None,
+                    unit_price=Decimal("10.25") * (n + 1),
+                    taxable=n % 2 == 0,
+                )
+            )
+        takeoffs = SqliteTakeoffRepository(conn=conn)
+        lines = SqliteTakeoffLineRepository(conn=conn)
+        for i, code in enumerate(TEMPLATES):
+            SqliteTemplateRepository(conn=conn).upsert(
+                Template(code=code, name=f"Model {code}", category="TH")
+            )
+            takeoffs.create(
+                TakeoffRecord(
+                    takeoff_id=f"T-{code}",
+                    project_code="P1",
+                    template_code=code,
+                    tax_rate=Decimal("0.07"),
+                )
+            )
+            lines.bulk_insert(
+                [
+                    TakeoffLineSnapshot(
+                        takeoff_id=f"T-{code}",
+                        item_code=f"ITEM-{n}",
+                        qty=Decimal(n + i + 1),
+                        notes=None,
+                        description_snapshot=f"Item {n}",
+                        details_snapshot=None,
+                        unit_price_snapshot=Decimal("10.25") * (n + 1),
+                        taxable_snapshot=n % 2 == 0,
+                        stage=list(Stage)[n % 3],
+                    )
+                    for n in range(5)
+                ]
+            )
+        takeoffs.create_project_snapshot(project_code="P1")
+    finally:
+        conn.close()
+    return path
+
+
+def _export(db_path: Path, out_dir: Path, jobs: int, *, cache: bool = True) -> int:
+    return cli.main(
+        [
+            "--db-path", str(db_path),
+            *(["--render-cache", str(db_path.parent / "render_cache")] if cache else []),
+            "projects", "export", "--code", "P1", "--out-dir", str(out_dir),
+            "--jobs", str(jobs),
+        ]
+    )
+
+
+def _files(root: Path) -> dict[str, Path]:
+    return {str(p.relative_to(root)): p for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def test_parallel_export_matches_serial_export(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    assert _export(db_path, tmp_path / "serial", jobs=1, cache=False) == 0
+    serial_out = capsys.readouterr().out
+    assert _export(db_path, tmp_path / "parallel", jobs=3, cache=False) == 0
+    parallel_out = capsys.readouterr().out
+
+    serial, parallel = _files(tmp_path / "serial"), _files(tmp_path / "parallel")
+    assert list(serial) == list(parallel)
+    assert len([name for name in serial if name.startswith("P1/deliverable/")]) == 9
+    assert len([name for name in serial if name.endswith("takeoff_v1.pdf")]) == 3
+    for name, path in serial.items():
+        if name.endswith(".csv"):
+            assert path.read_bytes() == parallel[name].read_bytes()
+
+    # Per-file report lines come out in job order whatever order workers finish in.
+    def rendered(out: str, root: Path) -> list[str]:
+        return [
+            ln.split(" | ")[0] + " " + ln.rsplit(" | ", 1)[1].replace(str(root.resolve()), "")
+            for ln in out.splitlines()
+            if ln.startswith("RENDERED ")
+        ]
+
+    assert rendered(serial_out, tmp_path / "serial") == rendered(
+        parallel_out, tmp_path / "parallel"
+    )
+    assert "render_jobs=12 | workers=3 | failed=0" in parallel_out
+    assert parallel_out.count("EXPORTED latest snapshot") == 3
+
+
+def test_failed_render_is_reported_and_others_still_written(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    out_dir = tmp_path / "out"
+    blocker = out_dir / "P1" / "deliverable" / "Palm Glades (B).csv"
+    blocker.mkdir(parents=True)  # a directory where the CSV should go
+
+    assert _export(db_path, out_dir, jobs=2) == 1
+    out = capsys.readouterr().out
+
+    assert "failed=1" in out
+    failures = out.split("FAILURES\n", 1)[1].strip().splitlines()
+    assert len(failures) == 1
+    assert failures[0].startswith("csv | ") and "Palm Glades (B).csv" in failures[0]
+    assert (out_dir / "P1" / "deliverable" / "Palm Glades (B).pdf").is_file()
+    assert (out_dir / "P1" / "deliverable" / "Palm Glades (C).csv").is_file()
+    assert out.count("EXPORTED latest snapshot") == 3
+
+
+def _export_project(db_path: Path, out_dir: Path, **kwargs: object) -> ProjectExportResult:
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        return ExportProject(
+            project_repo=SqliteProjectRepository(conn=conn),
+            template_repo=SqliteTemplateRepository(conn=conn),
+            takeoff_repo=SqliteTakeoffRepository(conn=conn),
+            takeoff_line_repo=SqliteTakeoffLineRepository(conn=conn),
+            config=AppConfig(),
+        )(project_code="P1", out_dir=out_dir, jobs=1, **kwargs)
+    finally:
+        conn.close()
+
+
+def test_export_project_use_case_reports_outputs_and_skips_unchanged_takeoffs(
+    db_path: Path, tmp_path: Path
+) -> None:
+    out_dir = tmp_path / "out"
+    first = _export_project(db_path, out_dir)
+    assert first.project_dir == out_dir / "P1"
+    assert first.summary_rebuilt and first.takeoffs_rebuilt == 3 and first.unchanged == ()
+    assert len(first.outputs) == 12  # bundle PDF + PDF/CSV/JSON deliverables per takeoff
+    assert {o.status for o in first.outputs} == {OutputStatus.RENDERED}
+    assert all(o.path.is_file() for o in first.outputs)
+    assert (first.render_jobs, first.cache_hits, first.failed) == (12, 0, ())
+    assert first.bundles_exported == 3 and first.rendered_deliverable_files == 9
+    assert first.manifest.is_file() and first.summary_json.is_file()
+
+    second = _export_project(db_path, out_dir)
+    assert not second.summary_rebuilt and second.takeoffs_rebuilt == 0
+    assert [u.template_code for u in second.unchanged] == ["A", "B", "C"]
+    assert (second.outputs, second.bundles, second.render_jobs) == ((), (), 0)
+
+    assert _export_project(db_path, out_dir, full=True).takeoffs_rebuilt == 3
+
+
+def test_export_project_use_case_keeps_failed_takeoffs_out_of_the_manifest(
+    db_path: Path, tmp_path: Path
+) -> None:
+    out_dir = tmp_path / "out"
+    (out_dir / "P1" / "deliverable" / "Palm Glades (B).csv").mkdir(parents=True)
+
+    result = _export_project(db_path, out_dir)
+    assert [(o.fmt, o.path.name) for o in result.failed] == [
+        (OutputFormat.CSV, "Palm Glades (B).csv")
+    ]
+    assert result.failed[0].error
+    assert result.bundles_exported == 3
+
+    (out_dir / "P1" / "deliverable" / "Palm Glades (B).csv").rmdir()
+    retry = _export_project(db_path, out_dir)
+    assert retry.takeoffs_rebuilt == 1 and retry.failed == ()
+    assert [u.template_code for u in retry.unchanged] == ["A", "C"]
+
+
+def test_render_jobs_returns_outcomes_in_job_order(db_path: Path, tmp_path: Path) -> None:
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        takeoffs = SqliteTakeoffRepository(conn=conn)
+        render = RenderTakeoffFromVersion(
+            project_repo=SqliteProjectRepository(conn=conn),
+            template_repo=SqliteTemplateRepository(conn=conn),
+            takeoff_repo=takeoffs,
+            renderer_factory=RendererRegistry(),
+            config=AppConfig(),
+        )
+        version_id = takeoffs.list_versions(takeoff_id="T-A")[0].version_id
+        report = render.build_report(version_id=version_id)
+        assert report == build_takeoff_report(
+            render.load_takeoff(version_id=version_id),
+            company_name=AppConfig().company_name,
+            created_at=report.created_at,
+        )
+    finally:
+        conn.close()
+
+    jobs = [
+        RenderJob(report=report, fmt=OutputFormat.CSV, out=tmp_path / f"{n}" / "t.csv")
+        for n in range(6)
+    ]
+    outcomes = RenderJobs(renderer_factory=RendererRegistry())(jobs, workers=3)
+    assert [o.out for o in outcomes] == [j.out for j in jobs]
+    assert all(o.ok for o in outcomes)
+    with jobs[0].out.open(encoding="utf-8", newline="") as f:
+        assert any("ITEM-0" in cell for row in csv.reader(f) for cell in row)
+
+
+def test_render_many_builds_the_report_once(db_path: Path, tmp_path: Path) -> None:
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        takeoffs = SqliteTakeoffRepository(conn=conn)
+        version_id = takeoffs.list_versions(takeoff_id="T-B")[0].version_id
+        render = RenderTakeoffFromVersion(
+            project_repo=SqliteProjectRepository(conn=conn),
+            template_repo=SqliteTemplateRepository(conn=conn),
+            takeoff_repo=takeoffs,
+            renderer_factory=RendererRegistry(),
+            config=AppConfig(),
+        )
+        outputs = {fmt: tmp_path / f"t.{fmt.value}" for fmt in OutputFormat}
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        rendered = render.render_many(version_id=version_id, outputs=outputs)
+        conn.set_trace_callback(None)
+    finally:
+        conn.close()
+
+    assert rendered == outputs
+    assert all(path.stat().st_size > 0 for path in outputs.values())
+    assert len([s for s in statements if "FROM takeoff_version_lines" in s]) == 1
+
+
+def test_cli_render_version_writes_each_listed_format(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        versions = SqliteTakeoffRepository(conn=conn).list_versions(takeoff_id="T-A")
+        version_id = versions[0].version_id
+    finally:
+        conn.close()
+
+    db = ["--db-path", str(db_path)]
+    argv = [*db, "takeoffs", "render-version", "--version-id", version_id]
+    assert cli.main([*argv, "--format", "pdf, csv,pdf", "--out", str(tmp_path / "v.pdf")]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        f"PDF generated at: {(tmp_path / 'v.pdf').resolve()}",
+        f"CSV generated at: {(tmp_path / 'v.csv').resolve()}",
+    ]
+
+    argv = [*db, "takeoffs", "render", "--id", "T-A", "--format", "pdf,csv,json"]
+    assert cli.main([*argv, "--out", str(tmp_path / "current" / "t")]) == 0
+    assert sorted(p.name for p in (tmp_path / "current").iterdir()) == ["t.csv", "t.json", "t.pdf"]
+
+    with pytest.raises(SystemExit, match="Invalid --format: 'xls'"):
+        cli.main([*argv[:-1], "pdf,xls", "--out", str(tmp_path / "t")])
+    with pytest.raises(SystemExit, match="--out must have no extension"):
+        cli.main([*argv, "--out", str(tmp_path / "t.txt")])
+
+
+def test_render_cache_is_off_unless_requested(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    assert _export(db_path, tmp_path / "out", jobs=1, cache=False) == 0
+    assert "cache_hits=0" in capsys.readouterr().out
+    assert not (db_path.parent / "render_cache").exists()
+
+    assert cli.main(["--db-path", str(db_path), "cache", "stats"]) != 0
+    assert "--render-cache" in capsys.readouterr().out
+
+
+def test_reexport_of_unchanged_project_is_served_from_the_render_cache(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    assert _export(db_path, tmp_path / "first", jobs=1) == 0
+    first_out = capsys.readouterr().out
+    # The bundle and deliverable PDFs are the same bytes: rendered once, copied once.
+    assert "render_jobs=9 |" in first_out and "cache_hits=3" in first_out
+
+    assert _export(db_path, tmp_path / "second", jobs=2) == 0
+    second_out = capsys.readouterr().out
+    assert "render_jobs=0" in second_out and "cache_hits=12" in second_out
+    assert second_out.count("CACHED ") == 12
+    assert "RENDERED " not in second_out
+    assert second_out.count("EXPORTED latest snapshot") == 3
+
+    first, second = _files(tmp_path / "first"), _files(tmp_path / "second")
+    assert list(first) == list(second)
+    for name, path in first.items():
+        if name.endswith((".pdf", ".csv")):
+            assert path.read_bytes() == second[name].read_bytes(), name
+    # Served as copies: editing an export cannot reach the cache.
+    pdf = "P1/deliverable/Palm Glades (A).pdf"
+    assert first[pdf].stat().st_ino != second[pdf].stat().st_ino
+
+    argv = ["--db-path", str(db_path), "--render-cache", str(tmp_path / "render_cache"), "cache"]
+    assert cli.main([*argv, "stats"]) == 0
+    assert "entries=9 |" in capsys.readouterr().out  # the two PDFs share an entry
+    assert cli.main([*argv, "prune", "--max-bytes", "0"]) == 0
+    assert "removed=9" in capsys.readouterr().out
+    assert _export(db_path, tmp_path / "third", jobs=1) == 0
+    assert "render_jobs=9 |" in capsys.readouterr().out
+
+
+def test_render_many_with_cache_skips_the_report_until_inputs_change(
+    db_path: Path, tmp_path: Path
+) -> None:
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        takeoffs = SqliteTakeoffRepository(conn=conn)
+        projects = SqliteProjectRepository(conn=conn)
+        version_id = takeoffs.list_versions(takeoff_id="T-C")[0].version_id
+        render = RenderTakeoffFromVersion(
+            project_repo=projects,
+            template_repo=SqliteTemplateRepository(conn=conn),
+            takeoff_repo=takeoffs,
+            renderer_factory=RendererRegistry(),
+            config=AppConfig(),
+            render_cache=RenderCache(root=tmp_path / "cache", max_bytes=10**8),
+        )
+
+        def render_csv(out: Path) -> int:
+            statements: list[str] = []
+            conn.set_trace_callback(statements.append)
+            render(version_id=version_id, out=out, fmt=OutputFormat.CSV)
+            conn.set_trace_callback(None)
+            return len([s for s in statements if "FROM takeoff_version_lines" in s])
+
+        assert render_csv(tmp_path / "a.csv") == 1
+        assert render_csv(tmp_path / "b.csv") == 0
+        assert (tmp_path / "a.csv").read_bytes() == (tmp_path / "b.csv").read_bytes()
+
+        # The header is read from the current project, so a rename is a new key.
+        projects.upsert(
+            Project(code="P1", name="Palm Glades II", contractor="Lennar", foreman="JOE")
+        )
+        assert render_csv(tmp_path / "c.csv") == 1
+        assert "Palm Glades II" in (tmp_path / "c.csv").read_text(encoding="utf-8")
+    finally:
+        conn.close()
+
+
+def test_incremental_reexport_rebuilds_only_what_changed(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    out_dir = tmp_path / "out"
+    project_dir = out_dir / "P1"
+    assert _export(db_path, out_dir, jobs=1) == 0
+    assert "takeoffs_rebuilt=3 | takeoffs_skipped=0 | summary=rebuilt" in capsys.readouterr().out
+    summary = next(project_dir.glob("*_project_summary.json"))
+    summary_mtime = summary.stat().st_mtime_ns
+
+    assert _export(db_path, out_dir, jobs=1) == 0
+    out = capsys.readouterr().out
+    assert "takeoffs_rebuilt=0 | takeoffs_skipped=3 | summary=skipped | stale_removed=0" in out
+    assert out.count("UNCHANGED takeoff") == 3
+    assert "render_jobs=0" in out and "EXPORTED" not in out
+    assert summary.stat().st_mtime_ns == summary_mtime
+
+    # A new snapshot of B: only B and the summary files are rebuilt, and B's
+    # v1 bundle is removed.
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        takeoffs = SqliteTakeoffRepository(conn=conn)
+        takeoffs.unlock(takeoff_id="T-B")
+        SqliteTakeoffLineRepository(conn=conn).apply_changes(
+            takeoff_id="T-B",
+            updates=[TakeoffLineUpdate(item_code="ITEM-0", qty=Decimal("40"))],
+        )
+        takeoffs.create_snapshot_version(takeoff_id="T-B")
+    finally:
+        conn.close()
+
+    v1_dir = project_dir / "takeoffs" / "B" / "latest" / "P1" / "B" / "v1"
+    assert v1_dir.is_dir()
+    assert _export(db_path, out_dir, jobs=1) == 0
+    out = capsys.readouterr().out
+    assert "takeoffs_rebuilt=1 | takeoffs_skipped=2 | summary=rebuilt" in out
+    assert "EXPORTED latest snapshot template=B" in out
+    assert out.count("REMOVED stale") == 3  # v1 PDF, metadata.json, phase_summary.txt
+    assert not v1_dir.exists()
+    assert (v1_dir.parent / "v2" / "takeoff_v2.pdf").is_file()
+
+    # A deleted or edited output is noticed through its recorded hash.
+    (project_dir / "deliverable" / "Palm Glades (A).csv").unlink()
+    (project_dir / "deliverable" / "Palm Glades (C).json").write_text("{}", encoding="utf-8")
+    assert _export(db_path, out_dir, jobs=1) == 0
+    out = capsys.readouterr().out
+    assert "takeoffs_rebuilt=2 | takeoffs_skipped=1 | summary=skipped" in out
+    assert (project_dir / "deliverable" / "Palm Glades (A).csv").is_file()
+    restored = project_dir / "deliverable" / "Palm Glades (C).json"
+    assert restored.read_text(encoding="utf-8") != "{}"
+
+    argv = ["--db-path", str(db_path), "projects", "export", "--code", "P1"]
+    assert cli.main([*argv, "--out-dir", str(out_dir), "--jobs", "1", "--full"]) == 0
+    assert "takeoffs_rebuilt=3 | takeoffs_skipped=0 | summary=rebuilt" in capsys.readouterr().out
+
+
+def test_package_copies_files_and_zip_is_deterministic(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    out_dir = tmp_path / "out"
+    assert _export(db_path, out_dir, jobs=1) == 0
+    argv = ["--db-path", str(db_path), "projects", "package", "--code", "P1"]
+    argv += ["--out-dir", str(out_dir)]
+
+    assert cli.main(argv) == 0
+    out = capsys.readouterr().out
+    package_dir = out_dir / "P1_PACKAGE"
+    packaged = _files(package_dir)
+    assert len(packaged) == 3 + 9 + 9  # summaries, deliverables, 3 bundles of 3 files
+    assert f"files={len(packaged)} | copied={len(packaged)} | skipped=0" in out
+    source = out_dir / "P1" / "deliverable" / "Palm Glades (A).pdf"
+    assert not packaged["02_MODELS/Palm Glades (A).pdf"].samefile(source)
+
+    assert cli.main(argv) == 0
+    assert f"copied=0 | skipped={len(packaged)}" in capsys.readouterr().out
+
+    assert cli.main([*argv, "--zip"]) == 0
+    zip_path = out_dir / "P1_PACKAGE.zip"
+    first = zip_path.read_bytes()
+    assert cli.main([*argv, "--zip"]) == 0
+    assert f"files={len(packaged)} |" in capsys.readouterr().out
+    assert zip_path.read_bytes() == first
+
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.namelist() == sorted(packaged)
+        for name, path in packaged.items():
+            assert zf.read(name) == path.read_bytes()
+
+
+def test_reexport_does_not_change_a_built_package(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    out_dir = tmp_path / "out"
+    assert _export(db_path, out_dir, jobs=1) == 0
+    argv = ["--db-path", str(db_path), "projects", "package", "--code", "P1"]
+    assert cli.main([*argv, "--out-dir", str(out_dir)]) == 0
+    package = {name: p.read_bytes() for name, p in _files(out_dir / "P1_PACKAGE").items()}
+
+    # New totals: the summary files are rewritten, and --full rewrites every
+    # bundle's report and metadata in place.
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        SqliteTakeoffRepository(conn=conn).unlock(takeoff_id="T-B")
+        SqliteTakeoffLineRepository(conn=conn).apply_changes(
+            takeoff_id="T-B",
+            updates=[TakeoffLineUpdate(item_code="ITEM-0", qty=Decimal("40"))],
+        )
+    finally:
+        conn.close()
+    export = ["--db-path", str(db_path), "projects", "export", "--code", "P1"]
+    assert cli.main([*export, "--out-dir", str(out_dir), "--jobs", "1", "--full"]) == 0
+    capsys.readouterr()
+
+    summary = next((out_dir / "P1").glob("*_project_summary.json"))
+    assert summary.read_bytes() != package[f"01_SUMMARY/{summary.name}"]
+    after = {name: p.read_bytes() for name, p in _files(out_dir / "P1_PACKAGE").items()}
+    assert after == package
+
+
+def test_mirror_copies_bundles_in_the_background_and_skips_matching_files(
+    db_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    mirror = tmp_path / "mirror"
+    argv = ["--db-path", str(db_path), "projects", "export", "--code", "P1"]
+    argv += ["--out-dir", str(tmp_path / "out"), "--jobs", "1", "--mirror-dir", str(mirror)]
+    assert cli.main(argv) == 0
+    out = capsys.readouterr().out
+    assert out.count("MIRROR export completed at:") == 3
+    assert "(copied=3 skipped=0)" in out
+
+    bundle = tmp_path / "out" / "P1" / "takeoffs" / "A" / "latest" / "P1" / "A" / "v1"
+    mirrored = mirror / "P1" / "A" / "v1"
+    for file in bundle.iterdir():
+        copy = mirrored / file.name
+        assert copy.read_bytes() == file.read_bytes()
+        assert not copy.samefile(file)  # a mirror is a real second copy
+        assert copy.stat().st_mtime_ns == file.stat().st_mtime_ns
+
+    assert mirror_bundle(bundle, mirrored).endswith("(copied=0 skipped=3)")
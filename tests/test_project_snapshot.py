@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.domain.item import Item
+from app.domain.project import Project
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template import Template
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+
+
+def _seed_project(db_path: Path, *, templates: tuple[str, ...]) -> None:
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        SqliteProjectRepository(conn=conn).upsert(
+            Project(code="P1", name="Palm Glades", contractor="Lennar", foreman="JOE")
+        )
+        SqliteItemRepository(conn=conn).upsert(
+            Item(
+                code="ITEM-001",
+                item_number="ITEM-001",
+                description="Kitchen Faucet",
+                details=None,
+                unit_price=Decimal("100.00"),
+                taxable=True,
+            )
+        )
+        takeoffs = SqliteTakeoffRepository(conn=conn)
+        lines = SqliteTakeoffLineRepository(conn=conn)
+        for code in templates:
+            SqliteTemplateRepository(conn=conn).upsert(
+                Template(code=code, name=code, category="TH")
+            )
+            takeoffs.create(
+                TakeoffRecord(
+                    takeoff_id=f"T-{code}",
+                    project_code="P1",
+                    template_code=code,
+                    tax_rate=Decimal("0.07"),
+                )
+            )
+            lines.bulk_insert(
+                [
+                    TakeoffLineSnapshot(
+                        takeoff_id=f"T-{code}",
+                        item_code="ITEM-001",
+                        qty=Decimal("2"),
+                        notes=None,
+                        description_snapshot="Kitchen Faucet",
+                        details_snapshot=None,
+                        unit_price_snapshot=Decimal("100.00"),
+                        taxable_snapshot=True,
+                        stage=Stage.FINAL,
+                    )
+                ]
+            )
+    finally:
+        conn.close()
+
+
+def test_project_snapshot_versions_and_locks_every_takeoff(tmp_path: Path) -> None:
+    db_path = tmp_path / "t.db"
+    _seed_project(db_path, templates=("A", "B", "C"))
+
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        repo = SqliteTakeoffRepository(conn=conn)
+        repo.create_snapshot_version(takeoff_id="T-B")
+
+        created = repo.create_project_snapshot(project_code="P1", reason="release")
+
+        assert {v.takeoff_id for v in created} == {"T-A", "T-B", "T-C"}
+        numbers = {v.takeoff_id: v.version_number for v in created}
+        assert numbers == {"T-A": 1, "T-B": 2, "T-C": 1}
+        for v in created:
+            assert v.line_count == 1
+            stored = repo.get_version(version_id=v.version_id)
+            assert stored.integrity_hash == v.integrity_hash
+            assert stored.reason == "release"
+            assert repo.verify_version_integrity(version_id=v.version_id)[0]
+            assert repo.get(v.takeoff_id).is_locked
+    finally:
+        conn.close()
+
+
+def test_project_snapshot_is_all_or_nothing(tmp_path: Path) -> None:
+    db_path = tmp_path / "t.db"
+    _seed_project(db_path, templates=("A", "B"))
+
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        # Corrupt one line so the canonicalization pass fails mid-project.
+        conn.execute("UPDATE takeoff_lines SET qty = 'oops' WHERE takeoff_id = 'T-B'")
+        conn.commit()
+
+        repo = SqliteTakeoffRepository(conn=conn)
+        with pytest.raises(InvalidOperation, match="ConversionSyntax"):
+            repo.create_project_snapshot(project_code="P1")
+
+        assert conn.execute("SELECT COUNT(*) FROM takeoff_versions").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM takeoff_version_lines").fetchone()[0] == 0
+        assert not repo.get("T-A").is_locked
+    finally:
+        conn.close()
+
+
+def test_cli_projects_snapshot(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    db_path = tmp_path / "t.db"
+    _seed_project(db_path, templates=("A", "B"))
+
+    rc = cli.main(["--db-path", str(db_path), "projects", "snapshot", "--code", "P1"])
+
+    assert rc == 0
+    out = capsys.readouterr().out
+    assert out.count("SNAPSHOT ") == 2
+    assert "PROJECT snapshot created code=P1 takeoffs=2 locked=True" in out
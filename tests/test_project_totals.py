@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+from collections import Counter
+from collections.abc import Sequence
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.application.generate_project_invoice import GenerateProjectInvoice
+from app.application.project_totals import (
+    load_project_takeoff_totals,
+    takeoff_totals_from_lines,
+)
+from app.application.repositories.takeoff_line_repository import (
+    TakeoffLineRepository,
+    TakeoffLineUpdate,
+    TakeoffStageSums,
+)
+from app.application.summarize_project import SummarizeProject
+from app.domain.item import Item
+from app.domain.project import Project
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template import Template
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+from app.infrastructure.sqlite_totals import rebuild_totals
+
+
+class _PerTakeoffLines(TakeoffLineRepository):
+    """Reference line repository: stage sums computed in Python from list_for_takeoff."""
+
+    def __init__(
+        self, takeoffs: SqliteTakeoffRepository, inner: SqliteTakeoffLineRepository
+    ) -> None:
+        self._takeoffs = takeoffs
+        self._inner = inner
+
+    def bulk_insert(self, lines: list[TakeoffLineSnapshot]) -> None:
+        self._inner.bulk_insert(lines)
+
+    def list_for_takeoff(self, takeoff_id: str) -> tuple[TakeoffLineSnapshot, ...]:
+        return self._inner.list_for_takeoff(takeoff_id=takeoff_id)
+
+    def apply_changes(
+        self,
+        *,
+        takeoff_id: str,
+        adds: Sequence[TakeoffLineSnapshot] = (),
+        updates: Sequence[TakeoffLineUpdate] = (),
+        deletes: Sequence[str] = (),
+    ) -> None:
+        self._inner.apply_changes(
+            takeoff_id=takeoff_id, adds=adds, updates=updates, deletes=deletes
+        )
+
+    def stage_sums_for_project(self, *, project_code: str) -> tuple[TakeoffStageSums, ...]:
+        return tuple(
+            row
+            for t in self._takeoffs.list_for_project(project_code=project_code)
+            for row in self.stage_sums_for_takeoff(takeoff_id=t.takeoff_id)
+        )
+
+    def stage_sums_for_takeoff(self, *, takeoff_id: str) -> tuple[TakeoffStageSums, ...]:
+        lines = self.list_for_takeoff(takeoff_id)
+        totals = takeoff_totals_from_lines(self._takeoffs.get(takeoff_id=takeoff_id), lines)
+        counts = Counter(ln.stage or Stage.FINAL for ln in lines)
+        by_stage = {
+            Stage.GROUND: totals.ground,
+            Stage.TOPOUT: totals.topout,
+            Stage.FINAL: totals.final,
+        }
+        return tuple(
+            TakeoffStageSums(
+                takeoff_id=takeoff_id,
+                stage=stage,
+                subtotal=by_stage[stage].subtotal,
+                tax=by_stage[stage].tax,
+                line_count=count,
+            )
+            for stage, count in counts.items()
+        )
+
+
+@pytest.fixture()
+def conn(tmp_path: Path) -> sqlite3.Connection:
+    c = SqliteDb(path=tmp_path / "t.db").connect()
+    yield c
+    c.close()
+
+
+def _seed_random_project(conn: sqlite3.Connection, *, seed: int) -> None:
+    rnd = random.Random(seed)
+    SqliteProjectRepository(conn=conn).upsert(
+        Project(code="P1", name="Palm Glades", contractor=None, foreman=None)
+    )
+    items = SqliteItemRepository(conn=conn)
+    codes = [f"ITEM-{i:03d}" for i in range(40)]
+    for code in codes:
+        items.upsert(
+            Item(
+                code=code,
+                item_number=code,
+                description=code,
+                details=None,
+                unit_price=Decimal("1.00"),
+                taxable=True,
+            )
+        )
+
+    takeoffs = SqliteTakeoffRepository(conn=conn)
+    lines = SqliteTakeoffLineRepository(conn=conn)
+    for n in range(6):
+        tpl = f"TPL-{n}"
+        SqliteTemplateRepository(conn=conn).upsert(Template(code=tpl, name=tpl, category="TH"))
+        takeoff_id = f"T-{n}"
+        takeoffs.create(
+            TakeoffRecord(
+                takeoff_id=takeoff_id,
+                project_code="P1",
+                template_code=tpl,
+                tax_rate=rnd.choice([Decimal("0.07"), Decimal("0.065"), Decimal("0.0725")]),
+                valve_discount=Decimal(-rnd.randint(0, 5000)) / 100,
+            )
+        )
+        if n == 5:
+            continue  # takeoff without lines
+        lines.bulk_insert(
+            [
+                TakeoffLineSnapshot(
+                    takeoff_id=takeoff_id,
+                    item_code=code,
+                    qty=Decimal(rnd.randint(1, 40)) / rnd.choice([1, 2, 4]),
+                    notes=None,
+                    description_snapshot=code,
+                    details_snapshot=None,
+                    unit_price_snapshot=Decimal(rnd.randint(1, 99_999)) / rnd.choice([100, 1000]),
+                    taxable_snapshot=rnd.random() < 0.7,
+                    stage=rnd.choice(list(Stage)),
+                    factor=rnd.choice(
+                        [Decimal("1.0"), Decimal("0.5"), Decimal("0.3333"), Decimal("1.5")]
+                    ),
+                )
+                for code in rnd.sample(codes, rnd.randint(1, len(codes)))
+            ]
+        )
+    conn.commit()
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_sql_aggregation_matches_python_path(conn: sqlite3.Connection, seed: int) -> None:
+    _seed_random_project(conn, seed=seed)
+    takeoff_repo = SqliteTakeoffRepository(conn=conn)
+    line_repo = SqliteTakeoffLineRepository(conn=conn)
+    reference_repo = _PerTakeoffLines(takeoff_repo, line_repo)
+
+    summary = SummarizeProject(takeoff_repo=takeoff_repo, takeoff_line_repo=line_repo)
+    reference = SummarizeProject(takeoff_repo=takeoff_repo, takeoff_line_repo=reference_repo)
+    assert summary(project_code="P1") == reference(project_code="P1")
+
+    invoice = GenerateProjectInvoice(takeoff_repo=takeoff_repo, takeoff_line_repo=line_repo)
+    ref_invoice = GenerateProjectInvoice(
+        takeoff_repo=takeoff_repo, takeoff_line_repo=reference_repo
+    )
+    assert invoice(project_code="P1") == ref_invoice(project_code="P1")
+
+
+def test_project_totals_read_cache_not_lines(conn: sqlite3.Connection) -> None:
+    _seed_random_project(conn, seed=7)
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+
+    SummarizeProject(
+        takeoff_repo=SqliteTakeoffRepository(conn=conn),
+        takeoff_line_repo=SqliteTakeoffLineRepository(conn=conn),
+    )(project_code="P1")
+
+    conn.set_trace_callback(None)
+    assert not any("takeoff_lines" in s for s in statements)
+    assert len([s for s in statements if "takeoff_totals" in s]) == 1
+
+
+def test_half_cent_lines_round_half_up_per_line(conn: sqlite3.Connection) -> None:
+    _seed_random_project(conn, seed=0)
+    conn.execute("DELETE FROM takeoff_lines WHERE takeoff_id = 'T-5'")
+    conn.execute("UPDATE takeoffs SET tax_rate = '0.07' WHERE takeoff_id = 'T-5'")
+    conn.commit()
+    lines = SqliteTakeoffLineRepository(conn=conn)
+    for code in ("ITEM-001", "ITEM-002"):
+        lines.add_line(
+            TakeoffLineSnapshot(
+                takeoff_id="T-5",
+                item_code=code,
+                qty=Decimal("1"),
+                notes=None,
+                description_snapshot="x",
+                details_snapshot=None,
+                unit_price_snapshot=Decimal("0.125"),
+                taxable_snapshot=True,
+                stage=Stage.GROUND,
+            )
+        )
+
+    sums = lines.stage_sums_for_takeoff(takeoff_id="T-5")
+    assert len(sums) == 1
+    # Each line rounds 0.125 -> 0.13; rounding the stage sum instead would give 0.25.
+    assert sums[0].stage is Stage.GROUND
+    assert sums[0].subtotal == Decimal("0.26")
+    assert sums[0].tax == Decimal("0.02")
+    assert sums[0].line_count == 2
+
+
+def test_line_writes_keep_takeoff_totals_current(conn: sqlite3.Connection) -> None:
+    _seed_random_project(conn, seed=11)
+    lines = SqliteTakeoffLineRepository(conn=conn)
+    existing = lines.list_for_takeoff(takeoff_id="T-0")
+
+    lines.update_line(
+        takeoff_id="T-0",
+        item_code=existing[0].item_code,
+        qty=Decimal("3.5"),
+        stage=Stage.TOPOUT if existing[0].stage is not Stage.TOPOUT else Stage.GROUND,
+        factor=Decimal("0.75"),
+    )
+    for ln in existing[1:]:
+        lines.delete_line(takeoff_id="T-0", item_code=ln.item_code)
+
+    report = rebuild_totals(conn)
+    assert report.stale_takeoff_rows == 0
+    assert {s.stage for s in lines.stage_sums_for_takeoff(takeoff_id="T-0")} == {
+        Stage.TOPOUT if existing[0].stage is not Stage.TOPOUT else Stage.GROUND
+    }
+
+
+def test_line_writes_read_the_line_inside_the_write_lock(conn: sqlite3.Connection) -> None:
+    _seed_random_project(conn, seed=11)
+    lines = SqliteTakeoffLineRepository(conn=conn)
+    first, second = lines.list_for_takeoff(takeoff_id="T-0")[:2]
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+
+    lines.update_line(takeoff_id="T-0", item_code=first.item_code, qty=Decimal("2"))
+    lines.delete_line(takeoff_id="T-0", item_code=second.item_code)
+
+    conn.set_trace_callback(None)
+    begins = [i for i, s in enumerate(statements) if s == "BEGIN IMMEDIATE"]
+    reads = [i for i, s in enumerate(statements) if s.startswith("SELECT is_locked")]
+    assert len(begins) == len(reads) == 2
+    assert all(b < r for b, r in zip(begins, reads, strict=True))
+    assert rebuild_totals(conn).stale_takeoff_rows == 0
+
+
+def test_version_totals_written_with_snapshot(conn: sqlite3.Connection) -> None:
+    _seed_random_project(conn, seed=5)
+    takeoffs = SqliteTakeoffRepository(conn=conn)
+    lines = SqliteTakeoffLineRepository(conn=conn)
+    v1 = takeoffs.create_snapshot_version(takeoff_id="T-1")
+    first = lines.list_for_takeoff(takeoff_id="T-1")[0]
+    lines.delete_line(takeoff_id="T-1", item_code=first.item_code)
+    v2 = takeoffs.create_snapshot_version(takeoff_id="T-1")
+
+    totals = takeoffs.version_grand_totals(takeoff_id="T-1")
+    assert set(totals) == {v1, v2}
+    current = load_project_takeoff_totals(
+        takeoff_repo=takeoffs,
+        takeoff_line_repo=_PerTakeoffLines(takeoffs, lines),
+        project_code="P1",
+    )
+    assert totals[v2] == next(t.grand for t in current if t.takeoff.takeoff_id == "T-1")
+    assert totals[v1] != totals[v2]
+    assert rebuild_totals(conn).stale_version_rows == 0
+
+
+def test_cli_db_rebuild_totals_repairs_stale_rows(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    db_path = tmp_path / "t.db"
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        _seed_random_project(conn, seed=3)
+        # Simulate a write that bypassed the repository.
+        conn.execute("UPDATE takeoff_lines SET qty = '999' WHERE takeoff_id = 'T-2'")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert cli.main(["--db-path", str(db_path), "db", "rebuild-totals"]) == 0
+    out = capsys.readouterr().out
+    assert "stale_takeoff_rows=0" not in out
+    assert "verified=True" in out
+
+    assert cli.main(["--db-path", str(db_path), "db", "rebuild-totals"]) == 0
+    assert "stale_takeoff_rows=0 stale_version_rows=0" in capsys.readouterr().out
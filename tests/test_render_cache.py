@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from app.infrastructure.render_cache import RenderCache, render_cache_key
+
+
+def _key(name: str) -> str:
+    return render_cache_key({"name": name})
+
+
+def test_store_fetch_and_lru_eviction(tmp_path: Path) -> None:
+    cache = RenderCache(root=tmp_path / "cache", max_bytes=10_000)
+    for n, name in enumerate("abc"):
+        src = tmp_path / f"{name}.txt"
+        src.write_bytes(name.encode() * 100)
+        cache.store(_key(name), src)
+        entry = next((tmp_path / "cache").rglob(_key(name)))
+        os.utime(entry, (1_000 + n, 1_000 + n))  # a oldest, c newest
+
+    assert cache.stats().entries == 3 and cache.stats().total_bytes == 300
+    assert cache.fetch(_key("a"), tmp_path / "out" / "a.txt")  # a is now most recent
+    assert (tmp_path / "out" / "a.txt").read_bytes() == b"a" * 100
+
+    result = cache.prune(max_bytes=250)
+    assert (result.removed, result.freed_bytes) == (1, 100)
+    assert not cache.fetch(_key("b"), tmp_path / "out" / "b.txt")
+    assert cache.fetch(_key("c"), tmp_path / "out" / "c.txt")
+
+    # Storing beyond max_bytes evicts on the way in.
+    small = RenderCache(root=tmp_path / "cache", max_bytes=200)
+    src = tmp_path / "d.txt"
+    src.write_bytes(b"d" * 100)
+    small.store(_key("d"), src)
+    assert small.stats().total_bytes <= 200
+    assert small.fetch(_key("d"), tmp_path / "out" / "d.txt")
+
+
+def test_served_file_is_replaced_not_written_through(tmp_path: Path) -> None:
+    cache = RenderCache(root=tmp_path / "cache", max_bytes=10_000)
+    src = tmp_path / "src.txt"
+    src.write_bytes(b"cached")
+    cache.store(_key("x"), src)
+
+    out = tmp_path / "out.txt"
+    out.write_bytes(b"stale")
+    assert cache.fetch(_key("x"), out)
+    assert out.read_bytes() == b"cached"
+
+    # Overwriting the source output later never reaches the entry.
+    src.write_bytes(b"edited")
+    assert cache.fetch(_key("x"), tmp_path / "again.txt")
+    assert (tmp_path / "again.txt").read_bytes() == b"cached"
+
+
+def test_output_edited_in_place_does_not_reach_the_entry(tmp_path: Path) -> None:
+    cache = RenderCache(root=tmp_path / "cache", max_bytes=10_000)
+    src = tmp_path / "src.txt"
+    src.write_bytes(b"cached")
+    cache.store(_key("x"), src)
+
+    out = tmp_path / "out.txt"
+    assert cache.fetch(_key("x"), out)
+    with out.open("r+b") as f:  # write through, not replace
+        f.write(b"edited")
+
+    assert cache.fetch(_key("x"), tmp_path / "again.txt")
+    assert (tmp_path / "again.txt").read_bytes() == b"cached"
@@ -11,6 +11,7 @@ from app.domain.item import Item
 from app.domain.project import Project
 from app.domain.template import Template
 from app.domain.template_line import TemplateLine
+from app.infrastructure.file_item_repository import FileItemRepository
 from app.infrastructure.sqlite_db import SqliteDb
 from app.infrastructure.sqlite_item_repository import SqliteItemRepository
 from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
@@ -153,3 +154,68 @@ def test_seed_fails_if_template_has_no_lines(tmp_path: Path) -> None:
 
     finally:
         conn.close()
+
+
+def _item(code: str) -> Item:
+    return Item(
+        code=code,
+        item_number=code,
+        description=code,
+        details=None,
+        unit_price=Decimal("1.00"),
+        taxable=True,
+    )
+
+
+def test_get_many_returns_found_items_only(tmp_path: Path) -> None:
+    conn = _make_conn(tmp_path)
+    try:
+        repos = [
+            SqliteItemRepository(conn=conn),
+            FileItemRepository(path=tmp_path / "items.json"),
+        ]
+        for repo in repos:
+            for code in ("A", "B", "C"):
+                repo.upsert(_item(code))
+
+            found = repo.get_many(["C", "A", "A", "MISSING"])
+            assert set(found) == {"A", "C"}
+            assert found["C"] == repo.get("C")
+            assert repo.get_many([]) == {}
+    finally:
+        conn.close()
+
+
+def test_seed_reports_all_missing_items_at_once(tmp_path: Path) -> None:
+    conn = _make_conn(tmp_path)
+    try:
+        items = SqliteItemRepository(conn=conn)
+        projects = SqliteProjectRepository(conn=conn)
+        templates = SqliteTemplateRepository(conn=conn)
+        template_lines = SqliteTemplateLineRepository(conn=conn)
+
+        projects.upsert(
+            Project(code="PROJ-001", name="Palm Glades", contractor=None, foreman=None)
+        )
+        templates.upsert(Template(code="TH_DEFAULT", name="Townhomes Default", category="TH"))
+        items.upsert(_item("ITEM-001"))
+        # Template lines pointing at items that no longer exist.
+        conn.execute("PRAGMA foreign_keys = OFF")
+        for code in ("ITEM-001", "GONE-2", "GONE-1"):
+            template_lines.upsert(
+                TemplateLine(template_code="TH_DEFAULT", item_code=code, qty=Decimal("1"))
+            )
+
+        use_case = SeedTakeoffFromTemplate(
+            project_repo=projects,
+            template_repo=templates,
+            template_line_repo=template_lines,
+            item_repo=items,
+            takeoff_repo=SqliteTakeoffRepository(conn=conn),
+            takeoff_line_repo=SqliteTakeoffLineRepository(conn=conn),
+        )
+
+        with pytest.raises(InvalidInputError, match="GONE-1, GONE-2"):
+            use_case(project_code="PROJ-001", template_code="TH_DEFAULT")
+    finally:
+        conn.close()
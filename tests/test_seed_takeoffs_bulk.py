@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import replace
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.application.seed_takeoff_from_template import SeedTakeoffFromTemplate
+from app.application.seed_takeoffs_bulk import SeedStatus, SeedTakeoffsBulk
+from app.domain.item import Item
+from app.domain.project import Project
+from app.domain.stage import Stage
+from app.domain.template import Template
+from app.domain.template_line import TemplateLine
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_line_repository import SqliteTemplateLineRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+from app.infrastructure.sqlite_totals import rebuild_totals
+
+
+def _seed_catalog(conn: sqlite3.Connection) -> None:
+    items = SqliteItemRepository(conn=conn)
+    for i in range(5):
+        items.upsert(
+            Item(
+                code=f"ITEM-{i}",
+                item_number=f"ITEM-{i}",
+                description=f"Item {i}",
+                details=None,
+                unit_price=Decimal("10.125") + i,
+                taxable=i % 2 == 0,
+            )
+        )
+    projects = SqliteProjectRepository(conn=conn)
+    for code in ("P1", "P2", "P3"):
+        projects.upsert(
+            Project(
+                code=code,
+                name=code,
+                contractor=None,
+                foreman=None,
+                valve_discount=Decimal("-5.00"),
+            )
+        )
+    templates = SqliteTemplateRepository(conn=conn)
+    lines = SqliteTemplateLineRepository(conn=conn)
+    for n, tpl in enumerate(("TPL-A", "TPL-B")):
+        templates.upsert(Template(code=tpl, name=tpl, category="TH"))
+        for i in range(n, 5):
+            lines.upsert(
+                TemplateLine(
+                    template_code=tpl,
+                    item_code=f"ITEM-{i}",
+                    qty=Decimal(i + 1),
+                    stage=list(Stage)[i % 3],
+                    factor=Decimal("1.5"),
+                    sort_order=i,
+                )
+            )
+    templates.upsert(Template(code="TPL-EMPTY", name="Empty", category="TH"))
+
+
+def _use_cases(conn: sqlite3.Connection) -> tuple[SeedTakeoffsBulk, SeedTakeoffFromTemplate]:
+    repos = dict(
+        project_repo=SqliteProjectRepository(conn=conn),
+        template_repo=SqliteTemplateRepository(conn=conn),
+        template_line_repo=SqliteTemplateLineRepository(conn=conn),
+        item_repo=SqliteItemRepository(conn=conn),
+        takeoff_repo=SqliteTakeoffRepository(conn=conn),
+        takeoff_line_repo=SqliteTakeoffLineRepository(conn=conn),
+    )
+    return SeedTakeoffsBulk(**repos), SeedTakeoffFromTemplate(**repos)
+
+
+@pytest.fixture()
+def conn(tmp_path: Path) -> sqlite3.Connection:
+    c = SqliteDb(path=tmp_path / "t.db").connect()
+    _seed_catalog(c)
+    yield c
+    c.close()
+
+
+def test_bulk_seed_reports_per_pair_outcome(conn: sqlite3.Connection) -> None:
+    bulk, single = _use_cases(conn)
+    existing_id = single(project_code="P2", template_code="TPL-A")
+
+    results = bulk(
+        pairs=[
+            ("P1", "TPL-A"),
+            ("P1", "TPL-B"),
+            ("P2", "TPL-A"),
+            ("P2", "TPL-B"),
+            ("P1", "TPL-A"),
+            ("P3", "TPL-EMPTY"),
+            ("NOPE", "TPL-A"),
+        ],
+        batch_size=2,
+    )
+
+    assert [r.status for r in results] == [
+        SeedStatus.SEEDED,
+        SeedStatus.SEEDED,
+        SeedStatus.SKIPPED,
+        SeedStatus.SEEDED,
+        SeedStatus.SKIPPED,
+        SeedStatus.FAILED,
+        SeedStatus.FAILED,
+    ]
+    assert results[2].takeoff_id == existing_id
+    assert results[4].message == "duplicate pair in input"
+    assert "no lines" in results[5].message
+
+    takeoffs = SqliteTakeoffRepository(conn=conn)
+    lines = SqliteTakeoffLineRepository(conn=conn)
+    seeded = takeoffs.get(results[1].takeoff_id)
+    assert seeded.valve_discount == Decimal("-5.00")
+    assert len(lines.list_for_takeoff(seeded.takeoff_id)) == 4
+    assert rebuild_totals(conn).stale_takeoff_rows == 0
+
+
+def test_bulk_seed_matches_single_seed(conn: sqlite3.Connection) -> None:
+    bulk, single = _use_cases(conn)
+    single_id = single(project_code="P1", template_code="TPL-B")
+    (result,) = bulk(pairs=[("P2", "TPL-B")])
+
+    lines = SqliteTakeoffLineRepository(conn=conn)
+
+    def _strip(takeoff_id: str) -> list[tuple]:
+        return [
+            (ln.item_code, ln.qty, ln.unit_price_snapshot, ln.taxable_snapshot, ln.stage, ln.factor)
+            for ln in lines.list_for_takeoff(takeoff_id)
+        ]
+
+    assert _strip(result.takeoff_id) == _strip(single_id)
+    assert lines.stage_sums_for_takeoff(takeoff_id=result.takeoff_id) == tuple(
+        replace(s, takeoff_id=result.takeoff_id)
+        for s in lines.stage_sums_for_takeoff(takeoff_id=single_id)
+    )
+
+
+def test_bulk_seed_reads_each_template_once(conn: sqlite3.Connection) -> None:
+    bulk, _ = _use_cases(conn)
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    bulk(pairs=[(p, t) for p in ("P1", "P2", "P3") for t in ("TPL-A", "TPL-B")])
+    conn.set_trace_callback(None)
+
+    assert len([s for s in statements if "FROM template_lines" in s]) == 2
+    assert len([s for s in statements if "FROM items" in s]) == 1
+    assert len([s for s in statements if s.startswith("BEGIN")]) == 1
+
+
+def test_cli_seed_bulk_from_manifest(
+    tmp_path: Path, conn: sqlite3.Connection, capsys: pytest.CaptureFixture[str]
+) -> None:
+    conn.commit()
+    manifest = tmp_path / "pairs.csv"
+    manifest.write_text(
+        "project_code,template_code\nP1,TPL-A\nP3,TPL-B\nP1,TPL-A\n", encoding="utf-8"
+    )
+    db_path = tmp_path / "t.db"
+
+    argv = ["--db-path", str(db_path), "takeoffs", "seed-bulk"]
+    assert cli.main([*argv, "--manifest", str(manifest)]) == 0
+    out = capsys.readouterr().out
+    assert "SEEDED project=P1 template=TPL-A" in out
+    assert "SEED-BULK pairs=3 seeded=2 skipped=1 failed=0" in out
+
+    rc = cli.main([*argv, "--projects", "P1,P3", "--templates", "TPL-A,TPL-EMPTY"])
+    assert rc == 1
+    assert "SEED-BULK pairs=4 seeded=1 skipped=1 failed=2" in capsys.readouterr().out
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+
+from app.domain.item import Item
+from app.domain.project import Project
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template import Template
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+
+
+def _seed(conn, *, lines: int) -> str:
+    SqliteProjectRepository(conn=conn).upsert(
+        Project(code="P1", name="Palm Glades", contractor="Lennar", foreman="JOE")
+    )
+    SqliteTemplateRepository(conn=conn).upsert(
+        Template(code="TH", name="Townhomes", category="TH")
+    )
+    items = SqliteItemRepository(conn=conn)
+    for i in range(lines):
+        items.upsert(
+            Item(
+                code=f"ITEM-{i:04d}",
+                item_number=None,
+                description=f"Item {i}",
+                details="Chrome" if i % 2 else None,
+                unit_price=Decimal("12.34") + i,
+                taxable=i % 3 != 0,
+            )
+        )
+
+    takeoff_id = "T1"
+    SqliteTakeoffRepository(conn=conn).create(
+        TakeoffRecord(
+            takeoff_id=takeoff_id,
+            project_code="P1",
+            template_code="TH",
+            tax_rate=Decimal("0.07"),
+            valve_discount=Decimal("-10.00"),
+        )
+    )
+    stages = (Stage.GROUND, Stage.TOPOUT, Stage.FINAL)
+    SqliteTakeoffLineRepository(conn=conn).bulk_insert(
+        [
+            TakeoffLineSnapshot(
+                takeoff_id=takeoff_id,
+                item_code=f"ITEM-{i:04d}",
+                qty=Decimal(i + 1),
+                notes="note" if i % 4 == 0 else None,
+                description_snapshot=f"Item {i}",
+                details_snapshot="Chrome" if i % 2 else None,
+                unit_price_snapshot=Decimal("12.34") + i,
+                taxable_snapshot=i % 3 != 0,
+                stage=stages[i % 3],
+                factor=Decimal("0.3") if i % 5 == 0 else Decimal("1.0"),
+                sort_order=i,
+            )
+            for i in range(lines)
+        ]
+    )
+    return takeoff_id
+
+
+def _legacy_hash(repo: SqliteTakeoffRepository, takeoff_id: str) -> str:
+    """Hash exactly as the row-by-row implementation computed it."""
+    t = repo.get(takeoff_id)
+    rows = [
+        {
+            "item_code": str(r["item_code"]),
+            "qty": str(Decimal(str(r["qty"]))),
+            "notes": str(r["notes"]) if r["notes"] is not None else None,
+            "description_snapshot": str(r["description_snapshot"]),
+            "details_snapshot": (
+                str(r["details_snapshot"]) if r["details_snapshot"] is not None else None
+            ),
+            "unit_price_snapshot": str(Decimal(str(r["unit_price_snapshot"]))),
+            "taxable_snapshot": str(int(r["taxable_snapshot"])),
+            "stage": str(r["stage"] or "final"),
+            "factor": str(Decimal(str(r["factor"] or "1.0"))),
+            "sort_order": str(int(r["sort_order"] or 0)),
+        }
+        for r in repo.conn.execute(
+            "SELECT * FROM takeoff_lines WHERE takeoff_id = ?", (takeoff_id,)
+        ).fetchall()
+    ]
+    return repo._build_integrity_hash(
+        takeoff_id=t.takeoff_id,
+        project_code_snapshot=t.project_code,
+        template_code_snapshot=t.template_code,
+        tax_rate_snapshot=t.tax_rate,
+        valve_discount_snapshot=t.valve_discount,
+        rows=rows,
+    )
+
+
+def test_set_based_snapshot_matches_legacy_hash(tmp_path: Path) -> None:
+    conn = SqliteDb(path=tmp_path / "t.db").connect()
+    try:
+        takeoff_id = _seed(conn, lines=25)
+        repo = SqliteTakeoffRepository(conn=conn)
+
+        expected = _legacy_hash(repo, takeoff_id)
+        version_id = repo.create_snapshot_version(takeoff_id=takeoff_id, reason="test")
+
+        v = repo.get_version(version_id=version_id)
+        assert v.integrity_hash == expected
+        assert v.integrity_schema_version == 2
+        assert len(repo.list_version_lines(version_id=version_id)) == 25
+
+        ok, _, _ = repo.verify_version_integrity(version_id=version_id)
+        assert ok
+    finally:
+        conn.close()
+
+
+def test_snapshot_canonicalizes_legacy_text_values(tmp_path: Path) -> None:
+    conn = SqliteDb(path=tmp_path / "t.db").connect()
+    try:
+        takeoff_id = _seed(conn, lines=3)
+        conn.execute(
+            "UPDATE takeoff_lines SET qty = '+2', unit_price_snapshot = '1E1', stage = '' "
+            "WHERE item_code = 'ITEM-0001'"
+        )
+        conn.commit()
+        repo = SqliteTakeoffRepository(conn=conn)
+
+        expected = _legacy_hash(repo, takeoff_id)
+        version_id = repo.create_snapshot_version(takeoff_id=takeoff_id)
+
+        row = conn.execute(
+            "SELECT qty, unit_price_snapshot, stage FROM takeoff_version_lines "
+            "WHERE version_id = ? AND item_code = 'ITEM-0001'",
+            (version_id,),
+        ).fetchone()
+        assert (row["qty"], row["unit_price_snapshot"], row["stage"]) == ("2", "1E+1", "final")
+        assert repo.get_version(version_id=version_id).integrity_hash == expected
+        assert repo.verify_version_integrity(version_id=version_id)[0]
+    finally:
+        conn.close()
+
+
+def test_snapshot_of_empty_takeoff(tmp_path: Path) -> None:
+    conn = SqliteDb(path=tmp_path / "t.db").connect()
+    try:
+        takeoff_id = _seed(conn, lines=0)
+        repo = SqliteTakeoffRepository(conn=conn)
+        expected = _legacy_hash(repo, takeoff_id)
+        version_id = repo.create_snapshot_version(takeoff_id=takeoff_id)
+        assert repo.get_version(version_id=version_id).integrity_hash == expected
+        assert repo.list_version_lines(version_id=version_id) == ()
+    finally:
+        conn.close()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.infrastructure.sqlite_db import (
+    LATEST_SCHEMA_VERSION,
+    MIGRATIONS,
+    SqliteDb,
+    pending_migrations,
+    schema_version,
+)
+
+
+def test_migrations_are_numbered_in_order() -> None:
+    versions = [m.version for m in MIGRATIONS]
+    assert versions == list(range(1, len(MIGRATIONS) + 1))
+    assert LATEST_SCHEMA_VERSION == versions[-1]
+
+
+def test_connect_migrates_fresh_db_to_latest(tmp_path: Path) -> None:
+    conn = SqliteDb(path=tmp_path / "t.db").connect()
+    try:
+        assert schema_version(conn) == LATEST_SCHEMA_VERSION
+        assert pending_migrations(conn) == ()
+    finally:
+        conn.close()
+
+
+def test_connect_on_current_db_skips_migration_work(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db = SqliteDb(path=tmp_path / "t.db")
+    db.connect().close()
+
+    statements: list[str] = []
+    original_connect = sqlite3.connect
+
+    def _traced_connect(*args: object, **kwargs: object) -> sqlite3.Connection:
+        conn = original_connect(*args, **kwargs)  # type: ignore[arg-type]
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", _traced_connect)
+    db.connect().close()
+
+    assert not any("table_info" in s or "CREATE TABLE" in s for s in statements)
+    assert not any(s.startswith("UPDATE") for s in statements)
+
+
+def test_legacy_unversioned_db_gets_additive_columns(tmp_path: Path) -> None:
+    path = tmp_path / "legacy.db"
+    raw = sqlite3.connect(path)
+    raw.execute(
+        """
+        CREATE TABLE projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_code TEXT NOT NULL UNIQUE,
+            project_name TEXT NOT NULL,
+            contractor_name TEXT NULL,
+            foreman TEXT NULL,
+            status TEXT NOT NULL DEFAULT 'in_course',
+            is_active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """
+    )
+    raw.commit()
+    raw.close()
+
+    conn = SqliteDb(path=path).connect()
+    try:
+        cols = {str(r["name"]) for r in conn.execute("PRAGMA table_info(projects)")}
+        assert "valve_discount" in cols
+        assert schema_version(conn) == LATEST_SCHEMA_VERSION
+    finally:
+        conn.close()
+
+
+def test_auto_migrate_false_leaves_steps_pending(tmp_path: Path) -> None:
+    conn = SqliteDb(path=tmp_path / "t.db", auto_migrate=False).connect()
+    try:
+        assert schema_version(conn) == 0
+        assert len(pending_migrations(conn)) == len(MIGRATIONS)
+    finally:
+        conn.close()
+
+
+def test_cli_db_status_and_migrate(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    db_path = str(tmp_path / "t.db")
+
+    assert cli.main(["--db-path", db_path, "db", "status"]) == 0
+    out = capsys.readouterr().out
+    assert "schema_version=0" in out
+    assert f"pending={len(MIGRATIONS)}" in out
+
+    assert cli.main(["--db-path", db_path, "db", "migrate"]) == 0
+    out = capsys.readouterr().out
+    assert "MIGRATION applied 0001 baseline_schema" in out
+
+    assert cli.main(["--db-path", db_path, "db", "migrate"]) == 0
+    assert "DB up to date" in capsys.readouterr().out
+
+
+def test_totals_migration_backfills_existing_lines(tmp_path: Path) -> None:
+    path = tmp_path / "t.db"
+    conn = SqliteDb(path=path).connect()
+    conn.execute("INSERT INTO projects (project_code, project_name) VALUES ('P', 'P')")
+    conn.execute(
+        "INSERT INTO templates (template_code, template_name, category) VALUES ('T', 'T', 'TH')"
+    )
+    conn.execute(
+        "INSERT INTO items (internal_item_code, description1, unit_price, default_taxable) "
+        "VALUES ('I', 'I', '10.005', 1)"
+    )
+    conn.execute(
+        "INSERT INTO takeoffs (takeoff_id, project_code, template_code, tax_rate) "
+        "VALUES ('TK', 'P', 'T', '0.07')"
+    )
+    conn.execute(
+        """
+        INSERT INTO takeoff_lines (
+            takeoff_id, item_code, qty, description_snapshot, unit_price_snapshot,
+            taxable_snapshot, stage, factor
+        ) VALUES ('TK', 'I', '1', 'I', '10.005', 1, 'final', '1.0')
+        """
+    )
+    # Roll the DB back to schema 1, as if written before the totals tables existed.
+    conn.execute("DROP TABLE takeoff_totals")
+    conn.execute("DROP TABLE takeoff_version_totals")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    conn = SqliteDb(path=path).connect()
+    try:
+        row = conn.execute("SELECT * FROM takeoff_totals WHERE takeoff_id = 'TK'").fetchone()
+        assert (row["stage"], row["subtotal_cents"], row["tax_cents"], row["line_count"]) == (
+            "final",
+            1001,
+            70,
+            1,
+        )
+    finally:
+        conn.close()
+
+
+LOOKUP_INDEXES = (
+    "idx_takeoff_lines_item_code",
+    "idx_template_lines_item_code",
+    "idx_takeoffs_template_code",
+)
+
+
+def test_lookup_index_migration_upgrades_schema_2(tmp_path: Path) -> None:
+    path = tmp_path / "t.db"
+    conn = SqliteDb(path=path).connect()
+    for name in LOOKUP_INDEXES:
+        conn.execute(f"DROP INDEX {name}")
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    conn.close()
+
+    conn = SqliteDb(path=path).connect()
+    try:
+        indexes = {
+            str(r[0])
+            for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        assert set(LOOKUP_INDEXES) <= indexes
+        assert schema_version(conn) == LATEST_SCHEMA_VERSION
+    finally:
+        conn.close()
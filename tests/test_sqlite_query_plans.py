@@ -0,0 +1,379 @@
+"""EXPLAIN QUERY PLAN harness for the SQLite repositories.
+
+Every public repository method (and the sqlite_totals entry points) is run
+against a DB of realistic size while the statements it issues are traced.
+Each traced statement is then explained; a `SCAN <table>` step (a full pass
+over a table or a whole index, including the FK checks SQLite plans for
+DELETEs) fails the test unless the method reads that table in full by design.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from app.domain.item import Item
+from app.domain.project import Project
+from app.domain.stage import Stage
+from app.domain.takeoff_line_snapshot import TakeoffLineSnapshot
+from app.domain.takeoff_record import TakeoffRecord
+from app.domain.template import Template
+from app.domain.template_line import TemplateLine
+from app.infrastructure import sqlite_totals
+from app.infrastructure.sqlite_db import SqliteDb
+from app.infrastructure.sqlite_item_repository import SqliteItemRepository
+from app.infrastructure.sqlite_project_repository import SqliteProjectRepository
+from app.infrastructure.sqlite_takeoff_line_repository import SqliteTakeoffLineRepository
+from app.infrastructure.sqlite_takeoff_repository import SqliteTakeoffRepository
+from app.infrastructure.sqlite_template_line_repository import SqliteTemplateLineRepository
+from app.infrastructure.sqlite_template_repository import SqliteTemplateRepository
+
+ITEMS = 2000
+PROJECTS = 25
+TEMPLATES = 10
+LINES_PER_TAKEOFF = 60
+
+REPOSITORIES = (
+    SqliteItemRepository,
+    SqliteProjectRepository,
+    SqliteTemplateRepository,
+    SqliteTemplateLineRepository,
+    SqliteTakeoffRepository,
+    SqliteTakeoffLineRepository,
+)
+TOTALS_FUNCTIONS = ("refresh_takeoff_totals", "insert_version_totals", "rebuild_totals")
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+_SKIP = re.compile(r"^(BEGIN|COMMIT|ROLLBACK|PRAGMA)\b")
+
+
+def _code(n: int) -> str:
+    return f"ITEM-{n:05d}"
+
+
+def _item(n: int) -> Item:
+    return Item(
+        code=_code(n),
+        item_number=_code(n),
+        description=f"Item {n}",
+        details=None,
+        unit_price=Decimal(n % 500) + Decimal("0.25"),
+        taxable=n % 3 != 0,
+    )
+
+
+def _template_codes(t: int) -> list[str]:
+    return [_code((t * 137 + k * 7) % ITEMS) for k in range(LINES_PER_TAKEOFF)]
+
+
+def _line(takeoff_id: str, code: str, k: int) -> TakeoffLineSnapshot:
+    return TakeoffLineSnapshot(
+        takeoff_id=takeoff_id,
+        item_code=code,
+        qty=Decimal(k % 7 + 1),
+        notes=None,
+        description_snapshot=code,
+        details_snapshot=None,
+        unit_price_snapshot=Decimal("12.50"),
+        taxable_snapshot=k % 2 == 0,
+        stage=list(Stage)[k % 3],
+        sort_order=k,
+    )
+
+
+@dataclass
+class _Db:
+    conn: sqlite3.Connection
+    version_id: str
+
+
+@pytest.fixture(params=[False, True], ids=["no-stats", "analyzed"])
+def db(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[_Db]:
+    """~2k items, 250 takeoffs x 60 lines, 10 templates; optionally ANALYZEd."""
+    conn = SqliteDb(path=tmp_path / "plans.db").connect()
+    SqliteItemRepository(conn=conn).upsert_many(_item(n) for n in range(ITEMS))
+    projects = SqliteProjectRepository(conn=conn)
+    templates = SqliteTemplateRepository(conn=conn)
+    template_lines = SqliteTemplateLineRepository(conn=conn)
+    for p in range(PROJECTS):
+        projects.upsert(Project(code=f"P{p:03d}", name=f"P {p}", contractor=None, foreman=None))
+    projects.upsert(Project(code="PNEW", name="No takeoffs", contractor=None, foreman=None))
+    for t in range(TEMPLATES):
+        templates.upsert(Template(code=f"TPL{t}", name=f"Template {t}", category="TH"))
+    for k, code in enumerate(_template_codes(0)):
+        template_lines.upsert(
+            TemplateLine(template_code="TPL0", item_code=code, qty=Decimal(k + 1))
+        )
+    conn.executemany(
+        "INSERT INTO template_lines (template_code, item_code, qty) VALUES (?, ?, '1')",
+        [(f"TPL{t}", code) for t in range(1, TEMPLATES) for code in _template_codes(t)],
+    )
+    conn.commit()
+
+    takeoffs = SqliteTakeoffRepository(conn=conn)
+    takeoffs.create_many(
+        [
+            (
+                TakeoffRecord(
+                    takeoff_id=f"T-{p:03d}-{t}",
+                    project_code=f"P{p:03d}",
+                    template_code=f"TPL{t}",
+                    tax_rate=Decimal("0.07"),
+                    valve_discount=Decimal("0"),
+                ),
+                [_line(f"T-{p:03d}-{t}", code, k) for k, code in enumerate(_template_codes(t))],
+            )
+            for p in range(PROJECTS)
+            for t in range(TEMPLATES)
+        ]
+    )
+    version_id = ""
+    for p in range(5):
+        for _ in range(3):
+            version_id = takeoffs.create_snapshot_version(takeoff_id=f"T-{p:03d}-0")
+    if request.param:
+        conn.execute("ANALYZE")
+        conn.commit()
+    try:
+        yield _Db(conn=conn, version_id=version_id)
+    finally:
+        conn.close()
+
+
+@dataclass(frozen=True)
+class _Case:
+    name: str
+    run: Callable[[], object]
+    # Tables (or aliases, as printed in the plan) the call reads in full by design.
+    full_scans: frozenset[str] = frozenset()
+
+
+def _cases(db: _Db) -> list[_Case]:
+    conn = db.conn
+    items = SqliteItemRepository(conn=conn)
+    projects = SqliteProjectRepository(conn=conn)
+    templates = SqliteTemplateRepository(conn=conn)
+    template_lines = SqliteTemplateLineRepository(conn=conn)
+    takeoffs = SqliteTakeoffRepository(conn=conn)
+    lines = SqliteTakeoffLineRepository(conn=conn)
+    spare = _code(ITEMS + 1)
+    code = _template_codes(1)[5]
+
+    def new_takeoff(takeoff_id: str, template_code: str) -> TakeoffRecord:
+        return TakeoffRecord(
+            takeoff_id=takeoff_id,
+            project_code="PNEW",
+            template_code=template_code,
+            tax_rate=Decimal("0.07"),
+            valve_discount=Decimal("0"),
+        )
+
+    return [
+        _Case("SqliteItemRepository.upsert", lambda: items.upsert(_item(ITEMS + 1))),
+        _Case(
+            "SqliteItemRepository.upsert_many",
+            lambda: items.upsert_many([_item(1), _item(ITEMS + 2)]),
+        ),
+        _Case("SqliteItemRepository.get", lambda: items.get(_code(7))),
+        _Case("SqliteItemRepository.get_many", lambda: items.get_many([_code(1), _code(9)])),
+        _Case("SqliteItemRepository.list", lambda: items.list(), frozenset({"items"})),
+        _Case("SqliteItemRepository.delete", lambda: items.delete(_code(ITEMS + 2))),
+        _Case(
+            "SqliteProjectRepository.upsert",
+            lambda: projects.upsert(Project(code="PX", name="X", contractor=None, foreman=None)),
+        ),
+        _Case("SqliteProjectRepository.get", lambda: projects.get("P001")),
+        _Case("SqliteProjectRepository.list", lambda: projects.list(), frozenset({"projects"})),
+        _Case(
+            "SqliteProjectRepository.set_valve_discount",
+            lambda: projects.set_valve_discount("P001", valve_discount=Decimal("-5")),
+        ),
+        _Case("SqliteProjectRepository.delete", lambda: projects.delete("PX")),
+        _Case(
+            "SqliteTemplateRepository.upsert",
+            lambda: templates.upsert(Template(code="TPLX", name="X", category="TH")),
+        ),
+        _Case("SqliteTemplateRepository.get", lambda: templates.get("TPL1")),
+        _Case("SqliteTemplateRepository.list", lambda: templates.list(), frozenset({"templates"})),
+        _Case("SqliteTemplateRepository.delete", lambda: templates.delete("TPLX")),
+        _Case(
+            "SqliteTemplateLineRepository.upsert",
+            lambda: template_lines.upsert(
+                TemplateLine(template_code="TPL1", item_code=spare, qty=Decimal("2"))
+            ),
+        ),
+        _Case(
+            "SqliteTemplateLineRepository.list_for_template",
+            lambda: template_lines.list_for_template("TPL1"),
+        ),
+        _Case(
+            "SqliteTemplateLineRepository.delete",
+            lambda: template_lines.delete("TPL1", spare),
+        ),
+        _Case("SqliteTakeoffRepository.create", lambda: takeoffs.create(new_takeoff("TX", "TPL1"))),
+        _Case(
+            "SqliteTakeoffRepository.create_many",
+            lambda: takeoffs.create_many([(new_takeoff("TY", "TPL2"), [_line("TY", _code(3), 0)])]),
+        ),
+        _Case("SqliteTakeoffRepository.get", lambda: takeoffs.get("T-001-1")),
+        _Case(
+            "SqliteTakeoffRepository.find_by_project_template",
+            lambda: takeoffs.find_by_project_template(project_code="P001", template_code="TPL1"),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.list_for_project",
+            lambda: takeoffs.list_for_project("P001"),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.set_locked",
+            lambda: takeoffs.set_locked(takeoff_id="T-002-1", is_locked=False),
+        ),
+        _Case("SqliteTakeoffRepository.lock", lambda: takeoffs.lock(takeoff_id="T-002-2")),
+        _Case("SqliteTakeoffRepository.unlock", lambda: takeoffs.unlock(takeoff_id="T-002-2")),
+        _Case(
+            "SqliteTakeoffLineRepository.bulk_insert",
+            lambda: lines.bulk_insert([_line("TX", _code(4), 0), _line("TX", _code(5), 1)]),
+        ),
+        _Case(
+            "SqliteTakeoffLineRepository.add_line",
+            lambda: lines.add_line(_line("TX", _code(6), 2)),
+        ),
+        _Case(
+            "SqliteTakeoffLineRepository.update_line",
+            lambda: lines.update_line(takeoff_id="T-001-1", item_code=code, qty=Decimal("9")),
+        ),
+        _Case(
+            "SqliteTakeoffLineRepository.list_for_takeoff",
+            lambda: lines.list_for_takeoff("T-001-1"),
+        ),
+        _Case(
+            "SqliteTakeoffLineRepository.delete_line",
+            lambda: lines.delete_line(takeoff_id="TX", item_code=_code(6)),
+        ),
+        _Case(
+            "SqliteTakeoffLineRepository.apply_changes",
+            lambda: lines.apply_changes(
+                takeoff_id="TX", adds=[_line("TX", _code(8), 3)], deletes=[_code(4)]
+            ),
+        ),
+        _Case(
+            "SqliteTakeoffLineRepository.stage_sums_for_project",
+            lambda: lines.stage_sums_for_project(project_code="P001"),
+        ),
+        _Case(
+            "SqliteTakeoffLineRepository.stage_sums_for_takeoff",
+            lambda: lines.stage_sums_for_takeoff(takeoff_id="T-001-1"),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.create_snapshot_version",
+            lambda: takeoffs.create_snapshot_version(takeoff_id="T-001-1"),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.create_project_snapshot",
+            lambda: takeoffs.create_project_snapshot(project_code="P003"),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.list_versions",
+            lambda: takeoffs.list_versions(takeoff_id="T-000-0"),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.version_grand_totals",
+            lambda: takeoffs.version_grand_totals(takeoff_id="T-000-0"),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.get_version",
+            lambda: takeoffs.get_version(version_id=db.version_id),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.list_version_lines",
+            lambda: takeoffs.list_version_lines(version_id=db.version_id),
+        ),
+        _Case(
+            "SqliteTakeoffRepository.verify_version_integrity",
+            lambda: takeoffs.verify_version_integrity(version_id=db.version_id),
+        ),
+        _Case(
+            "sqlite_totals.refresh_takeoff_totals",
+            lambda: _in_transaction(
+                conn, lambda: sqlite_totals.refresh_takeoff_totals(conn, takeoff_ids=["T-001-1"])
+            ),
+        ),
+        _Case(
+            "sqlite_totals.insert_version_totals",
+            lambda: _in_transaction(
+                conn,
+                lambda: sqlite_totals.insert_version_totals(conn, version_ids=[db.version_id]),
+            ),
+        ),
+        _Case(
+            "sqlite_totals.rebuild_totals",
+            lambda: sqlite_totals.rebuild_totals(conn),
+            frozenset({"l", "vl", "takeoff_totals", "takeoff_version_totals"}),
+        ),
+    ]
+
+
+def _in_transaction(conn: sqlite3.Connection, fn: Callable[[], object]) -> None:
+    conn.execute("BEGIN")
+    fn()
+    conn.commit()
+
+
+def _full_scans(conn: sqlite3.Connection, sql: str) -> list[tuple[str, str]]:
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return [(m.group(1), row[3]) for row in plan if (m := _SCAN.match(row[3]))]
+
+
+def test_harness_covers_every_repository_query(tmp_path: Path) -> None:
+    conn = SqliteDb(path=tmp_path / "empty.db").connect()
+    try:
+        covered = {case.name for case in _cases(_Db(conn=conn, version_id=""))}
+    finally:
+        conn.close()
+
+    public = {
+        f"{cls.__name__}.{name}"
+        for cls in REPOSITORIES
+        for name, attr in vars(cls).items()
+        if callable(attr) and not name.startswith("_")
+    }
+    public |= {f"sqlite_totals.{name}" for name in TOTALS_FUNCTIONS}
+    assert public - covered == set()
+
+
+def test_repository_queries_use_indexes(db: _Db) -> None:
+    conn = db.conn
+    violations: list[str] = []
+    for case in _cases(db):
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        try:
+            case.run()
+        finally:
+            conn.set_trace_callback(None)
+
+        assert statements, f"{case.name} issued no SQL"
+        for sql in dict.fromkeys(statements):
+            if _SKIP.match(sql.lstrip()):
+                continue
+            for table, detail in _full_scans(conn, sql):
+                if table not in case.full_scans:
+                    violations.append(f"{case.name}: {detail}\n    {' '.join(sql.split())}")
+
+    assert violations == []
+
+    # list_versions' ORDER BY version_number DESC walks the UNIQUE
+    # (takeoff_id, version_number) index backwards: no separate DESC index.
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT version_id FROM takeoff_versions "
+        "WHERE takeoff_id = 'T-000-0' ORDER BY version_number DESC"
+    ).fetchall()
+    assert [row[3] for row in plan] == [
+        "SEARCH takeoff_versions USING INDEX sqlite_autoindex_takeoff_versions_2 (takeoff_id=?)"
+    ]
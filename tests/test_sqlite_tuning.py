@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import app.cli as cli
+from app.config import DB_PROFILES, AppConfig, SqliteTuning
+from app.infrastructure.sqlite_db import SqliteDb
+
+
+def _pragma(conn, name: str) -> object:
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_default_config_uses_interactive_profile() -> None:
+    assert AppConfig().db_profile == "interactive"
+    assert AppConfig().db_tuning() == DB_PROFILES["interactive"]
+
+
+def test_unknown_profile_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown db_profile"):
+        AppConfig(db_profile="turbo").db_tuning()
+
+
+def test_tuning_rejects_invalid_pragma_values() -> None:
+    with pytest.raises(ValueError):
+        SqliteTuning(journal_mode="wal; DROP TABLE items")
+
+
+@pytest.mark.parametrize("profile", sorted(DB_PROFILES))
+def test_connect_applies_profile_pragmas(tmp_path: Path, profile: str) -> None:
+    tuning = DB_PROFILES[profile]
+    conn = SqliteDb(path=tmp_path / "t.db", tuning=tuning).connect()
+    try:
+        assert str(_pragma(conn, "journal_mode")).upper() == tuning.journal_mode
+        assert _pragma(conn, "cache_size") == tuning.cache_size
+        assert _pragma(conn, "busy_timeout") == tuning.busy_timeout_ms
+        sync_levels = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+        assert _pragma(conn, "synchronous") == sync_levels[tuning.synchronous]
+        temp_levels = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+        assert _pragma(conn, "temp_store") == temp_levels[tuning.temp_store]
+    finally:
+        conn.close()
+
+
+def test_cli_accepts_db_profile_flag(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    db_path = tmp_path / "t.db"
+    rc = cli.main(["--db-path", str(db_path), "--db-profile", "bulk_import", "db", "migrate"])
+    assert rc == 0
+    capsys.readouterr()
+
+    conn = SqliteDb(path=db_path).connect()
+    try:
+        # journal_mode=WAL is persistent in the DB file.
+        assert str(_pragma(conn, "journal_mode")).lower() == "wal"
+    finally:
+        conn.close()
+
+
+def test_read_only_report_profile_rejects_writes_after_migrating(tmp_path: Path) -> None:
+    tuning = DB_PROFILES["read_only_report"]
+    conn = SqliteDb(path=tmp_path / "t.db", tuning=tuning).connect()
+    try:
+        assert _pragma(conn, "query_only") == 1
+        assert _pragma(conn, "user_version") > 0  # migrations still ran
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            conn.execute("DELETE FROM items")
+    finally:
+        conn.close()
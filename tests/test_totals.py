@@ -1,7 +1,14 @@
+import random
 from decimal import Decimal
 
+from app.domain.money import calc_line_totals, q2
 from app.domain.stage import Stage
-from app.domain.totals import TakeoffLineInput, calc_grand_totals, calc_stage_totals
+from app.domain.totals import (
+    TakeoffLineInput,
+    TotalsAccumulator,
+    calc_grand_totals,
+    calc_stage_totals,
+)
 
 
 def test_stage_totals_sums_lines_by_stage():
@@ -58,3 +65,58 @@ def test_grand_totals_apply_valve_discount():
     assert gt.tax == Decimal("7.00")
     assert gt.total == Decimal("107.00")
     assert gt.total_after_discount == Decimal("-5.99")
+
+
+def _random_lines(rnd: random.Random, n: int) -> list[TakeoffLineInput]:
+    return [
+        TakeoffLineInput(
+            stage=rnd.choice(list(Stage)),
+            price=Decimal(rnd.randint(1, 99_999)) / rnd.choice([100, 1000]),
+            qty=Decimal(rnd.randint(1, 40)) / rnd.choice([1, 2, 4]),
+            factor=rnd.choice([Decimal("1"), Decimal("0.3"), Decimal("0.3333"), Decimal("1.5")]),
+            taxable=rnd.random() < 0.7,
+        )
+        for _ in range(n)
+    ]
+
+
+def test_accumulator_matches_per_stage_scan():
+    rnd = random.Random(42)
+    for _ in range(50):
+        lines = _random_lines(rnd, rnd.randint(0, 60))
+        tax_rate = rnd.choice([Decimal("0.07"), Decimal("0.065"), Decimal("0.0725")])
+        valve_discount = Decimal(-rnd.randint(0, 10_000)) / 100
+
+        acc = TotalsAccumulator(tax_rate=tax_rate)
+        line_totals = [acc.add(ln) for ln in lines]
+
+        # Reference: per-stage filter + per-line q2, as before the accumulator.
+        for st in Stage:
+            stage_lines = [ln for ln in lines if ln.stage == st]
+            ref = [
+                calc_line_totals(
+                    price=ln.price,
+                    qty=ln.qty,
+                    factor=ln.factor,
+                    taxable=ln.taxable,
+                    tax_rate=tax_rate,
+                )
+                for ln in stage_lines
+            ]
+            subtotal = q2(sum((t.subtotal for t in ref), Decimal("0.00")))
+            tax = q2(sum((t.tax for t in ref), Decimal("0.00")))
+            got = acc.stage_totals(st)
+            assert (got.subtotal, got.tax, got.total) == (subtotal, tax, q2(subtotal + tax))
+
+        gt = acc.grand_totals(valve_discount=valve_discount)
+        assert gt == calc_grand_totals(lines, valve_discount=valve_discount, tax_rate=tax_rate)
+        assert gt.subtotal == q2(sum((t.subtotal for t in line_totals), Decimal("0.00")))
+        assert gt.tax == q2(sum((t.tax for t in line_totals), Decimal("0.00")))
+
+
+def test_accumulator_without_lines_is_zero():
+    acc = TotalsAccumulator()
+    assert acc.stage_totals(Stage.TOPOUT) == calc_stage_totals([], stage=Stage.TOPOUT)
+    gt = acc.grand_totals(valve_discount=Decimal("-10.00"))
+    assert gt.total == Decimal("0.00")
+    assert gt.total_after_discount == Decimal("-10.00")